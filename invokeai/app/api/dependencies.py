@@ -16,21 +16,27 @@ from invokeai.app.services.events.events_fastapievents import FastAPIEventServic
 from invokeai.app.services.image_files.image_files_disk import DiskImageFileStorage
 from invokeai.app.services.image_records.image_records_sqlite import SqliteImageRecordStorage
 from invokeai.app.services.images.images_default import ImageService
+from invokeai.app.services.invocation_cache.invocation_cache_base import InvocationCacheBase
 from invokeai.app.services.invocation_cache.invocation_cache_memory import MemoryInvocationCache
+from invokeai.app.services.invocation_cache.invocation_cache_sqlite import SqliteInvocationCache
+from invokeai.app.services.invocation_cache.invocation_cache_tiered import TieredInvocationCache
 from invokeai.app.services.invocation_services import InvocationServices
 from invokeai.app.services.invocation_stats.invocation_stats_default import InvocationStatsService
 from invokeai.app.services.invoker import Invoker
+from invokeai.app.services.model_hash_cache.model_hash_cache_sqlite import SqliteModelHashCache
 from invokeai.app.services.model_images.model_images_default import ModelImageFileStorageDisk
 from invokeai.app.services.model_manager.model_manager_default import ModelManagerService
 from invokeai.app.services.model_records.model_records_sql import ModelRecordServiceSQL
 from invokeai.app.services.names.names_default import SimpleNameService
 from invokeai.app.services.object_serializer.object_serializer_disk import ObjectSerializerDisk
 from invokeai.app.services.object_serializer.object_serializer_forward_cache import ObjectSerializerForwardCache
+from invokeai.app.services.object_serializer.object_serializer_safetensors import ObjectSerializerSafetensors
 from invokeai.app.services.session_processor.session_processor_default import (
     DefaultSessionProcessor,
     DefaultSessionRunner,
 )
 from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
 from invokeai.app.services.shared.sqlite.sqlite_util import init_db
 from invokeai.app.services.style_preset_images.style_preset_images_disk import StylePresetImageFileStorageDisk
 from invokeai.app.services.style_preset_records.style_preset_records_sqlite import SqliteStylePresetRecordsStorage
@@ -79,7 +85,13 @@ class ApiDependencies:
         if output_folder is None:
             raise ValueError("Output folder is not set")
 
-        image_files = DiskImageFileStorage(f"{output_folder}/images")
+        image_files = DiskImageFileStorage(
+            f"{output_folder}/images",
+            max_cache_bytes=config.image_cache_ram_mb * 2**20,
+            max_thumbnail_cache_bytes=config.thumbnail_cache_ram_mb * 2**20,
+            save_workers=config.image_save_workers,
+            max_deferred_bytes=config.intermediate_image_ram_mb * 2**20,
+        )
 
         model_images_folder = config.models_path
         style_presets_folder = config.style_presets_path
@@ -97,12 +109,39 @@ class ApiDependencies:
         bulk_download = BulkDownloadService()
         image_records = SqliteImageRecordStorage(db=db)
         images = ImageService()
-        invocation_cache = MemoryInvocationCache(max_cache_size=config.node_cache_size)
-        tensors = ObjectSerializerForwardCache(
-            ObjectSerializerDisk[torch.Tensor](output_folder / "tensors", ephemeral=True)
+        invocation_cache: InvocationCacheBase = MemoryInvocationCache(
+            max_cache_size=config.node_cache_size, max_cache_bytes=config.node_cache_ram_mb * 2**20
         )
+        if config.node_cache_size > 0 and config.node_cache_disk_mb > 0:
+            invocation_cache_db = SqliteDatabase(
+                db_path=None if config.use_memory_db else output_folder / "invocation_cache.db",
+                logger=logger,
+                verbose=config.log_sql,
+            )
+            invocation_cache = TieredInvocationCache(
+                invocation_cache,
+                SqliteInvocationCache(db=invocation_cache_db, max_cache_bytes=config.node_cache_disk_mb * 2**20),
+            )
+        # Serializers must be created through a subscripted class, which names the objects they save
+        tensor_serializer: ObjectSerializerDisk[torch.Tensor]
+        conditioning_serializer: ObjectSerializerDisk[ConditioningFieldData]
+        if config.tensor_format == "safetensors":
+            tensor_serializer = ObjectSerializerSafetensors[torch.Tensor](
+                output_folder / "tensors", ephemeral=True, write_behind=True
+            )
+            conditioning_serializer = ObjectSerializerSafetensors[ConditioningFieldData](
+                output_folder / "conditioning", ephemeral=True, write_behind=True
+            )
+        else:
+            tensor_serializer = ObjectSerializerDisk[torch.Tensor](
+                output_folder / "tensors", ephemeral=True, write_behind=True
+            )
+            conditioning_serializer = ObjectSerializerDisk[ConditioningFieldData](
+                output_folder / "conditioning", ephemeral=True, write_behind=True
+            )
+        tensors = ObjectSerializerForwardCache(tensor_serializer, max_cache_bytes=config.tensor_cache_ram_mb * 2**20)
         conditioning = ObjectSerializerForwardCache(
-            ObjectSerializerDisk[ConditioningFieldData](output_folder / "conditioning", ephemeral=True)
+            conditioning_serializer, max_cache_bytes=config.tensor_cache_ram_mb * 2**20
         )
         download_queue_service = DownloadQueueService(app_config=configuration, event_bus=events)
         model_images_service = ModelImageFileStorageDisk(model_images_folder / "model_images")
@@ -111,10 +150,14 @@ class ApiDependencies:
             model_record_service=ModelRecordServiceSQL(db=db, logger=logger),
             download_queue=download_queue_service,
             events=events,
+            hash_cache=SqliteModelHashCache(db=db),
         )
         names = SimpleNameService()
         performance_statistics = InvocationStatsService()
-        session_processor = DefaultSessionProcessor(session_runner=DefaultSessionRunner())
+        session_processor = DefaultSessionProcessor(
+            session_runner=DefaultSessionRunner(max_concurrent_nodes=config.max_concurrent_nodes),
+            thread_limit=config.session_workers,
+        )
         session_queue = SqliteSessionQueue(db=db)
         urls = LocalUrlService()
         workflow_records = SqliteWorkflowRecordsStorage(db=db)
@@ -0,0 +1,147 @@
+import hashlib
+import os
+from typing import Mapping, Optional
+
+import anyio
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+
+class FileRangeResponse(FileResponse):
+    """Streams a single byte range of a file, as a 206 Partial Content response."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        start: int,
+        end: int,
+        stat_result: os.stat_result,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+    ) -> None:
+        super().__init__(path, status_code=206, headers=headers, media_type=media_type, stat_result=stat_result)
+        self.start = start
+        self.end = end
+        self.headers["content-length"] = str(end - start + 1)
+        self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = self.end - self.start + 1
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # The file was truncated while it was being sent
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def make_etag(name: str, stat_result: os.stat_result) -> str:
+    """Makes a strong ETag for a file from its name, modification time and size."""
+    etag_base = f"{name}:{stat_result.st_mtime_ns}:{stat_result.st_size}"
+    return f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Checks an If-None-Match header against an ETag, using the weak comparison required for conditional GETs."""
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """Parses a Range header with a single byte range into an inclusive (start, end) tuple.
+
+    Args:
+        header: The Range header
+        size: The size of the file
+
+    Returns:
+        The byte range, or None if the header is not a single byte range, in which case the whole file is sent.
+
+    Raises:
+        ValueError: If the range is not satisfiable
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, sep, last = ranges.strip().partition("-")
+    if not sep or (first and not first.isdigit()) or (last and not last.isdigit()) or not (first or last):
+        return None
+    if not first:
+        # A suffix range, for the last bytes of the file
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(f"Range {header} is not satisfiable")
+        return max(0, size - length), size - 1
+    start = int(first)
+    if start >= size:
+        raise ValueError(f"Range {header} is not satisfiable")
+    end = min(int(last), size - 1) if last else size - 1
+    if end < start:
+        return None
+    return start, end
+
+
+async def image_file_response(
+    request: Request,
+    path: str | os.PathLike[str],
+    name: str,
+    media_type: str,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """Makes a streamed response for an image file, answering conditional and range requests.
+
+    The file is stat'ed and read on worker threads, so the event loop is not blocked by disk I/O.
+
+    Args:
+        request: The request for the image
+        path: Path to the image file
+        name: The name of the image, from which the ETag is derived along with the file's modification time
+        media_type: The media type of the image
+        headers: Additional response headers
+
+    Returns:
+        A 304 response if the client's copy is current, a 206 response for a satisfiable byte range, a 416 response
+        for an unsatisfiable one, or else a 200 response with the whole file.
+
+    Raises:
+        OSError: If the file cannot be stat'ed
+    """
+    stat_result = await run_in_threadpool(os.stat, path)
+    etag = make_etag(name, stat_result)
+    # Images are already compressed. An explicit encoding keeps the GZip middleware from compressing them again, which
+    # would also break byte ranges and content lengths.
+    response_headers = {**(headers or {}), "etag": etag, "accept-ranges": "bytes", "content-encoding": "identity"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=response_headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header is not None and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, stat_result.st_size)
+        except ValueError:
+            return Response(
+                status_code=416, headers={**response_headers, "content-range": f"bytes */{stat_result.st_size}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            return FileRangeResponse(
+                path, start, end, stat_result=stat_result, headers=response_headers, media_type=media_type
+            )
+
+    return FileResponse(path, headers=response_headers, media_type=media_type, stat_result=stat_result)
@@ -12,6 +12,8 @@ from pydantic import BaseModel, Field
 
 from invokeai.app.api.dependencies import ApiDependencies
 from invokeai.app.invocations.upscale import ESRGAN_MODELS
+from invokeai.app.services.events.events_common import EventServiceStats
+from invokeai.app.services.image_files.image_files_common import ImageFileCacheStatus
 from invokeai.app.services.invocation_cache.invocation_cache_common import InvocationCacheStatus
 from invokeai.backend.image_util.infill_methods.patchmatch import PatchMatch
 from invokeai.backend.util.logging import logging
@@ -184,3 +186,23 @@ async def disable_invocation_cache() -> None:
 async def get_invocation_cache_status() -> InvocationCacheStatus:
     """Clears the invocation cache"""
     return ApiDependencies.invoker.services.invocation_cache.get_status()
+
+
+@app_router.get(
+    "/image_cache/status",
+    operation_id="get_image_cache_status",
+    responses={200: {"model": ImageFileCacheStatus}},
+)
+async def get_image_cache_status() -> ImageFileCacheStatus:
+    """Gets the status of the decoded image and thumbnail caches"""
+    return ApiDependencies.invoker.services.image_files.get_cache_status()
+
+
+@app_router.get(
+    "/events/stats",
+    operation_id="get_event_stats",
+    responses={200: {"model": EventServiceStats}},
+)
+async def get_event_stats() -> EventServiceStats:
+    """Gets the delivery statistics of each event type, including how many progress events were coalesced"""
+    return ApiDependencies.invoker.services.events.get_stats()
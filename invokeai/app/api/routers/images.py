@@ -3,20 +3,25 @@ import traceback
 from typing import Optional
 
 from fastapi import BackgroundTasks, Body, HTTPException, Path, Query, Request, Response, UploadFile
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.routing import APIRouter
 from PIL import Image
 from pydantic import BaseModel, Field, JsonValue
+from starlette.concurrency import run_in_threadpool
 
 from invokeai.app.api.dependencies import ApiDependencies
+from invokeai.app.api.image_file_response import image_file_response
 from invokeai.app.invocations.fields import MetadataField
+from invokeai.app.services.board_records.board_records_common import BoardRecordNotFoundException
 from invokeai.app.services.image_records.image_records_common import (
     ImageCategory,
     ImageRecordChanges,
+    ImageRecordNotFoundException,
+    InvalidImageCursorException,
     ResourceOrigin,
 )
 from invokeai.app.services.images.images_common import ImageDTO, ImageUrlsDTO
-from invokeai.app.services.shared.pagination import OffsetPaginatedResults
+from invokeai.app.services.shared.pagination import KeysetPaginatedResults, OffsetPaginatedResults
 from invokeai.app.services.shared.sqlite.sqlite_common import SQLiteDirection
 
 images_router = APIRouter(prefix="/v1/images", tags=["images"])
@@ -243,18 +248,24 @@ async def get_image_workflow(
     },
 )
 async def get_image_full(
+    request: Request,
     image_name: str = Path(description="The name of full-resolution image file to get"),
 ) -> Response:
     """Gets a full-resolution image file"""
 
     try:
-        path = ApiDependencies.invoker.services.images.get_path(image_name)
-        with open(path, "rb") as f:
-            content = f.read()
-        response = Response(content, media_type="image/png")
-        response.headers["Cache-Control"] = f"max-age={IMAGE_MAX_AGE}"
-        response.headers["Content-Disposition"] = f'inline; filename="{image_name}"'
-        return response
+        # Getting the path may wait for the image to be written, or write it
+        path = await run_in_threadpool(ApiDependencies.invoker.services.images.get_path, image_name)
+        return await image_file_response(
+            request,
+            path,
+            name=image_name,
+            media_type="image/png",
+            headers={
+                "Cache-Control": f"max-age={IMAGE_MAX_AGE}",
+                "Content-Disposition": f'inline; filename="{image_name}"',
+            },
+        )
     except Exception:
         raise HTTPException(status_code=404)
 
@@ -272,17 +283,20 @@ async def get_image_full(
     },
 )
 async def get_image_thumbnail(
+    request: Request,
     image_name: str = Path(description="The name of thumbnail image file to get"),
 ) -> Response:
     """Gets a thumbnail image file"""
 
     try:
-        path = ApiDependencies.invoker.services.images.get_path(image_name, thumbnail=True)
-        with open(path, "rb") as f:
-            content = f.read()
-        response = Response(content, media_type="image/webp")
-        response.headers["Cache-Control"] = f"max-age={IMAGE_MAX_AGE}"
-        return response
+        path = await run_in_threadpool(ApiDependencies.invoker.services.images.get_path, image_name, thumbnail=True)
+        return await image_file_response(
+            request,
+            path,
+            name=f"{image_name}:thumbnail",
+            media_type="image/webp",
+            headers={"Cache-Control": f"max-age={IMAGE_MAX_AGE}"},
+        )
     except Exception:
         raise HTTPException(status_code=404)
 
@@ -337,6 +351,38 @@ async def list_image_dtos(
     return image_dtos
 
 
+@images_router.get(
+    "/cursor",
+    operation_id="list_image_dtos_by_cursor",
+    response_model=KeysetPaginatedResults[ImageDTO],
+)
+async def list_image_dtos_by_cursor(
+    image_origin: Optional[ResourceOrigin] = Query(default=None, description="The origin of images to list."),
+    categories: Optional[list[ImageCategory]] = Query(default=None, description="The categories of image to include."),
+    is_intermediate: Optional[bool] = Query(default=None, description="Whether to list intermediate images."),
+    board_id: Optional[str] = Query(
+        default=None,
+        description="The board id to filter by. Use 'none' to find images without a board.",
+    ),
+    cursor: Optional[str] = Query(
+        default=None, description="The cursor returned with the previous page. Omit to get the first page."
+    ),
+    limit: int = Query(default=10, ge=1, description="The number of images per page"),
+    order_dir: SQLiteDirection = Query(default=SQLiteDirection.Descending, description="The order of sort"),
+    starred_first: bool = Query(default=True, description="Whether to sort by starred images first"),
+    search_term: Optional[str] = Query(default=None, description="The term to search for"),
+) -> KeysetPaginatedResults[ImageDTO]:
+    """Gets a page of image DTOs. Unlike offset pagination, the cost of getting a page does not grow with its depth.
+    The sort order and filters must be the same for every page."""
+
+    try:
+        return ApiDependencies.invoker.services.images.get_many_by_cursor(
+            cursor, limit, starred_first, order_dir, image_origin, categories, is_intermediate, board_id, search_term
+        )
+    except InvalidImageCursorException:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 class DeleteImagesFromListResult(BaseModel):
     deleted_images: list[str]
 
@@ -430,6 +476,49 @@ async def download_images_from_list(
     return ImagesDownloaded(bulk_download_item_name=bulk_download_item_id + ".zip")
 
 
+@images_router.post(
+    "/download/stream",
+    operation_id="stream_images_download",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "A zip file of the images, streamed as it is written",
+            "content": {"application/zip": {}},
+        },
+        400: {"description": "No images or board id specified"},
+        404: {"description": "Image or board not found"},
+    },
+)
+async def stream_images_download(
+    image_names: Optional[list[str]] = Body(
+        default=None, description="The list of names of images to download", embed=True
+    ),
+    board_id: Optional[str] = Body(
+        default=None, description="The board from which image should be downloaded", embed=True
+    ),
+    start: int = Body(default=0, ge=0, description="The number of images to skip, to resume a download", embed=True),
+) -> StreamingResponse:
+    """Streams a zip file of images, without preparing it on disk first. Progress is reported with bulk download
+    events, which give the number of images written, from which an interrupted download can be resumed."""
+    if (image_names is None or len(image_names) == 0) and board_id is None:
+        raise HTTPException(status_code=400, detail="No images or board id specified.")
+    bulk_download = ApiDependencies.invoker.services.bulk_download
+    try:
+        bulk_download_item_id = await run_in_threadpool(bulk_download.generate_item_id, board_id)
+        chunks = await run_in_threadpool(bulk_download.stream, image_names, board_id, bulk_download_item_id, start)
+    except (ImageRecordNotFoundException, BoardRecordNotFoundException):
+        raise HTTPException(status_code=404, detail="Image or board not found")
+    return StreamingResponse(
+        chunks,
+        media_type="application/zip",
+        # The images are already compressed, so keep the GZip middleware from compressing the zip file
+        headers={
+            "Content-Disposition": f'attachment; filename="{bulk_download_item_id}.zip"',
+            "Content-Encoding": "identity",
+        },
+    )
+
+
 @images_router.api_route(
     "/download/{bulk_download_item_name}",
     methods=["GET"],
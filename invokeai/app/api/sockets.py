@@ -11,6 +11,7 @@ from invokeai.app.services.events.events_common import (
     BulkDownloadCompleteEvent,
     BulkDownloadErrorEvent,
     BulkDownloadEventBase,
+    BulkDownloadProgressEvent,
     BulkDownloadStartedEvent,
     DownloadCancelledEvent,
     DownloadCompleteEvent,
@@ -79,7 +80,12 @@ MODEL_EVENTS = {
     ModelInstallErrorEvent,
 }
 
-BULK_DOWNLOAD_EVENTS = {BulkDownloadStartedEvent, BulkDownloadCompleteEvent, BulkDownloadErrorEvent}
+BULK_DOWNLOAD_EVENTS = {
+    BulkDownloadStartedEvent,
+    BulkDownloadProgressEvent,
+    BulkDownloadCompleteEvent,
+    BulkDownloadErrorEvent,
+}
 
 
 class SocketIO:
@@ -115,6 +121,10 @@ class SocketIO:
     async def _handle_unsub_bulk_download(self, sid: str, data: Any) -> None:
         await self._sio.leave_room(sid, BulkDownloadSubscriptionEvent(**data).bulk_download_id)
 
+    def has_queue_subscribers(self, queue_id: str) -> bool:
+        """Checks whether any client is subscribed to a queue. This is safe to call from other threads."""
+        return bool(self._sio.manager.rooms.get("/", {}).get(queue_id))
+
     async def _handle_queue_event(self, event: FastAPIEvent[QueueEventBase]):
         await self._sio.emit(event=event[0], data=event[1].model_dump(mode="json"), room=event[1].queue_id)
 
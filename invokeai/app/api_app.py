@@ -68,6 +68,8 @@ port = app_config.port
 async def lifespan(app: FastAPI):
     # Add startup event to load dependencies
     ApiDependencies.initialize(config=app_config, event_handler_id=event_handler_id, loop=loop, logger=logger)
+    # Lets nodes skip work, like progress previews, that no client would receive
+    ApiDependencies.invoker.services.events.set_queue_subscribers_check(socket_io.has_queue_subscribers)
 
     # Log the server address when it starts - in case the network log level is not high enough to see the startup log
     proto = "https" if app_config.ssl_certfile else "http"
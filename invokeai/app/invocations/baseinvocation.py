@@ -24,10 +24,11 @@ from typing import (
 )
 
 import semver
-from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, create_model
+from blake3 import blake3
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter, create_model
 from pydantic.fields import FieldInfo
 from pydantic_core import PydanticUndefined
-from typing_extensions import TypeAliasType
+from typing_extensions import Self, TypeAliasType
 
 from invokeai.app.invocations.fields import (
     FieldKind,
@@ -74,6 +75,18 @@ class Classification(str, Enum, metaclass=MetaEnum):
     Special = "special"
 
 
+class Concurrency(str, Enum, metaclass=MetaEnum):
+    """
+    Whether an Invocation may run at the same time as other invocations of its session, when the session runner is
+    configured to run nodes concurrently.
+    - `GpuExclusive`: The invocation runs one at a time with other `GpuExclusive` invocations. Use this for anything that loads models, uses the GPU or is not thread-safe.
+    - `CpuSafe`: The invocation may run alongside any other invocation. Use this for thread-safe invocations that only do CPU work, like image or math operations.
+    """
+
+    GpuExclusive = "gpu-exclusive"
+    CpuSafe = "cpu-safe"
+
+
 class UIConfigBase(BaseModel):
     """
     Provides additional node configuration to the UI.
@@ -170,6 +183,19 @@ class MissingInputException(Exception):
         super().__init__(f"Node {node_id} missing value or connection for field {field_name}")
 
 
+class FingerprintCache:
+    """Holds an invocation's cached fingerprint. It is derived from the invocation's fields, so it never affects
+    equality between invocations."""
+
+    def __init__(self, fingerprint: Optional[str] = None) -> None:
+        self.fingerprint = fingerprint
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FingerprintCache)
+
+    __hash__ = None  # type: ignore
+
+
 class BaseInvocation(ABC, BaseModel):
     """
     All invocations must use the `@invocation` decorator to provide their unique type.
@@ -178,12 +204,21 @@ class BaseInvocation(ABC, BaseModel):
     _invocation_classes: ClassVar[set[BaseInvocation]] = set()
     _typeadapter: ClassVar[Optional[TypeAdapter[Any]]] = None
     _typeadapter_needs_update: ClassVar[bool] = False
+    # The invocation's fingerprint, used as its cache key. It is invalidated when an input is reassigned, and each copy
+    # of the invocation gets its own, carried over unless the copy updates its inputs.
+    _fingerprint_cache: FingerprintCache = PrivateAttr(default_factory=FingerprintCache)
+    _concurrency: ClassVar[Concurrency] = Concurrency.GpuExclusive
 
     @classmethod
     def get_type(cls) -> str:
         """Gets the invocation's type, as provided by the `@invocation` decorator."""
         return cls.model_fields["type"].default
 
+    @classmethod
+    def get_concurrency(cls) -> Concurrency:
+        """Gets the invocation's concurrency, as provided by the `@invocation` decorator."""
+        return cls._concurrency
+
     @classmethod
     def register_invocation(cls, invocation: BaseInvocation) -> None:
         """Registers an invocation."""
@@ -258,6 +293,39 @@ class BaseInvocation(ABC, BaseModel):
         schema["class"] = "invocation"
         schema["required"].extend(["type", "id"])
 
+    def get_fingerprint(self) -> str:
+        """Gets a stable digest of the invocation's type, version and inputs, excluding its id.
+
+        The fingerprint is cached on the instance until one of its fields (other than `id`) is reassigned, so copies of
+        an invocation that only differ by id, like the nodes prepared for each iteration of a collection, share it.
+        """
+        cache: FingerprintCache = self.__pydantic_private__["_fingerprint_cache"]  # type: ignore
+        if cache.fingerprint is None:
+            hasher = blake3(self.UIConfig.version.encode())
+            hasher.update(self.__pydantic_serializer__.to_json(self, exclude={"id"}, warnings=False))
+            cache.fingerprint = hasher.hexdigest()
+        return cache.fingerprint
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name != "id" and not name.startswith("_") and self.__pydantic_private__ is not None:
+            self.__pydantic_private__["_fingerprint_cache"].fingerprint = None
+
+    def __copy__(self) -> Self:
+        copied = super().__copy__()
+        # A shallow copy would otherwise share the cache, so reassigning an input of either would affect the other
+        if copied.__pydantic_private__ is not None:
+            fingerprint = self.__pydantic_private__["_fingerprint_cache"].fingerprint  # type: ignore
+            copied.__pydantic_private__["_fingerprint_cache"] = FingerprintCache(fingerprint)
+        return copied
+
+    def model_copy(self, *, update: Optional[dict[str, Any]] = None, deep: bool = False) -> Self:
+        copied = super().model_copy(update=update, deep=deep)
+        # Updated fields are set directly, without going through __setattr__
+        if update and any(name != "id" for name in update) and copied.__pydantic_private__ is not None:
+            copied.__pydantic_private__["_fingerprint_cache"] = FingerprintCache()
+        return copied
+
     @abstractmethod
     def invoke(self, context: InvocationContext) -> BaseInvocationOutput:
         """Invoke with provided context and return outputs."""
@@ -294,11 +362,11 @@ class BaseInvocation(ABC, BaseModel):
         output: BaseInvocationOutput
         if self.use_cache:
             key = services.invocation_cache.create_key(self)
-            cached_value = services.invocation_cache.get(key)
+            cached_value = services.invocation_cache.get(key, self.get_type())
             if cached_value is None:
                 services.logger.debug(f'Invocation cache miss for type "{self.get_type()}": {self.id}')
                 output = self.invoke(context)
-                services.invocation_cache.save(key, output)
+                services.invocation_cache.save(key, output, self.get_type())
                 return output
             else:
                 services.logger.debug(f'Invocation cache hit for type "{self.get_type()}": {self.id}')
@@ -427,6 +495,7 @@ def invocation(
     version: Optional[str] = None,
     use_cache: Optional[bool] = True,
     classification: Classification = Classification.Stable,
+    concurrency: Concurrency = Concurrency.GpuExclusive,
 ) -> Callable[[Type[TBaseInvocation]], Type[TBaseInvocation]]:
     """
     Registers an invocation.
@@ -438,6 +507,7 @@ def invocation(
     :param Optional[str] version: Adds a version to the invocation. Must be a valid semver string. Defaults to None.
     :param Optional[bool] use_cache: Whether or not to use the invocation cache. Defaults to True. The user may override this in the workflow editor.
     :param Classification classification: The classification of the invocation. Defaults to FeatureClassification.Stable. Use Beta or Prototype if the invocation is unstable.
+    :param Concurrency concurrency: Whether the invocation may run at the same time as other invocations of its session. Defaults to Concurrency.GpuExclusive. Use CpuSafe if the invocation is thread-safe and only does CPU work.
     """
 
     def wrapper(cls: Type[TBaseInvocation]) -> Type[TBaseInvocation]:
@@ -475,6 +545,8 @@ def invocation(
         if use_cache is not None:
             cls.model_fields["use_cache"].default = use_cache
 
+        cls._concurrency = concurrency
+
         # Add the invocation type to the model.
 
         # You'd be tempted to just add the type field and rebuild the model, like this:
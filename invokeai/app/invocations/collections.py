@@ -4,7 +4,7 @@
 import numpy as np
 from pydantic import ValidationInfo, field_validator
 
-from invokeai.app.invocations.baseinvocation import BaseInvocation, invocation
+from invokeai.app.invocations.baseinvocation import BaseInvocation, Concurrency, invocation
 from invokeai.app.invocations.fields import InputField
 from invokeai.app.invocations.primitives import IntegerCollectionOutput
 from invokeai.app.services.shared.invocation_context import InvocationContext
@@ -12,7 +12,12 @@ from invokeai.app.util.misc import SEED_MAX
 
 
 @invocation(
-    "range", title="Integer Range", tags=["collection", "integer", "range"], category="collections", version="1.0.0"
+    "range",
+    title="Integer Range",
+    tags=["collection", "integer", "range"],
+    category="collections",
+    version="1.0.0",
+    concurrency=Concurrency.CpuSafe,
 )
 class RangeInvocation(BaseInvocation):
     """Creates a range of numbers from start to stop with step"""
@@ -37,6 +42,7 @@ class RangeInvocation(BaseInvocation):
     tags=["collection", "integer", "size", "range"],
     category="collections",
     version="1.0.0",
+    concurrency=Concurrency.CpuSafe,
 )
 class RangeOfSizeInvocation(BaseInvocation):
     """Creates a range from start to start + (size * step) incremented by step"""
@@ -58,6 +64,7 @@ class RangeOfSizeInvocation(BaseInvocation):
     category="collections",
     version="1.0.1",
     use_cache=False,
+    concurrency=Concurrency.CpuSafe,
 )
 class RandomRangeInvocation(BaseInvocation):
     """Creates a collection of random numbers"""
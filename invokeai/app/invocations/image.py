@@ -9,6 +9,7 @@ from PIL import Image, ImageChops, ImageFilter, ImageOps
 from invokeai.app.invocations.baseinvocation import (
     BaseInvocation,
     Classification,
+    Concurrency,
     invocation,
 )
 from invokeai.app.invocations.constants import IMAGE_MODES
@@ -27,7 +28,9 @@ from invokeai.backend.image_util.invisible_watermark import InvisibleWatermark
 from invokeai.backend.image_util.safety_checker import SafetyChecker
 
 
-@invocation("show_image", title="Show Image", tags=["image"], category="image", version="1.0.1")
+@invocation(
+    "show_image", title="Show Image", tags=["image"], category="image", version="1.0.1", concurrency=Concurrency.CpuSafe
+)
 class ShowImageInvocation(BaseInvocation):
     """Displays a provided image using the OS image viewer, and passes it forward in the pipeline."""
 
@@ -52,6 +55,7 @@ class ShowImageInvocation(BaseInvocation):
     tags=["image"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class BlankImageInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Creates a blank image and forwards it to the pipeline"""
@@ -75,6 +79,7 @@ class BlankImageInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "crop"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageCropInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Crops an image to a specified box. The box can be outside of the image."""
@@ -102,6 +107,7 @@ class ImageCropInvocation(BaseInvocation, WithMetadata, WithBoard):
     category="image",
     tags=["image", "pad", "crop"],
     version="1.0.0",
+    concurrency=Concurrency.CpuSafe,
 )
 class CenterPadCropInvocation(BaseInvocation):
     """Pad or crop an image's sides from the center by specified pixels. Positive values are outside of the image."""
@@ -146,6 +152,7 @@ class CenterPadCropInvocation(BaseInvocation):
     tags=["image", "paste"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImagePasteInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Pastes an image into another image."""
@@ -193,6 +200,7 @@ class ImagePasteInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "mask"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class MaskFromAlphaInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Extracts the alpha channel of an image as a mask."""
@@ -218,6 +226,7 @@ class MaskFromAlphaInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "multiply"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageMultiplyInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Multiplies two images together using `PIL.ImageChops.multiply()`."""
@@ -245,6 +254,7 @@ IMAGE_CHANNELS = Literal["A", "R", "G", "B"]
     tags=["image", "channel"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageChannelInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Gets a channel from an image."""
@@ -268,6 +278,7 @@ class ImageChannelInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "convert"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageConvertInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Converts an image to a different mode."""
@@ -291,6 +302,7 @@ class ImageConvertInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "blur"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageBlurInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Blurs an image"""
@@ -320,6 +332,7 @@ class ImageBlurInvocation(BaseInvocation, WithMetadata, WithBoard):
     category="image",
     version="1.2.2",
     classification=Classification.Beta,
+    concurrency=Concurrency.CpuSafe,
 )
 class UnsharpMaskInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Applies an unsharp mask filter to an image"""
@@ -388,6 +401,7 @@ PIL_RESAMPLING_MAP = {
     tags=["image", "resize"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageResizeInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Resizes an image to specific dimensions"""
@@ -418,6 +432,7 @@ class ImageResizeInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "scale"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageScaleInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Scales an image by a factor"""
@@ -453,6 +468,7 @@ class ImageScaleInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "lerp"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageLerpInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Linear interpolation of all pixels of an image"""
@@ -480,6 +496,7 @@ class ImageLerpInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "ilerp"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageInverseLerpInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Inverse linear interpolation of all pixels of an image"""
@@ -531,6 +548,7 @@ class ImageNSFWBlurInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "watermark"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageWatermarkInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Add an invisible watermark to an image"""
@@ -552,6 +570,7 @@ class ImageWatermarkInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "mask", "inpaint"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class MaskEdgeInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Applies an edge mask to an image"""
@@ -591,6 +610,7 @@ class MaskEdgeInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "mask", "multiply"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class MaskCombineInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Combine two masks together by multiplying them using `PIL.ImageChops.multiply()`."""
@@ -615,6 +635,7 @@ class MaskCombineInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "color"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ColorCorrectInvocation(BaseInvocation, WithMetadata, WithBoard):
     """
@@ -719,6 +740,7 @@ class ColorCorrectInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "hue"],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageHueAdjustmentInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Adjusts the Hue of an image."""
@@ -808,6 +830,7 @@ CHANNEL_FORMATS = {
     ],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageChannelOffsetInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Add or subtract a value from a specific color channel of an image."""
@@ -864,6 +887,7 @@ class ImageChannelOffsetInvocation(BaseInvocation, WithMetadata, WithBoard):
     ],
     category="image",
     version="1.2.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageChannelMultiplyInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Scale a specific color channel of an image."""
@@ -909,6 +933,7 @@ class ImageChannelMultiplyInvocation(BaseInvocation, WithMetadata, WithBoard):
     category="primitives",
     version="1.2.2",
     use_cache=False,
+    concurrency=Concurrency.CpuSafe,
 )
 class SaveImageInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Saves an image. Unlike an image primitive, this invocation stores a copy of the image."""
@@ -929,6 +954,7 @@ class SaveImageInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "combine"],
     category="image",
     version="1.0.0",
+    concurrency=Concurrency.CpuSafe,
 )
 class CanvasPasteBackInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Combines two images by using the mask provided. Intended for use on the Unified Canvas."""
@@ -966,6 +992,7 @@ class CanvasPasteBackInvocation(BaseInvocation, WithMetadata, WithBoard):
     tags=["image", "mask", "id"],
     category="image",
     version="1.0.0",
+    concurrency=Concurrency.CpuSafe,
 )
 class MaskFromIDInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Generate a mask for a particular color in an ID Map"""
@@ -1020,6 +1047,7 @@ class MaskFromIDInvocation(BaseInvocation, WithMetadata, WithBoard):
     category="image",
     version="1.0.0",
     classification=Classification.Internal,
+    concurrency=Concurrency.CpuSafe,
 )
 class CanvasV2MaskAndCropInvocation(BaseInvocation, WithMetadata, WithBoard):
     """Handles Canvas V2 image output masking and cropping"""
@@ -6,6 +6,7 @@ from invokeai.app.invocations.baseinvocation import (
     BaseInvocation,
     BaseInvocationOutput,
     Classification,
+    Concurrency,
     invocation,
     invocation_output,
 )
@@ -83,7 +84,14 @@ class MetadataItemOutput(BaseInvocationOutput):
     item: MetadataItemField = OutputField(description="Metadata Item")
 
 
-@invocation("metadata_item", title="Metadata Item", tags=["metadata"], category="metadata", version="1.0.1")
+@invocation(
+    "metadata_item",
+    title="Metadata Item",
+    tags=["metadata"],
+    category="metadata",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
+)
 class MetadataItemInvocation(BaseInvocation):
     """Used to create an arbitrary metadata item. Provide "label" and make a connection to "value" to store that data as the value."""
 
@@ -99,7 +107,14 @@ class MetadataOutput(BaseInvocationOutput):
     metadata: MetadataField = OutputField(description="Metadata Dict")
 
 
-@invocation("metadata", title="Metadata", tags=["metadata"], category="metadata", version="1.0.1")
+@invocation(
+    "metadata",
+    title="Metadata",
+    tags=["metadata"],
+    category="metadata",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
+)
 class MetadataInvocation(BaseInvocation):
     """Takes a MetadataItem or collection of MetadataItems and outputs a MetadataDict."""
 
@@ -120,7 +135,14 @@ class MetadataInvocation(BaseInvocation):
         return MetadataOutput(metadata=MetadataField.model_validate(data))
 
 
-@invocation("merge_metadata", title="Metadata Merge", tags=["metadata"], category="metadata", version="1.0.1")
+@invocation(
+    "merge_metadata",
+    title="Metadata Merge",
+    tags=["metadata"],
+    category="metadata",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
+)
 class MergeMetadataInvocation(BaseInvocation):
     """Merged a collection of MetadataDict into a single MetadataDict."""
 
@@ -161,6 +183,7 @@ GENERATION_MODES = Literal[
     category="metadata",
     version="2.0.0",
     classification=Classification.Internal,
+    concurrency=Concurrency.CpuSafe,
 )
 class CoreMetadataInvocation(BaseInvocation):
     """Used internally by Invoke to collect metadata for generations."""
@@ -8,6 +8,7 @@ from invokeai.app.invocations.baseinvocation import (
     BaseInvocation,
     BaseInvocationOutput,
     Classification,
+    Concurrency,
     invocation,
     invocation_output,
 )
@@ -58,7 +59,12 @@ class BooleanCollectionOutput(BaseInvocationOutput):
 
 
 @invocation(
-    "boolean", title="Boolean Primitive", tags=["primitives", "boolean"], category="primitives", version="1.0.1"
+    "boolean",
+    title="Boolean Primitive",
+    tags=["primitives", "boolean"],
+    category="primitives",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
 )
 class BooleanInvocation(BaseInvocation):
     """A boolean primitive value"""
@@ -75,6 +81,7 @@ class BooleanInvocation(BaseInvocation):
     tags=["primitives", "boolean", "collection"],
     category="primitives",
     version="1.0.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class BooleanCollectionInvocation(BaseInvocation):
     """A collection of boolean primitive values"""
@@ -107,7 +114,12 @@ class IntegerCollectionOutput(BaseInvocationOutput):
 
 
 @invocation(
-    "integer", title="Integer Primitive", tags=["primitives", "integer"], category="primitives", version="1.0.1"
+    "integer",
+    title="Integer Primitive",
+    tags=["primitives", "integer"],
+    category="primitives",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
 )
 class IntegerInvocation(BaseInvocation):
     """An integer primitive value"""
@@ -124,6 +136,7 @@ class IntegerInvocation(BaseInvocation):
     tags=["primitives", "integer", "collection"],
     category="primitives",
     version="1.0.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class IntegerCollectionInvocation(BaseInvocation):
     """A collection of integer primitive values"""
@@ -155,7 +168,14 @@ class FloatCollectionOutput(BaseInvocationOutput):
     )
 
 
-@invocation("float", title="Float Primitive", tags=["primitives", "float"], category="primitives", version="1.0.1")
+@invocation(
+    "float",
+    title="Float Primitive",
+    tags=["primitives", "float"],
+    category="primitives",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
+)
 class FloatInvocation(BaseInvocation):
     """A float primitive value"""
 
@@ -171,6 +191,7 @@ class FloatInvocation(BaseInvocation):
     tags=["primitives", "float", "collection"],
     category="primitives",
     version="1.0.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class FloatCollectionInvocation(BaseInvocation):
     """A collection of float primitive values"""
@@ -202,7 +223,14 @@ class StringCollectionOutput(BaseInvocationOutput):
     )
 
 
-@invocation("string", title="String Primitive", tags=["primitives", "string"], category="primitives", version="1.0.1")
+@invocation(
+    "string",
+    title="String Primitive",
+    tags=["primitives", "string"],
+    category="primitives",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
+)
 class StringInvocation(BaseInvocation):
     """A string primitive value"""
 
@@ -218,6 +246,7 @@ class StringInvocation(BaseInvocation):
     tags=["primitives", "string", "collection"],
     category="primitives",
     version="1.0.2",
+    concurrency=Concurrency.CpuSafe,
 )
 class StringCollectionInvocation(BaseInvocation):
     """A collection of string primitive values"""
@@ -259,7 +288,14 @@ class ImageCollectionOutput(BaseInvocationOutput):
     )
 
 
-@invocation("image", title="Image Primitive", tags=["primitives", "image"], category="primitives", version="1.0.2")
+@invocation(
+    "image",
+    title="Image Primitive",
+    tags=["primitives", "image"],
+    category="primitives",
+    version="1.0.2",
+    concurrency=Concurrency.CpuSafe,
+)
 class ImageInvocation(BaseInvocation):
     """An image primitive value"""
 
@@ -281,6 +317,7 @@ class ImageInvocation(BaseInvocation):
     tags=["primitives", "image", "collection"],
     category="primitives",
     version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageCollectionInvocation(BaseInvocation):
     """A collection of image primitive values"""
@@ -397,7 +434,14 @@ class ColorCollectionOutput(BaseInvocationOutput):
     )
 
 
-@invocation("color", title="Color Primitive", tags=["primitives", "color"], category="primitives", version="1.0.1")
+@invocation(
+    "color",
+    title="Color Primitive",
+    tags=["primitives", "color"],
+    category="primitives",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
+)
 class ColorInvocation(BaseInvocation):
     """A color primitive value"""
 
@@ -524,6 +568,7 @@ class BoundingBoxCollectionOutput(BaseInvocationOutput):
     tags=["primitives", "segmentation", "collection", "bounding box"],
     category="primitives",
     version="1.0.0",
+    concurrency=Concurrency.CpuSafe,
 )
 class BoundingBoxInvocation(BaseInvocation):
     """Create a bounding box manually by supplying box coordinates"""
@@ -548,6 +593,7 @@ class BoundingBoxInvocation(BaseInvocation):
     category="primitives",
     version="1.0.0",
     classification=Classification.Special,
+    concurrency=Concurrency.CpuSafe,
 )
 class ImageBatchInvocation(BaseInvocation):
     """Create a batched generation, where the workflow is executed once for each image in the batch."""
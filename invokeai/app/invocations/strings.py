@@ -2,7 +2,13 @@
 
 import re
 
-from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput, invocation, invocation_output
+from invokeai.app.invocations.baseinvocation import (
+    BaseInvocation,
+    BaseInvocationOutput,
+    Concurrency,
+    invocation,
+    invocation_output,
+)
 from invokeai.app.invocations.fields import InputField, OutputField, UIComponent
 from invokeai.app.invocations.primitives import StringOutput
 from invokeai.app.services.shared.invocation_context import InvocationContext
@@ -22,6 +28,7 @@ class StringPosNegOutput(BaseInvocationOutput):
     tags=["string", "split", "negative"],
     category="string",
     version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
 )
 class StringSplitNegInvocation(BaseInvocation):
     """Splits string into two strings, inside [] goes into negative string everthing else goes into positive string. Each [ and ] character is replaced with a space"""
@@ -63,7 +70,14 @@ class String2Output(BaseInvocationOutput):
     string_2: str = OutputField(description="string 2")
 
 
-@invocation("string_split", title="String Split", tags=["string", "split"], category="string", version="1.0.1")
+@invocation(
+    "string_split",
+    title="String Split",
+    tags=["string", "split"],
+    category="string",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
+)
 class StringSplitInvocation(BaseInvocation):
     """Splits string into two strings, based on the first occurance of the delimiter. The delimiter will be removed from the string"""
 
@@ -83,7 +97,14 @@ class StringSplitInvocation(BaseInvocation):
         return String2Output(string_1=part1, string_2=part2)
 
 
-@invocation("string_join", title="String Join", tags=["string", "join"], category="string", version="1.0.1")
+@invocation(
+    "string_join",
+    title="String Join",
+    tags=["string", "join"],
+    category="string",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
+)
 class StringJoinInvocation(BaseInvocation):
     """Joins string left to string right"""
 
@@ -94,7 +115,14 @@ class StringJoinInvocation(BaseInvocation):
         return StringOutput(value=((self.string_left or "") + (self.string_right or "")))
 
 
-@invocation("string_join_three", title="String Join Three", tags=["string", "join"], category="string", version="1.0.1")
+@invocation(
+    "string_join_three",
+    title="String Join Three",
+    tags=["string", "join"],
+    category="string",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
+)
 class StringJoinThreeInvocation(BaseInvocation):
     """Joins string left to string middle to string right"""
 
@@ -107,7 +135,12 @@ class StringJoinThreeInvocation(BaseInvocation):
 
 
 @invocation(
-    "string_replace", title="String Replace", tags=["string", "replace", "regex"], category="string", version="1.0.1"
+    "string_replace",
+    title="String Replace",
+    tags=["string", "replace", "regex"],
+    category="string",
+    version="1.0.1",
+    concurrency=Concurrency.CpuSafe,
 )
 class StringReplaceInvocation(BaseInvocation):
     """Replaces the search string with the replace string"""
@@ -1,5 +1,4 @@
 import sqlite3
-import threading
 from typing import Union, cast
 
 from invokeai.app.services.board_records.board_records_base import BoardRecordStorageBase
@@ -14,18 +13,19 @@ from invokeai.app.services.board_records.board_records_common import (
 )
 from invokeai.app.services.shared.pagination import OffsetPaginatedResults
 from invokeai.app.services.shared.sqlite.sqlite_common import SQLiteDirection
-from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase, SqliteLock
 from invokeai.app.util.misc import uuid_string
 
 
 class SqliteBoardRecordStorage(BoardRecordStorageBase):
     _conn: sqlite3.Connection
     _cursor: sqlite3.Cursor
-    _lock: threading.RLock
+    _lock: SqliteLock
 
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
-        self._lock = db.lock
+        self._db = db
+        self._lock = db.get_lock("board_records")
         self._conn = db.conn
         self._cursor = self._conn.cursor()
 
@@ -76,22 +76,20 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
         board_id: str,
     ) -> BoardRecord:
         try:
-            self._lock.acquire()
-            self._cursor.execute(
-                """--sql
-                SELECT *
-                FROM boards
-                WHERE board_id = ?;
-                """,
-                (board_id,),
-            )
+            with self._db.read_connection("board_records") as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """--sql
+                    SELECT *
+                    FROM boards
+                    WHERE board_id = ?;
+                    """,
+                    (board_id,),
+                )
 
-            result = cast(Union[sqlite3.Row, None], self._cursor.fetchone())
+                result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise BoardRecordNotFoundException from e
-        finally:
-            self._lock.release()
         if result is None:
             raise BoardRecordNotFoundException
         return BoardRecord(**dict(result))
@@ -153,9 +151,8 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
         limit: int = 10,
         include_archived: bool = False,
     ) -> OffsetPaginatedResults[BoardRecord]:
-        try:
-            self._lock.acquire()
-
+        with self._db.read_connection("board_records") as conn:
+            cursor = conn.cursor()
             # Build base query
             base_query = """
                 SELECT *
@@ -173,9 +170,9 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
             )
 
             # Execute query to fetch boards
-            self._cursor.execute(final_query, (limit, offset))
+            cursor.execute(final_query, (limit, offset))
 
-            result = cast(list[sqlite3.Row], self._cursor.fetchall())
+            result = cast(list[sqlite3.Row], cursor.fetchall())
             boards = [deserialize_board_record(dict(r)) for r in result]
 
             # Determine count query
@@ -192,24 +189,17 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
                 """
 
             # Execute count query
-            self._cursor.execute(count_query)
+            cursor.execute(count_query)
 
-            count = cast(int, self._cursor.fetchone()[0])
+            count = cast(int, cursor.fetchone()[0])
 
             return OffsetPaginatedResults[BoardRecord](items=boards, offset=offset, limit=limit, total=count)
 
-        except sqlite3.Error as e:
-            self._conn.rollback()
-            raise e
-        finally:
-            self._lock.release()
-
     def get_all(
         self, order_by: BoardRecordOrderBy, direction: SQLiteDirection, include_archived: bool = False
     ) -> list[BoardRecord]:
-        try:
-            self._lock.acquire()
-
+        with self._db.read_connection("board_records") as conn:
+            cursor = conn.cursor()
             if order_by == BoardRecordOrderBy.Name:
                 base_query = """
                     SELECT *
@@ -231,15 +221,9 @@ class SqliteBoardRecordStorage(BoardRecordStorageBase):
                 archived_filter=archived_filter, order_by=order_by.value, direction=direction.value
             )
 
-            self._cursor.execute(final_query)
+            cursor.execute(final_query)
 
-            result = cast(list[sqlite3.Row], self._cursor.fetchall())
+            result = cast(list[sqlite3.Row], cursor.fetchall())
             boards = [deserialize_board_record(dict(r)) for r in result]
 
             return boards
-
-        except sqlite3.Error as e:
-            self._conn.rollback()
-            raise e
-        finally:
-            self._lock.release()
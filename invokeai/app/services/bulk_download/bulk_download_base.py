@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterator, Optional
 
 
 class BulkDownloadBase(ABC):
@@ -17,6 +17,28 @@ class BulkDownloadBase(ABC):
         :param bulk_download_item_id: The bulk_download_item_id that will be used to retrieve the bulk download item when it is prepared, if none is provided a uuid will be generated.
         """
 
+    @abstractmethod
+    def stream(
+        self,
+        image_names: Optional[list[str]],
+        board_id: Optional[str],
+        bulk_download_item_id: Optional[str],
+        start: int = 0,
+    ) -> Iterator[bytes]:
+        """
+        Stream a zip file containing the images specified by the given image names or board id, without writing it to
+        disk. The images are stored without recompression.
+
+        The images are resolved when this is called, so missing images or boards raise before anything is streamed.
+        Progress events report the number of images written, so an interrupted download can be resumed with `start`.
+
+        :param image_names: A list of image names to include in the zip file.
+        :param board_id: The ID of the board. If provided, all images associated with the board will be included in the zip file.
+        :param bulk_download_item_id: The bulk_download_item_id used in the events, if none is provided a uuid will be generated.
+        :param start: The number of images to skip, to resume an interrupted download.
+        :return: An iterator of the chunks of the zip file.
+        """
+
     @abstractmethod
     def get_path(self, bulk_download_item_name: str) -> str:
         """
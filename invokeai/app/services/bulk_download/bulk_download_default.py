@@ -1,7 +1,13 @@
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Optional, Union
-from zipfile import ZipFile
+from typing import Iterator, Optional, Union
+from zipfile import ZIP_STORED, ZipFile, ZipInfo
 
 from invokeai.app.services.board_records.board_records_common import BoardRecordNotFoundException
 from invokeai.app.services.bulk_download.bulk_download_base import BulkDownloadBase
@@ -17,7 +23,35 @@ from invokeai.app.services.invoker import Invoker
 from invokeai.app.util.misc import uuid_string
 
 
+class _ZipStreamBuffer(io.RawIOBase):
+    """An unseekable file that collects what is written to it until it is drained.
+
+    ZipFile writes data descriptors after the entries it writes to an unseekable file, so a zip can be streamed as it
+    is written."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: bytes) -> int:  # type: ignore [override] # pyright: ignore [reportIncompatibleMethodOverride]
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
 class BulkDownloadService(BulkDownloadBase):
+    # The number of images read ahead of the one being written to a streamed zip, and the threads reading them
+    _READ_AHEAD = 8
+    _READER_THREADS = 4
+    # The minimum interval between progress events of a streamed zip, in seconds
+    _PROGRESS_INTERVAL = 0.5
+
     def start(self, invoker: Invoker) -> None:
         self._invoker = invoker
 
@@ -36,16 +70,8 @@ class BulkDownloadService(BulkDownloadBase):
         self._signal_job_started(bulk_download_id, bulk_download_item_id, bulk_download_item_name)
 
         try:
-            image_dtos: list[ImageDTO] = []
-
-            if board_id:
-                image_dtos = self._board_handler(board_id)
-            elif image_names:
-                image_dtos = self._image_handler(image_names)
-            else:
-                raise BulkDownloadParametersException()
-
-            bulk_download_item_name: str = self._create_zip_file(image_dtos, bulk_download_item_id)
+            image_dtos = self._get_image_dtos(image_names, board_id)
+            bulk_download_item_name = self._create_zip_file(image_dtos, bulk_download_item_id)
             self._signal_job_completed(bulk_download_id, bulk_download_item_id, bulk_download_item_name)
         except (
             ImageRecordNotFoundException,
@@ -59,6 +85,116 @@ class BulkDownloadService(BulkDownloadBase):
             self._invoker.services.logger.error("Problem bulk downloading images.")
             raise e
 
+    def stream(
+        self,
+        image_names: Optional[list[str]],
+        board_id: Optional[str],
+        bulk_download_item_id: Optional[str],
+        start: int = 0,
+    ) -> Iterator[bytes]:
+        bulk_download_id: str = DEFAULT_BULK_DOWNLOAD_ID
+        bulk_download_item_id = bulk_download_item_id or uuid_string()
+        bulk_download_item_name = bulk_download_item_id + ".zip"
+        image_dtos = self._get_image_dtos(image_names, board_id)
+        return self._stream_zip(image_dtos, start, bulk_download_id, bulk_download_item_id, bulk_download_item_name)
+
+    def _stream_zip(
+        self,
+        image_dtos: list[ImageDTO],
+        start: int,
+        bulk_download_id: str,
+        bulk_download_item_id: str,
+        bulk_download_item_name: str,
+    ) -> Iterator[bytes]:
+        """Stream a zip file of the images, from the image at index `start`, emitting progress events.
+
+        Only progress events are emitted. The started, complete and error events are about zip files that are created
+        to be downloaded later, which a streamed zip never is - the client sees the end or failure of the stream itself.
+        """
+        images_total = len(image_dtos)
+        images_done = min(max(start, 0), images_total)
+        bytes_sent = 0
+        self._signal_job_progress(
+            bulk_download_id, bulk_download_item_id, bulk_download_item_name, images_done, images_total, bytes_sent
+        )
+        last_progress = time.monotonic()
+        buffer = _ZipStreamBuffer()
+        try:
+            with ZipFile(buffer, "w", compression=ZIP_STORED) as zip_file:
+                image_dtos = image_dtos[images_done:]
+                image_paths = [self._invoker.services.images.get_path(image_dto.image_name) for image_dto in image_dtos]
+                for image_dto, (image_bytes, mtime) in zip(image_dtos, self._read_images(image_paths), strict=True):
+                    zip_info = ZipInfo(
+                        (Path(image_dto.image_category.value) / image_dto.image_name).as_posix(),
+                        date_time=time.localtime(mtime)[:6],
+                    )
+                    zip_file.writestr(zip_info, image_bytes, compress_type=ZIP_STORED)
+                    chunk = buffer.drain()
+                    bytes_sent += len(chunk)
+                    yield chunk
+
+                    images_done += 1
+                    if time.monotonic() - last_progress >= self._PROGRESS_INTERVAL:
+                        last_progress = time.monotonic()
+                        self._signal_job_progress(
+                            bulk_download_id,
+                            bulk_download_item_id,
+                            bulk_download_item_name,
+                            images_done,
+                            images_total,
+                            bytes_sent,
+                        )
+            # The central directory is written when the zip file is closed
+            chunk = buffer.drain()
+            bytes_sent += len(chunk)
+            yield chunk
+            self._signal_job_progress(
+                bulk_download_id, bulk_download_item_id, bulk_download_item_name, images_done, images_total, bytes_sent
+            )
+        except GeneratorExit:
+            # The client went away, likely because the download was cancelled. The last progress event tells it where
+            # to resume.
+            self._signal_job_progress(
+                bulk_download_id, bulk_download_item_id, bulk_download_item_name, images_done, images_total, bytes_sent
+            )
+            self._invoker.services.logger.debug(
+                f"Bulk download {bulk_download_item_name} interrupted after {images_done} of {images_total} images"
+            )
+            raise
+        except Exception as e:
+            self._invoker.services.logger.error(f"Problem streaming bulk download of images: {e}")
+            raise e
+
+    def _read_images(self, image_paths: list[str]) -> Iterator[tuple[bytes, float]]:
+        """Read the images in order, on reader threads that stay ahead of the consumer."""
+
+        def read_image(image_path: str) -> tuple[bytes, float]:
+            with open(image_path, "rb") as f:
+                return f.read(), os.fstat(f.fileno()).st_mtime
+
+        with ThreadPoolExecutor(max_workers=self._READER_THREADS, thread_name_prefix="bulk_download") as executor:
+            paths = iter(image_paths)
+            pending: deque[Future[tuple[bytes, float]]] = deque(
+                executor.submit(read_image, image_path) for image_path in islice(paths, self._READ_AHEAD)
+            )
+            try:
+                while pending:
+                    image = pending.popleft().result()
+                    if (image_path := next(paths, None)) is not None:
+                        pending.append(executor.submit(read_image, image_path))
+                    yield image
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _get_image_dtos(self, image_names: Optional[list[str]], board_id: Optional[str]) -> list[ImageDTO]:
+        if board_id:
+            return self._board_handler(board_id)
+        elif image_names:
+            return self._image_handler(image_names)
+        else:
+            raise BulkDownloadParametersException()
+
     def _image_handler(self, image_names: list[str]) -> list[ImageDTO]:
         return [self._invoker.services.images.get_dto(image_name) for image_name in image_names]
 
@@ -85,7 +221,8 @@ class BulkDownloadService(BulkDownloadBase):
         zip_file_name = bulk_download_item_id + ".zip"
         zip_file_path = self._bulk_downloads_folder / (zip_file_name)
 
-        with ZipFile(zip_file_path, "w") as zip_file:
+        # Images are already compressed, so they are stored as they are
+        with ZipFile(zip_file_path, "w", compression=ZIP_STORED) as zip_file:
             for image_dto in image_dtos:
                 image_zip_path = Path(image_dto.image_category.value) / image_dto.image_name
                 image_disk_path = self._invoker.services.images.get_path(image_dto.image_name)
@@ -119,6 +256,21 @@ class BulkDownloadService(BulkDownloadBase):
                 bulk_download_id, bulk_download_item_id, bulk_download_item_name
             )
 
+    def _signal_job_progress(
+        self,
+        bulk_download_id: str,
+        bulk_download_item_id: str,
+        bulk_download_item_name: str,
+        images_done: int,
+        images_total: int,
+        bytes_sent: int,
+    ) -> None:
+        """Signal the progress of a streamed bulk download job."""
+        if self._invoker:
+            self._invoker.services.events.emit_bulk_download_progress(
+                bulk_download_id, bulk_download_item_id, bulk_download_item_name, images_done, images_total, bytes_sent
+            )
+
     def _signal_job_failed(
         self, bulk_download_id: str, bulk_download_item_id: str, bulk_download_item_name: str, exception: Exception
     ) -> None:
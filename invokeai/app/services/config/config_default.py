@@ -30,6 +30,7 @@ ATTENTION_TYPE = Literal["auto", "normal", "xformers", "sliced", "torch-sdp"]
 ATTENTION_SLICE_SIZE = Literal["auto", "balanced", "max", 1, 2, 3, 4, 5, 6, 7, 8]
 LOG_FORMAT = Literal["plain", "color", "syslog", "legacy"]
 LOG_LEVEL = Literal["debug", "info", "warning", "error", "critical"]
+TENSOR_FORMAT = Literal["torch", "safetensors"]
 CONFIG_SCHEMA_VERSION = "4.0.2"
 
 
@@ -88,6 +89,8 @@ class InvokeAIAppConfig(BaseSettings):
         log_memory_usage: If True, a memory snapshot will be captured before and after every model cache operation, and the result will be logged (at debug level). There is a time cost to capturing the memory snapshots, so it is recommended to only enable this feature if you are actively inspecting the model cache's behaviour.
         device_working_mem_gb: The amount of working memory to keep available on the compute device (in GB). Has no effect if running on CPU. If you are experiencing OOM errors, try increasing this value.
         enable_partial_loading: Enable partial loading of models. This enables models to run with reduced VRAM requirements (at the cost of slower speed) by streaming the model from RAM to VRAM as its used. In some edge cases, partial loading can cause models to run more slowly if they were previously being fully loaded into VRAM.
+        lora_delta_cache_ram_mb: The maximum amount of CPU RAM to use for keeping the computed weight deltas of LoRAs between generations, in MB. Reapplying the same LoRAs at the same weights then skips recomputing them, which mostly helps with LoHA/LoKR models and on devices other than CUDA. Set to 0 to disable it.
+        gguf_dequantize_cache_ram_mb: The maximum amount of CPU RAM to use for keeping the dequantized weights of GGUF models between uses, in MB. This speeds up running GGUF models on the CPU, at the cost of memory. Set to 0 to disable it.
         device: Preferred execution device. `auto` will choose the device depending on the hardware platform and the installed torch capabilities.<br>Valid values: `auto`, `cpu`, `cuda`, `cuda:1`, `mps`
         precision: Floating point precision. `float16` will consume half the memory of `float32` but produce slightly lower-quality images. The `auto` setting will guess the proper precision based on your video card and operating system.<br>Valid values: `auto`, `float16`, `bfloat16`, `float32`
         sequential_guidance: Whether to calculate guidance in serial instead of in parallel, lowering memory requirements.
@@ -95,12 +98,25 @@ class InvokeAIAppConfig(BaseSettings):
         attention_slice_size: Slice size, valid when attention_type=="sliced".<br>Valid values: `auto`, `balanced`, `max`, `1`, `2`, `3`, `4`, `5`, `6`, `7`, `8`
         force_tiled_decode: Whether to enable tiled VAE decode (reduces memory consumption with some performance penalty).
         pil_compress_level: The compress_level setting of PIL.Image.save(), used for PNG encoding. All settings are lossless. 0 = no compression, 1 = fastest with slightly larger filesize, 9 = slowest with smallest filesize. 1 is typically the best setting.
+        image_cache_ram_mb: The maximum amount of memory to use for keeping recently used images decoded in memory, in MB. Set to 0 to disable the cache.
+        thumbnail_cache_ram_mb: The maximum amount of memory to use for keeping recently used thumbnails decoded in memory, in MB. Set to 0 to disable the cache.
+        image_save_workers: The number of background threads that encode and write images. Nodes continue as soon as their images are queued for writing. Set to 0 to write images before continuing.
+        intermediate_image_ram_mb: The maximum amount of memory to use for keeping intermediate images in memory instead of writing them to disk, in MB. They are written when their files are needed, for example to display them, or when this is exceeded. Set to 0 to always write them.
         max_queue_size: Maximum number of items in the session queue.
         clear_queue_on_startup: Empties session queue on startup.
+        session_workers: The number of queue items to run at once, each on its own worker. GPU nodes of the items still run one at a time, so this helps when sessions spend much of their time in CPU nodes, like image operations and saving.
+        progress_preview_max_rate: The maximum number of denoising progress previews to send per second for each node. The final steps are always sent. Set to 0 to send a preview for every step.
+        progress_preview_max_size: The maximum width and height of denoising progress previews, in pixels. Larger previews are downscaled before they are sent.
         allow_nodes: List of nodes to allow. Omit to allow all.
         deny_nodes: List of nodes to deny. Omit to deny none.
+        max_concurrent_nodes: The maximum number of a session's nodes to run at once. Nodes that only do CPU work, like image and math operations, may then run alongside each other and alongside a GPU node. Set to 1 to run nodes one at a time.
         node_cache_size: How many cached nodes to keep in memory.
+        node_cache_ram_mb: The maximum amount of memory to use for cached node outputs, in MB. Set to 0 to only limit the cache by `node_cache_size`.
+        node_cache_disk_mb: The maximum amount of disk space to use for persisting cached node outputs across restarts, in MB. The persistent cache is stored in the outputs directory. Set to 0 to disable it.
+        tensor_cache_ram_mb: The maximum amount of memory to use for keeping recently used tensors and conditioning in memory between nodes, in MB. Tensors and conditioning each get this budget. Set to 0 to only limit the cache by count.
+        tensor_format: The file format for tensors and conditioning passed between nodes. `torch` pickles them with `torch.save`. `safetensors` stores them as safetensors and memory-maps them on load, which is faster and shares memory between readers.<br>Valid values: `torch`, `safetensors`
         hashing_algorithm: Model hashing algorthim for model installs. 'blake3_multi' is best for SSDs. 'blake3_single' is best for spinning disk HDDs. 'random' disables hashing, instead assigning a UUID to models. Useful when using a memory db to reduce model installation time, or if you don't care about storing stable hashes for models. Alternatively, any other hashlib algorithm is accepted, though these are not nearly as performant as blake3.<br>Valid values: `blake3_multi`, `blake3_single`, `random`, `md5`, `sha1`, `sha224`, `sha256`, `sha384`, `sha512`, `blake2b`, `blake2s`, `sha3_224`, `sha3_256`, `sha3_384`, `sha3_512`, `shake_128`, `shake_256`
+        hashing_threads: The number of files hashed at once when a model is made of several files, such as a diffusers folder. Set to 1 for spinning disk HDDs.
         remote_api_tokens: List of regular expression and token pairs used when downloading models from URLs. The download URL is tested against the regex, and if it matches, the token is provided in as a Bearer token.
         scan_models_on_startup: Scan the models directory on startup, registering orphaned models. This is typically only used in conjunction with `use_memory_db` for testing purposes.
     """
@@ -161,6 +177,8 @@ class InvokeAIAppConfig(BaseSettings):
     log_memory_usage:              bool = Field(default=False,              description="If True, a memory snapshot will be captured before and after every model cache operation, and the result will be logged (at debug level). There is a time cost to capturing the memory snapshots, so it is recommended to only enable this feature if you are actively inspecting the model cache's behaviour.")
     device_working_mem_gb:        float = Field(default=3,                  description="The amount of working memory to keep available on the compute device (in GB). Has no effect if running on CPU. If you are experiencing OOM errors, try increasing this value.")
     enable_partial_loading:        bool = Field(default=False,              description="Enable partial loading of models. This enables models to run with reduced VRAM requirements (at the cost of slower speed) by streaming the model from RAM to VRAM as its used. In some edge cases, partial loading can cause models to run more slowly if they were previously being fully loaded into VRAM.")
+    lora_delta_cache_ram_mb:        int = Field(default=0, ge=0,            description="The maximum amount of CPU RAM to use for keeping the computed weight deltas of LoRAs between generations, in MB. Reapplying the same LoRAs at the same weights then skips recomputing them, which mostly helps with LoHA/LoKR models and on devices other than CUDA. Set to 0 to disable it.")
+    gguf_dequantize_cache_ram_mb:   int = Field(default=0, ge=0,            description="The maximum amount of CPU RAM to use for keeping the dequantized weights of GGUF models between uses, in MB. This speeds up running GGUF models on the CPU, at the cost of memory. Set to 0 to disable it.")
 
     # DEVICE
     device:                      DEVICE = Field(default="auto",             description="Preferred execution device. `auto` will choose the device depending on the hardware platform and the installed torch capabilities.")
@@ -172,16 +190,29 @@ class InvokeAIAppConfig(BaseSettings):
     attention_slice_size: ATTENTION_SLICE_SIZE = Field(default="auto",      description='Slice size, valid when attention_type=="sliced".')
     force_tiled_decode:            bool = Field(default=False,              description="Whether to enable tiled VAE decode (reduces memory consumption with some performance penalty).")
     pil_compress_level:             int = Field(default=1,                  description="The compress_level setting of PIL.Image.save(), used for PNG encoding. All settings are lossless. 0 = no compression, 1 = fastest with slightly larger filesize, 9 = slowest with smallest filesize. 1 is typically the best setting.")
+    image_cache_ram_mb:             int = Field(default=256, ge=0,          description="The maximum amount of memory to use for keeping recently used images decoded in memory, in MB. Set to 0 to disable the cache.")
+    thumbnail_cache_ram_mb:         int = Field(default=32, ge=0,           description="The maximum amount of memory to use for keeping recently used thumbnails decoded in memory, in MB. Set to 0 to disable the cache.")
+    image_save_workers:             int = Field(default=2, ge=0,            description="The number of background threads that encode and write images. Nodes continue as soon as their images are queued for writing. Set to 0 to write images before continuing.")
+    intermediate_image_ram_mb:      int = Field(default=256, ge=0,          description="The maximum amount of memory to use for keeping intermediate images in memory instead of writing them to disk, in MB. They are written when their files are needed, for example to display them, or when this is exceeded. Set to 0 to always write them.")
     max_queue_size:                 int = Field(default=10000, gt=0,        description="Maximum number of items in the session queue.")
     clear_queue_on_startup:        bool = Field(default=False,              description="Empties session queue on startup.")
+    session_workers:                int = Field(default=1, ge=1,            description="The number of queue items to run at once, each on its own worker. GPU nodes of the items still run one at a time, so this helps when sessions spend much of their time in CPU nodes, like image operations and saving.")
+    progress_preview_max_rate:    float = Field(default=10, ge=0,           description="The maximum number of denoising progress previews to send per second for each node. The final steps are always sent. Set to 0 to send a preview for every step.")
+    progress_preview_max_size:      int = Field(default=256, ge=16,         description="The maximum width and height of denoising progress previews, in pixels. Larger previews are downscaled before they are sent.")
 
     # NODES
     allow_nodes:    Optional[list[str]] = Field(default=None,               description="List of nodes to allow. Omit to allow all.")
     deny_nodes:     Optional[list[str]] = Field(default=None,               description="List of nodes to deny. Omit to deny none.")
+    max_concurrent_nodes:           int = Field(default=1, ge=1,            description="The maximum number of a session's nodes to run at once. Nodes that only do CPU work, like image and math operations, may then run alongside each other and alongside a GPU node. Set to 1 to run nodes one at a time.")
     node_cache_size:                int = Field(default=512,                description="How many cached nodes to keep in memory.")
+    node_cache_ram_mb:              int = Field(default=128, ge=0,          description="The maximum amount of memory to use for cached node outputs, in MB. Set to 0 to only limit the cache by `node_cache_size`.")
+    node_cache_disk_mb:             int = Field(default=0, ge=0,            description="The maximum amount of disk space to use for persisting cached node outputs across restarts, in MB. The persistent cache is stored in the outputs directory. Set to 0 to disable it.")
+    tensor_cache_ram_mb:            int = Field(default=512, ge=0,          description="The maximum amount of memory to use for keeping recently used tensors and conditioning in memory between nodes, in MB. Tensors and conditioning each get this budget. Set to 0 to only limit the cache by count.")
+    tensor_format:        TENSOR_FORMAT = Field(default="torch",            description="The file format for tensors and conditioning passed between nodes. `torch` pickles them with `torch.save`. `safetensors` stores them as safetensors and memory-maps them on load, which is faster and shares memory between readers.")
 
     # MODEL INSTALL
     hashing_algorithm: HASHING_ALGORITHMS = Field(default="blake3_single",  description="Model hashing algorthim for model installs. 'blake3_multi' is best for SSDs. 'blake3_single' is best for spinning disk HDDs. 'random' disables hashing, instead assigning a UUID to models. Useful when using a memory db to reduce model installation time, or if you don't care about storing stable hashes for models. Alternatively, any other hashlib algorithm is accepted, though these are not nearly as performant as blake3.")
+    hashing_threads:               int = Field(default=4, ge=1,             description="The number of files hashed at once when a model is made of several files, such as a diffusers folder. Set to 1 for spinning disk HDDs.")
     remote_api_tokens: Optional[list[URLRegexTokenPair]] = Field(default=None, description="List of regular expression and token pairs used when downloading models from URLs. The download URL is tested against the regex, and if it matches, the token is provided in as a Bearer token.")
     scan_models_on_startup:        bool = Field(default=False,              description="Scan the models directory on startup, registering orphaned models. This is typically only used in conjunction with `use_memory_db` for testing purposes.")
 
@@ -1,12 +1,13 @@
 # Copyright (c) 2022 Kyle Schouviller (https://github.com/kyle0654)
 
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
 from invokeai.app.services.events.events_common import (
     BatchEnqueuedEvent,
     BulkDownloadCompleteEvent,
     BulkDownloadErrorEvent,
+    BulkDownloadProgressEvent,
     BulkDownloadStartedEvent,
     DownloadCancelledEvent,
     DownloadCompleteEvent,
@@ -14,6 +15,7 @@ from invokeai.app.services.events.events_common import (
     DownloadProgressEvent,
     DownloadStartedEvent,
     EventBase,
+    EventServiceStats,
     InvocationCompleteEvent,
     InvocationErrorEvent,
     InvocationProgressEvent,
@@ -48,9 +50,23 @@ if TYPE_CHECKING:
 class EventServiceBase:
     """Basic event bus, to have an empty stand-in when not needed"""
 
+    _queue_subscribers_check: Optional[Callable[[str], bool]] = None
+
     def dispatch(self, event: "EventBase") -> None:
         pass
 
+    def get_stats(self) -> EventServiceStats:
+        """Gets the delivery statistics of the events"""
+        return EventServiceStats()
+
+    def set_queue_subscribers_check(self, check: Callable[[str], bool]) -> None:
+        """Sets the function that checks whether any client is subscribed to a queue's events"""
+        self._queue_subscribers_check = check
+
+    def has_queue_subscribers(self, queue_id: str) -> bool:
+        """Checks whether any client is subscribed to a queue's events. If this cannot be checked, assumes there is."""
+        return self._queue_subscribers_check is None or self._queue_subscribers_check(queue_id)
+
     # region: Invocation
 
     def emit_invocation_started(self, queue_item: "SessionQueueItem", invocation: "BaseInvocation") -> None:
@@ -188,6 +204,22 @@ class EventServiceBase:
         """Emitted when a bulk image download is complete"""
         self.dispatch(BulkDownloadCompleteEvent.build(bulk_download_id, bulk_download_item_id, bulk_download_item_name))
 
+    def emit_bulk_download_progress(
+        self,
+        bulk_download_id: str,
+        bulk_download_item_id: str,
+        bulk_download_item_name: str,
+        images_done: int,
+        images_total: int,
+        bytes_sent: int,
+    ) -> None:
+        """Emitted periodically while a bulk image download is streamed"""
+        self.dispatch(
+            BulkDownloadProgressEvent.build(
+                bulk_download_id, bulk_download_item_id, bulk_download_item_name, images_done, images_total, bytes_sent
+            )
+        )
+
     def emit_bulk_download_error(
         self, bulk_download_id: str, bulk_download_item_id: str, bulk_download_item_name: str, error: str
     ) -> None:
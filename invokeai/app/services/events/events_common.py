@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Any, ClassVar, Coroutine, Generic, Optional, Protocol, TypeAlias, TypeVar
+from typing import TYPE_CHECKING, Any, ClassVar, Coroutine, Generic, Hashable, Optional, Protocol, TypeAlias, TypeVar
 
 from fastapi_events.handlers.local import local_handler
 from fastapi_events.registry.payload_schema import registry as payload_schema
@@ -50,6 +50,11 @@ class EventBase(BaseModel):
 
         return event_subclasses
 
+    def get_coalesce_key(self) -> Optional[Hashable]:
+        """Gets the key of the event for coalescing. A pending event is superseded by a newer event of the same type
+        and key, and is dropped. Events without a key, which is the default, are never dropped."""
+        return None
+
 
 TEvent = TypeVar("TEvent", bound=EventBase, contravariant=True)
 
@@ -76,6 +81,22 @@ def register_events(events: set[type[TEvent]] | type[TEvent], func: FastAPIEvent
         local_handler.register(event_name=event.__event_name__, _func=func)  # pyright: ignore [reportUnknownMemberType, reportUnknownArgumentType, reportAttributeAccessIssue]
 
 
+class EventStats(BaseModel):
+    """Delivery statistics of an event type"""
+
+    dispatched: int = Field(default=0, description="The number of events dispatched")
+    coalesced: int = Field(
+        default=0, description="The number of events dropped because a newer event superseded them before delivery"
+    )
+
+
+class EventServiceStats(BaseModel):
+    """Delivery statistics of the event service"""
+
+    batches: int = Field(default=0, description="The number of batches of events delivered")
+    events: dict[str, EventStats] = Field(default_factory=dict, description="The statistics of each event type")
+
+
 class QueueEventBase(EventBase):
     """Base class for queue events"""
 
@@ -135,6 +156,9 @@ class InvocationProgressEvent(InvocationEventBase):
         default=None, description="An image representing the current state of the progress"
     )
 
+    def get_coalesce_key(self) -> Optional[Hashable]:
+        return (self.queue_id, self.item_id, self.invocation.id)
+
     @classmethod
     def build(
         cls,
@@ -331,6 +355,9 @@ class DownloadProgressEvent(DownloadEventBase):
     current_bytes: int = Field(description="The number of bytes downloaded so far")
     total_bytes: int = Field(description="The total number of bytes to be downloaded")
 
+    def get_coalesce_key(self) -> Optional[Hashable]:
+        return self.download_path
+
     @classmethod
     def build(cls, job: "DownloadJob") -> "DownloadProgressEvent":
         assert job.download_path
@@ -467,6 +494,9 @@ class ModelInstallDownloadProgressEvent(ModelEventBase):
         description="Progress of downloading URLs that comprise the model, if any"
     )
 
+    def get_coalesce_key(self) -> Optional[Hashable]:
+        return self.id
+
     @classmethod
     def build(cls, job: "ModelInstallJob") -> "ModelInstallDownloadProgressEvent":
         parts: list[dict[str, str | int]] = [
@@ -607,6 +637,41 @@ class BulkDownloadCompleteEvent(BulkDownloadEventBase):
         )
 
 
+@payload_schema.register
+class BulkDownloadProgressEvent(BulkDownloadEventBase):
+    """Event model for bulk_download_progress"""
+
+    __event_name__ = "bulk_download_progress"
+
+    images_done: int = Field(
+        description="The number of images completely written. An interrupted download can be resumed from this image."
+    )
+    images_total: int = Field(description="The total number of images in the download")
+    bytes_sent: int = Field(description="The number of bytes of the zip file sent so far")
+
+    def get_coalesce_key(self) -> Optional[Hashable]:
+        return self.bulk_download_item_name
+
+    @classmethod
+    def build(
+        cls,
+        bulk_download_id: str,
+        bulk_download_item_id: str,
+        bulk_download_item_name: str,
+        images_done: int,
+        images_total: int,
+        bytes_sent: int,
+    ) -> "BulkDownloadProgressEvent":
+        return cls(
+            bulk_download_id=bulk_download_id,
+            bulk_download_item_id=bulk_download_item_id,
+            bulk_download_item_name=bulk_download_item_name,
+            images_done=images_done,
+            images_total=images_total,
+            bytes_sent=bytes_sent,
+        )
+
+
 @payload_schema.register
 class BulkDownloadErrorEvent(BulkDownloadEventBase):
     """Event model for bulk_download_error"""
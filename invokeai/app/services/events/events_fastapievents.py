@@ -1,18 +1,35 @@
 import asyncio
 import threading
+from typing import Hashable, Optional
 
 from fastapi_events.dispatcher import dispatch
 
 from invokeai.app.services.events.events_base import EventServiceBase
-from invokeai.app.services.events.events_common import EventBase
+from invokeai.app.services.events.events_common import EventBase, EventServiceStats, EventStats
 
 
 class FastAPIEventService(EventServiceBase):
-    def __init__(self, event_handler_id: int, loop: asyncio.AbstractEventLoop) -> None:
+    """Dispatches events to `fastapi-events` on the event loop, in batches.
+
+    Events are buffered and handed to the event loop in one wake-up per batch. Progress events which are superseded by a
+    newer event of the same type and key before the batch is delivered are dropped. Batches with only such events are
+    held for `batch_window` seconds to collect newer ones; any other event is delivered right away.
+    """
+
+    def __init__(self, event_handler_id: int, loop: asyncio.AbstractEventLoop, batch_window: float = 0.05) -> None:
         self.event_handler_id = event_handler_id
-        self._queue = asyncio.Queue[EventBase | None]()
+        self._queue = asyncio.Queue[list[EventBase] | None]()
         self._stop_event = threading.Event()
         self._loop = loop
+        self._batch_window = batch_window
+
+        self._lock = threading.Lock()
+        self._pending: list[EventBase] = []
+        # The index in the pending events of each coalescable event, by event name and coalesce key
+        self._pending_index: dict[tuple[str, Hashable], int] = {}
+        self._flush_scheduled = False
+        self._flush_immediate = False
+        self._stats = EventServiceStats()
 
         # We need to store a reference to the task so it doesn't get GC'd
         # See: https://docs.python.org/3/library/asyncio-task.html#creating-tasks
@@ -28,17 +45,61 @@ class FastAPIEventService(EventServiceBase):
         self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
 
     def dispatch(self, event: EventBase) -> None:
-        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        key = event.get_coalesce_key()
+        with self._lock:
+            stats = self._stats.events.setdefault(event.__event_name__, EventStats())
+            stats.dispatched += 1
+            if key is None:
+                self._pending.append(event)
+                # Newer events must not be delivered ahead of this one, so they are not coalesced with older ones
+                self._pending_index.clear()
+            else:
+                index = self._pending_index.get((event.__event_name__, key))
+                if index is not None:
+                    self._pending[index] = event
+                    stats.coalesced += 1
+                else:
+                    self._pending_index[(event.__event_name__, key)] = len(self._pending)
+                    self._pending.append(event)
+
+            immediate = key is None
+            if self._flush_scheduled and (self._flush_immediate or not immediate):
+                return
+            self._flush_scheduled = True
+            self._flush_immediate = immediate
+
+        if immediate:
+            self._loop.call_soon_threadsafe(self._flush)
+        else:
+            self._loop.call_soon_threadsafe(self._loop.call_later, self._batch_window, self._flush)
+
+    def get_stats(self) -> EventServiceStats:
+        with self._lock:
+            return self._stats.model_copy(deep=True)
+
+    def _flush(self) -> None:
+        """Hands the pending events to the dispatcher task. This is called on the event loop."""
+        with self._lock:
+            batch = self._pending
+            self._pending = []
+            self._pending_index.clear()
+            self._flush_scheduled = False
+            self._flush_immediate = False
+            if batch:
+                self._stats.batches += 1
+        if batch:
+            self._queue.put_nowait(batch)
 
     async def _dispatch_from_queue(self, stop_event: threading.Event):
         """Get events on from the queue and dispatch them, from the correct thread"""
         while not stop_event.is_set():
             try:
-                event = await self._queue.get()
-                if not event:  # Probably stopping
+                batch: Optional[list[EventBase]] = await self._queue.get()
+                if not batch:  # Probably stopping
                     continue
-                # Leave the payloads as live pydantic models
-                dispatch(event, middleware_id=self.event_handler_id, payload_schema_dump=False)
+                for event in batch:
+                    # Leave the payloads as live pydantic models
+                    dispatch(event, middleware_id=self.event_handler_id, payload_schema_dump=False)
 
             except asyncio.CancelledError as e:
                 raise e  # Raise a proper error
@@ -4,13 +4,15 @@ from typing import Optional
 
 from PIL.Image import Image as PILImageType
 
+from invokeai.app.services.image_files.image_files_common import ImageFileCacheStatus
+
 
 class ImageFileStorageBase(ABC):
     """Low-level service responsible for storing and retrieving image files."""
 
     @abstractmethod
-    def get(self, image_name: str) -> PILImageType:
-        """Retrieves an image as PIL Image."""
+    def get(self, image_name: str, thumbnail: bool = False) -> PILImageType:
+        """Retrieves an image or thumbnail as PIL Image."""
         pass
 
     @abstractmethod
@@ -18,6 +20,11 @@ class ImageFileStorageBase(ABC):
         """Gets the internal path to an image or thumbnail."""
         pass
 
+    @abstractmethod
+    def exists(self, image_name: str) -> bool:
+        """Checks if an image exists, whether or not it has been written yet."""
+        pass
+
     # TODO: We need to validate paths before starlette makes the FileResponse, else we get a
     # 500 internal server error. I don't like having this method on the service.
     @abstractmethod
@@ -34,8 +41,11 @@ class ImageFileStorageBase(ABC):
         workflow: Optional[str] = None,
         graph: Optional[str] = None,
         thumbnail_size: int = 256,
+        is_intermediate: bool = False,
     ) -> None:
-        """Saves an image and a 256x256 WEBP thumbnail. Returns a tuple of the image name, thumbnail name, and created timestamp."""
+        """Saves an image and a 256x256 WEBP thumbnail. Returns a tuple of the image name, thumbnail name, and created timestamp.
+
+        Intermediate images may be kept in memory, and only written when their files are needed."""
         pass
 
     @abstractmethod
@@ -52,3 +62,8 @@ class ImageFileStorageBase(ABC):
     def get_graph(self, image_name: str) -> Optional[str]:
         """Gets the graph of an image."""
         pass
+
+    @abstractmethod
+    def get_cache_status(self) -> ImageFileCacheStatus:
+        """Gets the status of the decoded image and thumbnail caches, and of the intermediate images kept in memory."""
+        pass
@@ -1,3 +1,6 @@
+from pydantic import BaseModel, Field
+
+
 # TODO: Should these excpetions subclass existing python exceptions?
 class ImageFileNotFoundException(Exception):
     """Raised when an image file is not found in storage."""
@@ -18,3 +21,21 @@ class ImageFileDeleteException(Exception):
 
     def __init__(self, message="Image file not deleted"):
         super().__init__(message)
+
+
+class ImageFileCacheStats(BaseModel):
+    hits: int = Field(default=0, description="The number of cache hits")
+    misses: int = Field(default=0, description="The number of cache misses")
+    evictions: int = Field(default=0, description="The number of images evicted to stay within the cache's budget")
+    size: int = Field(default=0, description="The number of images in the cache")
+    size_bytes: int = Field(default=0, description="The estimated size of the decoded images in the cache, in bytes")
+    max_size_bytes: int = Field(default=0, description="The maximum size of the cache, in bytes")
+
+
+class ImageFileCacheStatus(BaseModel):
+    images: ImageFileCacheStats = Field(description="Stats for the full-size image cache")
+    thumbnails: ImageFileCacheStats = Field(description="Stats for the thumbnail cache")
+    deferred: ImageFileCacheStats = Field(
+        description="Stats for the intermediate images kept in memory until their files are needed. Their evictions are"
+        " the images written to stay within the budget."
+    )
@@ -1,6 +1,9 @@
 # Copyright (c) 2022 Kyle Schouviller (https://github.com/kyle0654) and the InvokeAI Team
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from queue import Queue
 from typing import Optional, Union
 
 from PIL import Image, PngImagePlugin
@@ -8,6 +11,8 @@ from PIL.Image import Image as PILImageType
 
 from invokeai.app.services.image_files.image_files_base import ImageFileStorageBase
 from invokeai.app.services.image_files.image_files_common import (
+    ImageFileCacheStats,
+    ImageFileCacheStatus,
     ImageFileDeleteException,
     ImageFileNotFoundException,
     ImageFileSaveException,
@@ -16,13 +21,145 @@ from invokeai.app.services.invoker import Invoker
 from invokeai.app.util.thumbnails import get_thumbnail_name, make_thumbnail
 
 
-class DiskImageFileStorage(ImageFileStorageBase):
-    """Stores images on disk"""
+def calc_image_size(image: PILImageType) -> int:
+    """Estimates the memory used by an image's decoded pixel data, in bytes."""
+    if image.mode in ("1", "L", "P"):
+        bytes_per_pixel = 1
+    elif image.mode.startswith("I;16"):
+        bytes_per_pixel = 2
+    else:
+        # Pillow pads multi-band images to 4 bytes per pixel
+        bytes_per_pixel = 4
+    return image.width * image.height * bytes_per_pixel
+
+
+class DecodedImageCache:
+    """A thread-safe LRU cache of decoded images, limited by the estimated size of their pixel data."""
+
+    def __init__(self, max_cache_bytes: int):
+        self._cache: OrderedDict[Path, tuple[PILImageType, int]] = OrderedDict()
+        self._cache_bytes = 0
+        self._max_cache_bytes = max_cache_bytes
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> Optional[PILImageType]:
+        with self._lock:
+            cache_item = self._cache.get(path)
+            if cache_item is None:
+                self._misses += 1
+                return None
+            self._cache.move_to_end(path)
+            self._hits += 1
+            return cache_item[0]
+
+    def set(self, path: Path, image: PILImageType) -> None:
+        size = calc_image_size(image)
+        if size > self._max_cache_bytes:
+            return
+        with self._lock:
+            self._delete(path)
+            self._cache[path] = (image, size)
+            self._cache_bytes += size
+            while self._cache_bytes > self._max_cache_bytes:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted_size
+                self._evictions += 1
+
+    def delete(self, path: Path) -> None:
+        with self._lock:
+            self._delete(path)
+
+    def get_stats(self) -> ImageFileCacheStats:
+        with self._lock:
+            return ImageFileCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._cache),
+                size_bytes=self._cache_bytes,
+                max_size_bytes=self._max_cache_bytes,
+            )
+
+    def _delete(self, path: Path) -> None:
+        cache_item = self._cache.pop(path, None)
+        if cache_item is not None:
+            self._cache_bytes -= cache_item[1]
+
+
+@dataclass
+class DeferredSave:
+    """An intermediate image that has been saved, and is kept in memory until its file is needed."""
+
+    image: PILImageType
+    pnginfo: PngImagePlugin.PngInfo
+    thumbnail_size: int
+    size: int
+
+
+@dataclass
+class PendingSave:
+    """An image that has been saved, but not yet written to disk."""
+
+    image: PILImageType
+    thumbnail: PILImageType
+    done: threading.Event = field(default_factory=threading.Event)
 
-    def __init__(self, output_folder: Union[str, Path]):
-        self.__cache: dict[Path, PILImageType] = {}
-        self.__cache_ids = Queue[Path]()
-        self.__max_cache_size = 10  # TODO: get this from config
+
+class DiskImageFileStorage(ImageFileStorageBase):
+    """Stores images on disk.
+
+    Recently used images and thumbnails are kept decoded in memory, in separate LRU caches.
+
+    With `save_workers`, images are encoded and written by a pool of background threads, and `save` returns as soon as
+    the image is queued. Until it is written, `get`, `get_workflow` and `get_graph` read the image from memory, and
+    `get_path` and `delete` wait for the write to finish, so anything that accesses the files sees them complete.
+
+    With `max_deferred_bytes`, intermediate images are not written when they are saved. They are kept in memory, where
+    `get` reads them, until their files are needed: `get_path` and `get` of the thumbnail write them first. The least
+    recently used ones are written when they exceed the budget, and the rest when the storage is stopped. Intermediate
+    images that are deleted before then are never written.
+
+    :param output_folder: The folder to store images in. Thumbnails are stored in a `thumbnails` subfolder.
+    :param max_cache_bytes: The maximum estimated size of the cached images' pixel data, in bytes
+    :param max_thumbnail_cache_bytes: The maximum estimated size of the cached thumbnails' pixel data, in bytes
+    :param save_workers: The number of threads that write images in the background. If 0, images are written by `save`.
+    :param max_pending_saves: The maximum number of images waiting to be written. When reached, `save` blocks until a
+        write finishes.
+    :param max_deferred_bytes: The maximum estimated size of the pixel data of the intermediate images that are kept
+        in memory instead of being written, in bytes. If 0, intermediate images are written like any other.
+    """
+
+    def __init__(
+        self,
+        output_folder: Union[str, Path],
+        max_cache_bytes: int = 256 * 2**20,
+        max_thumbnail_cache_bytes: int = 32 * 2**20,
+        save_workers: int = 0,
+        max_pending_saves: int = 8,
+        max_deferred_bytes: int = 0,
+    ):
+        self.__cache = DecodedImageCache(max_cache_bytes)
+        self.__thumbnail_cache = DecodedImageCache(max_thumbnail_cache_bytes)
+
+        self.__save_executor = (
+            ThreadPoolExecutor(max_workers=save_workers, thread_name_prefix="image_save") if save_workers > 0 else None
+        )
+        self.__pending_saves: dict[str, PendingSave] = {}
+        self.__pending_saves_lock = threading.Lock()
+        self.__pending_save_slots = threading.BoundedSemaphore(max_pending_saves)
+
+        self.__deferred_saves: OrderedDict[str, DeferredSave] = OrderedDict()
+        self.__deferred_bytes = 0
+        self.__max_deferred_bytes = max_deferred_bytes
+        self.__deferred_hits = 0
+        self.__deferred_evictions = 0
+        self.__deferred_saves_lock = threading.Lock()
+        # Held from taking deferred images out of memory until they are written or pending, so that `get_path` never
+        # finds an image that is neither deferred, pending nor written
+        self.__write_deferred_lock = threading.Lock()
 
         self.__output_folder = output_folder if isinstance(output_folder, Path) else Path(output_folder)
         self.__thumbnails_folder = self.__output_folder / "thumbnails"
@@ -32,16 +169,41 @@ class DiskImageFileStorage(ImageFileStorageBase):
     def start(self, invoker: Invoker) -> None:
         self.__invoker = invoker
 
-    def get(self, image_name: str) -> PILImageType:
+    def stop(self, invoker: Invoker) -> None:
+        self.__write_deferred_saves(all_saves=True)
+        if self.__save_executor is not None:
+            # Finish writing any pending images
+            self.__save_executor.shutdown(wait=True)
+
+    def get(self, image_name: str, thumbnail: bool = False) -> PILImageType:
+        if thumbnail:
+            # Thumbnails of deferred images are only made when they are written
+            self.__write_deferred_saves(image_name)
+        else:
+            with self.__deferred_saves_lock:
+                deferred_save = self.__deferred_saves.get(image_name)
+                if deferred_save is not None:
+                    self.__deferred_saves.move_to_end(image_name)
+                    self.__deferred_hits += 1
+                    return deferred_save.image
+
+        with self.__pending_saves_lock:
+            pending_save = self.__pending_saves.get(image_name)
+        if pending_save is not None:
+            return pending_save.thumbnail if thumbnail else pending_save.image
+
+        cache = self.__thumbnail_cache if thumbnail else self.__cache
         try:
-            image_path = self.get_path(image_name)
+            image_path = self.get_path(image_name, thumbnail)
 
-            cache_item = self.__get_cache(image_path)
-            if cache_item:
+            cache_item = cache.get(image_path)
+            if cache_item is not None:
                 return cache_item
 
             image = Image.open(image_path)
-            self.__set_cache(image_path, image)
+            # Decode the pixel data now, which also closes the file
+            image.load()
+            cache.set(image_path, image)
             return image
         except FileNotFoundError as e:
             raise ImageFileNotFoundException from e
@@ -54,10 +216,10 @@ class DiskImageFileStorage(ImageFileStorageBase):
         workflow: Optional[str] = None,
         graph: Optional[str] = None,
         thumbnail_size: int = 256,
+        is_intermediate: bool = False,
     ) -> None:
         try:
             self.__validate_storage_folders()
-            image_path = self.get_path(image_name)
 
             pnginfo = PngImagePlugin.PngInfo()
             info_dict = {}
@@ -74,43 +236,65 @@ class DiskImageFileStorage(ImageFileStorageBase):
 
             # When saving the image, the image object's info field is not populated. We need to set it
             image.info = info_dict
-            image.save(
-                image_path,
-                "PNG",
-                pnginfo=pnginfo,
-                compress_level=self.__invoker.services.configuration.pil_compress_level,
-            )
-
-            thumbnail_name = get_thumbnail_name(image_name)
-            thumbnail_path = self.get_path(thumbnail_name, thumbnail=True)
-            thumbnail_image = make_thumbnail(image, thumbnail_size)
-            thumbnail_image.save(thumbnail_path)
 
-            self.__set_cache(image_path, image)
-            self.__set_cache(thumbnail_path, thumbnail_image)
+            size = calc_image_size(image)
+            if is_intermediate and 0 < size <= self.__max_deferred_bytes:
+                with self.__deferred_saves_lock:
+                    replaced = self.__deferred_saves.pop(image_name, None)
+                    if replaced is not None:
+                        self.__deferred_bytes -= replaced.size
+                    self.__deferred_saves[image_name] = DeferredSave(
+                        image=image, pnginfo=pnginfo, thumbnail_size=thumbnail_size, size=size
+                    )
+                    self.__deferred_bytes += size
+                    over_budget = self.__deferred_bytes > self.__max_deferred_bytes
+                if over_budget:
+                    self.__write_deferred_saves()
+                return
+
+            self.__save(image, image_name, pnginfo, thumbnail_size)
         except Exception as e:
             raise ImageFileSaveException from e
 
     def delete(self, image_name: str) -> None:
         try:
+            # Deferred images are dropped without being written
+            with self.__deferred_saves_lock:
+                deferred_save = self.__deferred_saves.pop(image_name, None)
+                if deferred_save is not None:
+                    self.__deferred_bytes -= deferred_save.size
+
             image_path = self.get_path(image_name)
 
             if image_path.exists():
                 image_path.unlink()
-            if image_path in self.__cache:
-                del self.__cache[image_path]
+            self.__cache.delete(image_path)
 
             thumbnail_name = get_thumbnail_name(image_name)
             thumbnail_path = self.get_path(thumbnail_name, True)
 
             if thumbnail_path.exists():
                 thumbnail_path.unlink()
-            if thumbnail_path in self.__cache:
-                del self.__cache[thumbnail_path]
+            self.__thumbnail_cache.delete(thumbnail_path)
         except Exception as e:
             raise ImageFileDeleteException from e
 
     def get_path(self, image_name: str, thumbnail: bool = False) -> Path:
+        # Callers may access the file directly, so it must be completely written
+        self.__write_deferred_saves(image_name)
+        self.__wait_for_pending_save(image_name)
+        return self.__resolve_path(image_name, thumbnail)
+
+    def exists(self, image_name: str) -> bool:
+        with self.__deferred_saves_lock:
+            if image_name in self.__deferred_saves:
+                return True
+        with self.__pending_saves_lock:
+            if image_name in self.__pending_saves:
+                return True
+        return self.__resolve_path(image_name).exists()
+
+    def __resolve_path(self, image_name: str, thumbnail: bool = False) -> Path:
         base_folder = self.__thumbnails_folder if thumbnail else self.__output_folder
         filename = get_thumbnail_name(image_name) if thumbnail else image_name
 
@@ -150,20 +334,124 @@ class DiskImageFileStorage(ImageFileStorageBase):
             return graph
         return None
 
+    def get_cache_status(self) -> ImageFileCacheStatus:
+        with self.__deferred_saves_lock:
+            deferred = ImageFileCacheStats(
+                hits=self.__deferred_hits,
+                evictions=self.__deferred_evictions,
+                size=len(self.__deferred_saves),
+                size_bytes=self.__deferred_bytes,
+                max_size_bytes=self.__max_deferred_bytes,
+            )
+        return ImageFileCacheStatus(
+            images=self.__cache.get_stats(), thumbnails=self.__thumbnail_cache.get_stats(), deferred=deferred
+        )
+
+    def __save(
+        self, image: PILImageType, image_name: str, pnginfo: PngImagePlugin.PngInfo, thumbnail_size: int
+    ) -> None:
+        """Writes an image and its thumbnail, or queues them for the background threads to write."""
+        image_path = self.__resolve_path(image_name)
+        thumbnail_name = get_thumbnail_name(image_name)
+        thumbnail_path = self.__resolve_path(thumbnail_name, thumbnail=True)
+        thumbnail_image = make_thumbnail(image, thumbnail_size)
+
+        if self.__save_executor is None:
+            self.__write(image, pnginfo, image_path, thumbnail_image, thumbnail_path)
+            self.__cache.set(image_path, image)
+            self.__thumbnail_cache.set(thumbnail_path, thumbnail_image)
+            return
+
+        self.__cache.set(image_path, image)
+        self.__thumbnail_cache.set(thumbnail_path, thumbnail_image)
+
+        # Blocks if the workers have fallen too far behind
+        self.__pending_save_slots.acquire()
+        pending_save = PendingSave(image=image, thumbnail=thumbnail_image)
+        with self.__pending_saves_lock:
+            self.__pending_saves[image_name] = pending_save
+        try:
+            self.__save_executor.submit(
+                self.__write_pending, image_name, pending_save, pnginfo, image_path, thumbnail_path
+            )
+        except Exception:
+            self.__finish_pending_save(image_name, pending_save)
+            raise
+
+    def __write(
+        self,
+        image: PILImageType,
+        pnginfo: PngImagePlugin.PngInfo,
+        image_path: Path,
+        thumbnail_image: PILImageType,
+        thumbnail_path: Path,
+    ) -> None:
+        image.save(
+            image_path,
+            "PNG",
+            pnginfo=pnginfo,
+            compress_level=self.__invoker.services.configuration.pil_compress_level,
+        )
+        thumbnail_image.save(thumbnail_path)
+
+    def __write_pending(
+        self,
+        image_name: str,
+        pending_save: PendingSave,
+        pnginfo: PngImagePlugin.PngInfo,
+        image_path: Path,
+        thumbnail_path: Path,
+    ) -> None:
+        try:
+            self.__write(pending_save.image, pnginfo, image_path, pending_save.thumbnail, thumbnail_path)
+        except Exception as e:
+            self.__invoker.services.logger.error(f"Failed to write image {image_name}: {e}")
+        finally:
+            self.__finish_pending_save(image_name, pending_save)
+
+    def __finish_pending_save(self, image_name: str, pending_save: PendingSave) -> None:
+        with self.__pending_saves_lock:
+            if self.__pending_saves.get(image_name) is pending_save:
+                del self.__pending_saves[image_name]
+        pending_save.done.set()
+        self.__pending_save_slots.release()
+
+    def __write_deferred_saves(self, image_name: Optional[str] = None, all_saves: bool = False) -> None:
+        """Writes the deferred image with the given name, or all of them, or else the least recently used ones until
+        the rest are within the budget."""
+        with self.__write_deferred_lock:
+            to_write: list[tuple[str, DeferredSave]] = []
+            with self.__deferred_saves_lock:
+                if image_name is not None:
+                    deferred_save = self.__deferred_saves.pop(image_name, None)
+                    if deferred_save is not None:
+                        to_write.append((image_name, deferred_save))
+                elif all_saves:
+                    to_write.extend(self.__deferred_saves.items())
+                    self.__deferred_saves.clear()
+                else:
+                    while self.__deferred_bytes > self.__max_deferred_bytes:
+                        name, deferred_save = self.__deferred_saves.popitem(last=False)
+                        self.__deferred_bytes -= deferred_save.size
+                        self.__deferred_evictions += 1
+                        to_write.append((name, deferred_save))
+                if image_name is not None or all_saves:
+                    self.__deferred_bytes -= sum(deferred_save.size for _, deferred_save in to_write)
+
+            for name, deferred_save in to_write:
+                try:
+                    self.__save(deferred_save.image, name, deferred_save.pnginfo, deferred_save.thumbnail_size)
+                except Exception as e:
+                    self.__invoker.services.logger.error(f"Failed to write image {name}: {e}")
+
+    def __wait_for_pending_save(self, image_name: str) -> None:
+        with self.__pending_saves_lock:
+            pending_save = self.__pending_saves.get(image_name)
+        if pending_save is not None:
+            pending_save.done.wait()
+
     def __validate_storage_folders(self) -> None:
         """Checks if the required output folders exist and create them if they don't"""
         folders: list[Path] = [self.__output_folder, self.__thumbnails_folder]
         for folder in folders:
             folder.mkdir(parents=True, exist_ok=True)
-
-    def __get_cache(self, image_name: Path) -> Optional[PILImageType]:
-        return None if image_name not in self.__cache else self.__cache[image_name]
-
-    def __set_cache(self, image_name: Path, image: PILImageType):
-        if image_name not in self.__cache:
-            self.__cache[image_name] = image
-            self.__cache_ids.put(image_name)  # TODO: this should refresh position for LRU cache
-            if len(self.__cache) > self.__max_cache_size:
-                cache_id = self.__cache_ids.get()
-                if cache_id in self.__cache:
-                    del self.__cache[cache_id]
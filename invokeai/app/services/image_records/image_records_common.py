@@ -1,5 +1,9 @@
 # TODO: Should these excpetions subclass existing python exceptions?
+import base64
+import binascii
 import datetime
+import json
+import re
 from enum import Enum
 from typing import Optional, Union
 
@@ -36,6 +40,16 @@ class InvalidOriginException(ValueError):
         super().__init__(message)
 
 
+class InvalidImageCursorException(ValueError):
+    """Raised when a provided value is not a valid image pagination cursor.
+
+    Subclasses `ValueError`.
+    """
+
+    def __init__(self, message="Invalid image cursor."):
+        super().__init__(message)
+
+
 class ImageCategory(str, Enum, metaclass=MetaEnum):
     """The category of an image.
 
@@ -207,3 +221,27 @@ def deserialize_image_record(image_dict: dict) -> ImageRecord:
         starred=starred,
         has_workflow=has_workflow,
     )
+
+
+def encode_image_cursor(starred: bool, created_at: str, image_name: str) -> str:
+    """Encodes the sort key of an image as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(json.dumps([bool(starred), created_at, image_name]).encode()).decode()
+
+
+def decode_image_cursor(cursor: str) -> tuple[bool, str, str]:
+    """Decodes a pagination cursor into the sort key of an image: `starred`, `created_at` and `image_name`."""
+    try:
+        starred, created_at, image_name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError, TypeError, ValueError) as e:
+        raise InvalidImageCursorException from e
+    if not isinstance(starred, bool) or not isinstance(created_at, str) or not isinstance(image_name, str):
+        raise InvalidImageCursorException
+    return starred, created_at, image_name
+
+
+def build_fts_query(search_term: str) -> str:
+    """Builds a full-text search query matching images with words starting with every word in the search term.
+
+    Returns an empty string if the search term has no words.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", search_term))
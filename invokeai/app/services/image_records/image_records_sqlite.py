@@ -14,42 +14,48 @@ from invokeai.app.services.image_records.image_records_common import (
     ImageRecordNotFoundException,
     ImageRecordSaveException,
     ResourceOrigin,
+    build_fts_query,
+    decode_image_cursor,
     deserialize_image_record,
+    encode_image_cursor,
 )
-from invokeai.app.services.shared.pagination import OffsetPaginatedResults
+from invokeai.app.services.shared.pagination import KeysetPaginatedResults, OffsetPaginatedResults
 from invokeai.app.services.shared.sqlite.sqlite_common import SQLiteDirection
-from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase, SqliteLock
 
 
 class SqliteImageRecordStorage(ImageRecordStorageBase):
     _conn: sqlite3.Connection
     _cursor: sqlite3.Cursor
-    _lock: threading.RLock
+    _lock: SqliteLock
 
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
-        self._lock = db.lock
+        self._db = db
+        self._lock = db.get_lock("image_records")
         self._conn = db.conn
         self._cursor = self._conn.cursor()
+        self._count_cache: dict[tuple[str, tuple[Union[int, str, bool], ...]], int] = {}
+        self._count_cache_changes = -1
+        self._count_cache_lock = threading.Lock()
+        self._cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'images_fts';")
+        self._has_fts = self._cursor.fetchone() is not None
 
     def get(self, image_name: str) -> ImageRecord:
         try:
-            self._lock.acquire()
-
-            self._cursor.execute(
-                f"""--sql
-                SELECT {IMAGE_DTO_COLS} FROM images
-                WHERE image_name = ?;
-                """,
-                (image_name,),
-            )
+            with self._db.read_connection("image_records") as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"""--sql
+                    SELECT {IMAGE_DTO_COLS} FROM images
+                    WHERE image_name = ?;
+                    """,
+                    (image_name,),
+                )
 
-            result = cast(Optional[sqlite3.Row], self._cursor.fetchone())
+                result = cast(Optional[sqlite3.Row], cursor.fetchone())
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise ImageRecordNotFoundException from e
-        finally:
-            self._lock.release()
 
         if not result:
             raise ImageRecordNotFoundException
@@ -58,29 +64,26 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
 
     def get_metadata(self, image_name: str) -> Optional[MetadataField]:
         try:
-            self._lock.acquire()
-
-            self._cursor.execute(
-                """--sql
-                SELECT metadata FROM images
-                WHERE image_name = ?;
-                """,
-                (image_name,),
-            )
-
-            result = cast(Optional[sqlite3.Row], self._cursor.fetchone())
-
-            if not result:
-                raise ImageRecordNotFoundException
+            with self._db.read_connection("image_records") as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """--sql
+                    SELECT metadata FROM images
+                    WHERE image_name = ?;
+                    """,
+                    (image_name,),
+                )
 
-            as_dict = dict(result)
-            metadata_raw = cast(Optional[str], as_dict.get("metadata", None))
-            return MetadataFieldValidator.validate_json(metadata_raw) if metadata_raw is not None else None
+                result = cast(Optional[sqlite3.Row], cursor.fetchone())
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise ImageRecordNotFoundException from e
-        finally:
-            self._lock.release()
+
+        if not result:
+            raise ImageRecordNotFoundException
+
+        as_dict = dict(result)
+        metadata_raw = cast(Optional[str], as_dict.get("metadata", None))
+        return MetadataFieldValidator.validate_json(metadata_raw) if metadata_raw is not None else None
 
     def update(
         self,
@@ -152,105 +155,224 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
         board_id: Optional[str] = None,
         search_term: Optional[str] = None,
     ) -> OffsetPaginatedResults[ImageRecord]:
-        try:
-            self._lock.acquire()
-
-            # Manually build two queries - one for the count, one for the records
-            count_query = """--sql
-            SELECT COUNT(*)
-            FROM images
-            LEFT JOIN board_images ON board_images.image_name = images.image_name
-            WHERE 1=1
+        query_conditions, query_params = self._build_query_conditions(
+            image_origin, categories, is_intermediate, board_id, search_term
+        )
+
+        images_query = f"""--sql
+        SELECT {IMAGE_DTO_COLS}
+        FROM images
+        LEFT JOIN board_images ON board_images.image_name = images.image_name
+        WHERE 1=1
+        """
+
+        if starred_first:
+            query_pagination = f"""--sql
+            ORDER BY images.starred DESC, images.created_at {order_dir.value} LIMIT ? OFFSET ?
             """
-
-            images_query = f"""--sql
-            SELECT {IMAGE_DTO_COLS}
-            FROM images
-            LEFT JOIN board_images ON board_images.image_name = images.image_name
-            WHERE 1=1
+        else:
+            query_pagination = f"""--sql
+            ORDER BY images.created_at {order_dir.value} LIMIT ? OFFSET ?
             """
 
-            query_conditions = ""
-            query_params: list[Union[int, str, bool]] = []
+        # Final images query with pagination
+        images_query += query_conditions + query_pagination + ";"
+        # Add all the parameters
+        images_params = query_params.copy()
+        # Add the pagination parameters
+        images_params.extend([limit, offset])
+
+        # Build the list of images, deserializing each row
+        with self._db.read_connection("image_records") as conn:
+            changes = self._get_count_cache_changes()
+            result = cast(list[sqlite3.Row], conn.execute(images_query, images_params).fetchall())
+            images = [deserialize_image_record(dict(r)) for r in result]
 
-            if image_origin is not None:
-                query_conditions += """--sql
-                AND images.image_origin = ?
-                """
-                query_params.append(image_origin.value)
+            count = self._get_count(conn, changes, query_conditions, query_params)
 
-            if categories is not None:
-                # Convert the enum values to unique list of strings
-                category_strings = [c.value for c in set(categories)]
-                # Create the correct length of placeholders
-                placeholders = ",".join("?" * len(category_strings))
+        return OffsetPaginatedResults(items=images, offset=offset, limit=limit, total=count)
 
-                query_conditions += f"""--sql
-                AND images.image_category IN ( {placeholders} )
+    def get_many_by_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        starred_first: bool = True,
+        order_dir: SQLiteDirection = SQLiteDirection.Descending,
+        image_origin: Optional[ResourceOrigin] = None,
+        categories: Optional[list[ImageCategory]] = None,
+        is_intermediate: Optional[bool] = None,
+        board_id: Optional[str] = None,
+        search_term: Optional[str] = None,
+    ) -> KeysetPaginatedResults[ImageRecord]:
+        cursor_values = decode_image_cursor(cursor) if cursor is not None else None
+        query_conditions, query_params = self._build_query_conditions(
+            image_origin, categories, is_intermediate, board_id, search_term
+        )
+
+        images_query = f"""--sql
+        SELECT {IMAGE_DTO_COLS}
+        FROM images
+        LEFT JOIN board_images ON board_images.image_name = images.image_name
+        WHERE 1=1
+        """
+        images_params = query_params.copy()
+
+        # Continue from the last image of the previous page, in the same order. Image names break ties in
+        # `created_at`, so no image is skipped or repeated.
+        comparison = "<" if order_dir is SQLiteDirection.Descending else ">"
+        cursor_conditions = ""
+        if cursor_values is not None:
+            starred, created_at, image_name = cursor_values
+            if starred_first:
+                cursor_conditions = f"""--sql
+                AND (
+                    images.starred < ?
+                    OR (images.starred = ? AND (images.created_at, images.image_name) {comparison} (?, ?))
+                )
                 """
+                images_params.extend([starred, starred, created_at, image_name])
+            else:
+                cursor_conditions = f"""--sql
+                AND (images.created_at, images.image_name) {comparison} (?, ?)
+                """
+                images_params.extend([created_at, image_name])
 
-                # Unpack the included categories into the query params
-                for c in category_strings:
-                    query_params.append(c)
+        query_order = f"images.created_at {order_dir.value}, images.image_name {order_dir.value}"
+        if starred_first:
+            query_order = f"images.starred DESC, {query_order}"
 
-            if is_intermediate is not None:
-                query_conditions += """--sql
-                AND images.is_intermediate = ?
-                """
+        # Get one extra image to find out if there is another page
+        images_query += query_conditions + cursor_conditions + f"ORDER BY {query_order} LIMIT ?;"
+        images_params.append(limit + 1)
 
-                query_params.append(is_intermediate)
+        with self._db.read_connection("image_records") as conn:
+            changes = self._get_count_cache_changes()
+            rows = cast(list[sqlite3.Row], conn.execute(images_query, images_params).fetchall())
+            result = [dict(r) for r in rows]
 
-            # board_id of "none" is reserved for images without a board
-            if board_id == "none":
-                query_conditions += """--sql
-                AND board_images.board_id IS NULL
-                """
-            elif board_id is not None:
-                query_conditions += """--sql
-                AND board_images.board_id = ?
-                """
-                query_params.append(board_id)
+            count = self._get_count(conn, changes, query_conditions, query_params)
 
-            # Search term condition
-            if search_term:
-                query_conditions += """--sql
-                AND images.metadata LIKE ?
-                """
-                query_params.append(f"%{search_term.lower()}%")
+        next_cursor = None
+        if len(result) > limit:
+            result = result[:limit]
+            last = result[-1]
+            next_cursor = encode_image_cursor(last["starred"], last["created_at"], last["image_name"])
 
-            if starred_first:
-                query_pagination = f"""--sql
-                ORDER BY images.starred DESC, images.created_at {order_dir.value} LIMIT ? OFFSET ?
-                """
-            else:
-                query_pagination = f"""--sql
-                ORDER BY images.created_at {order_dir.value} LIMIT ? OFFSET ?
-                """
+        images = [deserialize_image_record(r) for r in result]
+        return KeysetPaginatedResults(items=images, limit=limit, total=count, next_cursor=next_cursor)
 
-            # Final images query with pagination
-            images_query += query_conditions + query_pagination + ";"
-            # Add all the parameters
-            images_params = query_params.copy()
-            # Add the pagination parameters
-            images_params.extend([limit, offset])
+    def _build_query_conditions(
+        self,
+        image_origin: Optional[ResourceOrigin],
+        categories: Optional[list[ImageCategory]],
+        is_intermediate: Optional[bool],
+        board_id: Optional[str],
+        search_term: Optional[str],
+    ) -> tuple[str, list[Union[int, str, bool]]]:
+        """Builds the `WHERE` conditions and their parameters for a query on `images` joined with `board_images`."""
+        query_conditions = ""
+        query_params: list[Union[int, str, bool]] = []
+
+        if image_origin is not None:
+            query_conditions += """--sql
+            AND images.image_origin = ?
+            """
+            query_params.append(image_origin.value)
 
-            # Build the list of images, deserializing each row
-            self._cursor.execute(images_query, images_params)
-            result = cast(list[sqlite3.Row], self._cursor.fetchall())
-            images = [deserialize_image_record(dict(r)) for r in result]
+        if categories is not None:
+            # Convert the enum values to unique list of strings
+            category_strings = [c.value for c in set(categories)]
+            # Create the correct length of placeholders
+            placeholders = ",".join("?" * len(category_strings))
 
-            # Set up and execute the count query, without pagination
-            count_query += query_conditions + ";"
-            count_params = query_params.copy()
-            self._cursor.execute(count_query, count_params)
-            count = cast(int, self._cursor.fetchone()[0])
-        except sqlite3.Error as e:
-            self._conn.rollback()
-            raise e
-        finally:
-            self._lock.release()
+            query_conditions += f"""--sql
+            AND images.image_category IN ( {placeholders} )
+            """
 
-        return OffsetPaginatedResults(items=images, offset=offset, limit=limit, total=count)
+            # Unpack the included categories into the query params
+            for c in category_strings:
+                query_params.append(c)
+
+        if is_intermediate is not None:
+            query_conditions += """--sql
+            AND images.is_intermediate = ?
+            """
+
+            query_params.append(is_intermediate)
+
+        # board_id of "none" is reserved for images without a board
+        if board_id == "none":
+            query_conditions += """--sql
+            AND board_images.board_id IS NULL
+            """
+        elif board_id is not None:
+            query_conditions += """--sql
+            AND board_images.board_id = ?
+            """
+            query_params.append(board_id)
+
+        # Search term condition
+        fts_query = build_fts_query(search_term) if search_term else None
+        if fts_query and self._has_fts:
+            query_conditions += """--sql
+            AND images.image_name IN (
+                SELECT images_fts_ids.image_name
+                FROM images_fts
+                JOIN images_fts_ids ON images_fts_ids.id = images_fts.rowid
+                WHERE images_fts MATCH ?
+            )
+            """
+            query_params.append(fts_query)
+        elif search_term:
+            query_conditions += """--sql
+            AND images.metadata LIKE ?
+            """
+            query_params.append(f"%{search_term.lower()}%")
+
+        return query_conditions, query_params
+
+    def _get_count_cache_changes(self) -> Optional[int]:
+        """Gets the number of changes made to the database, which identifies the counts that are cached. Must be called
+        before the first query of a read, so the counts read are from no earlier than the changes returned.
+
+        Returns None while a write is in progress, when the counts read may or may not include the write's changes.
+        """
+        changes = self._conn.total_changes
+        return None if self._conn.in_transaction else changes
+
+    def _get_count(
+        self,
+        conn: sqlite3.Connection,
+        changes: Optional[int],
+        query_conditions: str,
+        query_params: list[Union[int, str, bool]],
+    ) -> int:
+        """Counts the images matching the given conditions.
+
+        Counts are cached until the next write to the database, so paging through results only counts them once.
+        """
+        cache_key = (query_conditions, tuple(query_params))
+        with self._count_cache_lock:
+            if changes != self._count_cache_changes:
+                self._count_cache.clear()
+                self._count_cache_changes = -1 if changes is None else changes
+            count = self._count_cache.get(cache_key) if changes is not None else None
+        if count is not None:
+            return count
+
+        count_query = f"""--sql
+        SELECT COUNT(*)
+        FROM images
+        LEFT JOIN board_images ON board_images.image_name = images.image_name
+        WHERE 1=1
+        {query_conditions};
+        """
+        count = cast(int, conn.execute(count_query, query_params).fetchone()[0])
+        if changes is not None:
+            with self._count_cache_lock:
+                if changes == self._count_cache_changes:
+                    self._count_cache[cache_key] = count
+        return count
 
     def delete(self, image_name: str) -> None:
         try:
@@ -290,21 +412,18 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
 
     def get_intermediates_count(self) -> int:
         try:
-            self._lock.acquire()
-            self._cursor.execute(
-                """--sql
-                SELECT COUNT(*) FROM images
-                WHERE is_intermediate = TRUE;
-                """
-            )
-            count = cast(int, self._cursor.fetchone()[0])
-            self._conn.commit()
+            with self._db.read_connection("image_records") as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """--sql
+                    SELECT COUNT(*) FROM images
+                    WHERE is_intermediate = TRUE;
+                    """
+                )
+                count = cast(int, cursor.fetchone()[0])
             return count
         except sqlite3.Error as e:
-            self._conn.rollback()
             raise ImageRecordDeleteException from e
-        finally:
-            self._lock.release()
 
     def delete_intermediates(self) -> list[str]:
         try:
@@ -399,9 +518,9 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
             self._lock.release()
 
     def get_most_recent_image_for_board(self, board_id: str) -> Optional[ImageRecord]:
-        try:
-            self._lock.acquire()
-            self._cursor.execute(
+        with self._db.read_connection("image_records") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT images.*
                 FROM images
@@ -414,9 +533,7 @@ class SqliteImageRecordStorage(ImageRecordStorageBase):
                 (board_id,),
             )
 
-            result = cast(Optional[sqlite3.Row], self._cursor.fetchone())
-        finally:
-            self._lock.release()
+            result = cast(Optional[sqlite3.Row], cursor.fetchone())
         if result is None:
             return None
 
@@ -16,13 +16,14 @@ from invokeai.app.services.image_records.image_records_common import (
     ImageRecordNotFoundException,
     ImageRecordSaveException,
     InvalidImageCategoryException,
+    InvalidImageCursorException,
     InvalidOriginException,
     ResourceOrigin,
 )
 from invokeai.app.services.images.images_base import ImageServiceABC
 from invokeai.app.services.images.images_common import ImageDTO, image_record_to_dto
 from invokeai.app.services.invoker import Invoker
-from invokeai.app.services.shared.pagination import OffsetPaginatedResults
+from invokeai.app.services.shared.pagination import KeysetPaginatedResults, OffsetPaginatedResults
 from invokeai.app.services.shared.sqlite.sqlite_common import SQLiteDirection
 
 
@@ -80,7 +81,12 @@ class ImageService(ImageServiceABC):
                 except Exception as e:
                     self.__invoker.services.logger.warn(f"Failed to add image to board {board_id}: {str(e)}")
             self.__invoker.services.image_files.save(
-                image_name=image_name, image=image, metadata=metadata, workflow=workflow, graph=graph
+                image_name=image_name,
+                image=image,
+                metadata=metadata,
+                workflow=workflow,
+                graph=graph,
+                is_intermediate=bool(is_intermediate),
             )
             image_dto = self.get_dto(image_name)
 
@@ -103,6 +109,9 @@ class ImageService(ImageServiceABC):
     ) -> ImageDTO:
         try:
             self.__invoker.services.image_records.update(image_name, changes)
+            if changes.is_intermediate is False:
+                # Intermediate images may not have been written yet, and the image must now outlive the process
+                self.__invoker.services.image_files.get_path(image_name)
             image_dto = self.get_dto(image_name)
             self._on_changed(image_dto)
             return image_dto
@@ -248,6 +257,53 @@ class ImageService(ImageServiceABC):
             self.__invoker.services.logger.error("Problem getting paginated image DTOs")
             raise e
 
+    def get_many_by_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        starred_first: bool = True,
+        order_dir: SQLiteDirection = SQLiteDirection.Descending,
+        image_origin: Optional[ResourceOrigin] = None,
+        categories: Optional[list[ImageCategory]] = None,
+        is_intermediate: Optional[bool] = None,
+        board_id: Optional[str] = None,
+        search_term: Optional[str] = None,
+    ) -> KeysetPaginatedResults[ImageDTO]:
+        try:
+            results = self.__invoker.services.image_records.get_many_by_cursor(
+                cursor,
+                limit,
+                starred_first,
+                order_dir,
+                image_origin,
+                categories,
+                is_intermediate,
+                board_id,
+                search_term,
+            )
+
+            image_dtos = [
+                image_record_to_dto(
+                    image_record=r,
+                    image_url=self.__invoker.services.urls.get_image_url(r.image_name),
+                    thumbnail_url=self.__invoker.services.urls.get_image_url(r.image_name, True),
+                    board_id=self.__invoker.services.board_image_records.get_board_for_image(r.image_name),
+                )
+                for r in results.items
+            ]
+
+            return KeysetPaginatedResults[ImageDTO](
+                items=image_dtos,
+                limit=results.limit,
+                total=results.total,
+                next_cursor=results.next_cursor,
+            )
+        except InvalidImageCursorException:
+            raise
+        except Exception as e:
+            self.__invoker.services.logger.error("Problem getting paginated image DTOs")
+            raise e
+
     def delete(self, image_name: str):
         try:
             self.__invoker.services.image_files.delete(image_name)
@@ -12,23 +12,25 @@ class InvocationCacheBase(ABC):
     When new invocations are executed, if they are flagged with `use_cache`, they
     will attempt to pull their value from the cache before executing.
 
-    Implementations should register for the `on_deleted` event of the `images` and `latents`
-    services, and delete any cached outputs that reference the deleted image or latent.
+    Implementations should register for the `on_deleted` event of the `images`, `tensors` and
+    `conditioning` services, and delete any cached outputs that reference the deleted object.
 
     See the memory implementation for an example.
 
-    Implementations should respect the `node_cache_size` configuration value, and skip all
-    cache logic if the value is set to 0.
+    Implementations should respect the `node_cache_size` and `node_cache_ram_mb` configuration
+    values, and skip all cache logic if `node_cache_size` is set to 0.
     """
 
     @abstractmethod
-    def get(self, key: Union[int, str]) -> Optional[BaseInvocationOutput]:
-        """Retrieves an invocation output from the cache"""
+    def get(self, key: Union[int, str], invocation_type: Optional[str] = None) -> Optional[BaseInvocationOutput]:
+        """Retrieves an invocation output from the cache. The invocation type is only used for statistics."""
         pass
 
     @abstractmethod
-    def save(self, key: Union[int, str], invocation_output: BaseInvocationOutput) -> None:
-        """Stores an invocation output in the cache"""
+    def save(
+        self, key: Union[int, str], invocation_output: BaseInvocationOutput, invocation_type: Optional[str] = None
+    ) -> None:
+        """Stores an invocation output in the cache. The invocation type is only used for statistics."""
         pass
 
     @abstractmethod
@@ -43,7 +45,7 @@ class InvocationCacheBase(ABC):
 
     @staticmethod
     @abstractmethod
-    def create_key(invocation: BaseInvocation) -> int:
+    def create_key(invocation: BaseInvocation) -> str:
         """Gets the key for the invocation's cache item"""
         pass
 
@@ -1,5 +1,27 @@
+from typing import Any, Literal, Optional
+
 from pydantic import BaseModel, Field
 
+ObjectKind = Literal["images", "tensors", "conditioning"]
+
+# Output fields that hold the name of an object stored by one of the image, tensor or conditioning services
+OBJECT_REFERENCE_FIELDS: dict[str, ObjectKind] = {
+    "image_name": "images",
+    "tensor_name": "tensors",
+    "latents_name": "tensors",
+    "mask_name": "tensors",
+    "masked_latents_name": "tensors",
+    "conditioning_name": "conditioning",
+}
+
+
+class InvocationCacheTypeStats(BaseModel):
+    hits: int = Field(default=0, description="The number of cache hits for this invocation type")
+    misses: int = Field(default=0, description="The number of cache misses for this invocation type")
+    evictions: int = Field(
+        default=0, description="The number of outputs of this invocation type evicted from the cache"
+    )
+
 
 class InvocationCacheStatus(BaseModel):
     size: int = Field(description="The current size of the invocation cache")
@@ -7,3 +29,49 @@ class InvocationCacheStatus(BaseModel):
     misses: int = Field(description="The number of cache misses")
     enabled: bool = Field(description="Whether the invocation cache is enabled")
     max_size: int = Field(description="The maximum size of the invocation cache")
+    size_bytes: int = Field(default=0, description="The estimated memory used by the cached outputs, in bytes")
+    max_size_bytes: int = Field(default=0, description="The maximum memory the cached outputs may use, in bytes")
+    evictions: int = Field(default=0, description="The number of outputs evicted from the cache")
+    stats_by_type: dict[str, InvocationCacheTypeStats] = Field(
+        default_factory=dict, description="Hit, miss and eviction counters per invocation type"
+    )
+    disk_size_bytes: int = Field(
+        default=0, description="The disk space used by the persistent invocation cache, in bytes"
+    )
+    max_disk_size_bytes: int = Field(
+        default=0, description="The maximum disk space the persistent invocation cache may use, in bytes"
+    )
+
+
+def get_object_references(value: Any) -> set[tuple[str, str]]:
+    """Collects the objects referenced by an invocation output, as `(field_name, object_name)` tuples.
+
+    Object references are fields whose name ends in `_name` (e.g. `image_name`, `latents_name`,
+    `conditioning_name`), found at any depth in the output.
+    """
+    references: set[tuple[str, str]] = set()
+    stack: list[Any] = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, BaseModel):
+            item = item.__dict__
+        if isinstance(item, dict):
+            for k, v in item.items():
+                if isinstance(v, str):
+                    if isinstance(k, str) and k.endswith("_name"):
+                        references.add((k, v))
+                elif v is not None:
+                    stack.append(v)
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(i for i in item if isinstance(i, (BaseModel, dict, list, tuple, set)))
+    return references
+
+
+def get_referenced_names(value: Any) -> set[str]:
+    """Collects the names of all images, tensors and conditionings referenced by an invocation output."""
+    return {name for _, name in get_object_references(value)}
+
+
+def get_object_kind(field_name: str) -> Optional[ObjectKind]:
+    """Gets the kind of object referenced by an output field, or None if it is not a known reference field."""
+    return OBJECT_REFERENCE_FIELDS.get(field_name)
@@ -1,35 +1,64 @@
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from threading import Lock
 from typing import Optional, Union
 
 from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput
 from invokeai.app.services.invocation_cache.invocation_cache_base import InvocationCacheBase
-from invokeai.app.services.invocation_cache.invocation_cache_common import InvocationCacheStatus
+from invokeai.app.services.invocation_cache.invocation_cache_common import (
+    InvocationCacheStatus,
+    InvocationCacheTypeStats,
+    get_referenced_names,
+)
 from invokeai.app.services.invoker import Invoker
 
+UNKNOWN_INVOCATION_TYPE = "unknown"
+
 
 @dataclass(order=True)
 class CachedItem:
     invocation_output: BaseInvocationOutput = field(compare=False)
-    invocation_output_json: str = field(compare=False)
+    size_bytes: int = field(compare=False)
+    invocation_type: str = field(compare=False, default=UNKNOWN_INVOCATION_TYPE)
+    referenced_names: frozenset[str] = field(compare=False, default_factory=frozenset)
 
 
 class MemoryInvocationCache(InvocationCacheBase):
+    """An in-memory LRU invocation cache, capped by both number of entries and estimated size in bytes.
+
+    Each cached output is indexed by the image, tensor and conditioning names it references, so deleting
+    one of those objects only touches the outputs that actually reference it.
+    """
+
     _cache: OrderedDict[Union[int, str], CachedItem]
+    _references: dict[str, set[Union[int, str]]]
     _max_cache_size: int
+    _max_cache_bytes: int
+    _cache_bytes: int
     _disabled: bool
     _hits: int
     _misses: int
+    _evictions: int
+    _stats_by_type: defaultdict[str, InvocationCacheTypeStats]
     _invoker: Invoker
     _lock: Lock
 
-    def __init__(self, max_cache_size: int = 0) -> None:
+    def __init__(self, max_cache_size: int = 0, max_cache_bytes: int = 0) -> None:
+        """
+        Args:
+            max_cache_size: Maximum number of cached outputs. The cache is disabled if 0.
+            max_cache_bytes: Maximum estimated size of all cached outputs, in bytes. No byte limit is applied if 0.
+        """
         self._cache = OrderedDict()
+        self._references = {}
         self._max_cache_size = max_cache_size
+        self._max_cache_bytes = max_cache_bytes
+        self._cache_bytes = 0
         self._disabled = False
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._stats_by_type = defaultdict(InvocationCacheTypeStats)
         self._lock = Lock()
 
     def start(self, invoker: Invoker) -> None:
@@ -40,56 +69,93 @@ class MemoryInvocationCache(InvocationCacheBase):
         self._invoker.services.tensors.on_deleted(self._delete_by_match)
         self._invoker.services.conditioning.on_deleted(self._delete_by_match)
 
-    def get(self, key: Union[int, str]) -> Optional[BaseInvocationOutput]:
+    def get(self, key: Union[int, str], invocation_type: Optional[str] = None) -> Optional[BaseInvocationOutput]:
         with self._lock:
             if self._max_cache_size == 0 or self._disabled:
                 return None
             item = self._cache.get(key, None)
             if item is not None:
                 self._hits += 1
+                self._stats_by_type[invocation_type or item.invocation_type].hits += 1
                 self._cache.move_to_end(key)
                 return item.invocation_output
             self._misses += 1
+            self._stats_by_type[invocation_type or UNKNOWN_INVOCATION_TYPE].misses += 1
             return None
 
-    def save(self, key: Union[int, str], invocation_output: BaseInvocationOutput) -> None:
+    def save(
+        self, key: Union[int, str], invocation_output: BaseInvocationOutput, invocation_type: Optional[str] = None
+    ) -> None:
+        # Measuring the output is comparatively expensive, so do it before taking the lock
+        size_bytes = len(invocation_output.model_dump_json(warnings=False, exclude_defaults=True, exclude_unset=True))
+        referenced_names = frozenset(get_referenced_names(invocation_output))
         with self._lock:
             if self._max_cache_size == 0 or self._disabled or key in self._cache:
                 return
+            if self._max_cache_bytes > 0 and size_bytes > self._max_cache_bytes:
+                # This output would evict everything else and still not fit
+                return
             # If the cache is full, we need to remove the least used
             number_to_delete = len(self._cache) + 1 - self._max_cache_size
             self._delete_oldest_access(number_to_delete)
+            if self._max_cache_bytes > 0:
+                while self._cache and self._cache_bytes + size_bytes > self._max_cache_bytes:
+                    self._delete_oldest_access(1)
             self._cache[key] = CachedItem(
                 invocation_output,
-                invocation_output.model_dump_json(warnings=False, exclude_defaults=True, exclude_unset=True),
+                size_bytes,
+                invocation_type or UNKNOWN_INVOCATION_TYPE,
+                referenced_names,
             )
+            self._cache_bytes += size_bytes
+            for name in referenced_names:
+                self._references.setdefault(name, set()).add(key)
 
     def _delete_oldest_access(self, number_to_delete: int) -> None:
         number_to_delete = min(number_to_delete, len(self._cache))
         for _ in range(number_to_delete):
-            self._cache.popitem(last=False)
+            key = next(iter(self._cache))
+            item = self._delete(key)
+            if item is not None:
+                self._evictions += 1
+                self._stats_by_type[item.invocation_type].evictions += 1
 
-    def _delete(self, key: Union[int, str]) -> None:
+    def _delete(self, key: Union[int, str]) -> Optional[CachedItem]:
         if self._max_cache_size == 0:
-            return
-        if key in self._cache:
-            del self._cache[key]
+            return None
+        item = self._cache.pop(key, None)
+        if item is None:
+            return None
+        self._cache_bytes -= item.size_bytes
+        for name in item.referenced_names:
+            keys = self._references.get(name)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._references[name]
+        return item
 
     def delete(self, key: Union[int, str]) -> None:
         with self._lock:
-            return self._delete(key)
+            self._delete(key)
 
     def clear(self) -> None:
         with self._lock:
             if self._max_cache_size == 0:
                 return
             self._cache.clear()
+            self._references.clear()
+            self._cache_bytes = 0
             self._misses = 0
             self._hits = 0
+            self._evictions = 0
+            self._stats_by_type.clear()
 
     @staticmethod
-    def create_key(invocation: BaseInvocation) -> int:
-        return hash(invocation.model_dump_json(exclude={"id"}, warnings=False))
+    def create_key(invocation: BaseInvocation) -> str:
+        # The key must be stable across processes so it can be shared with the persistent cache tier
+        return invocation.get_fingerprint()
 
     def disable(self) -> None:
         with self._lock:
@@ -111,20 +177,21 @@ class MemoryInvocationCache(InvocationCacheBase):
                 enabled=not self._disabled and self._max_cache_size > 0,
                 size=len(self._cache),
                 max_size=self._max_cache_size,
+                size_bytes=self._cache_bytes,
+                max_size_bytes=self._max_cache_bytes,
+                evictions=self._evictions,
+                stats_by_type={k: v.model_copy() for k, v in self._stats_by_type.items()},
             )
 
     def _delete_by_match(self, to_match: str) -> None:
         with self._lock:
             if self._max_cache_size == 0:
                 return
-            keys_to_delete = set()
-            for key, cached_item in self._cache.items():
-                if to_match in cached_item.invocation_output_json:
-                    keys_to_delete.add(key)
+            keys_to_delete = self._references.get(to_match)
             if not keys_to_delete:
                 return
+            # _delete mutates the index, so iterate over a copy
+            keys_to_delete = set(keys_to_delete)
             for key in keys_to_delete:
                 self._delete(key)
-            self._invoker.services.logger.debug(
-                f"Deleted {len(keys_to_delete)} cached invocation outputs for {to_match}"
-            )
+        self._invoker.services.logger.debug(f"Deleted {len(keys_to_delete)} cached invocation outputs for {to_match}")
@@ -0,0 +1,331 @@
+import sqlite3
+import time
+from collections import defaultdict
+from typing import Optional, Union, cast
+
+from pydantic import ValidationError
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput
+from invokeai.app.services.invocation_cache.invocation_cache_base import InvocationCacheBase
+from invokeai.app.services.invocation_cache.invocation_cache_common import (
+    InvocationCacheStatus,
+    InvocationCacheTypeStats,
+    get_object_kind,
+    get_object_references,
+)
+from invokeai.app.services.invocation_cache.invocation_cache_memory import (
+    UNKNOWN_INVOCATION_TYPE,
+    MemoryInvocationCache,
+)
+from invokeai.app.services.invoker import Invoker
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.version.invokeai_version import __version__
+
+
+class SqliteInvocationCache(InvocationCacheBase):
+    """A persistent invocation cache, stored in its own SQLite database so cached outputs survive restarts.
+
+    The cache is evicted in least-recently-used order when its outputs exceed `max_cache_bytes`. Outputs
+    are checked on read, and dropped if any image, tensor or conditioning they reference no longer exists.
+    Entries written by a different app version are dropped on startup.
+
+    This is intended to be used as the second tier of a `TieredInvocationCache`.
+    """
+
+    def __init__(self, db: SqliteDatabase, max_cache_bytes: int = 0) -> None:
+        """
+        Args:
+            db: The database to store cached outputs in. This should not be the main app database.
+            max_cache_bytes: Maximum size of all cached outputs, in bytes. The cache is disabled if 0.
+        """
+        self._lock = db.get_lock("invocation_cache")
+        self._conn = db.conn
+        self._max_cache_bytes = max_cache_bytes
+        self._cache_bytes = 0
+        self._disabled = False
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._stats_by_type: defaultdict[str, InvocationCacheTypeStats] = defaultdict(InvocationCacheTypeStats)
+        self._create_tables()
+
+    def start(self, invoker: Invoker) -> None:
+        self._invoker = invoker
+        if self._max_cache_bytes == 0:
+            return
+        self._delete_stale_versions()
+        self._evict(0)
+        self._invoker.services.images.on_deleted(self._delete_by_match)
+        self._invoker.services.tensors.on_deleted(self._delete_by_match)
+        self._invoker.services.conditioning.on_deleted(self._delete_by_match)
+
+    def _create_tables(self) -> None:
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(
+                """--sql
+                CREATE TABLE IF NOT EXISTS invocation_cache (
+                    key TEXT NOT NULL PRIMARY KEY,
+                    invocation_type TEXT NOT NULL,
+                    invocation_output TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    app_version TEXT NOT NULL,
+                    last_accessed_at REAL NOT NULL
+                );
+                """
+            )
+            cursor.execute(
+                """--sql
+                CREATE INDEX IF NOT EXISTS idx_invocation_cache_last_accessed_at
+                ON invocation_cache(last_accessed_at);
+                """
+            )
+            cursor.execute(
+                """--sql
+                CREATE TABLE IF NOT EXISTS invocation_cache_references (
+                    key TEXT NOT NULL,
+                    object_name TEXT NOT NULL,
+                    object_kind TEXT,
+                    PRIMARY KEY (key, object_name),
+                    FOREIGN KEY (key) REFERENCES invocation_cache(key) ON DELETE CASCADE
+                );
+                """
+            )
+            cursor.execute(
+                """--sql
+                CREATE INDEX IF NOT EXISTS idx_invocation_cache_references_object_name
+                ON invocation_cache_references(object_name);
+                """
+            )
+            cursor.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM invocation_cache;")
+            self._cache_bytes = cursor.fetchone()[0]
+            self._conn.commit()
+
+    def get(self, key: Union[int, str], invocation_type: Optional[str] = None) -> Optional[BaseInvocationOutput]:
+        if self._max_cache_bytes == 0 or self._disabled:
+            return None
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(
+                """--sql
+                SELECT invocation_type, invocation_output
+                FROM invocation_cache
+                WHERE key = ?;
+                """,
+                (str(key),),
+            )
+            row = cursor.fetchone()
+            if row is None:
+                self._misses += 1
+                self._stats_by_type[invocation_type or UNKNOWN_INVOCATION_TYPE].misses += 1
+                return None
+            cursor.execute(
+                """--sql
+                SELECT object_name, object_kind
+                FROM invocation_cache_references
+                WHERE key = ?;
+                """,
+                (str(key),),
+            )
+            references = [(r[0], r[1]) for r in cursor.fetchall()]
+
+        output = self._parse_output(row[1])
+        if output is None or not self._references_exist(references):
+            self._invoker.services.logger.debug(f"Dropping stale persisted invocation output {key}")
+            self.delete(key)
+            with self._lock:
+                self._misses += 1
+                self._stats_by_type[invocation_type or row[0]].misses += 1
+            return None
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE invocation_cache SET last_accessed_at = ? WHERE key = ?;", (time.time(), str(key))
+            )
+            self._conn.commit()
+            self._hits += 1
+            self._stats_by_type[invocation_type or row[0]].hits += 1
+        return output
+
+    def save(
+        self, key: Union[int, str], invocation_output: BaseInvocationOutput, invocation_type: Optional[str] = None
+    ) -> None:
+        if self._max_cache_bytes == 0 or self._disabled:
+            return
+        output_json = invocation_output.model_dump_json(warnings=False)
+        size_bytes = len(output_json)
+        if size_bytes > self._max_cache_bytes:
+            return
+        references = get_object_references(invocation_output)
+        with self._lock:
+            try:
+                cursor = self._conn.cursor()
+                cursor.execute("SELECT 1 FROM invocation_cache WHERE key = ?;", (str(key),))
+                if cursor.fetchone() is not None:
+                    return
+                self._evict(size_bytes)
+                cursor.execute(
+                    """--sql
+                    INSERT INTO invocation_cache (
+                        key,
+                        invocation_type,
+                        invocation_output,
+                        size_bytes,
+                        app_version,
+                        last_accessed_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?);
+                    """,
+                    (
+                        str(key),
+                        invocation_type or UNKNOWN_INVOCATION_TYPE,
+                        output_json,
+                        size_bytes,
+                        __version__,
+                        time.time(),
+                    ),
+                )
+                cursor.executemany(
+                    """--sql
+                    INSERT OR IGNORE INTO invocation_cache_references (key, object_name, object_kind)
+                    VALUES (?, ?, ?);
+                    """,
+                    [(str(key), name, get_object_kind(field_name)) for field_name, name in references],
+                )
+                self._conn.commit()
+                self._cache_bytes += size_bytes
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+
+    def delete(self, key: Union[int, str]) -> None:
+        with self._lock:
+            try:
+                self._delete(str(key))
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM invocation_cache;")
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+            self._cache_bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._stats_by_type.clear()
+
+    @staticmethod
+    def create_key(invocation: BaseInvocation) -> str:
+        return MemoryInvocationCache.create_key(invocation)
+
+    def disable(self) -> None:
+        with self._lock:
+            self._disabled = True
+
+    def enable(self) -> None:
+        with self._lock:
+            self._disabled = False
+
+    def get_status(self) -> InvocationCacheStatus:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM invocation_cache;").fetchone()[0]
+            return InvocationCacheStatus(
+                hits=self._hits,
+                misses=self._misses,
+                enabled=not self._disabled and self._max_cache_bytes > 0,
+                size=size,
+                max_size=0,
+                evictions=self._evictions,
+                stats_by_type={k: v.model_copy() for k, v in self._stats_by_type.items()},
+                disk_size_bytes=self._cache_bytes,
+                max_disk_size_bytes=self._max_cache_bytes,
+            )
+
+    def _delete(self, key: str) -> Optional[str]:
+        """Deletes an entry, returning its invocation type if it existed. Must be called with the lock held."""
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT invocation_type, size_bytes FROM invocation_cache WHERE key = ?;", (key,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        cursor.execute("DELETE FROM invocation_cache WHERE key = ?;", (key,))
+        self._cache_bytes -= row[1]
+        return cast(str, row[0])
+
+    def _evict(self, incoming_bytes: int) -> None:
+        """Evicts least recently used entries until `incoming_bytes` fit in the budget. Must be called with the lock held."""
+        if self._cache_bytes + incoming_bytes <= self._max_cache_bytes:
+            return
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT key FROM invocation_cache ORDER BY last_accessed_at ASC;")
+        for (key,) in cursor.fetchall():
+            if self._cache_bytes + incoming_bytes <= self._max_cache_bytes:
+                break
+            invocation_type = self._delete(key)
+            if invocation_type is not None:
+                self._evictions += 1
+                self._stats_by_type[invocation_type].evictions += 1
+        self._conn.commit()
+
+    def _delete_stale_versions(self) -> None:
+        with self._lock:
+            try:
+                cursor = self._conn.cursor()
+                cursor.execute("DELETE FROM invocation_cache WHERE app_version != ?;", (__version__,))
+                deleted = cursor.rowcount
+                cursor.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM invocation_cache;")
+                self._cache_bytes = cursor.fetchone()[0]
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+        if deleted > 0:
+            self._invoker.services.logger.debug(f"Deleted {deleted} persisted invocation outputs from other versions")
+
+    def _parse_output(self, output_json: str) -> Optional[BaseInvocationOutput]:
+        try:
+            return cast(BaseInvocationOutput, BaseInvocationOutput.get_typeadapter().validate_json(output_json))
+        except ValidationError:
+            # The output's class may have changed or been removed (e.g. an uninstalled custom node)
+            return None
+
+    def _references_exist(self, references: list[tuple[str, Optional[str]]]) -> bool:
+        services = self._invoker.services
+        for name, kind in references:
+            if kind == "images":
+                if not services.image_files.exists(name):
+                    return False
+            elif kind == "tensors":
+                if not services.tensors.exists(name):
+                    return False
+            elif kind == "conditioning":
+                if not services.conditioning.exists(name):
+                    return False
+        return True
+
+    def _delete_by_match(self, to_match: str) -> None:
+        with self._lock:
+            try:
+                cursor = self._conn.cursor()
+                cursor.execute(
+                    "SELECT DISTINCT key FROM invocation_cache_references WHERE object_name = ?;", (to_match,)
+                )
+                keys_to_delete = [row[0] for row in cursor.fetchall()]
+                if not keys_to_delete:
+                    return
+                for key in keys_to_delete:
+                    self._delete(key)
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+        self._invoker.services.logger.debug(
+            f"Deleted {len(keys_to_delete)} persisted invocation outputs for {to_match}"
+        )
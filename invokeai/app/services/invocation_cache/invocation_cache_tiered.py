@@ -0,0 +1,95 @@
+from typing import Optional, Union
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput
+from invokeai.app.services.invocation_cache.invocation_cache_base import InvocationCacheBase
+from invokeai.app.services.invocation_cache.invocation_cache_common import (
+    InvocationCacheStatus,
+    InvocationCacheTypeStats,
+)
+from invokeai.app.services.invocation_cache.invocation_cache_memory import MemoryInvocationCache
+from invokeai.app.services.invoker import Invoker
+
+
+class TieredInvocationCache(InvocationCacheBase):
+    """Combines a fast invocation cache with a slower, larger (typically persistent) one.
+
+    Outputs are saved to both tiers. Reads try the first tier, then fall back to the second tier, promoting
+    hits from the second tier into the first.
+    """
+
+    def __init__(self, first_tier: InvocationCacheBase, second_tier: InvocationCacheBase) -> None:
+        self._first_tier = first_tier
+        self._second_tier = second_tier
+
+    def start(self, invoker: Invoker) -> None:
+        # The invoker only starts top-level services, so we need to start the tiers ourselves
+        for tier in (self._first_tier, self._second_tier):
+            start_op = getattr(tier, "start", None)
+            if callable(start_op):
+                start_op(invoker)
+
+    def stop(self, invoker: Invoker) -> None:
+        for tier in (self._first_tier, self._second_tier):
+            stop_op = getattr(tier, "stop", None)
+            if callable(stop_op):
+                stop_op(invoker)
+
+    def get(self, key: Union[int, str], invocation_type: Optional[str] = None) -> Optional[BaseInvocationOutput]:
+        output = self._first_tier.get(key, invocation_type)
+        if output is not None:
+            return output
+        output = self._second_tier.get(key, invocation_type)
+        if output is not None:
+            self._first_tier.save(key, output, invocation_type)
+        return output
+
+    def save(
+        self, key: Union[int, str], invocation_output: BaseInvocationOutput, invocation_type: Optional[str] = None
+    ) -> None:
+        self._first_tier.save(key, invocation_output, invocation_type)
+        self._second_tier.save(key, invocation_output, invocation_type)
+
+    def delete(self, key: Union[int, str]) -> None:
+        self._first_tier.delete(key)
+        self._second_tier.delete(key)
+
+    def clear(self) -> None:
+        self._first_tier.clear()
+        self._second_tier.clear()
+
+    @staticmethod
+    def create_key(invocation: BaseInvocation) -> str:
+        # Both tiers must agree on keys, so defer to the default implementation
+        return MemoryInvocationCache.create_key(invocation)
+
+    def disable(self) -> None:
+        self._first_tier.disable()
+        self._second_tier.disable()
+
+    def enable(self) -> None:
+        self._first_tier.enable()
+        self._second_tier.enable()
+
+    def get_status(self) -> InvocationCacheStatus:
+        first = self._first_tier.get_status()
+        second = self._second_tier.get_status()
+        # A first-tier miss is only a real miss if the second tier missed too
+        stats_by_type: dict[str, InvocationCacheTypeStats] = {}
+        for invocation_type in first.stats_by_type.keys() | second.stats_by_type.keys():
+            first_stats = first.stats_by_type.get(invocation_type, InvocationCacheTypeStats())
+            second_stats = second.stats_by_type.get(invocation_type, InvocationCacheTypeStats())
+            stats_by_type[invocation_type] = InvocationCacheTypeStats(
+                hits=first_stats.hits + second_stats.hits,
+                misses=second_stats.misses if second.enabled else first_stats.misses,
+                evictions=first_stats.evictions + second_stats.evictions,
+            )
+        return first.model_copy(
+            update={
+                "hits": first.hits + second.hits,
+                "misses": second.misses if second.enabled else first.misses,
+                "evictions": first.evictions + second.evictions,
+                "stats_by_type": stats_by_type,
+                "disk_size_bytes": second.disk_size_bytes,
+                "max_disk_size_bytes": second.max_disk_size_bytes,
+            }
+        )
@@ -30,7 +30,7 @@ writes to the system log is stored in InvocationServices.performance_statistics.
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import ContextManager
+from typing import ContextManager, Optional
 
 from invokeai.app.invocations.baseinvocation import BaseInvocation
 from invokeai.app.services.invocation_stats.invocation_stats_common import InvocationStatsSummary
@@ -60,8 +60,11 @@ class InvocationStatsServiceBase(ABC):
         pass
 
     @abstractmethod
-    def reset_stats(self):
-        """Reset all stored statistics."""
+    def reset_stats(self, graph_execution_state_id: Optional[str] = None):
+        """
+        Reset stored statistics.
+        :param graph_execution_state_id: The id of the session whose stats to reset. Omit to reset all stats.
+        """
         pass
 
     @abstractmethod
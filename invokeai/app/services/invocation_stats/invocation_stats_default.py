@@ -2,7 +2,7 @@ import json
 import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Optional
 
 import psutil
 import torch
@@ -45,9 +45,10 @@ class InvocationStatsService(InvocationStatsServiceBase):
         # during some tests.
         services = self._invoker.services
         if not self._stats.get(graph_execution_state_id):
-            # First time we're seeing this graph_execution_state_id.
-            self._stats[graph_execution_state_id] = GraphExecutionStats()
-            self._cache_stats[graph_execution_state_id] = CacheStats()
+            # First time we're seeing this graph_execution_state_id. Nodes of a session may run concurrently, so only
+            # the first of them creates its stats.
+            self._stats.setdefault(graph_execution_state_id, GraphExecutionStats())
+            self._cache_stats.setdefault(graph_execution_state_id, CacheStats())
 
         # Record state before the invocation.
         start_time = time.time()
@@ -73,9 +74,13 @@ class InvocationStatsService(InvocationStatsServiceBase):
             )
             self._stats[graph_execution_state_id].add_node_execution_stats(node_stats)
 
-    def reset_stats(self):
-        self._stats = {}
-        self._cache_stats = {}
+    def reset_stats(self, graph_execution_state_id: Optional[str] = None):
+        if graph_execution_state_id is None:
+            self._stats = {}
+            self._cache_stats = {}
+            return
+        self._stats.pop(graph_execution_state_id, None)
+        self._cache_stats.pop(graph_execution_state_id, None)
 
     def get_stats(self, graph_execution_state_id: str) -> InvocationStatsSummary:
         graph_stats_summary = self._get_graph_summary(graph_execution_state_id)
@@ -0,0 +1,70 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.backend.model_hash.model_hash_cache import FileSignature, ModelHashCacheBase
+
+
+class SqliteModelHashCache(ModelHashCacheBase):
+    """Stores the hashes of model files in the `model_file_hashes` table."""
+
+    def __init__(self, db: SqliteDatabase) -> None:
+        super().__init__()
+        self._db = db
+        self._lock = db.get_lock("model_hash_cache")
+        self._conn = db.conn
+
+    def get(self, path: Path, algorithm: str, signature: FileSignature) -> Optional[str]:
+        with self._db.read_connection("model_hash_cache") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """--sql
+                SELECT hash
+                FROM model_file_hashes
+                WHERE path = ? AND algorithm = ? AND size = ? AND mtime_ns = ? AND inode = ?;
+                """,
+                (str(path.resolve()), algorithm, *signature),
+            )
+            row = cursor.fetchone()
+        return row["hash"] if row is not None else None
+
+    def put(self, path: Path, algorithm: str, signature: FileSignature, hash: str) -> None:
+        try:
+            self._lock.acquire()
+            self._conn.execute(
+                """--sql
+                INSERT OR REPLACE INTO model_file_hashes (path, algorithm, size, mtime_ns, inode, hash)
+                VALUES (?, ?, ?, ?, ?, ?);
+                """,
+                (str(path.resolve()), algorithm, *signature, hash),
+            )
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+        finally:
+            self._lock.release()
+
+    def invalidate(self, path: Optional[Path] = None) -> int:
+        try:
+            self._lock.acquire()
+            if path is None:
+                cursor = self._conn.execute("DELETE FROM model_file_hashes;")
+            else:
+                resolved = str(path.resolve())
+                prefix = resolved.rstrip(os.sep) + os.sep
+                cursor = self._conn.execute(
+                    """--sql
+                    DELETE FROM model_file_hashes
+                    WHERE path = ? OR substr(path, 1, ?) = ?;
+                    """,
+                    (resolved, len(prefix), prefix),
+                )
+            self._conn.commit()
+            return cursor.rowcount
+        except Exception:
+            self._conn.rollback()
+            raise
+        finally:
+            self._lock.release()
@@ -90,6 +90,15 @@ class ModelInstallServiceBase(ABC):
     def unconditionally_delete(self, key: str) -> None:
         """Remove model with indicated key from the database and unconditionally delete weight files from disk."""
 
+    @abstractmethod
+    def verify_model_hash(self, key: str) -> bool:
+        """
+        Hash the model with the indicated key again, ignoring cached file hashes, and check it against its record.
+
+        :param key: Unique key for the model
+        :returns: True if the model's files still match its recorded hash
+        """
+
     @abstractmethod
     def install_path(
         self,
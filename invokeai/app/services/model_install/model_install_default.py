@@ -34,6 +34,8 @@ from invokeai.app.services.model_install.model_install_common import (
 )
 from invokeai.app.services.model_records import DuplicateModelException, ModelRecordServiceBase
 from invokeai.app.services.model_records.model_records_base import ModelRecordChanges
+from invokeai.backend.model_hash.model_hash import ModelHash
+from invokeai.backend.model_hash.model_hash_cache import ModelHashCacheBase
 from invokeai.backend.model_manager.config import (
     AnyModelConfig,
     CheckpointConfigBase,
@@ -73,6 +75,7 @@ class ModelInstallService(ModelInstallServiceBase):
         download_queue: DownloadQueueServiceBase,
         event_bus: Optional["EventServiceBase"] = None,
         session: Optional[Session] = None,
+        hash_cache: Optional[ModelHashCacheBase] = None,
     ):
         """
         Initialize the installer object.
@@ -80,6 +83,7 @@ class ModelInstallService(ModelInstallServiceBase):
         :param app_config: InvokeAIAppConfig object
         :param record_store: Previously-opened ModelRecordService database
         :param event_bus: Optional EventService object
+        :param hash_cache: Optional cache of model file hashes
         """
         self._app_config = app_config
         self._record_store = record_store
@@ -97,6 +101,7 @@ class ModelInstallService(ModelInstallServiceBase):
         self._session = session
         self._install_thread: Optional[threading.Thread] = None
         self._next_job_id = 0
+        self._hash_cache = hash_cache
 
     @property
     def app_config(self) -> InvokeAIAppConfig:  # noqa D102
@@ -182,9 +187,7 @@ class ModelInstallService(ModelInstallServiceBase):
     ) -> str:  # noqa D102
         model_path = Path(model_path)
         config = config or ModelRecordChanges()
-        info: AnyModelConfig = ModelProbe.probe(
-            Path(model_path), config.model_dump(), hash_algo=self._app_config.hashing_algorithm
-        )  # type: ignore
+        info: AnyModelConfig = self._probe(Path(model_path), config)
 
         if preferred_name := config.name:
             preferred_name = Path(preferred_name).with_suffix(model_path.suffix)
@@ -363,12 +366,24 @@ class ModelInstallService(ModelInstallServiceBase):
     def unconditionally_delete(self, key: str) -> None:  # noqa D102
         model = self.record_store.get_model(key)
         model_path = self.app_config.models_path / model.path
+        if self._hash_cache is not None:
+            self._hash_cache.invalidate(model_path)
         if model_path.is_file() or model_path.is_symlink():
             model_path.unlink()
         elif model_path.is_dir():
             rmtree(model_path)
         self.unregister(key)
 
+    def verify_model_hash(self, key: str) -> bool:  # noqa D102
+        model = self.record_store.get_model(key)
+        model_path = self.app_config.models_path / model.path
+        hasher = ModelHash(
+            algorithm=self._app_config.hashing_algorithm,
+            cache=self._hash_cache,
+            max_workers=self._app_config.hashing_threads,
+        )
+        return hasher.verify(model_path, model.hash)
+
     @classmethod
     def _download_cache_path(cls, source: Union[str, AnyHttpUrl], app_config: InvokeAIAppConfig) -> Path:
         escaped_source = slugify(str(source))
@@ -644,12 +659,21 @@ class ModelInstallService(ModelInstallServiceBase):
         move(old_path, new_path)
         return new_path
 
+    def _probe(self, model_path: Path, config: ModelRecordChanges) -> AnyModelConfig:
+        return ModelProbe.probe(
+            model_path,
+            config.model_dump(),
+            hash_algo=self._app_config.hashing_algorithm,
+            hash_cache=self._hash_cache,
+            hash_threads=self._app_config.hashing_threads,
+        )  # type: ignore
+
     def _register(
         self, model_path: Path, config: Optional[ModelRecordChanges] = None, info: Optional[AnyModelConfig] = None
     ) -> str:
         config = config or ModelRecordChanges()
 
-        info = info or ModelProbe.probe(model_path, config.model_dump(), hash_algo=self._app_config.hashing_algorithm)  # type: ignore
+        info = info or self._probe(model_path, config)
 
         model_path = model_path.resolve()
 
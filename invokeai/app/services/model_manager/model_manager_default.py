@@ -16,6 +16,7 @@ from invokeai.app.services.model_load.model_load_base import ModelLoadServiceBas
 from invokeai.app.services.model_load.model_load_default import ModelLoadService
 from invokeai.app.services.model_manager.model_manager_base import ModelManagerServiceBase
 from invokeai.app.services.model_records.model_records_base import ModelRecordServiceBase
+from invokeai.backend.model_hash.model_hash_cache import ModelHashCacheBase
 from invokeai.backend.model_manager.load.model_cache.model_cache import ModelCache
 from invokeai.backend.model_manager.load.model_loader_registry import ModelLoaderRegistry
 from invokeai.backend.util.devices import TorchDevice
@@ -72,6 +73,7 @@ class ModelManagerService(ModelManagerServiceBase):
         download_queue: DownloadQueueServiceBase,
         events: EventServiceBase,
         execution_device: Optional[torch.device] = None,
+        hash_cache: Optional[ModelHashCacheBase] = None,
     ) -> Self:
         """
         Construct the model manager service instance.
@@ -99,5 +101,6 @@ class ModelManagerService(ModelManagerServiceBase):
             record_store=model_record_service,
             download_queue=download_queue,
             event_bus=events,
+            hash_cache=hash_cache,
         )
         return cls(store=model_record_service, install=installer, load=loader)
@@ -78,6 +78,7 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
         """
         super().__init__()
         self._db = db
+        self._lock = db.get_lock("model_records")
         self._cursor = db.conn.cursor()
         self._logger = logger
 
@@ -96,7 +97,7 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
 
         Can raise DuplicateModelException and InvalidModelConfigException exceptions.
         """
-        with self._db.lock:
+        with self._lock:
             try:
                 self._cursor.execute(
                     """--sql
@@ -139,7 +140,7 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
 
         Can raise an UnknownModelException
         """
-        with self._db.lock:
+        with self._lock:
             try:
                 self._cursor.execute(
                     """--sql
@@ -164,7 +165,7 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
 
         json_serialized = record.model_dump_json()
 
-        with self._db.lock:
+        with self._lock:
             try:
                 self._cursor.execute(
                     """--sql
@@ -192,30 +193,32 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
 
         Exceptions: UnknownModelException
         """
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read_connection("model_records") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT config, strftime('%s',updated_at) FROM models
                 WHERE id=?;
                 """,
                 (key,),
             )
-            rows = self._cursor.fetchone()
+            rows = cursor.fetchone()
             if not rows:
                 raise UnknownModelException("model not found")
             model = ModelConfigFactory.make_config(json.loads(rows[0]), timestamp=rows[1])
         return model
 
     def get_model_by_hash(self, hash: str) -> AnyModelConfig:
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read_connection("model_records") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT config, strftime('%s',updated_at) FROM models
                 WHERE hash=?;
                 """,
                 (hash,),
             )
-            rows = self._cursor.fetchone()
+            rows = cursor.fetchone()
             if not rows:
                 raise UnknownModelException("model not found")
             model = ModelConfigFactory.make_config(json.loads(rows[0]), timestamp=rows[1])
@@ -228,15 +231,16 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
         :param key: Unique key for the model to be deleted
         """
         count = 0
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read_connection("model_records") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 select count(*) FROM models
                 WHERE id=?;
                 """,
                 (key,),
             )
-            count = self._cursor.fetchone()[0]
+            count = cursor.fetchone()[0]
         return count > 0
 
     def search_by_attr(
@@ -284,8 +288,9 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
             where_clause.append("format=?")
             bindings.append(model_format)
         where = f"WHERE {' AND '.join(where_clause)}" if where_clause else ""
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read_connection("model_records") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 f"""--sql
                 SELECT config, strftime('%s',updated_at)
                 FROM models
@@ -294,7 +299,7 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
                 """,
                 tuple(bindings),
             )
-            result = self._cursor.fetchall()
+            result = cursor.fetchall()
 
         # Parse the model configs.
         results: list[AnyModelConfig] = []
@@ -314,33 +319,31 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
     def search_by_path(self, path: Union[str, Path]) -> List[AnyModelConfig]:
         """Return models with the indicated path."""
         results = []
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read_connection("model_records") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT config, strftime('%s',updated_at) FROM models
                 WHERE path=?;
                 """,
                 (str(path),),
             )
-            results = [
-                ModelConfigFactory.make_config(json.loads(x[0]), timestamp=x[1]) for x in self._cursor.fetchall()
-            ]
+            results = [ModelConfigFactory.make_config(json.loads(x[0]), timestamp=x[1]) for x in cursor.fetchall()]
         return results
 
     def search_by_hash(self, hash: str) -> List[AnyModelConfig]:
         """Return models with the indicated hash."""
         results = []
-        with self._db.lock:
-            self._cursor.execute(
+        with self._db.read_connection("model_records") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT config, strftime('%s',updated_at) FROM models
                 WHERE hash=?;
                 """,
                 (hash,),
             )
-            results = [
-                ModelConfigFactory.make_config(json.loads(x[0]), timestamp=x[1]) for x in self._cursor.fetchall()
-            ]
+            results = [ModelConfigFactory.make_config(json.loads(x[0]), timestamp=x[1]) for x in cursor.fetchall()]
         return results
 
     def list_models(
@@ -356,19 +359,20 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
             ModelRecordOrderBy.Format: "format",
         }
 
-        # Lock so that the database isn't updated while we're doing the two queries.
-        with self._db.lock:
+        # Read from one snapshot so that the database isn't updated between the two queries.
+        with self._db.read_connection("model_records") as conn:
+            cursor = conn.cursor()
             # query1: get the total number of model configs
-            self._cursor.execute(
+            cursor.execute(
                 """--sql
                 select count(*) from models;
                 """,
                 (),
             )
-            total = int(self._cursor.fetchone()[0])
+            total = int(cursor.fetchone()[0])
 
             # query2: fetch key fields
-            self._cursor.execute(
+            cursor.execute(
                 f"""--sql
                 SELECT config
                 FROM models
@@ -381,7 +385,7 @@ class ModelRecordServiceSQL(ModelRecordServiceBase):
                     page * per_page,
                 ),
             )
-            rows = self._cursor.fetchall()
+            rows = cursor.fetchall()
             items = [ModelSummary.model_validate(dict(x)) for x in rows]
             return PaginatedResults(
                 page=page, pages=ceil(total / per_page), per_page=per_page, total=total, items=items
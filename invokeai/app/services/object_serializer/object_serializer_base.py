@@ -35,6 +35,14 @@ class ObjectSerializerBase(ABC, Generic[T]):
         """
         pass
 
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        """
+        Checks whether the object exists, without loading it.
+        :param name: The name of the object to check.
+        """
+        pass
+
     def on_deleted(self, on_deleted: Callable[[str], None]) -> None:
         """Register a callback for when an object is deleted"""
         self._on_deleted_callbacks.append(on_deleted)
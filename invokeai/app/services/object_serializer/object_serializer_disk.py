@@ -1,7 +1,9 @@
 import shutil
 import tempfile
+import threading
 import typing
 from pathlib import Path
+from queue import Queue
 from typing import TYPE_CHECKING, Optional, TypeVar
 
 import torch
@@ -9,6 +11,7 @@ import torch
 from invokeai.app.services.object_serializer.object_serializer_base import ObjectSerializerBase
 from invokeai.app.services.object_serializer.object_serializer_common import ObjectNotFoundError
 from invokeai.app.util.misc import uuid_string
+from invokeai.backend.util.logging import InvokeAILogger
 
 if TYPE_CHECKING:
     from invokeai.app.services.invoker import Invoker
@@ -22,9 +25,16 @@ class ObjectSerializerDisk(ObjectSerializerBase[T]):
 
     :param output_dir: The folder where the serialized objects will be stored
     :param ephemeral: If True, objects will be stored in a temporary directory inside the given output_dir and cleaned up on exit
+    :param write_behind: If True, `save` returns immediately and objects are written to disk on a background thread.
+        Objects are held in memory until written, so they can be loaded right away. Callers must not mutate an object
+        after saving it. If a write fails, the error is logged and the object is dropped.
+    :param max_pending_writes: The maximum number of objects waiting to be written. When the queue is full, `save`
+        blocks until a write finishes. Only used with `write_behind`.
     """
 
-    def __init__(self, output_dir: Path, ephemeral: bool = False):
+    def __init__(
+        self, output_dir: Path, ephemeral: bool = False, write_behind: bool = False, max_pending_writes: int = 8
+    ):
         super().__init__()
         self._ephemeral = ephemeral
         self._base_output_dir = output_dir
@@ -42,23 +52,99 @@ class ObjectSerializerDisk(ObjectSerializerBase[T]):
         self._output_dir = Path(self._tempdir.name) if self._tempdir else self._base_output_dir
         self.__obj_class_name: Optional[str] = None
 
+        # Objects that have been saved but not yet written to disk, by name
+        self._pending: dict[str, T] = {}
+        self._pending_lock = threading.Lock()
+        self._write_queue: Optional[Queue[Optional[str]]] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        if write_behind:
+            self._write_queue = Queue(maxsize=max_pending_writes)
+            self._writer_thread = threading.Thread(
+                name="object_serializer_writer", target=self._write_loop, daemon=True
+            )
+            self._writer_thread.start()
+
     def load(self, name: str) -> T:
+        with self._pending_lock:
+            if name in self._pending:
+                return self._pending[name]
         file_path = self._get_path(name)
         try:
-            return torch.load(file_path)  # pyright: ignore [reportUnknownMemberType]
+            return self._read(file_path)
         except FileNotFoundError as e:
             raise ObjectNotFoundError(name) from e
 
     def save(self, obj: T) -> str:
         name = self._new_name()
-        file_path = self._get_path(name)
-        torch.save(obj, file_path)  # pyright: ignore [reportUnknownMemberType]
+        if self._write_queue is not None:
+            with self._pending_lock:
+                self._pending[name] = obj
+            # Blocks if the writer has fallen too far behind
+            self._write_queue.put(name)
+            return name
+        self._write(obj, self._get_path(name))
         return name
 
     def delete(self, name: str) -> None:
         file_path = self._get_path(name)
+        with self._pending_lock:
+            if self._pending.pop(name, None) is not None:
+                # The writer may or may not have started writing the file. If it has, it cleans up after itself.
+                file_path.unlink(missing_ok=True)
+                return
         file_path.unlink()
 
+    def exists(self, name: str) -> bool:
+        with self._pending_lock:
+            if name in self._pending:
+                return True
+        return self._get_path(name).exists()
+
+    def flush(self) -> None:
+        """Blocks until all pending objects have been written to disk."""
+        if self._write_queue is not None:
+            self._write_queue.join()
+
+    def _write_loop(self) -> None:
+        assert self._write_queue is not None
+        while True:
+            name = self._write_queue.get()
+            try:
+                if name is None:
+                    return
+                self._write_pending(name)
+            finally:
+                self._write_queue.task_done()
+
+    def _write_pending(self, name: str) -> None:
+        with self._pending_lock:
+            obj = self._pending.get(name)
+        if obj is None:
+            # Deleted before it was written
+            return
+        file_path = self._get_path(name)
+        try:
+            self._write(obj, file_path)
+        except Exception as e:
+            # Drop the object, so it is reported as missing instead of silently living only in memory
+            with self._pending_lock:
+                self._pending.pop(name, None)
+            file_path.unlink(missing_ok=True)
+            InvokeAILogger.get_logger().error(f"Failed to write {name} to disk: {e}")
+            return
+        with self._pending_lock:
+            if self._pending.pop(name, None) is None:
+                # Deleted while it was being written
+                file_path.unlink(missing_ok=True)
+
+    def _read(self, file_path: Path) -> T:
+        """Deserializes an object from the given file."""
+        return torch.load(file_path)  # pyright: ignore [reportUnknownMemberType]
+
+    def _write(self, obj: T, file_path: Path) -> None:
+        """Serializes an object to the given file."""
+        torch.save(obj, file_path)  # pyright: ignore [reportUnknownMemberType]
+
     @property
     def _obj_class_name(self) -> str:
         if not self.__obj_class_name:
@@ -82,4 +168,11 @@ class ObjectSerializerDisk(ObjectSerializerBase[T]):
         self._tempdir_cleanup()
 
     def stop(self, invoker: "Invoker") -> None:
+        if self._write_queue is not None and self._writer_thread is not None:
+            self.flush()
+            self._write_queue.put(None)
+            self._writer_thread.join()
+            # Any later saves are written synchronously
+            self._write_queue = None
+            self._writer_thread = None
         self._tempdir_cleanup()
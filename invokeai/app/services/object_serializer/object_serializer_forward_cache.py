@@ -1,7 +1,13 @@
-from queue import Queue
-from typing import TYPE_CHECKING, Optional, TypeVar
+import dataclasses
+import sys
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+import torch
 
 from invokeai.app.services.object_serializer.object_serializer_base import ObjectSerializerBase
+from invokeai.backend.util.calc_tensor_size import calc_tensor_size
 
 T = TypeVar("T")
 
@@ -9,18 +15,50 @@ if TYPE_CHECKING:
     from invokeai.app.services.invoker import Invoker
 
 
+def calc_object_size(obj: Any) -> int:
+    """Estimates the memory used by an object, counting the data of any tensors it holds.
+
+    Tensors are found in dataclasses, lists, tuples and dicts at any depth. Other objects are measured shallowly.
+    """
+    size = 0
+    seen: set[int] = set()
+    stack: list[Any] = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, torch.Tensor):
+            size += calc_tensor_size(item)
+        elif dataclasses.is_dataclass(item) and not isinstance(item, type):
+            stack.extend(getattr(item, f.name) for f in dataclasses.fields(item))
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        else:
+            size += sys.getsizeof(item)
+    return size
+
+
 class ObjectSerializerForwardCache(ObjectSerializerBase[T]):
     """
     Provides a LRU cache for an instance of `ObjectSerializerBase`.
     Saving an object to the cache always writes through to the underlying storage.
+
+    :param underlying_storage: The storage to cache
+    :param max_cache_size: The maximum number of objects to keep in the cache
+    :param max_cache_bytes: The maximum estimated size of the cached objects, in bytes. If 0, only `max_cache_size` applies.
     """
 
-    def __init__(self, underlying_storage: ObjectSerializerBase[T], max_cache_size: int = 20):
+    def __init__(self, underlying_storage: ObjectSerializerBase[T], max_cache_size: int = 20, max_cache_bytes: int = 0):
         super().__init__()
         self._underlying_storage = underlying_storage
-        self._cache: dict[str, T] = {}
-        self._cache_ids = Queue[str]()
+        self._cache: OrderedDict[str, tuple[T, int]] = OrderedDict()
+        self._cache_bytes = 0
         self._max_cache_size = max_cache_size
+        self._max_cache_bytes = max_cache_bytes
+        self._lock = threading.Lock()
 
     def start(self, invoker: "Invoker") -> None:
         self._invoker = invoker
@@ -50,16 +88,35 @@ class ObjectSerializerForwardCache(ObjectSerializerBase[T]):
 
     def delete(self, name: str) -> None:
         self._underlying_storage.delete(name)
-        if name in self._cache:
-            del self._cache[name]
+        with self._lock:
+            cache_item = self._cache.pop(name, None)
+            if cache_item is not None:
+                self._cache_bytes -= cache_item[1]
         self._on_deleted(name)
 
+    def exists(self, name: str) -> bool:
+        return name in self._cache or self._underlying_storage.exists(name)
+
     def _get_cache(self, name: str) -> Optional[T]:
-        return None if name not in self._cache else self._cache[name]
+        with self._lock:
+            cache_item = self._cache.get(name)
+            if cache_item is None:
+                return None
+            self._cache.move_to_end(name)
+            return cache_item[0]
 
     def _set_cache(self, name: str, data: T):
-        if name not in self._cache:
-            self._cache[name] = data
-            self._cache_ids.put(name)
-            if self._cache_ids.qsize() > self._max_cache_size:
-                self._cache.pop(self._cache_ids.get())
+        size = calc_object_size(data)
+        with self._lock:
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                return
+            if self._max_cache_bytes > 0 and size > self._max_cache_bytes:
+                return
+            self._cache[name] = (data, size)
+            self._cache_bytes += size
+            while len(self._cache) > self._max_cache_size or (
+                self._max_cache_bytes > 0 and self._cache_bytes > self._max_cache_bytes
+            ):
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted_size
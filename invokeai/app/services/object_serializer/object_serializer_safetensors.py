@@ -0,0 +1,146 @@
+import dataclasses
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, TypeVar, cast
+
+import torch
+from safetensors.torch import save_file
+
+from invokeai.app.services.object_serializer.object_serializer_disk import ObjectSerializerDisk
+from invokeai.backend.stable_diffusion.diffusion.conditioning_data import (
+    BasicConditioningInfo,
+    ConditioningFieldData,
+    FLUXConditioningInfo,
+    SD3ConditioningInfo,
+    SDXLConditioningInfo,
+)
+
+T = TypeVar("T")
+
+# The dataclasses that may be stored as safetensors, by name
+SERIALIZABLE_DATACLASSES: dict[str, type] = {
+    cls.__name__: cls
+    for cls in (
+        ConditioningFieldData,
+        BasicConditioningInfo,
+        SDXLConditioningInfo,
+        FLUXConditioningInfo,
+        SD3ConditioningInfo,
+    )
+}
+
+# The safetensors dtype names, as written by `safetensors.torch`
+SAFETENSORS_DTYPES: dict[str, torch.dtype] = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+    "F8_E4M3": torch.float8_e4m3fn,
+    "F8_E5M2": torch.float8_e5m2,
+}
+
+STRUCTURE_METADATA_KEY = "invokeai_structure"
+
+# Files written by `torch.save` are zip archives
+ZIP_MAGIC = b"PK"
+
+
+class UnsupportedObjectError(Exception):
+    """Raised when an object cannot be represented as safetensors."""
+
+
+class ObjectSerializerSafetensors(ObjectSerializerDisk[T]):
+    """Disk-backed storage for tensors and conditioning, stored as safetensors and memory-mapped on load.
+
+    Loaded tensors are copy-on-write views of the file, so loading is nearly free and readers of the same file share
+    pages until they write to them. Tensors are always loaded on the CPU, then moved to the device they were saved
+    from.
+
+    Tensors and the conditioning dataclasses are supported, along with lists of them. Any other object falls back to
+    `torch.save`.
+
+    See `ObjectSerializerDisk` for the parameters.
+    """
+
+    def _read(self, file_path: Path) -> T:
+        with open(file_path, "rb") as file:
+            prefix = file.read(8)
+            if prefix[: len(ZIP_MAGIC)] == ZIP_MAGIC:
+                return super()._read(file_path)
+            (header_size,) = struct.unpack("<Q", prefix)
+            header: dict[str, Any] = json.loads(file.read(header_size))
+            # ACCESS_COPY maps the file privately: pages are shared until written, and writes never reach the file
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        data_start = 8 + header_size
+        metadata: dict[str, str] = header.pop("__metadata__", {})
+        tensors: dict[str, torch.Tensor] = {}
+        for key, info in header.items():
+            dtype = SAFETENSORS_DTYPES[info["dtype"]]
+            begin, end = info["data_offsets"]
+            if begin == end:
+                tensors[key] = torch.empty(info["shape"], dtype=dtype)
+                continue
+            tensors[key] = torch.frombuffer(
+                buffer, dtype=dtype, count=(end - begin) // dtype.itemsize, offset=data_start + begin
+            ).reshape(info["shape"])
+        return cast(T, _decode(json.loads(metadata[STRUCTURE_METADATA_KEY]), tensors))
+
+    def _write(self, obj: T, file_path: Path) -> None:
+        tensors: dict[str, torch.Tensor] = {}
+        try:
+            structure = _encode(obj, tensors)
+        except UnsupportedObjectError:
+            super()._write(obj, file_path)
+            return
+        save_file(tensors, file_path, metadata={STRUCTURE_METADATA_KEY: json.dumps(structure)})
+
+
+def _encode(obj: Any, tensors: dict[str, torch.Tensor]) -> Any:
+    """Encodes an object as a JSON-serializable structure, adding its tensors to `tensors`."""
+    if isinstance(obj, torch.Tensor):
+        key = str(len(tensors))
+        tensor = obj.detach().to("cpu").contiguous()
+        # safetensors refuses to write tensors that share storage
+        storage_ptr = tensor.untyped_storage().data_ptr()
+        if tensor.numel() > 0 and any(
+            t.untyped_storage().data_ptr() == storage_ptr for t in tensors.values() if t.numel() > 0
+        ):
+            tensor = tensor.clone()
+        tensors[key] = tensor
+        if obj.device.type == "cpu":
+            return {"tensor": key}
+        return {"tensor": key, "device": str(obj.device)}
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return {"value": obj}
+    if isinstance(obj, list):
+        return {"list": [_encode(item, tensors) for item in obj]}
+    if dataclasses.is_dataclass(obj) and SERIALIZABLE_DATACLASSES.get(type(obj).__name__) is type(obj):
+        return {
+            "dataclass": type(obj).__name__,
+            "fields": {f.name: _encode(getattr(obj, f.name), tensors) for f in dataclasses.fields(obj)},
+        }
+    raise UnsupportedObjectError(type(obj).__name__)
+
+
+def _decode(structure: Any, tensors: dict[str, torch.Tensor]) -> Any:
+    """Rebuilds an object encoded by `_encode`."""
+    if "tensor" in structure:
+        tensor = tensors[structure["tensor"]]
+        if "device" in structure:
+            tensor = tensor.to(structure["device"])
+        return tensor
+    if "value" in structure:
+        return structure["value"]
+    if "list" in structure:
+        return [_decode(item, tensors) for item in structure["list"]]
+    cls = SERIALIZABLE_DATACLASSES[structure["dataclass"]]
+    return cls(**{name: _decode(value, tensors) for name, value in structure["fields"].items()})
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from threading import Event
+from threading import Event, Lock
 from typing import Optional, Protocol
 
 from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput
@@ -15,7 +15,13 @@ class SessionRunnerBase(ABC):
     """
 
     @abstractmethod
-    def start(self, services: InvocationServices, cancel_event: Event, profiler: Optional[Profiler] = None) -> None:
+    def start(
+        self,
+        services: InvocationServices,
+        cancel_event: Event,
+        profiler: Optional[Profiler] = None,
+        gpu_lock: Optional[Lock] = None,
+    ) -> None:
         """Starts the session runner.
 
         Args:
@@ -23,6 +29,8 @@ class SessionRunnerBase(ABC):
             cancel_event: The cancel event.
             profiler: The profiler to use for session profiling via cProfile. Omit to disable profiling. Basic session
                 stats will be still be recorded and logged when profiling is disabled.
+            gpu_lock: A lock to hold while running gpu-exclusive nodes. Provided when several runners run sessions at
+                once, so that their nodes take turns with the GPU and the model cache.
         """
         pass
 
@@ -50,9 +58,8 @@ class SessionProcessorBase(ABC):
     """
     Base class for session processor.
 
-    The session processor is responsible for executing sessions. It runs a simple polling loop,
-    checking the session queue for new sessions to execute. It must coordinate with the
-    invocation queue to ensure only one session is executing at a time.
+    The session processor is responsible for executing sessions. Each of its workers runs a simple polling loop,
+    checking the session queue for new sessions to execute.
     """
 
     @abstractmethod
@@ -1,12 +1,22 @@
+from typing import Optional
+
 from PIL.Image import Image as PILImageType
 from pydantic import BaseModel, Field
 
 from invokeai.backend.util.util import image_to_dataURL
 
 
+class SessionWorkerStatus(BaseModel):
+    worker_id: int = Field(description="The index of the worker")
+    is_processing: bool = Field(description="Whether the worker is processing a session")
+    item_id: Optional[int] = Field(default=None, description="The ID of the queue item being processed, if any")
+    session_id: Optional[str] = Field(default=None, description="The ID of the session being processed, if any")
+
+
 class SessionProcessorStatus(BaseModel):
     is_started: bool = Field(description="Whether the session processor is started")
     is_processing: bool = Field(description="Whether a session is being processed")
+    workers: list[SessionWorkerStatus] = Field(default_factory=list, description="The status of each worker")
 
 
 class CanceledException(Exception):
@@ -1,12 +1,14 @@
 import traceback
-from contextlib import suppress
-from threading import BoundedSemaphore, Thread
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext, suppress
+from copy import copy
+from threading import BoundedSemaphore, Lock, Thread
 from threading import Event as ThreadEvent
-from typing import Optional
+from typing import ContextManager, Generator, Optional
 
-from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput
+from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput, Concurrency
 from invokeai.app.services.events.events_common import (
-    BatchEnqueuedEvent,
     FastAPIEvent,
     QueueClearedEvent,
     QueueItemStatusChangedEvent,
@@ -25,7 +27,11 @@ from invokeai.app.services.session_processor.session_processor_base import (
     SessionProcessorBase,
     SessionRunnerBase,
 )
-from invokeai.app.services.session_processor.session_processor_common import CanceledException, SessionProcessorStatus
+from invokeai.app.services.session_processor.session_processor_common import (
+    CanceledException,
+    SessionProcessorStatus,
+    SessionWorkerStatus,
+)
 from invokeai.app.services.session_queue.session_queue_common import SessionQueueItem, SessionQueueItemNotFoundError
 from invokeai.app.services.shared.graph import NodeInputError
 from invokeai.app.services.shared.invocation_context import InvocationContextData, build_invocation_context
@@ -42,6 +48,7 @@ class DefaultSessionRunner(SessionRunnerBase):
         on_after_run_node_callbacks: Optional[list[OnAfterRunNode]] = None,
         on_node_error_callbacks: Optional[list[OnNodeError]] = None,
         on_after_run_session_callbacks: Optional[list[OnAfterRunSession]] = None,
+        max_concurrent_nodes: int = 1,
     ):
         """
         Args:
@@ -50,6 +57,8 @@ class DefaultSessionRunner(SessionRunnerBase):
             on_after_run_node_callbacks: Callbacks to run after each node completes.
             on_node_error_callbacks: Callbacks to run when a node errors.
             on_after_run_session_callbacks: Callbacks to run after the session completes.
+            max_concurrent_nodes: The maximum number of nodes to run at once. If greater than 1, nodes are run on a
+                thread pool, as allowed by their concurrency.
         """
 
         self._on_before_run_session_callbacks = on_before_run_session_callbacks or []
@@ -57,11 +66,19 @@ class DefaultSessionRunner(SessionRunnerBase):
         self._on_after_run_node_callbacks = on_after_run_node_callbacks or []
         self._on_node_error_callbacks = on_node_error_callbacks or []
         self._on_after_run_session_callbacks = on_after_run_session_callbacks or []
+        self._max_concurrent_nodes = max_concurrent_nodes
 
-    def start(self, services: InvocationServices, cancel_event: ThreadEvent, profiler: Optional[Profiler] = None):
+    def start(
+        self,
+        services: InvocationServices,
+        cancel_event: ThreadEvent,
+        profiler: Optional[Profiler] = None,
+        gpu_lock: Optional[Lock] = None,
+    ):
         self._services = services
         self._cancel_event = cancel_event
         self._profiler = profiler
+        self._gpu_lock = gpu_lock
 
     def _is_canceled(self) -> bool:
         """Check if the cancel event is set. This is also passed to the invocation context builder and called during
@@ -73,22 +90,21 @@ class DefaultSessionRunner(SessionRunnerBase):
 
         self._on_before_run_session(queue_item=queue_item)
 
+        if self._max_concurrent_nodes > 1:
+            self._run_concurrently(queue_item)
+        else:
+            self._run_sequentially(queue_item)
+
+        self._on_after_run_session(queue_item=queue_item)
+
+    def _run_sequentially(self, queue_item: SessionQueueItem) -> None:
         # Loop over invocations until the session is complete or canceled
         while True:
             try:
                 invocation = queue_item.session.next()
             # Anything other than a `NodeInputError` is handled as a processor error
             except NodeInputError as e:
-                error_type = e.__class__.__name__
-                error_message = str(e)
-                error_traceback = traceback.format_exc()
-                self._on_node_error(
-                    invocation=e.node,
-                    queue_item=queue_item,
-                    error_type=error_type,
-                    error_message=error_message,
-                    error_traceback=error_traceback,
-                )
+                self._on_node_input_error(e, queue_item)
                 break
 
             if invocation is None or self._is_canceled():
@@ -99,39 +115,109 @@ class DefaultSessionRunner(SessionRunnerBase):
             # The session is complete if all invocations have been run or there is an error on the session.
             # At this time, the queue item may be canceled, but the object itself here won't be updated yet. We must
             # use the cancel event to check if the session is canceled.
-            if (
-                queue_item.session.is_complete()
-                or self._is_canceled()
-                or queue_item.status in ["failed", "canceled", "completed"]
-            ):
+            if self._is_session_done(queue_item):
                 break
 
-        self._on_after_run_session(queue_item=queue_item)
+    def _run_concurrently(self, queue_item: SessionQueueItem) -> None:
+        """Runs the session's invocations on a thread pool, starting as many ready invocations as their concurrency
+        allows.
+
+        Invocations are started in the order the session provides them, and their outputs are given to the session in
+        that same order, so events and the session's execution history do not depend on which invocation finishes
+        first. Which invocations are started only depends on the outputs given to the session so far, for the same
+        reason.
+        """
+        running: deque[tuple[BaseInvocation, Future[BaseInvocationOutput]]] = deque()
+
+        # Leaving the executor waits for any invocations still running when the session is canceled or fails. Their
+        # outputs are discarded.
+        with ThreadPoolExecutor(
+            max_workers=self._max_concurrent_nodes, thread_name_prefix="session_runner"
+        ) as executor:
+            while True:
+                # Start as many ready invocations as allowed
+                while len(running) < self._max_concurrent_nodes and not self._is_session_done(queue_item):
+                    try:
+                        invocation = queue_item.session.next(
+                            accept=lambda i: self._can_run_concurrently(i, [r for r, _ in running])
+                        )
+                    except NodeInputError as e:
+                        self._on_node_input_error(e, queue_item)
+                        break
+
+                    if invocation is None:
+                        break
+
+                    with self._handle_node_errors(invocation, queue_item):
+                        self._on_before_run_node(invocation, queue_item)
+                        running.append((invocation, executor.submit(self._invoke_node, invocation, queue_item)))
+
+                if not running or self._is_session_done(queue_item):
+                    break
+
+                # Wait for the earliest started invocation
+                invocation, future = running.popleft()
+                with self._handle_node_errors(invocation, queue_item):
+                    output = future.result()
+                    queue_item.session.complete(invocation.id, output)
+                    self._on_after_run_node(invocation, queue_item, output)
+
+    def _can_run_concurrently(self, invocation: BaseInvocation, running: list[BaseInvocation]) -> bool:
+        """CPU-safe invocations may run alongside any others. Other invocations run one at a time."""
+        if invocation.get_concurrency() is Concurrency.CpuSafe:
+            return True
+        return all(r.get_concurrency() is Concurrency.CpuSafe for r in running)
+
+    def _is_session_done(self, queue_item: SessionQueueItem) -> bool:
+        return (
+            queue_item.session.is_complete()
+            or self._is_canceled()
+            or queue_item.status in ["failed", "canceled", "completed"]
+        )
 
     def run_node(self, invocation: BaseInvocation, queue_item: SessionQueueItem):
-        try:
-            # Any unhandled exception in this scope is an invocation error & will fail the graph
+        with self._handle_node_errors(invocation, queue_item):
             with self._services.performance_statistics.collect_stats(invocation, queue_item.session_id):
                 self._on_before_run_node(invocation, queue_item)
 
-                data = InvocationContextData(
-                    invocation=invocation,
-                    source_invocation_id=queue_item.session.prepared_source_mapping[invocation.id],
-                    queue_item=queue_item,
-                )
-                context = build_invocation_context(
-                    data=data,
-                    services=self._services,
-                    is_canceled=self._is_canceled,
-                )
-
                 # Invoke the node
-                output = invocation.invoke_internal(context=context, services=self._services)
+                output = self._invoke(invocation, queue_item)
                 # Save output and history
                 queue_item.session.complete(invocation.id, output)
 
                 self._on_after_run_node(invocation, queue_item, output)
 
+    def _invoke_node(self, invocation: BaseInvocation, queue_item: SessionQueueItem) -> BaseInvocationOutput:
+        """Invokes a node on the thread pool, collecting its stats."""
+        with self._services.performance_statistics.collect_stats(invocation, queue_item.session_id):
+            return self._invoke(invocation, queue_item)
+
+    def _invoke(self, invocation: BaseInvocation, queue_item: SessionQueueItem) -> BaseInvocationOutput:
+        data = InvocationContextData(
+            invocation=invocation,
+            source_invocation_id=queue_item.session.prepared_source_mapping[invocation.id],
+            queue_item=queue_item,
+        )
+        context = build_invocation_context(
+            data=data,
+            services=self._services,
+            is_canceled=self._is_canceled,
+        )
+        with self._get_gpu_lock(invocation):
+            return invocation.invoke_internal(context=context, services=self._services)
+
+    def _get_gpu_lock(self, invocation: BaseInvocation) -> ContextManager[object]:
+        if self._gpu_lock is None or invocation.get_concurrency() is Concurrency.CpuSafe:
+            return nullcontext()
+        return self._gpu_lock
+
+    @contextmanager
+    def _handle_node_errors(
+        self, invocation: BaseInvocation, queue_item: SessionQueueItem
+    ) -> Generator[None, None, None]:
+        try:
+            # Any unhandled exception in this scope is an invocation error & will fail the graph
+            yield
         except KeyboardInterrupt:
             # TODO(psyche): This is expected to be caught in the main thread. Do we need to catch this here?
             pass
@@ -155,6 +241,18 @@ class DefaultSessionRunner(SessionRunnerBase):
                 error_traceback=error_traceback,
             )
 
+    def _on_node_input_error(self, e: NodeInputError, queue_item: SessionQueueItem) -> None:
+        error_type = e.__class__.__name__
+        error_message = str(e)
+        error_traceback = traceback.format_exc()
+        self._on_node_error(
+            invocation=e.node,
+            queue_item=queue_item,
+            error_type=error_type,
+            error_message=error_message,
+            error_traceback=error_traceback,
+        )
+
     def _on_before_run_session(self, queue_item: SessionQueueItem) -> None:
         """Called before a session is run.
 
@@ -210,7 +308,8 @@ class DefaultSessionRunner(SessionRunnerBase):
             # we don't care about that - suppress the error.
             with suppress(GESStatsNotFoundError):
                 self._services.performance_statistics.log_stats(queue_item.session.id)
-                self._services.performance_statistics.reset_stats()
+                # Other workers' sessions may still be running, so only this session's stats are reset
+                self._services.performance_statistics.reset_stats(queue_item.session.id)
 
             for callback in self._on_after_run_session_callbacks:
                 callback(queue_item=queue_item)
@@ -307,6 +406,27 @@ class DefaultSessionRunner(SessionRunnerBase):
             )
 
 
+class _SessionWorker:
+    """One of the session processor's workers. Each worker runs one session at a time, with its own session runner and
+    cancel event."""
+
+    def __init__(self, worker_id: int, session_runner: SessionRunnerBase) -> None:
+        self.worker_id = worker_id
+        self.session_runner = session_runner
+        self.cancel_event = ThreadEvent()
+        self.poll_now_event = ThreadEvent()
+        self.queue_item: Optional[SessionQueueItem] = None
+
+    def get_status(self) -> SessionWorkerStatus:
+        queue_item = self.queue_item
+        return SessionWorkerStatus(
+            worker_id=self.worker_id,
+            is_processing=queue_item is not None,
+            item_id=queue_item.item_id if queue_item else None,
+            session_id=queue_item.session_id if queue_item else None,
+        )
+
+
 class DefaultSessionProcessor(SessionProcessorBase):
     def __init__(
         self,
@@ -315,6 +435,13 @@ class DefaultSessionProcessor(SessionProcessorBase):
         thread_limit: int = 1,
         polling_interval: int = 1,
     ) -> None:
+        """
+        Args:
+            session_runner: The session runner. Each worker after the first gets its own copy of it.
+            on_non_fatal_processor_error_callbacks: Callbacks to run when a non-fatal error occurs in the processor.
+            thread_limit: The number of workers, each running one session at a time.
+            polling_interval: How long a worker waits before checking an empty queue again, in seconds.
+        """
         super().__init__()
 
         self.session_runner = session_runner if session_runner else DefaultSessionRunner()
@@ -324,74 +451,91 @@ class DefaultSessionProcessor(SessionProcessorBase):
 
     def start(self, invoker: Invoker) -> None:
         self._invoker: Invoker = invoker
-        self._queue_item: Optional[SessionQueueItem] = None
-        self._invocation: Optional[BaseInvocation] = None
 
         self._resume_event = ThreadEvent()
         self._stop_event = ThreadEvent()
-        self._poll_now_event = ThreadEvent()
-        self._cancel_event = ThreadEvent()
+        # The workers' gpu-exclusive nodes take turns, so that their sessions do not compete for VRAM
+        self._gpu_lock = Lock()
 
         register_events(QueueClearedEvent, self._on_queue_cleared)
-        register_events(BatchEnqueuedEvent, self._on_batch_enqueued)
         register_events(QueueItemStatusChangedEvent, self._on_queue_item_status_changed)
 
         self._thread_semaphore = BoundedSemaphore(self._thread_limit)
 
-        # If profiling is enabled, create a profiler. The same profiler will be used for all sessions. Internally,
-        # the profiler will create a new profile for each session.
-        self._profiler = (
-            Profiler(
-                logger=self._invoker.services.logger,
-                output_dir=self._invoker.services.configuration.profiles_path,
-                prefix=self._invoker.services.configuration.profile_prefix,
+        self._workers = [
+            _SessionWorker(worker_id=i, session_runner=self.session_runner if i == 0 else copy(self.session_runner))
+            for i in range(self._thread_limit)
+        ]
+        self._threads: list[Thread] = []
+
+        self._stop_event.clear()
+        self._resume_event.set()
+
+        for worker in self._workers:
+            # If profiling is enabled, create a profiler. The same profiler will be used for all of the worker's
+            # sessions. Internally, the profiler will create a new profile for each session.
+            profiler = (
+                Profiler(
+                    logger=self._invoker.services.logger,
+                    output_dir=self._invoker.services.configuration.profiles_path,
+                    prefix=self._invoker.services.configuration.profile_prefix,
+                )
+                if self._invoker.services.configuration.profile_graphs
+                else None
             )
-            if self._invoker.services.configuration.profile_graphs
-            else None
-        )
+            worker.session_runner.start(
+                services=invoker.services,
+                cancel_event=worker.cancel_event,
+                profiler=profiler,
+                gpu_lock=self._gpu_lock if self._thread_limit > 1 else None,
+            )
+            thread = Thread(
+                name="session_processor" if self._thread_limit == 1 else f"session_processor_{worker.worker_id}",
+                target=self._process,
+                kwargs={
+                    "worker": worker,
+                    "stop_event": self._stop_event,
+                    "resume_event": self._resume_event,
+                },
+            )
+            self._threads.append(thread)
+            thread.start()
 
-        self.session_runner.start(services=invoker.services, cancel_event=self._cancel_event, profiler=self._profiler)
-        self._thread = Thread(
-            name="session_processor",
-            target=self._process,
-            kwargs={
-                "stop_event": self._stop_event,
-                "poll_now_event": self._poll_now_event,
-                "resume_event": self._resume_event,
-                "cancel_event": self._cancel_event,
-            },
-        )
-        self._thread.start()
+        # Wake the workers as soon as items are enqueued, rather than on their next poll of the queue
+        invoker.services.session_queue.add_enqueue_listener(self._poll_now)
 
     def stop(self, *args, **kwargs) -> None:
         self._stop_event.set()
 
     def _poll_now(self) -> None:
-        self._poll_now_event.set()
+        for worker in self._workers:
+            worker.poll_now_event.set()
 
     async def _on_queue_cleared(self, event: FastAPIEvent[QueueClearedEvent]) -> None:
-        if self._queue_item and self._queue_item.queue_id == event[1].queue_id:
-            self._cancel_event.set()
-            self._poll_now()
-
-    async def _on_batch_enqueued(self, event: FastAPIEvent[BatchEnqueuedEvent]) -> None:
+        for worker in self._workers:
+            queue_item = worker.queue_item
+            if queue_item and queue_item.queue_id == event[1].queue_id:
+                worker.cancel_event.set()
         self._poll_now()
 
     async def _on_queue_item_status_changed(self, event: FastAPIEvent[QueueItemStatusChangedEvent]) -> None:
-        # Make sure the cancel event is for the currently processing queue item
-        if self._queue_item and self._queue_item.item_id != event[1].item_id:
-            return
-        if self._queue_item and event[1].status in ["completed", "failed", "canceled"]:
-            # When the queue item is canceled via HTTP, the queue item status is set to `"canceled"` and this event is
-            # emitted. We need to respond to this event and stop graph execution. This is done by setting the cancel
-            # event, which the session runner checks between invocations. If set, the session runner loop is broken.
-            #
-            # Long-running nodes that cannot be interrupted easily present a challenge. `denoise_latents` is one such
-            # node, but it gets a step callback, called on each step of denoising. This callback checks if the queue item
-            # is canceled, and if it is, raises a `CanceledException` to stop execution immediately.
-            if event[1].status == "canceled":
-                self._cancel_event.set()
-            self._poll_now()
+        # Make sure the cancel event is for a queue item being processed, and route it to that item's worker
+        for worker in self._workers:
+            queue_item = worker.queue_item
+            if queue_item is None or queue_item.item_id != event[1].item_id:
+                continue
+            if event[1].status in ["completed", "failed", "canceled"]:
+                # When the queue item is canceled via HTTP, the queue item status is set to `"canceled"` and this event
+                # is emitted. We need to respond to this event and stop graph execution. This is done by setting the
+                # worker's cancel event, which its session runner checks between invocations. If set, the session
+                # runner loop is broken.
+                #
+                # Long-running nodes that cannot be interrupted easily present a challenge. `denoise_latents` is one
+                # such node, but it gets a step callback, called on each step of denoising. This callback checks if the
+                # queue item is canceled, and if it is, raises a `CanceledException` to stop execution immediately.
+                if event[1].status == "canceled":
+                    worker.cancel_event.set()
+                self._poll_now()
 
     def resume(self) -> SessionProcessorStatus:
         if not self._resume_event.is_set():
@@ -404,23 +548,24 @@ class DefaultSessionProcessor(SessionProcessorBase):
         return self.get_status()
 
     def get_status(self) -> SessionProcessorStatus:
+        workers = [worker.get_status() for worker in self._workers]
         return SessionProcessorStatus(
             is_started=self._resume_event.is_set(),
-            is_processing=self._queue_item is not None,
+            is_processing=any(worker.is_processing for worker in workers),
+            workers=workers,
         )
 
     def _process(
         self,
+        worker: _SessionWorker,
         stop_event: ThreadEvent,
-        poll_now_event: ThreadEvent,
         resume_event: ThreadEvent,
-        cancel_event: ThreadEvent,
     ):
+        poll_now_event = worker.poll_now_event
+        cancel_event = worker.cancel_event
         try:
-            # Any unhandled exception in this block is a fatal processor error and will stop the processor.
+            # Any unhandled exception in this block is a fatal processor error and will stop the worker.
             self._thread_semaphore.acquire()
-            stop_event.clear()
-            resume_event.set()
             cancel_event.clear()
 
             while not stop_event.is_set():
@@ -430,29 +575,31 @@ class DefaultSessionProcessor(SessionProcessorBase):
                     # If we are paused, wait for resume event
                     resume_event.wait()
 
-                    # Get the next session to process
-                    self._queue_item = self._invoker.services.session_queue.dequeue()
+                    # Get the next session to process. The previous item is cleared first, so that an error while
+                    # dequeuing is not attributed to it
+                    worker.queue_item = None
+                    worker.queue_item = self._invoker.services.session_queue.dequeue()
 
-                    if self._queue_item is None:
+                    if worker.queue_item is None:
                         # The queue was empty, wait for next polling interval or event to try again
                         self._invoker.services.logger.debug("Waiting for next polling interval or event")
                         poll_now_event.wait(self._polling_interval)
                         continue
 
                     self._invoker.services.logger.info(
-                        f"Executing queue item {self._queue_item.item_id}, session {self._queue_item.session_id}"
+                        f"Executing queue item {worker.queue_item.item_id}, session {worker.queue_item.session_id}"
                     )
                     cancel_event.clear()
 
                     # Run the graph
-                    self.session_runner.run(queue_item=self._queue_item)
+                    worker.session_runner.run(queue_item=worker.queue_item)
 
                 except Exception as e:
                     error_type = e.__class__.__name__
                     error_message = str(e)
                     error_traceback = traceback.format_exc()
                     self._on_non_fatal_processor_error(
-                        queue_item=self._queue_item,
+                        queue_item=worker.queue_item,
                         error_type=error_type,
                         error_message=error_message,
                         error_traceback=error_traceback,
@@ -469,9 +616,8 @@ class DefaultSessionProcessor(SessionProcessorBase):
             self._invoker.services.logger.error(error_traceback)
             pass
         finally:
-            stop_event.clear()
             poll_now_event.clear()
-            self._queue_item = None
+            worker.queue_item = None
             self._thread_semaphore.release()
 
     def _on_non_fatal_processor_error(
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Callable, Optional
 
 from invokeai.app.services.session_queue.session_queue_common import (
     QUEUE_ITEM_STATUS,
@@ -30,6 +30,11 @@ class SessionQueueBase(ABC):
         """Dequeues the next session queue item."""
         pass
 
+    @abstractmethod
+    def add_enqueue_listener(self, listener: Callable[[], None]) -> None:
+        """Adds a listener, called on the enqueuing thread whenever queue items are enqueued."""
+        pass
+
     @abstractmethod
     def enqueue_batch(self, queue_id: str, batch: Batch, prepend: bool) -> EnqueueBatchResult:
         """Enqueues all permutations of a batch for execution."""
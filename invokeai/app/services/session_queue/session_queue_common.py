@@ -1,7 +1,7 @@
 import datetime
 import json
 from itertools import chain, product
-from typing import Generator, Iterable, Literal, NamedTuple, Optional, TypeAlias, Union, cast
+from typing import Generator, Iterable, Iterator, Literal, NamedTuple, Optional, TypeAlias, Union, cast
 
 from pydantic import (
     AliasChoices,
@@ -177,16 +177,23 @@ def get_field_values(queue_item_dict: dict) -> Optional[list[NodeFieldValue]]:
 
 
 GraphExecutionStateValidator = TypeAdapter(GraphExecutionState)
+GraphValidator = TypeAdapter(Graph)
 
 
 def get_session(queue_item_dict: dict) -> GraphExecutionState:
     session_raw = queue_item_dict.get("session", "{}")
+    graph_raw = queue_item_dict.get("graph", None)
+    if session_raw is None and graph_raw is not None:
+        # The session has not been saved yet - build it from the graph shared by the batch. Field values must be parsed.
+        graph = GraphValidator.validate_json(graph_raw, strict=False)
+        apply_field_values(graph, queue_item_dict.get("field_values", None) or [])
+        return GraphExecutionState(id=queue_item_dict["session_id"], graph=graph)
     session = GraphExecutionStateValidator.validate_json(session_raw, strict=False)
     return session
 
 
 def get_workflow(queue_item_dict: dict) -> Optional[WorkflowWithoutID]:
-    workflow_raw = queue_item_dict.get("workflow", None)
+    workflow_raw = queue_item_dict.get("workflow", None) or queue_item_dict.get("graph_workflow", None)
     if workflow_raw is not None:
         workflow = WorkflowWithoutIDValidator.validate_json(workflow_raw, strict=False)
         return workflow
@@ -261,10 +268,12 @@ class SessionQueueItem(SessionQueueItemWithoutGraph):
     )
 
     @classmethod
-    def queue_item_from_dict(cls, queue_item_dict: dict) -> "SessionQueueItem":
-        # must parse these manually
+    def queue_item_from_dict(
+        cls, queue_item_dict: dict, session: Optional[GraphExecutionState] = None
+    ) -> "SessionQueueItem":
+        # must parse these manually, unless the session has already been built
         queue_item_dict["field_values"] = get_field_values(queue_item_dict)
-        queue_item_dict["session"] = get_session(queue_item_dict)
+        queue_item_dict["session"] = session if session is not None else get_session(queue_item_dict)
         queue_item_dict["workflow"] = get_workflow(queue_item_dict)
         return SessionQueueItem(**queue_item_dict)
 
@@ -384,27 +393,51 @@ class IsFullResult(BaseModel):
 # region Util
 
 
-def populate_graph(graph: Graph, node_field_values: Iterable[NodeFieldValue]) -> Graph:
+def apply_field_values(graph: Graph, node_field_values: Iterable[NodeFieldValue]) -> None:
     """
-    Populates the given graph with the given batch data items.
+    Populates the given graph with the given batch data items, in place.
     """
-    graph_clone = graph.model_copy(deep=True)
     for item in node_field_values:
-        node = graph_clone.get_node(item.node_path)
+        node = graph.get_node(item.node_path)
         if node is None:
             continue
         setattr(node, item.field_name, item.value)
-        graph_clone.update_node(item.node_path, node)
+        graph.update_node(item.node_path, node)
+
+
+def validate_field_values(
+    graph: Graph, node_field_values: Iterable[NodeFieldValue], validated: set[tuple[str, str]]
+) -> None:
+    """
+    Validates the given batch data items against the nodes of the given graph, by applying them to copies of the nodes.
+    Each node's set of values is only validated once - `validated` holds the sets that were already validated.
+    """
+    values_by_node: dict[str, list[NodeFieldValue]] = {}
+    for item in node_field_values:
+        values_by_node.setdefault(item.node_path, []).append(item)
+    for node_path, items in values_by_node.items():
+        key = (node_path, json.dumps([(i.field_name, i.value) for i in items], default=to_jsonable_python))
+        if key in validated:
+            continue
+        node = graph.get_node(node_path).model_copy()
+        for item in items:
+            setattr(node, item.field_name, item.value)
+        validated.add(key)
+
+
+def populate_graph(graph: Graph, node_field_values: Iterable[NodeFieldValue]) -> Graph:
+    """
+    Populates a copy of the given graph with the given batch data items.
+    """
+    graph_clone = graph.model_copy(deep=True)
+    apply_field_values(graph_clone, node_field_values)
     return graph_clone
 
 
-def create_session_nfv_tuples(
-    batch: Batch, maximum: int
-) -> Generator[tuple[GraphExecutionState, list[NodeFieldValue], Optional[WorkflowWithoutID]], None, None]:
+def create_session_field_values(batch: Batch, maximum: int) -> Generator[list[NodeFieldValue], None, None]:
     """
-    Create all graph permutations from the given batch data and graph. Yields tuples
-    of the form (graph, batch_data_items) where batch_data_items is the list of BatchDataItems
-    that was applied to the graph.
+    Create the field values for each session of the given batch, in order, without creating the sessions. Yields the
+    list of NodeFieldValues to apply to the batch's graph for each session.
     """
 
     # TODO: Should this be a class method on Batch?
@@ -423,18 +456,29 @@ def create_session_nfv_tuples(
             node_field_values_to_zip.append(node_field_values)
         data.append(list(zip(*node_field_values_to_zip, strict=True)))  # type: ignore [arg-type]
 
-    # create generator to yield session,nfv tuples
+    # create generator to yield the field values of each session
     count = 0
     for _ in range(batch.runs):
         for d in product(*data):
             if count >= maximum:
                 return
-            flat_node_field_values = list(chain.from_iterable(d))
-            graph = populate_graph(batch.graph, flat_node_field_values)
-            yield (GraphExecutionState(graph=graph), flat_node_field_values, batch.workflow)
+            yield list(chain.from_iterable(d))
             count += 1
 
 
+def create_session_nfv_tuples(
+    batch: Batch, maximum: int
+) -> Generator[tuple[GraphExecutionState, list[NodeFieldValue], Optional[WorkflowWithoutID]], None, None]:
+    """
+    Create all graph permutations from the given batch data and graph. Yields tuples
+    of the form (graph, batch_data_items) where batch_data_items is the list of BatchDataItems
+    that was applied to the graph.
+    """
+    for flat_node_field_values in create_session_field_values(batch, maximum):
+        graph = populate_graph(batch.graph, flat_node_field_values)
+        yield (GraphExecutionState(graph=graph), flat_node_field_values, batch.workflow)
+
+
 def calc_session_count(batch: Batch) -> int:
     """
     Calculates the number of sessions that would be created by the batch, without incurring
@@ -443,15 +487,11 @@ def calc_session_count(batch: Batch) -> int:
     # TODO: Should this be a class method on Batch?
     if not batch.data:
         return batch.runs
-    data = []
+    count = batch.runs
     for batch_datum_list in batch.data:
-        to_zip = []
-        for batch_datum in batch_datum_list:
-            batch_data_items = range(len(batch_datum.items))
-            to_zip.append(batch_data_items)
-        data.append(list(zip(*to_zip, strict=True)))
-    data_product = list(product(*data))
-    return len(data_product) * batch.runs
+        # Zipped items are validated to all have the same length, and a zip is as long as its shortest input
+        count *= min((len(batch_datum.items) for batch_datum in batch_datum_list), default=0)
+    return count
 
 
 class SessionQueueValueToInsert(NamedTuple):
@@ -459,39 +499,40 @@ class SessionQueueValueToInsert(NamedTuple):
 
     # Careful with the ordering of this - it must match the insert statement
     queue_id: str  # queue_id
-    session: str  # session json
     session_id: str  # session_id
     batch_id: str  # batch_id
     field_values: Optional[str]  # field_values json
     priority: int  # priority
-    workflow: Optional[str]  # workflow json
+    graph_id: int  # graph_id
     origin: str | None
     destination: str | None
 
 
-ValuesToInsert: TypeAlias = list[SessionQueueValueToInsert]
-
-
-def prepare_values_to_insert(queue_id: str, batch: Batch, priority: int, max_new_queue_items: int) -> ValuesToInsert:
-    values_to_insert: ValuesToInsert = []
-    for session, field_values, workflow in create_session_nfv_tuples(batch, max_new_queue_items):
-        # sessions must have unique id
-        session.id = uuid_string()
-        values_to_insert.append(
-            SessionQueueValueToInsert(
-                queue_id,  # queue_id
-                session.model_dump_json(warnings=False, exclude_none=True),  # session (json)
-                session.id,  # session_id
-                batch.batch_id,  # batch_id
-                # must use pydantic_encoder bc field_values is a list of models
-                json.dumps(field_values, default=to_jsonable_python) if field_values else None,  # field_values (json)
-                priority,  # priority
-                json.dumps(workflow, default=to_jsonable_python) if workflow else None,  # workflow (json)
-                batch.origin,  # origin
-                batch.destination,  # destination
-            )
+def prepare_values_to_insert(
+    queue_id: str, batch: Batch, priority: int, max_new_queue_items: int, graph_id: int
+) -> Iterator[SessionQueueValueToInsert]:
+    """
+    Lazily prepares the values to insert for each session of the batch. The sessions are not created - the queue stores
+    the batch's graph once, as `graph_id`, and each queue item's session is built from it and the item's field values
+    when the item is retrieved.
+
+    The field values are validated against the batch's graph as they are prepared, so that invalid batches are rejected
+    when they are enqueued.
+    """
+    validated: set[tuple[str, str]] = set()
+    for field_values in create_session_field_values(batch, max_new_queue_items):
+        validate_field_values(batch.graph, field_values, validated)
+        yield SessionQueueValueToInsert(
+            queue_id,  # queue_id
+            uuid_string(),  # session_id - sessions must have unique id
+            batch.batch_id,  # batch_id
+            # must use pydantic_encoder bc field_values is a list of models
+            json.dumps(field_values, default=to_jsonable_python) if field_values else None,  # field_values (json)
+            priority,  # priority
+            graph_id,  # graph_id
+            batch.origin,  # origin
+            batch.destination,  # destination
         )
-    return values_to_insert
 
 
 # endregion Util
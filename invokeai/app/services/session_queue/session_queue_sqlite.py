@@ -1,6 +1,10 @@
+import json
 import sqlite3
-import threading
-from typing import Optional, Union, cast
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Union, cast
+
+from pydantic_core import to_jsonable_python
 
 from invokeai.app.services.invoker import Invoker
 from invokeai.app.services.session_queue.session_queue_base import SessionQueueBase
@@ -14,6 +18,7 @@ from invokeai.app.services.session_queue.session_queue_common import (
     CancelByQueueIDResult,
     ClearResult,
     EnqueueBatchResult,
+    GraphValidator,
     IsEmptyResult,
     IsFullResult,
     PruneResult,
@@ -23,18 +28,20 @@ from invokeai.app.services.session_queue.session_queue_common import (
     SessionQueueItemNotFoundError,
     SessionQueueStatus,
     calc_session_count,
+    get_field_values,
+    get_session,
     prepare_values_to_insert,
 )
 from invokeai.app.services.shared.graph import GraphExecutionState
 from invokeai.app.services.shared.pagination import CursorPaginatedResults
-from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase, SqliteLock
 
 
 class SqliteSessionQueue(SessionQueueBase):
     __invoker: Invoker
     __conn: sqlite3.Connection
     __cursor: sqlite3.Cursor
-    __lock: threading.RLock
+    __lock: SqliteLock
 
     def start(self, invoker: Invoker) -> None:
         self.__invoker = invoker
@@ -50,9 +57,16 @@ class SqliteSessionQueue(SessionQueueBase):
 
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
-        self.__lock = db.lock
+        self.__db = db
+        self.__lock = db.get_lock("session_queue")
         self.__conn = db.conn
         self.__cursor = self.__conn.cursor()
+        self._enqueue_listeners: list[Callable[[], None]] = []
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session_queue_prefetch")
+        self._prefetched: Optional[Future[Optional[tuple[int, GraphExecutionState]]]] = None
+
+    def stop(self, invoker: Invoker) -> None:
+        self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
 
     def _set_in_progress_to_canceled(self) -> None:
         """
@@ -103,6 +117,10 @@ class SqliteSessionQueue(SessionQueueBase):
         return cast(Union[int, None], self.__cursor.fetchone()[0]) or 0
 
     def enqueue_batch(self, queue_id: str, batch: Batch, prepend: bool) -> EnqueueBatchResult:
+        # The graph and workflow are stored once, and shared by all of the batch's queue items
+        graph_json = batch.graph.model_dump_json(warnings=False, exclude_none=True)
+        workflow_json = json.dumps(batch.workflow, default=to_jsonable_python) if batch.workflow else None
+        requested_count = calc_session_count(batch)
         try:
             self.__lock.acquire()
 
@@ -115,25 +133,33 @@ class SqliteSessionQueue(SessionQueueBase):
             if prepend:
                 priority = self._get_highest_priority(queue_id) + 1
 
-            requested_count = calc_session_count(batch)
-            values_to_insert = prepare_values_to_insert(
-                queue_id=queue_id,
-                batch=batch,
-                priority=priority,
-                max_new_queue_items=max_new_queue_items,
-            )
-            enqueued_count = len(values_to_insert)
-
-            if requested_count > enqueued_count:
-                values_to_insert = values_to_insert[:max_new_queue_items]
+            enqueued_count = max(0, min(requested_count, max_new_queue_items))
 
-            self.__cursor.executemany(
-                """--sql
-                INSERT INTO session_queue (queue_id, session, session_id, batch_id, field_values, priority, workflow, origin, destination)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                values_to_insert,
-            )
+            if enqueued_count > 0:
+                self.__cursor.execute(
+                    """--sql
+                    INSERT INTO session_queue_graphs (graph, workflow)
+                    VALUES (?, ?)
+                    """,
+                    (graph_json, workflow_json),
+                )
+                graph_id = cast(int, self.__cursor.lastrowid)
+
+                # The values are generated as they are inserted, so the batch is never expanded in memory all at once
+                values_to_insert = prepare_values_to_insert(
+                    queue_id=queue_id,
+                    batch=batch,
+                    priority=priority,
+                    max_new_queue_items=enqueued_count,
+                    graph_id=graph_id,
+                )
+                self.__cursor.executemany(
+                    """--sql
+                    INSERT INTO session_queue (queue_id, session_id, batch_id, field_values, priority, graph_id, origin, destination)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    values_to_insert,
+                )
             self.__conn.commit()
         except Exception:
             self.__conn.rollback()
@@ -148,15 +174,120 @@ class SqliteSessionQueue(SessionQueueBase):
             priority=priority,
         )
         self.__invoker.services.events.emit_batch_enqueued(enqueue_result)
+        if enqueued_count > 0:
+            for listener in self._enqueue_listeners:
+                listener()
         return enqueue_result
 
+    def add_enqueue_listener(self, listener: Callable[[], None]) -> None:
+        self._enqueue_listeners.append(listener)
+
     def dequeue(self) -> Optional[SessionQueueItem]:
+        # The next item is claimed with a single statement, so several session workers may dequeue at once without
+        # getting the same item. The `idx_session_queue_status_priority_item_id` index finds it without a sort.
+        with self.__lock:
+            try:
+                self.__cursor.execute(
+                    """--sql
+                    UPDATE session_queue
+                    SET
+                      status = 'in_progress',
+                      started_at = STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW'),
+                      updated_at = STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')
+                    WHERE item_id = (
+                      SELECT item_id
+                      FROM session_queue
+                      WHERE status = 'pending'
+                      ORDER BY
+                        priority DESC,
+                        item_id ASC
+                      LIMIT 1
+                    )
+                    RETURNING *
+                    """
+                )
+                rows = self.__cursor.fetchall()
+                queue_item_dict = dict(rows[0]) if rows else None
+                if queue_item_dict is not None and queue_item_dict["graph_id"] is not None:
+                    self.__cursor.execute(
+                        """--sql
+                        SELECT graph, workflow AS graph_workflow
+                        FROM session_queue_graphs
+                        WHERE graph_id = ?
+                        """,
+                        (queue_item_dict["graph_id"],),
+                    )
+                    queue_item_dict.update(dict(self.__cursor.fetchone()))
+                self.__conn.commit()
+            except Exception:
+                self.__conn.rollback()
+                raise
+            prefetched = self._prefetched
+            self._prefetched = None
+            if queue_item_dict is not None:
+                self._prefetched = self._prefetch_executor.submit(self._load_next_session)
+
+        if queue_item_dict is None:
+            return None
         try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+            queue_item = SessionQueueItem.queue_item_from_dict(
+                queue_item_dict, session=self._get_prefetched_session(prefetched, queue_item_dict["item_id"])
+            )
+        except Exception as e:
+            # The item is already claimed, so it must not be left in progress
+            self._fail_unloadable_queue_item(queue_item_dict, e, traceback.format_exc())
+            raise
+        self._emit_queue_item_status_changed(queue_item)
+        return queue_item
+
+    def _fail_unloadable_queue_item(
+        self, queue_item_dict: dict[str, Any], error: Exception, error_traceback: str
+    ) -> None:
+        """Fails a dequeued queue item whose session could not be built. The batch's graph, without the item's field
+        values, is saved as its session, so that the item can still be retrieved."""
+        item_id = queue_item_dict["item_id"]
+        session_json: Optional[str] = None
+        if queue_item_dict.get("session") is None and queue_item_dict.get("graph") is not None:
+            try:
+                graph = GraphValidator.validate_json(queue_item_dict["graph"], strict=False)
+                session = GraphExecutionState(id=queue_item_dict["session_id"], graph=graph)
+                session_json = session.model_dump_json(warnings=False, exclude_none=True)
+            except Exception:
+                pass
+        with self.__lock:
+            try:
+                self.__cursor.execute(
+                    """--sql
+                    UPDATE session_queue
+                    SET status = 'failed', error_type = ?, error_message = ?, error_traceback = ?,
+                      session = COALESCE(?, session)
+                    WHERE item_id = ?
+                    """,
+                    (error.__class__.__name__, str(error), error_traceback, session_json, item_id),
+                )
+                self.__conn.commit()
+            except Exception:
+                self.__conn.rollback()
+                raise
+        try:
+            self._emit_queue_item_status_changed(self.get_queue_item(item_id))
+        except Exception as e:
+            self.__invoker.services.logger.error(f"Failed to emit the status of failed queue item {item_id}: {e}")
+
+    def _load_next_session(self) -> Optional[tuple[int, GraphExecutionState]]:
+        """Builds the session of the queue item that will be dequeued next, if any.
+
+        This runs in the background while the dequeued item is processed, so the next item can start without waiting
+        for its session to be parsed. The sessions of pending queue items do not change, so the session can be used
+        as long as the item is the one dequeued next.
+        """
+        with self.__db.read_connection("session_queue") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
-                SELECT *
+                SELECT session_queue.*, session_queue_graphs.graph, session_queue_graphs.workflow AS graph_workflow
                 FROM session_queue
+                LEFT JOIN session_queue_graphs ON session_queue_graphs.graph_id = session_queue.graph_id
                 WHERE status = 'pending'
                 ORDER BY
                   priority DESC,
@@ -164,25 +295,36 @@ class SqliteSessionQueue(SessionQueueBase):
                 LIMIT 1
                 """
             )
-            result = cast(Union[sqlite3.Row, None], self.__cursor.fetchone())
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
+            result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         if result is None:
             return None
-        queue_item = SessionQueueItem.queue_item_from_dict(dict(result))
-        queue_item = self._set_queue_item_status(item_id=queue_item.item_id, status="in_progress")
-        return queue_item
+        queue_item_dict = dict(result)
+        queue_item_dict["field_values"] = get_field_values(queue_item_dict)
+        return queue_item_dict["item_id"], get_session(queue_item_dict)
+
+    def _get_prefetched_session(
+        self, prefetched: Optional[Future[Optional[tuple[int, GraphExecutionState]]]], item_id: int
+    ) -> Optional[GraphExecutionState]:
+        if prefetched is None:
+            return None
+        try:
+            result = prefetched.result()
+        except Exception as e:
+            # The session will be built when the item is dequeued instead
+            self.__invoker.services.logger.debug(f"Failed to prefetch the next queue item: {e}")
+            return None
+        if result is None or result[0] != item_id:
+            return None
+        return result[1]
 
     def get_next(self, queue_id: str) -> Optional[SessionQueueItem]:
-        try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+        with self.__db.read_connection("session_queue") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
-                SELECT *
+                SELECT session_queue.*, session_queue_graphs.graph, session_queue_graphs.workflow AS graph_workflow
                 FROM session_queue
+                LEFT JOIN session_queue_graphs ON session_queue_graphs.graph_id = session_queue.graph_id
                 WHERE
                   queue_id = ?
                   AND status = 'pending'
@@ -193,23 +335,19 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 (queue_id,),
             )
-            result = cast(Union[sqlite3.Row, None], self.__cursor.fetchone())
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
+            result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         if result is None:
             return None
         return SessionQueueItem.queue_item_from_dict(dict(result))
 
     def get_current(self, queue_id: str) -> Optional[SessionQueueItem]:
-        try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+        with self.__db.read_connection("session_queue") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
-                SELECT *
+                SELECT session_queue.*, session_queue_graphs.graph, session_queue_graphs.workflow AS graph_workflow
                 FROM session_queue
+                LEFT JOIN session_queue_graphs ON session_queue_graphs.graph_id = session_queue.graph_id
                 WHERE
                   queue_id = ?
                   AND status = 'in_progress'
@@ -217,12 +355,7 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 (queue_id,),
             )
-            result = cast(Union[sqlite3.Row, None], self.__cursor.fetchone())
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
+            result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         if result is None:
             return None
         return SessionQueueItem.queue_item_from_dict(dict(result))
@@ -252,15 +385,18 @@ class SqliteSessionQueue(SessionQueueBase):
         finally:
             self.__lock.release()
         queue_item = self.get_queue_item(item_id)
+        self._emit_queue_item_status_changed(queue_item)
+        return queue_item
+
+    def _emit_queue_item_status_changed(self, queue_item: SessionQueueItem) -> None:
         batch_status = self.get_batch_status(queue_id=queue_item.queue_id, batch_id=queue_item.batch_id)
         queue_status = self.get_queue_status(queue_id=queue_item.queue_id)
         self.__invoker.services.events.emit_queue_item_status_changed(queue_item, batch_status, queue_status)
-        return queue_item
 
     def is_empty(self, queue_id: str) -> IsEmptyResult:
-        try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+        with self.__db.read_connection("session_queue") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT count(*)
                 FROM session_queue
@@ -268,18 +404,13 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 (queue_id,),
             )
-            is_empty = cast(int, self.__cursor.fetchone()[0]) == 0
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
+            is_empty = cast(int, cursor.fetchone()[0]) == 0
         return IsEmptyResult(is_empty=is_empty)
 
     def is_full(self, queue_id: str) -> IsFullResult:
-        try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+        with self.__db.read_connection("session_queue") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT count(*)
                 FROM session_queue
@@ -288,12 +419,7 @@ class SqliteSessionQueue(SessionQueueBase):
                 (queue_id,),
             )
             max_queue_size = self.__invoker.services.configuration.max_queue_size
-            is_full = cast(int, self.__cursor.fetchone()[0]) >= max_queue_size
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
+            is_full = cast(int, cursor.fetchone()[0]) >= max_queue_size
         return IsFullResult(is_full=is_full)
 
     def clear(self, queue_id: str) -> ClearResult:
@@ -511,22 +637,19 @@ class SqliteSessionQueue(SessionQueueBase):
         return CancelByQueueIDResult(canceled=count)
 
     def get_queue_item(self, item_id: int) -> SessionQueueItem:
-        try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+        with self.__db.read_connection("session_queue") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
-                SELECT * FROM session_queue
+                SELECT session_queue.*, session_queue_graphs.graph, session_queue_graphs.workflow AS graph_workflow
+                FROM session_queue
+                LEFT JOIN session_queue_graphs ON session_queue_graphs.graph_id = session_queue.graph_id
                 WHERE
                   item_id = ?
                 """,
                 (item_id,),
             )
-            result = cast(Union[sqlite3.Row, None], self.__cursor.fetchone())
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
+            result = cast(Union[sqlite3.Row, None], cursor.fetchone())
         if result is None:
             raise SessionQueueItemNotFoundError(f"No queue item with id {item_id}")
         return SessionQueueItem.queue_item_from_dict(dict(result))
@@ -562,9 +685,8 @@ class SqliteSessionQueue(SessionQueueBase):
         cursor: Optional[int] = None,
         status: Optional[QUEUE_ITEM_STATUS] = None,
     ) -> CursorPaginatedResults[SessionQueueItemDTO]:
-        try:
-            item_id = cursor
-            self.__lock.acquire()
+        item_id = cursor
+        with self.__db.read_connection("session_queue") as conn:
             query = """--sql
                 SELECT item_id,
                     status,
@@ -606,25 +728,19 @@ class SqliteSessionQueue(SessionQueueBase):
                 LIMIT ?
                 """
             params.append(limit + 1)
-            self.__cursor.execute(query, params)
-            results = cast(list[sqlite3.Row], self.__cursor.fetchall())
-            items = [SessionQueueItemDTO.queue_item_dto_from_dict(dict(result)) for result in results]
-            has_more = False
-            if len(items) > limit:
-                # remove the extra item
-                items.pop()
-                has_more = True
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
+            results = cast(list[sqlite3.Row], conn.execute(query, params).fetchall())
+        items = [SessionQueueItemDTO.queue_item_dto_from_dict(dict(result)) for result in results]
+        has_more = False
+        if len(items) > limit:
+            # remove the extra item
+            items.pop()
+            has_more = True
         return CursorPaginatedResults(items=items, limit=limit, has_more=has_more)
 
     def get_queue_status(self, queue_id: str) -> SessionQueueStatus:
-        try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+        with self.__db.read_connection("session_queue") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT status, count(*)
                 FROM session_queue
@@ -633,12 +749,7 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 (queue_id,),
             )
-            counts_result = cast(list[sqlite3.Row], self.__cursor.fetchall())
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
+            counts_result = cast(list[sqlite3.Row], cursor.fetchall())
 
         current_item = self.get_current(queue_id=queue_id)
         total = sum(row[1] for row in counts_result)
@@ -657,9 +768,9 @@ class SqliteSessionQueue(SessionQueueBase):
         )
 
     def get_batch_status(self, queue_id: str, batch_id: str) -> BatchStatus:
-        try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+        with self.__db.read_connection("session_queue") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT status, count(*), origin, destination
                 FROM session_queue
@@ -670,16 +781,11 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 (queue_id, batch_id),
             )
-            result = cast(list[sqlite3.Row], self.__cursor.fetchall())
+            result = cast(list[sqlite3.Row], cursor.fetchall())
             total = sum(row[1] for row in result)
             counts: dict[str, int] = {row[0]: row[1] for row in result}
             origin = result[0]["origin"] if result else None
             destination = result[0]["destination"] if result else None
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
 
         return BatchStatus(
             batch_id=batch_id,
@@ -695,9 +801,9 @@ class SqliteSessionQueue(SessionQueueBase):
         )
 
     def get_counts_by_destination(self, queue_id: str, destination: str) -> SessionQueueCountsByDestination:
-        try:
-            self.__lock.acquire()
-            self.__cursor.execute(
+        with self.__db.read_connection("session_queue") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT status, count(*)
                 FROM session_queue
@@ -707,12 +813,7 @@ class SqliteSessionQueue(SessionQueueBase):
                 """,
                 (queue_id, destination),
             )
-            counts_result = cast(list[sqlite3.Row], self.__cursor.fetchall())
-        except Exception:
-            self.__conn.rollback()
-            raise
-        finally:
-            self.__lock.release()
+            counts_result = cast(list[sqlite3.Row], cursor.fetchall())
 
         total = sum(row[1] for row in counts_result)
         counts: dict[str, int] = {row[0]: row[1] for row in counts_result}
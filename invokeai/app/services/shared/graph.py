@@ -1,14 +1,16 @@
 # Copyright (c) 2022 Kyle Schouviller (https://github.com/kyle0654)
 
 import copy
+import heapq
 import itertools
-from typing import Any, Optional, TypeVar, Union, get_args, get_origin, get_type_hints
+from typing import Any, Callable, Optional, TypeVar, Union, get_args, get_origin, get_type_hints
 
 import networkx as nx
 from pydantic import (
     BaseModel,
     GetCoreSchemaHandler,
     GetJsonSchemaHandler,
+    PrivateAttr,
     ValidationError,
     field_validator,
 )
@@ -739,6 +741,53 @@ class Graph(BaseModel):
         return g
 
 
+class _ExecutionScheduler:
+    """Indexes over a graph execution state, used to schedule its nodes without searching the whole execution graph.
+
+    They are derived from the state's fields, and rebuilt whenever those change without them (e.g. when the state is
+    deserialized), so they never affect equality between states.
+    """
+
+    def __init__(self) -> None:
+        # Identifies the graph and execution graph the indexes were built for
+        self.source_key: Optional[tuple[int, ...]] = None
+        self.execution_key: Optional[tuple[int, ...]] = None
+
+        # The source graph's nodes in topological order and, for each node, its parents, the iterators it is expanded
+        # over, and all of its iterate ancestors (including those behind a collector)
+        self.source_nodes: list[str] = []
+        self.parents: dict[str, list[str]] = {}
+        self.iterators: dict[str, list[str]] = {}
+        self.iterate_ancestors: dict[str, list[str]] = {}
+
+        # The execution graph's edges by node, and the number of each prepared node's inputs that are not executed
+        self.input_edges: dict[str, list[Edge]] = {}
+        self.output_edges: dict[str, list[Edge]] = {}
+        self.pending_inputs: dict[str, int] = {}
+
+        # The prepared nodes of each source node in order of preparation, and how many of them are not executed
+        self.prepared: dict[str, list[str]] = {}
+        self.unexecuted: dict[str, int] = {}
+
+        # The prepared iterate node of each iterator a prepared node descends from, and the prepared nodes of each
+        # source node keyed by the prepared iterate nodes of the source node's iterators
+        self.iterations: dict[str, dict[str, str]] = {}
+        self.prepared_by_iteration: dict[str, dict[tuple[str, ...], str]] = {}
+
+        # A heap of prepared nodes whose inputs are all executed, and counters used to order it
+        self.ready: list[tuple[tuple[Any, ...], str]] = []
+        self.completions = 0
+        self.readied = 0
+
+        # Nodes that have been handed out to be executed concurrently, and are not yet completed
+        self.executing: set[str] = set()
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _ExecutionScheduler)
+
+    __hash__ = None  # type: ignore
+
+
 class GraphExecutionState(BaseModel):
     """Tracks the state of a graph execution"""
 
@@ -777,27 +826,29 @@ class GraphExecutionState(BaseModel):
         default_factory=dict,
     )
 
+    # Indexes used to schedule nodes, kept up to date as nodes are prepared and completed
+    _scheduler: _ExecutionScheduler = PrivateAttr(default_factory=_ExecutionScheduler)
+
     @field_validator("graph")
     def graph_is_valid(cls, v: Graph):
         """Validates that the graph is valid"""
         v.validate_self()
         return v
 
-    def next(self) -> Optional[BaseInvocation]:
-        """Gets the next node ready to execute."""
+    def next(self, accept: Optional[Callable[[BaseInvocation], bool]] = None) -> Optional[BaseInvocation]:
+        """Gets the next node ready to execute.
 
-        # TODO: enable multiple nodes to execute simultaneously by tracking currently executing nodes
-        #       possibly with a timeout?
+        To execute several nodes at once, provide `accept`. The next ready node it accepts is returned and tracked as
+        executing, so that later calls return other nodes until it is completed.
+        """
 
         # If there are no prepared nodes, prepare some nodes
-        next_node = self._get_next_node()
+        next_node = self._get_next_node(accept)
         if next_node is None:
-            prepared_id = self._prepare()
-
             # Prepare as many nodes as we can
-            while prepared_id is not None:
-                prepared_id = self._prepare()
-                next_node = self._get_next_node()
+            while self._prepare() is not None:
+                pass
+            next_node = self._get_next_node(accept)
 
         # Get values from edges
         if next_node is not None:
@@ -815,17 +866,31 @@ class GraphExecutionState(BaseModel):
         if node_id not in self.execution_graph.nodes:
             return  # TODO: log error?
 
+        scheduler = self._get_scheduler()
+        scheduler.executing.discard(node_id)
+        newly_executed = node_id not in self.executed
+
         # Mark node as executed
         self.executed.add(node_id)
         self.results[node_id] = output
 
-        # Check if source node is complete (all prepared nodes are complete)
-        source_node = self.prepared_source_mapping[node_id]
-        prepared_nodes = self.source_prepared_mapping[source_node]
+        if newly_executed:
+            # Nodes whose last input this was are now ready
+            scheduler.completions += 1
+            for edge in scheduler.output_edges[node_id]:
+                destination_id = edge.destination.node_id
+                scheduler.pending_inputs[destination_id] -= 1
+                if scheduler.pending_inputs[destination_id] == 0:
+                    self._push_ready(scheduler, destination_id)
+
+            # Check if source node is complete (all prepared nodes are complete)
+            source_node = self.prepared_source_mapping[node_id]
+            scheduler.unexecuted[source_node] -= 1
+            if scheduler.unexecuted[source_node] == 0:
+                self.executed.add(source_node)
+                self.executed_history.append(source_node)
 
-        if all(n in self.executed for n in prepared_nodes):
-            self.executed.add(source_node)
-            self.executed_history.append(source_node)
+        scheduler.execution_key = self._get_execution_key()
 
     def set_node_error(self, node_id: str, error: str):
         """Marks a node as errored"""
@@ -833,13 +898,102 @@ class GraphExecutionState(BaseModel):
 
     def is_complete(self) -> bool:
         """Returns true if the graph is complete"""
-        node_ids = set(self.graph.nx_graph_flat().nodes)
-        return self.has_error() or all((k in self.executed for k in node_ids))
+        return self.has_error() or all((k in self.executed for k in self._get_scheduler().source_nodes))
 
     def has_error(self) -> bool:
         """Returns true if the graph has any errors"""
         return len(self.errors) > 0
 
+    def _get_source_key(self) -> tuple[int, ...]:
+        return (id(self.graph), len(self.graph.nodes), len(self.graph.edges))
+
+    def _get_execution_key(self) -> tuple[int, ...]:
+        return (id(self.execution_graph), len(self.execution_graph.nodes), id(self.executed), len(self.executed))
+
+    def _get_scheduler(self) -> _ExecutionScheduler:
+        """Gets the scheduling indexes, rebuilding them if the state has changed without them"""
+        scheduler: _ExecutionScheduler = self.__pydantic_private__["_scheduler"]  # type: ignore
+        if scheduler.source_key == self._get_source_key() and scheduler.execution_key == self._get_execution_key():
+            return scheduler
+
+        scheduler = _ExecutionScheduler()
+        self.__pydantic_private__["_scheduler"] = scheduler  # type: ignore
+
+        # Index the source graph
+        g = self.graph.nx_graph_flat()
+        iterator_graph = self._iterator_graph()
+        scheduler.source_nodes = list(nx.topological_sort(g))
+        source_order = {n: i for i, n in enumerate(scheduler.source_nodes)}
+        iterate_nodes = {n for n in scheduler.source_nodes if isinstance(self.graph.get_node(n), IterateInvocation)}
+        for n in scheduler.source_nodes:
+            scheduler.parents[n] = [e[0] for e in g.in_edges(n)]
+            scheduler.iterate_ancestors[n] = [a for a in nx.ancestors(g, n) if a in iterate_nodes]
+            iterators = [a for a in nx.ancestors(iterator_graph, n) if a in iterate_nodes]
+            scheduler.iterators[n] = sorted(iterators, key=source_order.__getitem__)
+
+        # Index the execution graph. Nodes are added to it after their parents, so this visits parents first.
+        for node_id in self.execution_graph.nodes:
+            scheduler.input_edges[node_id] = []
+            scheduler.output_edges[node_id] = []
+        for edge in self.execution_graph.edges:
+            scheduler.input_edges[edge.destination.node_id].append(edge)
+            scheduler.output_edges[edge.source.node_id].append(edge)
+        for node_id in self.execution_graph.nodes:
+            self._index_execution_node(scheduler, node_id)
+
+        scheduler.source_key = self._get_source_key()
+        scheduler.execution_key = self._get_execution_key()
+        return scheduler
+
+    def _reset_scheduler(self) -> None:
+        self.__pydantic_private__["_scheduler"] = _ExecutionScheduler()  # type: ignore
+
+    def _index_execution_node(self, scheduler: _ExecutionScheduler, node_id: str) -> None:
+        """Indexes a prepared node whose edges are indexed, queueing it if it is ready"""
+        node = self.execution_graph.nodes[node_id]
+        source_node_id = self.prepared_source_mapping[node_id]
+        scheduler.prepared.setdefault(source_node_id, []).append(node_id)
+
+        # The node descends from the same iterations as its parents, unless it collects them
+        iterators = scheduler.iterators[source_node_id]
+        parent_iterations: dict[str, str] = {}
+        if not isinstance(node, CollectInvocation):
+            for edge in scheduler.input_edges[node_id]:
+                for source_iterator, prepared_iterator in scheduler.iterations[edge.source.node_id].items():
+                    parent_iterations.setdefault(source_iterator, prepared_iterator)
+        iteration = {n: parent_iterations[n] for n in iterators if n in parent_iterations}
+        iteration_key = tuple(iteration.values())
+        if isinstance(node, IterateInvocation):
+            iteration[source_node_id] = node_id
+        scheduler.iterations[node_id] = iteration
+        scheduler.prepared_by_iteration.setdefault(source_node_id, {}).setdefault(iteration_key, node_id)
+
+        if node_id in self.executed:
+            scheduler.pending_inputs[node_id] = 0
+            return
+
+        scheduler.unexecuted[source_node_id] = scheduler.unexecuted.get(source_node_id, 0) + 1
+        scheduler.pending_inputs[node_id] = sum(
+            1 for e in scheduler.input_edges[node_id] if e.source.node_id not in self.executed
+        )
+        if scheduler.pending_inputs[node_id] == 0:
+            self._push_ready(scheduler, node_id)
+
+    def _push_ready(self, scheduler: _ExecutionScheduler, node_id: str) -> None:
+        """Queues a node whose inputs are all executed.
+
+        Nodes expanded from iterators come first, ordered by the indices of their iterations, so that each iteration
+        finishes in the order of its collection. Ties go to the nodes readied by the latest completion, so that each
+        branch is executed as far as possible before moving to the next, and then to the earliest prepared node.
+        """
+        iteration_indices = tuple(
+            self.execution_graph.nodes[n].index
+            for n in scheduler.iterations[node_id].values()  # type: ignore
+        )
+        priority = (not iteration_indices, iteration_indices, -scheduler.completions, scheduler.readied)
+        heapq.heappush(scheduler.ready, (priority, node_id))
+        scheduler.readied += 1
+
     def _create_execution_node(self, node_id: str, iteration_node_map: list[tuple[str, str]]) -> list[str]:
         """Prepares an iteration node and connects all edges, returning the new node id"""
 
@@ -863,6 +1017,8 @@ class GraphExecutionState(BaseModel):
             # TODO: should this raise a warning? It might just happen if an empty collection is input, and should be valid.
             return new_nodes
 
+        scheduler = self._get_scheduler()
+
         # Get all input edges
         input_edges = self.graph._get_input_edges(node_id)
 
@@ -896,16 +1052,23 @@ class GraphExecutionState(BaseModel):
                 self.source_prepared_mapping[node_id] = set()
             self.source_prepared_mapping[node_id].add(new_node.id)
 
-            # Add new edges to execution graph
+            # Add new edges to execution graph. They are copies of the source graph's validated edges, and the new
+            # node has no outputs yet so cannot close a cycle, so they are added without validating them again.
+            scheduler.input_edges[new_node.id] = []
+            scheduler.output_edges[new_node.id] = []
             for edge in new_edges:
                 new_edge = Edge(
                     source=edge.source,
                     destination=EdgeConnection(node_id=new_node.id, field=edge.destination.field),
                 )
-                self.execution_graph.add_edge(new_edge)
+                self.execution_graph.edges.append(new_edge)
+                scheduler.input_edges[new_node.id].append(new_edge)
+                scheduler.output_edges[new_edge.source.node_id].append(new_edge)
 
+            self._index_execution_node(scheduler, new_node.id)
             new_nodes.append(new_node.id)
 
+        scheduler.execution_key = self._get_execution_key()
         return new_nodes
 
     def _iterator_graph(self) -> nx.DiGraph:
@@ -916,40 +1079,26 @@ class GraphExecutionState(BaseModel):
             g.remove_edges_from(list(g.in_edges(c)))
         return g
 
-    def _get_node_iterators(self, node_id: str) -> list[str]:
-        """Gets iterators for a node"""
-        g = self._iterator_graph()
-        iterators = [n for n in nx.ancestors(g, node_id) if isinstance(self.graph.get_node(n), IterateInvocation)]
-        return iterators
-
     def _prepare(self) -> Optional[str]:
-        # Get flattened source graph
-        g = self.graph.nx_graph_flat()
+        scheduler = self._get_scheduler()
 
         # Find next node that:
         # - was not already prepared
         # - is not an iterate node whose inputs have not been executed
         # - does not have an unexecuted iterate ancestor
-        sorted_nodes = nx.topological_sort(g)
         next_node_id = next(
             (
                 n
-                for n in sorted_nodes
+                for n in scheduler.source_nodes
                 # exclude nodes that have already been prepared
                 if n not in self.source_prepared_mapping
                 # exclude iterate nodes whose inputs have not been executed
                 and not (
                     isinstance(self.graph.get_node(n), IterateInvocation)  # `n` is an iterate node...
-                    and not all((e[0] in self.executed for e in g.in_edges(n)))  # ...that has unexecuted inputs
+                    and not all((p in self.executed for p in scheduler.parents[n]))  # ...that has unexecuted inputs
                 )
                 # exclude nodes who have unexecuted iterate ancestors
-                and not any(
-                    (
-                        isinstance(self.graph.get_node(a), IterateInvocation)  # `a` is an iterate ancestor of `n`...
-                        and a not in self.executed  # ...that is not executed
-                        for a in nx.ancestors(g, n)  # for all ancestors `a` of node `n`
-                    )
-                )
+                and all((a in self.executed for a in scheduler.iterate_ancestors[n]))
             ),
             None,
         )
@@ -958,7 +1107,7 @@ class GraphExecutionState(BaseModel):
             return None
 
         # Get all parents of the next node
-        next_node_parents = [e[0] for e in g.in_edges(next_node_id)]
+        next_node_parents = scheduler.parents[next_node_id]
 
         # Create execution nodes
         next_node = self.graph.get_node(next_node_id)
@@ -966,25 +1115,26 @@ class GraphExecutionState(BaseModel):
         if isinstance(next_node, CollectInvocation):
             # Collapse all iterator input mappings and create a single execution node for the collect invocation
             all_iteration_mappings = list(
-                itertools.chain(*(((s, p) for p in self.source_prepared_mapping[s]) for s in next_node_parents))
+                itertools.chain(*(((s, p) for p in scheduler.prepared[s]) for s in next_node_parents))
             )
-            # all_iteration_mappings = list(set(itertools.chain(*prepared_parent_mappings)))
             create_results = self._create_execution_node(next_node_id, all_iteration_mappings)
             if create_results is not None:
                 new_node_ids.extend(create_results)
         else:  # Iterators or normal nodes
             # Get all iterator combinations for this node
             # Will produce a list of lists of prepared iterator nodes, from which results can be iterated
-            iterator_nodes = self._get_node_iterators(next_node_id)
-            iterator_nodes_prepared = [list(self.source_prepared_mapping[n]) for n in iterator_nodes]
+            iterator_nodes = scheduler.iterators[next_node_id]
+            iterator_nodes_prepared = [scheduler.prepared[n] for n in iterator_nodes]
             iterator_node_prepared_combinations = list(itertools.product(*iterator_nodes_prepared))
 
             # Select the correct prepared parents for each iteration
             # For every iterator, the parent must either not be a child of that iterator, or must match the prepared iteration for that iterator
             # TODO: Handle a node mapping to none
-            eg = self.execution_graph.nx_graph_flat()
             prepared_parent_mappings = [
-                [(n, self._get_iteration_node(n, g, eg, it)) for n in next_node_parents]
+                [
+                    (n, self._get_iteration_node(n, dict(zip(iterator_nodes, it, strict=True))))
+                    for n in next_node_parents
+                ]
                 for it in iterator_node_prepared_combinations
             ]  # type: ignore
 
@@ -996,65 +1146,55 @@ class GraphExecutionState(BaseModel):
 
         return next(iter(new_node_ids), None)
 
-    def _get_iteration_node(
-        self,
-        source_node_id: str,
-        graph: nx.DiGraph,
-        execution_graph: nx.DiGraph,
-        prepared_iterator_nodes: list[str],
-    ) -> Optional[str]:
-        """Gets the prepared version of the specified source node that matches every iteration specified"""
-        prepared_nodes = self.source_prepared_mapping[source_node_id]
+    def _get_iteration_node(self, source_node_id: str, iteration: dict[str, str]) -> Optional[str]:
+        """Gets the prepared version of the specified source node that matches every iteration specified, given as a
+        map of source iterate nodes to prepared iterate nodes"""
+        scheduler = self._get_scheduler()
+        prepared_nodes = scheduler.prepared[source_node_id]
         if len(prepared_nodes) == 1:
-            return next(iter(prepared_nodes))
+            return prepared_nodes[0]
 
         # Check if the requested node is an iterator
-        prepared_iterator = next((n for n in prepared_nodes if n in prepared_iterator_nodes), None)
-        if prepared_iterator is not None:
-            return prepared_iterator
+        if source_node_id in iteration:
+            return iteration[source_node_id]
 
-        # Filter to only iterator nodes that are a parent of the specified node, in tuple format (prepared, source)
-        iterator_source_node_mapping = [(n, self.prepared_source_mapping[n]) for n in prepared_iterator_nodes]
-        parent_iterators = [itn for itn in iterator_source_node_mapping if nx.has_path(graph, itn[1], source_node_id)]
+        # The node's iterators are a subset of the iteration's, so the node is the one prepared for their iterations
+        iteration_key = tuple(iteration.get(n, "") for n in scheduler.iterators[source_node_id])
+        return scheduler.prepared_by_iteration[source_node_id].get(iteration_key)
 
-        return next(
-            (n for n in prepared_nodes if all(nx.has_path(execution_graph, pit[0], n) for pit in parent_iterators)),
-            None,
-        )
-
-    def _get_next_node(self) -> Optional[BaseInvocation]:
-        """Gets the deepest node that is ready to be executed"""
-        g = self.execution_graph.nx_graph()
-
-        # Perform a topological sort using depth-first search
-        topo_order = list(nx.dfs_postorder_nodes(g))
-
-        # Get all IterateInvocation nodes
-        iterate_nodes = [n for n in topo_order if isinstance(self.execution_graph.nodes[n], IterateInvocation)]
-
-        # Sort the IterateInvocation nodes based on their index attribute
-        iterate_nodes.sort(key=lambda x: self.execution_graph.nodes[x].index)
+    def _get_next_node(self, accept: Optional[Callable[[BaseInvocation], bool]] = None) -> Optional[BaseInvocation]:
+        """Gets the next node that is ready to be executed, and is accepted if `accept` is provided"""
+        scheduler = self._get_scheduler()
 
-        # Prioritize IterateInvocation nodes and their children
-        for iterate_node in iterate_nodes:
-            if iterate_node not in self.executed and all((e[0] in self.executed for e in g.in_edges(iterate_node))):
-                return self.execution_graph.nodes[iterate_node]
-
-            # Check the children of the IterateInvocation node
-            for child_node in nx.dfs_postorder_nodes(g, iterate_node):
-                if child_node not in self.executed and all((e[0] in self.executed for e in g.in_edges(child_node))):
-                    return self.execution_graph.nodes[child_node]
-
-        # If no IterateInvocation node or its children are ready, return the first ready node in the topological order
-        for node in topo_order:
-            if node not in self.executed and all((e[0] in self.executed for e in g.in_edges(node))):
-                return self.execution_graph.nodes[node]
-
-        # If no node is found, return None
-        return None
+        # Nodes are only removed from the queue once executed or executing, so without `accept`, this returns the same
+        # node until it is completed
+        while scheduler.ready and (
+            scheduler.ready[0][1] in self.executed or scheduler.ready[0][1] in scheduler.executing
+        ):
+            heapq.heappop(scheduler.ready)
+
+        if accept is None:
+            return self.execution_graph.nodes[scheduler.ready[0][1]] if scheduler.ready else None
+
+        # Skip over the nodes that are not accepted, and put them back afterwards
+        skipped: list[tuple[tuple[Any, ...], str]] = []
+        next_node: Optional[BaseInvocation] = None
+        while scheduler.ready:
+            entry = heapq.heappop(scheduler.ready)
+            if entry[1] in self.executed or entry[1] in scheduler.executing:
+                continue
+            node = self.execution_graph.nodes[entry[1]]
+            if accept(node):
+                scheduler.executing.add(node.id)
+                next_node = node
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(scheduler.ready, entry)
+        return next_node
 
     def _prepare_inputs(self, node: BaseInvocation):
-        input_edges = [e for e in self.execution_graph.edges if e.destination.node_id == node.id]
+        input_edges = self._get_scheduler().input_edges[node.id]
         # Inputs must be deep-copied, else if a node mutates the object, other nodes that get the same input
         # will see the mutation.
         if isinstance(node, CollectInvocation):
@@ -1092,6 +1232,7 @@ class GraphExecutionState(BaseModel):
 
     def add_node(self, node: BaseInvocation) -> None:
         self.graph.add_node(node)
+        self._reset_scheduler()
 
     def update_node(self, node_id: str, new_node: BaseInvocation) -> None:
         if not self._is_node_updatable(node_id):
@@ -1099,6 +1240,7 @@ class GraphExecutionState(BaseModel):
                 f"Node {node_id} has already been prepared or executed and cannot be updated"
             )
         self.graph.update_node(node_id, new_node)
+        self._reset_scheduler()
 
     def delete_node(self, node_id: str) -> None:
         if not self._is_node_updatable(node_id):
@@ -1106,6 +1248,7 @@ class GraphExecutionState(BaseModel):
                 f"Node {node_id} has already been prepared or executed and cannot be deleted"
             )
         self.graph.delete_node(node_id)
+        self._reset_scheduler()
 
     def add_edge(self, edge: Edge) -> None:
         if not self._is_node_updatable(edge.destination.node_id):
@@ -1113,6 +1256,7 @@ class GraphExecutionState(BaseModel):
                 f"Destination node {edge.destination.node_id} has already been prepared or executed and cannot be linked to"
             )
         self.graph.add_edge(edge)
+        self._reset_scheduler()
 
     def delete_edge(self, edge: Edge) -> None:
         if not self._is_node_updatable(edge.destination.node_id):
@@ -1120,3 +1264,4 @@ class GraphExecutionState(BaseModel):
                 f"Destination node {edge.destination.node_id} has already been prepared or executed and cannot have a source edge deleted"
             )
         self.graph.delete_edge(edge)
+        self._reset_scheduler()
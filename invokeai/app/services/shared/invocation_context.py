@@ -15,8 +15,9 @@ from invokeai.app.services.image_records.image_records_common import ImageCatego
 from invokeai.app.services.images.images_common import ImageDTO
 from invokeai.app.services.invocation_services import InvocationServices
 from invokeai.app.services.model_records.model_records_base import UnknownModelException
-from invokeai.app.services.session_processor.session_processor_common import ProgressImage
-from invokeai.app.util.step_callback import flux_step_callback, stable_diffusion_step_callback
+from invokeai.app.services.session_processor.session_processor_common import CanceledException, ProgressImage
+from invokeai.app.util.progress_preview import ProgressPreviewThrottle, progress_preview_encoder
+from invokeai.app.util.step_callback import SignalProgressFunc, flux_step_callback, stable_diffusion_step_callback
 from invokeai.backend.model_manager.config import (
     AnyModel,
     AnyModelConfig,
@@ -557,6 +558,7 @@ class UtilInterface(InvocationContextInterface):
     ) -> None:
         super().__init__(services, data)
         self._is_canceled = is_canceled
+        self._preview_throttle: Optional[ProgressPreviewThrottle] = None
 
     def is_canceled(self) -> bool:
         """Checks if the current session has been canceled.
@@ -578,8 +580,13 @@ class UtilInterface(InvocationContextInterface):
             base_model: The base model for the current denoising step.
         """
 
+        if self.is_canceled():
+            raise CanceledException
+        if not self._should_send_preview(intermediate_state):
+            return
+
         stable_diffusion_step_callback(
-            signal_progress=self.signal_progress,
+            signal_progress=self._get_preview_signal(intermediate_state),
             intermediate_state=intermediate_state,
             base_model=base_model,
             is_canceled=self.is_canceled,
@@ -596,12 +603,74 @@ class UtilInterface(InvocationContextInterface):
             intermediate_state: The intermediate state of the diffusion pipeline.
         """
 
+        if self.is_canceled():
+            raise CanceledException
+        if not self._should_send_preview(intermediate_state):
+            return
+
         flux_step_callback(
-            signal_progress=self.signal_progress,
+            signal_progress=self._get_preview_signal(intermediate_state),
             intermediate_state=intermediate_state,
             is_canceled=self.is_canceled,
         )
 
+    def _should_send_preview(self, intermediate_state: PipelineIntermediateState) -> bool:
+        """Checks whether a progress preview should be made for a step.
+
+        Previews are skipped when no client is subscribed to the queue, and are limited to the configured rate. The
+        last steps are always previewed.
+        """
+        if not self._services.events.has_queue_subscribers(self._data.queue_item.queue_id):
+            return False
+        if self._preview_throttle is None:
+            self._preview_throttle = ProgressPreviewThrottle(self._services.configuration.progress_preview_max_rate)
+        return self._preview_throttle.should_send(force=self._is_last_step(intermediate_state))
+
+    @staticmethod
+    def _is_last_step(intermediate_state: PipelineIntermediateState) -> bool:
+        # Pipelines count steps from 0 or from 1, so the last step is either of the last two
+        return intermediate_state.step >= intermediate_state.total_steps - 1
+
+    def _get_preview_signal(self, intermediate_state: PipelineIntermediateState) -> SignalProgressFunc:
+        """Gets a progress signal function which downscales, encodes and emits the preview off the calling thread.
+
+        The previews of the last steps are emitted on the calling thread, so that they are emitted before the
+        invocation completes.
+        """
+        queue_item = self._data.queue_item
+        invocation = self._data.invocation
+        events = self._services.events
+        max_size = self._services.configuration.progress_preview_max_size
+        is_last_step = self._is_last_step(intermediate_state)
+
+        def signal_preview(
+            message: str,
+            percentage: float | None = None,
+            image: Image | None = None,
+            image_size: tuple[int, int] | None = None,
+        ) -> None:
+            def emit() -> None:
+                progress_image = None
+                if image is not None:
+                    size = image_size or image.size
+                    image.thumbnail((max_size, max_size))
+                    progress_image = ProgressImage.build(image, size)
+                events.emit_invocation_progress(
+                    queue_item=queue_item,
+                    invocation=invocation,
+                    message=message,
+                    percentage=percentage,
+                    image=progress_image,
+                )
+
+            key = (queue_item.item_id, invocation.id)
+            if is_last_step:
+                progress_preview_encoder.emit_now(key, emit)
+            else:
+                progress_preview_encoder.submit(key, emit)
+
+        return signal_preview
+
     def signal_progress(
         self,
         message: str,
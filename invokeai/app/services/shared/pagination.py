@@ -1,4 +1,4 @@
-from typing import Generic, TypeVar
+from typing import Generic, Optional, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -16,6 +16,20 @@ class CursorPaginatedResults(BaseModel, Generic[GenericBaseModel]):
     items: list[GenericBaseModel] = Field(..., description="Items")
 
 
+class KeysetPaginatedResults(BaseModel, Generic[GenericBaseModel]):
+    """
+    Keyset-paginated results, where each page is requested with the cursor returned by the previous page
+    Generic must be a Pydantic model
+    """
+
+    limit: int = Field(description="Limit of items to get")
+    total: int = Field(description="Total number of items in result")
+    next_cursor: Optional[str] = Field(
+        description="The cursor to get the next page with, or null if this is the last page"
+    )
+    items: list[GenericBaseModel] = Field(description="Items")
+
+
 class OffsetPaginatedResults(BaseModel, Generic[GenericBaseModel]):
     """
     Offset-paginated results
@@ -1,11 +1,142 @@
 import sqlite3
 import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
 from logging import Logger
 from pathlib import Path
+from queue import Empty, SimpleQueue
+from typing import Generator, Optional
 
 from invokeai.app.services.shared.sqlite.sqlite_common import sqlite_memory
 
 
+@dataclass
+class SqliteLockStats:
+    """How long a user of the database waited for it, in seconds."""
+
+    acquisitions: int = 0
+    """The number of times the write lock was acquired."""
+    wait_time: float = 0.0
+    """The total time spent waiting for the write lock."""
+    max_wait_time: float = 0.0
+    """The longest single wait for the write lock."""
+    hold_time: float = 0.0
+    """The total time the write lock was held."""
+    reads: int = 0
+    """The number of read connections taken from the pool."""
+    read_wait_time: float = 0.0
+    """The total time spent waiting for a free read connection."""
+
+
+class _WriteLock:
+    """A re-entrant lock which is granted to waiting threads in the order they asked for it.
+
+    Unlike `threading.RLock`, a thread that releases the lock cannot immediately take it back while others are waiting,
+    so a steady stream of writes from one service cannot starve another. Waits and holds are recorded per name.
+    """
+
+    def __init__(self, logger: Logger, slow_wait_threshold: float) -> None:
+        self._logger = logger
+        self._slow_wait_threshold = slow_wait_threshold
+        self._mutex = threading.Lock()
+        self._waiters: deque[tuple[int, threading.Lock]] = deque()
+        self._owner: Optional[int] = None
+        self._owner_name = ""
+        self._count = 0
+        self._acquired_at = 0.0
+        self._stats: dict[str, SqliteLockStats] = {}
+
+    def acquire(self, name: str) -> None:
+        thread_id = threading.get_ident()
+        start = time.perf_counter()
+        with self._mutex:
+            if self._owner == thread_id:
+                self._count += 1
+                return
+            if self._owner is None and not self._waiters:
+                self._take(thread_id, name, start)
+                return
+            waiter = threading.Lock()
+            waiter.acquire()
+            self._waiters.append((thread_id, waiter))
+
+        # The releasing thread hands the lock over to us directly, then releases the waiter
+        waiter.acquire()
+        wait_time = time.perf_counter() - start
+        with self._mutex:
+            self._take(thread_id, name, start)
+        if wait_time > self._slow_wait_threshold:
+            self._logger.debug(f"Waited {wait_time:.2f}s for the database lock ({name})")
+
+    def _take(self, thread_id: int, name: str, start: float) -> None:
+        """Records the acquisition of the lock. Must be called with the mutex held."""
+        now = time.perf_counter()
+        stats = self._get_stats(name)
+        stats.acquisitions += 1
+        stats.wait_time += now - start
+        stats.max_wait_time = max(stats.max_wait_time, now - start)
+        self._owner = thread_id
+        self._owner_name = name
+        self._count = 1
+        self._acquired_at = now
+
+    def release(self) -> None:
+        with self._mutex:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("Cannot release un-acquired lock")
+            self._count -= 1
+            if self._count > 0:
+                return
+            self._get_stats(self._owner_name).hold_time += time.perf_counter() - self._acquired_at
+            if self._waiters:
+                thread_id, waiter = self._waiters.popleft()
+                self._owner = thread_id
+                waiter.release()
+            else:
+                self._owner = None
+
+    def is_owned(self) -> bool:
+        return self._owner == threading.get_ident()
+
+    def record_read(self, name: str, wait_time: float) -> None:
+        with self._mutex:
+            stats = self._get_stats(name)
+            stats.reads += 1
+            stats.read_wait_time += wait_time
+
+    def get_stats(self) -> dict[str, SqliteLockStats]:
+        with self._mutex:
+            return {name: SqliteLockStats(**vars(stats)) for name, stats in self._stats.items()}
+
+    def _get_stats(self, name: str) -> SqliteLockStats:
+        if name not in self._stats:
+            self._stats[name] = SqliteLockStats()
+        return self._stats[name]
+
+
+class SqliteLock:
+    """The database's write lock, as used by one service. Waits for the lock are attributed to the service's name."""
+
+    def __init__(self, lock: _WriteLock, name: str) -> None:
+        self._lock = lock
+        self.name = name
+
+    def acquire(self) -> bool:
+        self._lock.acquire(self.name)
+        return True
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *args: object) -> None:
+        self.release()
+
+
 class SqliteDatabase:
     """
     Manages a connection to an SQLite database.
@@ -13,19 +144,26 @@ class SqliteDatabase:
     :param db_path: Path to the database file. If None, an in-memory database is used.
     :param logger: Logger to use for logging.
     :param verbose: Whether to log SQL statements. Provides `logger.debug` as the SQLite trace callback.
+    :param read_pool_size: The maximum number of connections used for reads. Ignored for in-memory databases.
 
     This is a light wrapper around the `sqlite3` module, providing a few conveniences:
     - The database file is written to disk if it does not exist.
     - Foreign key constraints are enabled by default.
     - The connection is configured to use the `sqlite3.Row` row factory.
+    - File databases use WAL mode, so reads do not wait for writes, or writes for reads.
 
     In addition to the constructor args, the instance provides the following attributes and methods:
-    - `conn`: A `sqlite3.Connection` object. Note that the connection must never be closed if the database is in-memory.
-    - `lock`: A shared re-entrant lock, used to approximate thread safety.
+    - `conn`: A `sqlite3.Connection` object, which is the only connection used for writes. Note that the connection
+      must never be closed if the database is in-memory.
+    - `lock`: A shared re-entrant lock, which must be held while using `conn`. Waiting threads are granted the lock in
+      the order they asked for it.
+    - `get_lock(name)`: The shared lock, with waits for it attributed to `name` in the lock stats.
+    - `read_connection(name)`: A context manager providing a read-only connection from a pool.
+    - `get_lock_stats()`: How long each user of the database has waited for it.
     - `clean()`: Runs the SQL `VACUUM;` command and reports on the freed space.
     """
 
-    def __init__(self, db_path: Path | None, logger: Logger, verbose: bool = False) -> None:
+    def __init__(self, db_path: Path | None, logger: Logger, verbose: bool = False, read_pool_size: int = 4) -> None:
         """Initializes the database. This is used internally by the class constructor."""
         self.logger = logger
         self.db_path = db_path
@@ -38,7 +176,8 @@ class SqliteDatabase:
             self.logger.info(f"Initializing database at {self.db_path}")
 
         self.conn = sqlite3.connect(database=self.db_path or sqlite_memory, check_same_thread=False)
-        self.lock = threading.RLock()
+        self._write_lock = _WriteLock(logger=logger, slow_wait_threshold=1.0)
+        self.lock = SqliteLock(self._write_lock, "default")
         self.conn.row_factory = sqlite3.Row
 
         if self.verbose:
@@ -46,6 +185,67 @@ class SqliteDatabase:
 
         self.conn.execute("PRAGMA foreign_keys = ON;")
 
+        if self.db_path:
+            self.conn.execute("PRAGMA journal_mode = WAL;")
+            # In WAL mode, this is safe from corruption, but the last transactions may be lost on a power failure
+            self.conn.execute("PRAGMA synchronous = NORMAL;")
+
+        self._read_pool_size = read_pool_size if self.db_path else 0
+        self._read_pool: SimpleQueue[sqlite3.Connection] = SimpleQueue()
+        self._read_pool_lock = threading.Lock()
+        self._read_conn_count = 0
+
+    def get_lock(self, name: str) -> SqliteLock:
+        """Gets the shared lock, attributing waits for it to the given name."""
+        return SqliteLock(self._write_lock, name)
+
+    def get_lock_stats(self) -> dict[str, SqliteLockStats]:
+        """Gets the lock stats for each name the lock has been used with."""
+        return self._write_lock.get_stats()
+
+    @contextmanager
+    def read_connection(self, name: str = "default") -> Generator[sqlite3.Connection, None, None]:
+        """Provides a connection for reads, which sees a consistent snapshot of the database while in use.
+
+        Reads on these connections do not wait for the write lock. An in-memory database cannot be shared between
+        connections, so for those, and for a thread already holding the write lock (which must see its own uncommitted
+        changes), this holds the write lock and provides the write connection.
+        """
+        if not self._read_pool_size or self._write_lock.is_owned():
+            with self.get_lock(name):
+                yield self.conn
+            return
+
+        start = time.perf_counter()
+        conn = self._take_read_connection()
+        self._write_lock.record_read(name, time.perf_counter() - start)
+        try:
+            conn.execute("BEGIN;")
+            yield conn
+        finally:
+            conn.rollback()
+            self._read_pool.put(conn)
+
+    def _take_read_connection(self) -> sqlite3.Connection:
+        try:
+            return self._read_pool.get_nowait()
+        except Empty:
+            pass
+        with self._read_pool_lock:
+            if self._read_conn_count < self._read_pool_size:
+                self._read_conn_count += 1
+                return self._open_read_connection()
+        return self._read_pool.get()
+
+    def _open_read_connection(self) -> sqlite3.Connection:
+        assert self.db_path is not None
+        conn = sqlite3.connect(database=self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if self.verbose:
+            conn.set_trace_callback(self.logger.debug)
+        conn.execute("PRAGMA query_only = ON;")
+        return conn
+
     def clean(self) -> None:
         """
         Cleans the database by running the VACUUM command, reporting on the freed space.
@@ -58,6 +258,8 @@ class SqliteDatabase:
                 initial_db_size = Path(self.db_path).stat().st_size
                 self.conn.execute("VACUUM;")
                 self.conn.commit()
+                # In WAL mode, the vacuumed database is in the WAL until it is checkpointed
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
                 final_db_size = Path(self.db_path).stat().st_size
                 freed_space_in_mb = round((initial_db_size - final_db_size) / 1024 / 1024, 2)
                 if freed_space_in_mb > 0:
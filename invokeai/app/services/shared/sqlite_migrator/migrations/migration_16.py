@@ -0,0 +1,115 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+# The text indexed for an image's prompts
+_PROMPTS_SQL = """
+CASE WHEN json_valid({metadata}) THEN
+    COALESCE(json_extract({metadata}, '$.positive_prompt'), '') || ' ' ||
+    COALESCE(json_extract({metadata}, '$.negative_prompt'), '')
+END
+"""
+
+
+class Migration16Callback:
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        self._add_images_pagination_index(cursor)
+        self._create_images_fts(cursor)
+
+    def _add_images_pagination_index(self, cursor: sqlite3.Cursor) -> None:
+        """Adds an index matching the gallery's sort order, so pages can be found by cursor without a sort."""
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_images_starred_created_at_image_name ON images(starred, created_at, image_name);"
+        )
+
+    def _create_images_fts(self, cursor: sqlite3.Cursor) -> None:
+        """Creates a full-text search index over image metadata, kept in sync with the `images` table by triggers.
+
+        FTS5 rows are keyed by integer rowids, but the `images` table's implicit rowids may change on VACUUM, so
+        `images_fts_ids` assigns each image a stable id. If this build of SQLite lacks FTS5, searches fall back to
+        scanning the metadata.
+        """
+        cursor.execute("PRAGMA compile_options;")
+        if "ENABLE_FTS5" not in {row[0] for row in cursor.fetchall()}:
+            return
+
+        tables = [
+            """--sql
+            CREATE TABLE IF NOT EXISTS images_fts_ids (
+                id INTEGER PRIMARY KEY,
+                image_name TEXT NOT NULL UNIQUE
+            );
+            """,
+            """--sql
+            CREATE VIRTUAL TABLE IF NOT EXISTS images_fts USING fts5(prompts, metadata);
+            """,
+        ]
+
+        new_prompts = _PROMPTS_SQL.format(metadata="new.metadata")
+        triggers = [
+            f"""--sql
+            CREATE TRIGGER IF NOT EXISTS tg_images_fts_insert
+            AFTER INSERT ON images FOR EACH ROW
+            BEGIN
+                INSERT INTO images_fts_ids (image_name) VALUES (new.image_name);
+                INSERT INTO images_fts (rowid, prompts, metadata)
+                VALUES (
+                    (SELECT id FROM images_fts_ids WHERE image_name = new.image_name),
+                    {new_prompts},
+                    new.metadata
+                );
+            END;
+            """,
+            f"""--sql
+            CREATE TRIGGER IF NOT EXISTS tg_images_fts_update
+            AFTER UPDATE OF metadata ON images FOR EACH ROW
+            BEGIN
+                DELETE FROM images_fts WHERE rowid = (SELECT id FROM images_fts_ids WHERE image_name = old.image_name);
+                INSERT INTO images_fts (rowid, prompts, metadata)
+                VALUES (
+                    (SELECT id FROM images_fts_ids WHERE image_name = new.image_name),
+                    {new_prompts},
+                    new.metadata
+                );
+            END;
+            """,
+            """--sql
+            CREATE TRIGGER IF NOT EXISTS tg_images_fts_delete
+            AFTER DELETE ON images FOR EACH ROW
+            BEGIN
+                DELETE FROM images_fts WHERE rowid = (SELECT id FROM images_fts_ids WHERE image_name = old.image_name);
+                DELETE FROM images_fts_ids WHERE image_name = old.image_name;
+            END;
+            """,
+        ]
+
+        for stmt in tables + triggers:
+            cursor.execute(stmt)
+
+        # Index the existing images
+        cursor.execute("INSERT OR IGNORE INTO images_fts_ids (image_name) SELECT image_name FROM images;")
+        cursor.execute(
+            f"""--sql
+            INSERT INTO images_fts (rowid, prompts, metadata)
+            SELECT images_fts_ids.id, {_PROMPTS_SQL.format(metadata="images.metadata")}, images.metadata
+            FROM images
+            JOIN images_fts_ids ON images_fts_ids.image_name = images.image_name;
+            """
+        )
+
+
+def build_migration_16() -> Migration:
+    """
+    Build the migration from database version 15 to 16.
+
+    This migration does the following:
+        - Adds an index on `images` for cursor-based pagination.
+        - Creates the `images_fts` full-text search index over image metadata, and the triggers that maintain it.
+    """
+    migration_16 = Migration(
+        from_version=15,
+        to_version=16,
+        callback=Migration16Callback(),
+    )
+
+    return migration_16
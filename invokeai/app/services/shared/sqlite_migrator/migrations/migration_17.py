@@ -0,0 +1,164 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+_SESSION_QUEUE_COLUMNS = [
+    "item_id",
+    "batch_id",
+    "queue_id",
+    "session_id",
+    "field_values",
+    "session",
+    "status",
+    "priority",
+    "error_traceback",
+    "created_at",
+    "updated_at",
+    "started_at",
+    "completed_at",
+    "workflow",
+    "error_type",
+    "error_message",
+    "origin",
+    "destination",
+]
+
+
+class Migration17Callback:
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        self._create_session_queue_graphs(cursor)
+        self._rebuild_session_queue(cursor)
+
+    def _create_session_queue_graphs(self, cursor: sqlite3.Cursor) -> None:
+        """Creates the `session_queue_graphs` table, which stores the graph of a batch once for all of its queue items."""
+        cursor.execute(
+            """--sql
+            CREATE TABLE IF NOT EXISTS session_queue_graphs (
+                graph_id INTEGER PRIMARY KEY,
+                graph TEXT NOT NULL, -- the graph shared by the queue items, before their field values are applied
+                workflow TEXT -- the workflow shared by the queue items, if any
+            );
+            """
+        )
+
+    def _rebuild_session_queue(self, cursor: sqlite3.Cursor) -> None:
+        """Makes the `session` column of `session_queue` nullable, and adds the `graph_id` column.
+
+        SQLite cannot drop a NOT NULL constraint, so the table is rebuilt, and its indices and triggers recreated.
+        """
+        cursor.execute(
+            """--sql
+            CREATE TABLE session_queue_new (
+                item_id INTEGER PRIMARY KEY AUTOINCREMENT, -- used for ordering, cursor pagination
+                batch_id TEXT NOT NULL, -- identifier of the batch this queue item belongs to
+                queue_id TEXT NOT NULL, -- identifier of the queue this queue item belongs to
+                session_id TEXT NOT NULL UNIQUE, -- duplicated data from the session column, for ease of access
+                field_values TEXT, -- NULL if no values are associated with this queue item
+                session TEXT, -- the session to be executed, NULL until it is first saved if built from graph_id
+                status TEXT NOT NULL DEFAULT 'pending', -- the status of the queue item, one of 'pending', 'in_progress', 'completed', 'failed', 'canceled'
+                priority INTEGER NOT NULL DEFAULT 0, -- the priority, higher is more important
+                error_traceback TEXT, -- any errors associated with this queue item
+                created_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
+                updated_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')), -- updated via trigger
+                started_at DATETIME, -- updated via trigger
+                completed_at DATETIME, -- updated via trigger, completed items are cleaned up on application startup
+                workflow TEXT, -- NULL if there is no workflow, or if it is shared via graph_id
+                error_type TEXT,
+                error_message TEXT,
+                origin TEXT,
+                destination TEXT,
+                graph_id INTEGER -- the graph in session_queue_graphs the session is built from, while session is NULL
+            );
+            """
+        )
+
+        columns = ", ".join(_SESSION_QUEUE_COLUMNS)
+        cursor.execute(f"INSERT INTO session_queue_new ({columns}) SELECT {columns} FROM session_queue;")
+
+        # Item ids must not be reused, so keep the AUTOINCREMENT sequence
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'session_queue';")
+        row = cursor.fetchone()
+        cursor.execute("DROP TABLE session_queue;")
+        cursor.execute("ALTER TABLE session_queue_new RENAME TO session_queue;")
+        if row is not None:
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'session_queue';")
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('session_queue', ?);", (row[0],))
+
+        indices = [
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_session_queue_item_id ON session_queue(item_id);",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_session_queue_session_id ON session_queue(session_id);",
+            "CREATE INDEX IF NOT EXISTS idx_session_queue_batch_id ON session_queue(batch_id);",
+            "CREATE INDEX IF NOT EXISTS idx_session_queue_created_priority ON session_queue(priority);",
+            "CREATE INDEX IF NOT EXISTS idx_session_queue_created_status ON session_queue(status);",
+            "CREATE INDEX IF NOT EXISTS idx_session_queue_graph_id ON session_queue(graph_id);",
+        ]
+
+        triggers = [
+            """--sql
+            CREATE TRIGGER IF NOT EXISTS tg_session_queue_completed_at
+            AFTER UPDATE OF status ON session_queue
+            FOR EACH ROW
+            WHEN
+            NEW.status = 'completed'
+            OR NEW.status = 'failed'
+            OR NEW.status = 'canceled'
+            BEGIN
+            UPDATE session_queue
+            SET completed_at = STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')
+            WHERE item_id = NEW.item_id;
+            END;
+            """,
+            """--sql
+            CREATE TRIGGER IF NOT EXISTS tg_session_queue_started_at
+            AFTER UPDATE OF status ON session_queue
+            FOR EACH ROW
+            WHEN
+            NEW.status = 'in_progress'
+            BEGIN
+            UPDATE session_queue
+            SET started_at = STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')
+            WHERE item_id = NEW.item_id;
+            END;
+            """,
+            """--sql
+            CREATE TRIGGER IF NOT EXISTS tg_session_queue_updated_at
+            AFTER UPDATE
+            ON session_queue FOR EACH ROW
+            BEGIN
+                UPDATE session_queue
+                SET updated_at = STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')
+                WHERE item_id = old.item_id;
+            END;
+            """,
+            """--sql
+            CREATE TRIGGER IF NOT EXISTS tg_session_queue_graphs_delete
+            AFTER DELETE ON session_queue FOR EACH ROW
+            WHEN old.graph_id IS NOT NULL
+            BEGIN
+                DELETE FROM session_queue_graphs
+                WHERE graph_id = old.graph_id
+                AND NOT EXISTS (SELECT 1 FROM session_queue WHERE graph_id = old.graph_id);
+            END;
+            """,
+        ]
+
+        for stmt in indices + triggers:
+            cursor.execute(stmt)
+
+
+def build_migration_17() -> Migration:
+    """
+    Build the migration from database version 16 to 17.
+
+    This migration does the following:
+        - Creates the `session_queue_graphs` table, so a batch's graph is stored once for all of its queue items.
+        - Makes the `session` column of `session_queue` nullable, and adds the `graph_id` column. A queue item's
+          session is built from its graph and field values when it is needed.
+    """
+    migration_17 = Migration(
+        from_version=16,
+        to_version=17,
+        callback=Migration17Callback(),
+    )
+
+    return migration_17
@@ -0,0 +1,31 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+
+class Migration18Callback:
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        self._add_session_queue_dequeue_index(cursor)
+
+    def _add_session_queue_dequeue_index(self, cursor: sqlite3.Cursor) -> None:
+        """Adds an index matching the order in which queue items are dequeued, so the next pending item is found
+        without a sort. The item id is the rowid, so the index covers the lookup."""
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_session_queue_status_priority_item_id ON session_queue(status, priority DESC, item_id);"
+        )
+
+
+def build_migration_18() -> Migration:
+    """
+    Build the migration from database version 17 to 18.
+
+    This migration does the following:
+        - Adds an index on `session_queue` for finding the next pending queue item.
+    """
+    migration_18 = Migration(
+        from_version=17,
+        to_version=18,
+        callback=Migration18Callback(),
+    )
+
+    return migration_18
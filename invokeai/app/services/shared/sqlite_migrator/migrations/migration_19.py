@@ -0,0 +1,41 @@
+import sqlite3
+
+from invokeai.app.services.shared.sqlite_migrator.sqlite_migrator_common import Migration
+
+
+class Migration19Callback:
+    def __call__(self, cursor: sqlite3.Cursor) -> None:
+        self._create_model_file_hashes(cursor)
+
+    def _create_model_file_hashes(self, cursor: sqlite3.Cursor) -> None:
+        """Creates the `model_file_hashes` table, which caches the hashes of model files by their stat signature."""
+        cursor.execute(
+            """--sql
+            CREATE TABLE IF NOT EXISTS model_file_hashes (
+                path TEXT NOT NULL, -- the resolved path of the file
+                algorithm TEXT NOT NULL, -- the hashing algorithm
+                size INTEGER NOT NULL, -- the size of the file when it was hashed
+                mtime_ns INTEGER NOT NULL, -- the modification time of the file when it was hashed
+                inode INTEGER NOT NULL, -- the inode of the file when it was hashed
+                hash TEXT NOT NULL, -- the hexdigest of the file
+                updated_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
+                PRIMARY KEY (path, algorithm)
+            );
+            """
+        )
+
+
+def build_migration_19() -> Migration:
+    """
+    Build the migration from database version 18 to 19.
+
+    This migration does the following:
+        - Creates the `model_file_hashes` table, so unchanged model files are not hashed again.
+    """
+    migration_19 = Migration(
+        from_version=18,
+        to_version=19,
+        callback=Migration19Callback(),
+    )
+
+    return migration_19
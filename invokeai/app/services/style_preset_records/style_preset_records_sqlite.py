@@ -17,7 +17,8 @@ from invokeai.app.util.misc import uuid_string
 class SqliteStylePresetRecordsStorage(StylePresetRecordsStorageBase):
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
-        self._lock = db.lock
+        self._db = db
+        self._lock = db.get_lock("style_preset_records")
         self._conn = db.conn
         self._cursor = self._conn.cursor()
 
@@ -27,9 +28,9 @@ class SqliteStylePresetRecordsStorage(StylePresetRecordsStorageBase):
 
     def get(self, style_preset_id: str) -> StylePresetRecordDTO:
         """Gets a style preset by ID."""
-        try:
-            self._lock.acquire()
-            self._cursor.execute(
+        with self._db.read_connection("style_preset_records") as conn:
+            cursor = conn.cursor()
+            cursor.execute(
                 """--sql
                 SELECT *
                 FROM style_presets
@@ -37,15 +38,10 @@ class SqliteStylePresetRecordsStorage(StylePresetRecordsStorageBase):
                 """,
                 (style_preset_id,),
             )
-            row = self._cursor.fetchone()
+            row = cursor.fetchone()
             if row is None:
                 raise StylePresetNotFoundError(f"Style preset with id {style_preset_id} not found")
             return StylePresetRecordDTO.from_dict(dict(row))
-        except Exception:
-            self._conn.rollback()
-            raise
-        finally:
-            self._lock.release()
 
     def create(self, style_preset: StylePresetWithoutId) -> StylePresetRecordDTO:
         style_preset_id = uuid_string()
@@ -161,8 +157,8 @@ class SqliteStylePresetRecordsStorage(StylePresetRecordsStorageBase):
         return None
 
     def get_many(self, type: PresetType | None = None) -> list[StylePresetRecordDTO]:
-        try:
-            self._lock.acquire()
+        with self._db.read_connection("style_preset_records") as conn:
+            cursor = conn.cursor()
             main_query = """
                 SELECT
                     *
@@ -175,19 +171,14 @@ class SqliteStylePresetRecordsStorage(StylePresetRecordsStorageBase):
             main_query += "ORDER BY LOWER(name) ASC"
 
             if type is not None:
-                self._cursor.execute(main_query, (type,))
+                cursor.execute(main_query, (type,))
             else:
-                self._cursor.execute(main_query)
+                cursor.execute(main_query)
 
-            rows = self._cursor.fetchall()
+            rows = cursor.fetchall()
             style_presets = [StylePresetRecordDTO.from_dict(dict(row)) for row in rows]
 
             return style_presets
-        except Exception:
-            self._conn.rollback()
-            raise
-        finally:
-            self._lock.release()
 
     def _sync_default_style_presets(self) -> None:
         """Syncs default style presets to the database. Internal use only."""
@@ -23,7 +23,8 @@ from invokeai.app.util.misc import uuid_string
 class SqliteWorkflowRecordsStorage(WorkflowRecordsStorageBase):
     def __init__(self, db: SqliteDatabase) -> None:
         super().__init__()
-        self._lock = db.lock
+        self._db = db
+        self._lock = db.get_lock("workflow_records")
         self._conn = db.conn
         self._cursor = self._conn.cursor()
 
@@ -132,8 +133,8 @@ class SqliteWorkflowRecordsStorage(WorkflowRecordsStorageBase):
         per_page: Optional[int] = None,
         query: Optional[str] = None,
     ) -> PaginatedResults[WorkflowRecordListItemDTO]:
-        try:
-            self._lock.acquire()
+        with self._db.read_connection("workflow_records") as conn:
+            cursor = conn.cursor()
             # sanitize!
             assert order_by in WorkflowRecordOrderBy
             assert direction in SQLiteDirection
@@ -168,12 +169,12 @@ class SqliteWorkflowRecordsStorage(WorkflowRecordsStorageBase):
                 main_query += " LIMIT ? OFFSET ?"
                 main_params.extend([per_page, page * per_page])
 
-            self._cursor.execute(main_query, main_params)
-            rows = self._cursor.fetchall()
+            cursor.execute(main_query, main_params)
+            rows = cursor.fetchall()
             workflows = [WorkflowRecordListItemDTOValidator.validate_python(dict(row)) for row in rows]
 
-            self._cursor.execute(count_query, count_params)
-            total = self._cursor.fetchone()[0]
+            cursor.execute(count_query, count_params)
+            total = cursor.fetchone()[0]
 
             if per_page:
                 pages = total // per_page + (total % per_page > 0)
@@ -187,11 +188,6 @@ class SqliteWorkflowRecordsStorage(WorkflowRecordsStorageBase):
                 pages=pages,
                 total=total,
             )
-        except Exception:
-            self._conn.rollback()
-            raise
-        finally:
-            self._lock.release()
 
     def _sync_default_workflows(self) -> None:
         """Syncs default workflows to the database. Internal use only."""
@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Optional
+
+from invokeai.backend.util.logging import InvokeAILogger
+
+
+class ProgressPreviewThrottle:
+    """Limits how often an invocation sends progress previews.
+
+    Args:
+        max_rate: The maximum number of previews per second. If 0, every preview is sent.
+    """
+
+    def __init__(self, max_rate: float) -> None:
+        self._min_interval = 1 / max_rate if max_rate > 0 else 0.0
+        self._last_sent: Optional[float] = None
+
+    def should_send(self, force: bool = False) -> bool:
+        """Checks whether a preview should be sent now, and if so, records it as sent.
+
+        Args:
+            force: Send the preview regardless of the rate, e.g. for the final step.
+        """
+        now = time.monotonic()
+        if not force and self._last_sent is not None and now - self._last_sent < self._min_interval:
+            return False
+        self._last_sent = now
+        return True
+
+
+class ProgressPreviewEncoder:
+    """Encodes and emits progress previews on a background thread, so that denoising does not wait for them.
+
+    Only the latest preview of each key (e.g. an invocation) is kept. When previews are produced faster than they are
+    encoded, older ones are dropped instead of queueing up.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="progress_preview")
+        # Held while a preview is emitted, so that previews of a key are emitted in order
+        self._emit_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending: dict[Hashable, Callable[[], None]] = {}
+        self._scheduled = False
+
+    def submit(self, key: Hashable, emit: Callable[[], None]) -> None:
+        """Emits a preview on the background thread, replacing the key's pending preview if there is one.
+
+        Args:
+            key: The key of the preview
+            emit: Encodes and emits the preview
+        """
+        with self._lock:
+            self._pending[key] = emit
+            if not self._scheduled:
+                self._scheduled = True
+                self._executor.submit(self._run)
+
+    def emit_now(self, key: Hashable, emit: Callable[[], None]) -> None:
+        """Emits a preview on the calling thread, dropping the key's pending preview.
+
+        The preview is emitted after any preview that is already being emitted, so a stale preview never follows it.
+
+        Args:
+            key: The key of the preview
+            emit: Encodes and emits the preview
+        """
+        with self._lock:
+            self._pending.pop(key, None)
+        with self._emit_lock:
+            emit()
+
+    def _run(self) -> None:
+        while True:
+            with self._emit_lock:
+                with self._lock:
+                    if not self._pending:
+                        self._scheduled = False
+                        return
+                    key = next(iter(self._pending))
+                    emit = self._pending.pop(key)
+                try:
+                    emit()
+                except Exception as e:
+                    InvokeAILogger.get_logger().warning(f"Failed to emit progress preview: {e}")
+
+
+progress_preview_encoder = ProgressPreviewEncoder()
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from math import floor
 from typing import Callable, Optional, TypeAlias
 
@@ -73,6 +74,21 @@ FLUX_LATENT_RGB_FACTORS = [
 ]
 
 
+_PREVIEW_MATRICES = {
+    "sdxl": SDXL_LATENT_RGB_FACTORS,
+    "sdxl_smooth": SDXL_SMOOTH_MATRIX,
+    "sd1_5": SD1_5_LATENT_RGB_FACTORS,
+    "sd3_5": SD3_5_LATENT_RGB_FACTORS,
+    "flux": FLUX_LATENT_RGB_FACTORS,
+}
+
+
+@lru_cache(maxsize=32)
+def get_preview_matrix(name: str, device: torch.device, dtype: torch.dtype) -> torch.Tensor:
+    """Gets a latent preview matrix as a tensor, which is cached for each device and dtype."""
+    return torch.tensor(_PREVIEW_MATRICES[name], dtype=dtype, device=device)
+
+
 def sample_to_lowres_estimated_image(
     samples: torch.Tensor, latent_rgb_factors: torch.Tensor, smooth_matrix: Optional[torch.Tensor] = None
 ):
@@ -126,14 +142,14 @@ def stable_diffusion_step_callback(
         sample = intermediate_state.latents
 
     if base_model in [BaseModelType.StableDiffusionXL, BaseModelType.StableDiffusionXLRefiner]:
-        sdxl_latent_rgb_factors = torch.tensor(SDXL_LATENT_RGB_FACTORS, dtype=sample.dtype, device=sample.device)
-        sdxl_smooth_matrix = torch.tensor(SDXL_SMOOTH_MATRIX, dtype=sample.dtype, device=sample.device)
+        sdxl_latent_rgb_factors = get_preview_matrix("sdxl", sample.device, sample.dtype)
+        sdxl_smooth_matrix = get_preview_matrix("sdxl_smooth", sample.device, sample.dtype)
         image = sample_to_lowres_estimated_image(sample, sdxl_latent_rgb_factors, sdxl_smooth_matrix)
     elif base_model == BaseModelType.StableDiffusion3:
-        sd3_latent_rgb_factors = torch.tensor(SD3_5_LATENT_RGB_FACTORS, dtype=sample.dtype, device=sample.device)
+        sd3_latent_rgb_factors = get_preview_matrix("sd3_5", sample.device, sample.dtype)
         image = sample_to_lowres_estimated_image(sample, sd3_latent_rgb_factors)
     else:
-        v1_5_latent_rgb_factors = torch.tensor(SD1_5_LATENT_RGB_FACTORS, dtype=sample.dtype, device=sample.device)
+        v1_5_latent_rgb_factors = get_preview_matrix("sd1_5", sample.device, sample.dtype)
         image = sample_to_lowres_estimated_image(sample, v1_5_latent_rgb_factors)
 
     width = image.width * 8
@@ -151,13 +167,12 @@ def flux_step_callback(
     if is_canceled():
         raise CanceledException
     sample = intermediate_state.latents
-    latent_rgb_factors = torch.tensor(FLUX_LATENT_RGB_FACTORS, dtype=sample.dtype, device=sample.device)
-    latent_image_perm = sample.permute(1, 2, 0).to(dtype=sample.dtype, device=sample.device)
-    latent_image = latent_image_perm @ latent_rgb_factors
+    latent_rgb_factors = get_preview_matrix("flux", sample.device, sample.dtype)
+    latent_image = sample.permute(1, 2, 0) @ latent_rgb_factors
     latents_ubyte = (
         ((latent_image + 1) / 2).clamp(0, 1).mul(0xFF)  # change scale from -1..1 to 0..1  # to 0..255
     ).to(device="cpu", dtype=torch.uint8)
-    image = Image.fromarray(latents_ubyte.cpu().numpy())
+    image = Image.fromarray(latents_ubyte.numpy())
 
     width = image.width * 8
     height = image.height * 8
@@ -1,6 +1,7 @@
 import einops
 import torch
 
+from invokeai.backend.flux.extensions.batched_cfg_extension import BatchedCFGIPAdapterExtension
 from invokeai.backend.flux.extensions.regional_prompting_extension import RegionalPromptingExtension
 from invokeai.backend.flux.extensions.xlabs_ip_adapter_extension import XLabsIPAdapterExtension
 from invokeai.backend.flux.math import attention
@@ -68,7 +69,7 @@ class CustomDoubleStreamBlockProcessor:
         txt: torch.Tensor,
         vec: torch.Tensor,
         pe: torch.Tensor,
-        ip_adapter_extensions: list[XLabsIPAdapterExtension],
+        ip_adapter_extensions: list[XLabsIPAdapterExtension] | list[BatchedCFGIPAdapterExtension],
         regional_prompting_extension: RegionalPromptingExtension,
     ) -> tuple[torch.Tensor, torch.Tensor]:
         """A custom implementation of DoubleStreamBlock.forward() with additional features:
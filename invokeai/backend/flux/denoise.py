@@ -5,6 +5,10 @@ import torch
 from tqdm import tqdm
 
 from invokeai.backend.flux.controlnet.controlnet_flux_output import ControlNetFluxOutput, sum_controlnet_flux_outputs
+from invokeai.backend.flux.extensions.batched_cfg_extension import (
+    BatchedCFGIPAdapterExtension,
+    BatchedCFGRegionalPromptingExtension,
+)
 from invokeai.backend.flux.extensions.inpaint_extension import InpaintExtension
 from invokeai.backend.flux.extensions.instantx_controlnet_extension import InstantXControlNetExtension
 from invokeai.backend.flux.extensions.regional_prompting_extension import RegionalPromptingExtension
@@ -32,6 +36,8 @@ def denoise(
     neg_ip_adapter_extensions: list[XLabsIPAdapterExtension],
     # extra img tokens
     img_cond: torch.Tensor | None,
+    # run the positive and negative predictions in a single batch. If None, this is chosen from the working memory
+    batch_cfg: bool | None = None,
 ):
     # step 0 is the initial state
     total_steps = len(timesteps) - 1
@@ -46,6 +52,24 @@ def denoise(
     )
     # guidance_vec is ignored for schnell.
     guidance_vec = torch.full((img.shape[0],), guidance, device=img.device, dtype=img.dtype)
+
+    batched_regional_prompting_extension: BatchedCFGRegionalPromptingExtension | None = None
+    batched_ip_adapter_extensions: list[BatchedCFGIPAdapterExtension] = []
+    uses_cfg = any(not math.isclose(step_cfg_scale, 1.0) for step_cfg_scale in cfg_scale)
+    if uses_cfg and neg_regional_prompting_extension is not None:
+        if batch_cfg is None:
+            batch_cfg = can_batch_cfg(
+                model, img, pos_regional_prompting_extension, neg_regional_prompting_extension, img_cond
+            )
+        if batch_cfg:
+            batched_regional_prompting_extension = BatchedCFGRegionalPromptingExtension(
+                pos_regional_prompting_extension, neg_regional_prompting_extension, img_seq_len=img.shape[1]
+            )
+            if pos_ip_adapter_extensions or neg_ip_adapter_extensions:
+                batched_ip_adapter_extensions = [
+                    BatchedCFGIPAdapterExtension(pos_ip_adapter_extensions, neg_ip_adapter_extensions)
+                ]
+
     for step_index, (t_curr, t_prev) in tqdm(list(enumerate(zip(timesteps[:-1], timesteps[1:], strict=True)))):
         t_vec = torch.full((img.shape[0],), t_curr, dtype=img.dtype, device=img.device)
 
@@ -72,47 +96,70 @@ def denoise(
         # tensors. Calculating the sum materializes each tensor into its own instance.
         merged_controlnet_residuals = sum_controlnet_flux_outputs(controlnet_residuals)
         pred_img = torch.cat((img, img_cond), dim=-1) if img_cond is not None else img
-        pred = model(
-            img=pred_img,
-            img_ids=img_ids,
-            txt=pos_regional_prompting_extension.regional_text_conditioning.t5_embeddings,
-            txt_ids=pos_regional_prompting_extension.regional_text_conditioning.t5_txt_ids,
-            y=pos_regional_prompting_extension.regional_text_conditioning.clip_embeddings,
-            timesteps=t_vec,
-            guidance=guidance_vec,
-            timestep_index=step_index,
-            total_num_timesteps=total_steps,
-            controlnet_double_block_residuals=merged_controlnet_residuals.double_block_residuals,
-            controlnet_single_block_residuals=merged_controlnet_residuals.single_block_residuals,
-            ip_adapter_extensions=pos_ip_adapter_extensions,
-            regional_prompting_extension=pos_regional_prompting_extension,
-        )
 
         step_cfg_scale = cfg_scale[step_index]
 
         # If step_cfg_scale, is 1.0, then we don't need to run the negative prediction.
-        if not math.isclose(step_cfg_scale, 1.0):
-            # TODO(ryand): Add option to run positive and negative predictions in a single batch for better performance
-            # on systems with sufficient VRAM.
-
-            if neg_regional_prompting_extension is None:
-                raise ValueError("Negative text conditioning is required when cfg_scale is not 1.0.")
+        do_cfg = not math.isclose(step_cfg_scale, 1.0)
+        if do_cfg and neg_regional_prompting_extension is None:
+            raise ValueError("Negative text conditioning is required when cfg_scale is not 1.0.")
 
-            neg_pred = model(
-                img=img,
+        neg_pred: torch.Tensor | None = None
+        if do_cfg and batched_regional_prompting_extension is not None:
+            # Run the positive and negative predictions in a single batch. The ControlNet residuals only apply to the
+            # positive half of the batch.
+            batched_text_conditioning = batched_regional_prompting_extension.regional_text_conditioning
+            pred, neg_pred = model(
+                img=torch.cat((pred_img, pred_img)),
+                img_ids=torch.cat((img_ids, img_ids)),
+                txt=batched_text_conditioning.t5_embeddings,
+                txt_ids=batched_text_conditioning.t5_txt_ids,
+                y=batched_text_conditioning.clip_embeddings,
+                timesteps=torch.cat((t_vec, t_vec)),
+                guidance=torch.cat((guidance_vec, guidance_vec)),
+                timestep_index=step_index,
+                total_num_timesteps=total_steps,
+                controlnet_double_block_residuals=merged_controlnet_residuals.double_block_residuals,
+                controlnet_single_block_residuals=merged_controlnet_residuals.single_block_residuals,
+                ip_adapter_extensions=batched_ip_adapter_extensions,
+                regional_prompting_extension=batched_regional_prompting_extension,
+            ).chunk(2)
+        else:
+            pred = model(
+                img=pred_img,
                 img_ids=img_ids,
-                txt=neg_regional_prompting_extension.regional_text_conditioning.t5_embeddings,
-                txt_ids=neg_regional_prompting_extension.regional_text_conditioning.t5_txt_ids,
-                y=neg_regional_prompting_extension.regional_text_conditioning.clip_embeddings,
+                txt=pos_regional_prompting_extension.regional_text_conditioning.t5_embeddings,
+                txt_ids=pos_regional_prompting_extension.regional_text_conditioning.t5_txt_ids,
+                y=pos_regional_prompting_extension.regional_text_conditioning.clip_embeddings,
                 timesteps=t_vec,
                 guidance=guidance_vec,
                 timestep_index=step_index,
                 total_num_timesteps=total_steps,
-                controlnet_double_block_residuals=None,
-                controlnet_single_block_residuals=None,
-                ip_adapter_extensions=neg_ip_adapter_extensions,
-                regional_prompting_extension=neg_regional_prompting_extension,
+                controlnet_double_block_residuals=merged_controlnet_residuals.double_block_residuals,
+                controlnet_single_block_residuals=merged_controlnet_residuals.single_block_residuals,
+                ip_adapter_extensions=pos_ip_adapter_extensions,
+                regional_prompting_extension=pos_regional_prompting_extension,
             )
+
+            if do_cfg:
+                assert neg_regional_prompting_extension is not None
+                neg_pred = model(
+                    img=pred_img,
+                    img_ids=img_ids,
+                    txt=neg_regional_prompting_extension.regional_text_conditioning.t5_embeddings,
+                    txt_ids=neg_regional_prompting_extension.regional_text_conditioning.t5_txt_ids,
+                    y=neg_regional_prompting_extension.regional_text_conditioning.clip_embeddings,
+                    timesteps=t_vec,
+                    guidance=guidance_vec,
+                    timestep_index=step_index,
+                    total_num_timesteps=total_steps,
+                    controlnet_double_block_residuals=None,
+                    controlnet_single_block_residuals=None,
+                    ip_adapter_extensions=neg_ip_adapter_extensions,
+                    regional_prompting_extension=neg_regional_prompting_extension,
+                )
+
+        if neg_pred is not None:
             pred = neg_pred + step_cfg_scale * (pred - neg_pred)
 
         preview_img = img - t_curr * pred
@@ -133,3 +180,58 @@ def denoise(
         )
 
     return img
+
+
+def estimate_batched_cfg_working_memory(
+    model: Flux,
+    img: torch.Tensor,
+    pos_regional_prompting_extension: RegionalPromptingExtension,
+    neg_regional_prompting_extension: RegionalPromptingExtension,
+) -> int:
+    """Estimates the working memory of a transformer pass over a batch of the positive and negative predictions, in
+    bytes."""
+    txt_seq_len = max(
+        pos_regional_prompting_extension.regional_text_conditioning.t5_embeddings.shape[1],
+        neg_regional_prompting_extension.regional_text_conditioning.t5_embeddings.shape[1],
+    )
+    seq_len = txt_seq_len + img.shape[1]
+    element_size = img.element_size()
+
+    # The largest activations are in the single stream blocks, which hold the fused qkv and MLP projections of the
+    # sequence, the rotary embedded queries and keys, and the attention and MLP outputs at once. This constant was
+    # chosen to cover them, with some headroom.
+    scaling_constant = 32
+    working_memory = 2 * seq_len * model.hidden_size * element_size * scaling_constant
+
+    # Regional prompting adds a boolean attention mask for each half of the batch.
+    if (
+        pos_regional_prompting_extension.restricted_attn_mask is not None
+        or neg_regional_prompting_extension.restricted_attn_mask is not None
+    ):
+        working_memory += 2 * seq_len * seq_len
+
+    return int(working_memory * 1.2)
+
+
+def can_batch_cfg(
+    model: Flux,
+    img: torch.Tensor,
+    pos_regional_prompting_extension: RegionalPromptingExtension,
+    neg_regional_prompting_extension: RegionalPromptingExtension,
+    img_cond: torch.Tensor | None = None,
+) -> bool:
+    """Checks whether the positive and negative predictions fit in the free memory of the device as a single batch.
+
+    Batching is only chosen for CUDA devices, where it makes better use of the GPU. Elsewhere, the predictions are run
+    one after the other.
+    """
+    if img.device.type != "cuda":
+        return False
+    mem_free, _ = torch.cuda.mem_get_info(img.device)
+    # Memory reserved by torch, but not allocated, is free for the batch too
+    mem_free += torch.cuda.memory_reserved(img.device) - torch.cuda.memory_allocated(img.device)
+    batch_img = torch.cat((img, img_cond), dim=-1) if img_cond is not None else img
+    working_memory = estimate_batched_cfg_working_memory(
+        model, batch_img, pos_regional_prompting_extension, neg_regional_prompting_extension
+    )
+    return working_memory <= mem_free
@@ -0,0 +1,131 @@
+import torch
+
+from invokeai.backend.flux.extensions.regional_prompting_extension import RegionalPromptingExtension
+from invokeai.backend.flux.extensions.xlabs_ip_adapter_extension import XLabsIPAdapterExtension
+from invokeai.backend.flux.modules.layers import DoubleStreamBlock
+from invokeai.backend.flux.text_conditioning import FluxRegionalTextConditioning
+
+
+class BatchedCFGRegionalPromptingExtension(RegionalPromptingExtension):
+    """Regional prompting for a batch of the positive and negative predictions, so that both run in a single
+    transformer pass.
+
+    The positive and negative text conditionings are stacked along the batch dimension. The shorter one is padded to the
+    length of the longer one, and the padding is masked out of attention. The attention mask of each block stacks the
+    masks of the positive and negative extensions.
+    """
+
+    def __init__(self, pos: RegionalPromptingExtension, neg: RegionalPromptingExtension, img_seq_len: int):
+        pos_cond = pos.regional_text_conditioning
+        neg_cond = neg.regional_text_conditioning
+        txt_seq_len = max(pos_cond.t5_embeddings.shape[1], neg_cond.t5_embeddings.shape[1])
+
+        super().__init__(
+            regional_text_conditioning=FluxRegionalTextConditioning(
+                t5_embeddings=torch.cat(
+                    (
+                        self._pad_txt(pos_cond.t5_embeddings, txt_seq_len),
+                        self._pad_txt(neg_cond.t5_embeddings, txt_seq_len),
+                    )
+                ),
+                t5_txt_ids=torch.cat(
+                    (self._pad_txt(pos_cond.t5_txt_ids, txt_seq_len), self._pad_txt(neg_cond.t5_txt_ids, txt_seq_len))
+                ),
+                clip_embeddings=torch.cat((pos_cond.clip_embeddings, neg_cond.clip_embeddings)),
+                image_masks=pos_cond.image_masks + neg_cond.image_masks,
+                t5_embedding_ranges=pos_cond.t5_embedding_ranges + neg_cond.t5_embedding_ranges,
+            ),
+        )
+
+        # The masks of the blocks which use the restricted attention mask, and of the blocks which do not use one
+        txt_seq_lens = [pos_cond.t5_embeddings.shape[1], neg_cond.t5_embeddings.shape[1]]
+        device = pos_cond.t5_embeddings.device
+        self._restricted_attn_mask = self._stack_attn_masks(
+            txt_seq_lens, [pos.restricted_attn_mask, neg.restricted_attn_mask], txt_seq_len, img_seq_len, device
+        )
+        self._unrestricted_attn_mask = self._stack_attn_masks(
+            txt_seq_lens, [None, None], txt_seq_len, img_seq_len, device
+        )
+
+    def get_double_stream_attn_mask(self, block_index: int) -> torch.Tensor | None:
+        order = [self._restricted_attn_mask, self._unrestricted_attn_mask]
+        return order[block_index % len(order)]
+
+    def get_single_stream_attn_mask(self, block_index: int) -> torch.Tensor | None:
+        order = [self._restricted_attn_mask, self._unrestricted_attn_mask]
+        return order[block_index % len(order)]
+
+    @staticmethod
+    def _pad_txt(x: torch.Tensor, txt_seq_len: int) -> torch.Tensor:
+        """Pads a (batch, txt_seq_len, channels) tensor with zeros to the given txt sequence length."""
+        return torch.nn.functional.pad(x, (0, 0, 0, txt_seq_len - x.shape[1]))
+
+    @staticmethod
+    def _stack_attn_masks(
+        txt_seq_lens: list[int],
+        attn_masks: list[torch.Tensor | None],
+        txt_seq_len: int,
+        img_seq_len: int,
+        device: torch.device,
+    ) -> torch.Tensor | None:
+        """Stacks the attention masks of the batch, adding the txt padding to them.
+
+        Returns:
+            A mask of shape (batch, 1, seq_len, seq_len), or of shape (batch, 1, 1, seq_len) if only the padding is
+            masked, or None if nothing is masked.
+        """
+        if all(m is None for m in attn_masks):
+            if all(n == txt_seq_len for n in txt_seq_lens):
+                return None
+            # Only mask out the padding keys
+            key_masks = []
+            for n in txt_seq_lens:
+                key_mask = torch.ones(txt_seq_len + img_seq_len, dtype=torch.bool, device=device)
+                key_mask[n:txt_seq_len] = False
+                key_masks.append(key_mask.view(1, 1, -1))
+            return torch.stack(key_masks)
+
+        seq_len = txt_seq_len + img_seq_len
+        stacked = torch.zeros((len(attn_masks), 1, seq_len, seq_len), dtype=torch.bool, device=device)
+        for i, (n, attn_mask) in enumerate(zip(txt_seq_lens, attn_masks, strict=True)):
+            # The positions of the unpadded sequence in the padded sequence
+            index = torch.cat((torch.arange(n, device=device), torch.arange(txt_seq_len, seq_len, device=device)))
+            if attn_mask is None:
+                stacked[i, 0, :, index] = True
+            else:
+                stacked[i, 0, index[:, None], index[None, :]] = attn_mask
+            # Padding queries attend to themselves, so that none of their attention rows are empty
+            padding = torch.arange(n, txt_seq_len, device=device)
+            stacked[i, 0, padding, padding] = True
+        return stacked
+
+
+class BatchedCFGIPAdapterExtension:
+    """Applies the IP-Adapters of the positive and negative predictions to their halves of a batch of both."""
+
+    def __init__(self, pos: list[XLabsIPAdapterExtension], neg: list[XLabsIPAdapterExtension]):
+        self._pos = pos
+        self._neg = neg
+
+    def run_ip_adapter(
+        self,
+        timestep_index: int,
+        total_num_timesteps: int,
+        block_index: int,
+        block: DoubleStreamBlock,
+        img_q: torch.Tensor,
+        img: torch.Tensor,
+    ) -> torch.Tensor:
+        outputs: list[torch.Tensor] = []
+        for extensions, half_img_q, half_img in zip((self._pos, self._neg), img_q.chunk(2), img.chunk(2), strict=True):
+            for extension in extensions:
+                half_img = extension.run_ip_adapter(
+                    timestep_index=timestep_index,
+                    total_num_timesteps=total_num_timesteps,
+                    block_index=block_index,
+                    block=block,
+                    img_q=half_img_q,
+                    img=half_img,
+                )
+            outputs.append(half_img)
+        return torch.cat(outputs)
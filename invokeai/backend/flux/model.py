@@ -10,6 +10,7 @@ from invokeai.backend.flux.custom_block_processor import (
     CustomDoubleStreamBlockProcessor,
     CustomSingleStreamBlockProcessor,
 )
+from invokeai.backend.flux.extensions.batched_cfg_extension import BatchedCFGIPAdapterExtension
 from invokeai.backend.flux.extensions.regional_prompting_extension import RegionalPromptingExtension
 from invokeai.backend.flux.extensions.xlabs_ip_adapter_extension import XLabsIPAdapterExtension
 from invokeai.backend.flux.modules.layers import (
@@ -100,7 +101,7 @@ class Flux(nn.Module):
         total_num_timesteps: int,
         controlnet_double_block_residuals: list[Tensor] | None,
         controlnet_single_block_residuals: list[Tensor] | None,
-        ip_adapter_extensions: list[XLabsIPAdapterExtension],
+        ip_adapter_extensions: list[XLabsIPAdapterExtension] | list[BatchedCFGIPAdapterExtension],
         regional_prompting_extension: RegionalPromptingExtension,
     ) -> Tensor:
         if img.ndim != 3 or txt.ndim != 3:
@@ -138,7 +139,9 @@ class Flux(nn.Module):
             )
 
             if controlnet_double_block_residuals is not None:
-                img += controlnet_double_block_residuals[block_index]
+                # The residuals may only cover the leading part of the batch, e.g. the positive half of a CFG batch.
+                residual = controlnet_double_block_residuals[block_index]
+                img[: residual.shape[0]] += residual
 
         img = torch.cat((txt, img), 1)
 
@@ -160,7 +163,8 @@ class Flux(nn.Module):
             )
 
             if controlnet_single_block_residuals is not None:
-                img[:, txt.shape[1] :, ...] += controlnet_single_block_residuals[block_index]
+                residual = controlnet_single_block_residuals[block_index]
+                img[: residual.shape[0], txt.shape[1] :, ...] += residual
 
         img = img[:, txt.shape[1] :, ...]
 
@@ -31,27 +31,20 @@ def infill_mosaic(
     non_transparent_pixels[:, 1] = np.clip(non_transparent_pixels[:, 1], g_min, g_max)
     non_transparent_pixels[:, 2] = np.clip(non_transparent_pixels[:, 2], b_min, b_max)
 
-    tiles = []
-    for _ in range(256):
-        color = non_transparent_pixels[np.random.randint(len(non_transparent_pixels))]
-        tile = np.zeros((tile_height, tile_width, 3), dtype=np.uint8)
-        tile[:, :] = color
-        tiles.append(tile)
+    # Pick the colors of the tiles. Every pixel then picks a random tile, which is written over the cell of the grid
+    # that the pixel is in, visiting the pixels column by column. Only the last pick of each cell is visible, and cells
+    # that do not fit in the image are left empty. All the picks are drawn up front, so that seeded output matches
+    # pixel-by-pixel filling.
+    colors = non_transparent_pixels[np.random.randint(len(non_transparent_pixels), size=256)]
+    picks = np.random.randint(len(colors), size=(image.width, image.height))
+    last_picks = picks[tile_width - 1 :: tile_width, tile_height - 1 :: tile_height].T
+    n_tiles_y, n_tiles_x = last_picks.shape
 
     # Fill the transparent area with tiles
     filled_image = np.zeros((image.height, image.width, 3), dtype=np.uint8)
-
-    for x in range(image.width):
-        for y in range(image.height):
-            tile = tiles[np.random.randint(len(tiles))]
-            try:
-                filled_image[
-                    y - (y % tile_height) : y - (y % tile_height) + tile_height,
-                    x - (x % tile_width) : x - (x % tile_width) + tile_width,
-                ] = tile
-            except ValueError:
-                # Need to handle edge cases - literally
-                pass
+    filled_image[: n_tiles_y * tile_height, : n_tiles_x * tile_width] = np.repeat(
+        np.repeat(colors[last_picks], tile_height, axis=0), tile_width, axis=1
+    )
 
     filled_image = Image.fromarray(filled_image)  # Convert the filled tiles image to PIL
     image = Image.composite(
@@ -16,18 +16,22 @@ def create_tile_pool(img_array: np.ndarray, tile_size: tuple[int, int]) -> list[
     Returns:
         A list of numpy arrays, each representing a tile.
     """
-    tiles: list[np.ndarray] = []
     rows, cols = img_array.shape[:2]
     tile_width, tile_height = tile_size
 
-    for y in range(0, rows - tile_height + 1, tile_height):
-        for x in range(0, cols - tile_width + 1, tile_width):
-            tile = img_array[y : y + tile_height, x : x + tile_width]
-            # Check if the image has an alpha channel and the tile is completely opaque
-            if img_array.shape[2] == 4 and np.all(tile[:, :, 3] == 255):
-                tiles.append(tile)
-            elif img_array.shape[2] == 3:  # If no alpha channel, append the tile
-                tiles.append(tile)
+    # Split the image into a grid of whole tiles, in row-major order
+    n_tiles_y, n_tiles_x = rows // tile_height, cols // tile_width
+    grid = img_array[: n_tiles_y * tile_height, : n_tiles_x * tile_width]
+    grid = grid.reshape(n_tiles_y, tile_height, n_tiles_x, tile_width, -1).swapaxes(1, 2)
+    grid = grid.reshape(n_tiles_y * n_tiles_x, tile_height, tile_width, -1)
+
+    if img_array.shape[2] == 4:
+        # Only use the tiles that are completely opaque
+        tiles = list(grid[np.all(grid[:, :, :, 3] == 255, axis=(1, 2))])
+    elif img_array.shape[2] == 3:  # If no alpha channel, use all tiles
+        tiles = list(grid)
+    else:
+        tiles = []
 
     if not tiles:
         raise ValueError(
@@ -55,26 +59,15 @@ def create_filled_image(
     rows, cols, _ = img_array.shape
     tile_width, tile_height = tile_size
 
-    # Prep an empty RGB image
-    filled_img_array = np.zeros((rows, cols, 3), dtype=img_array.dtype)
-
-    # Make the random tile selection reproducible
+    # Make the random tile selection reproducible. The tiles are picked in row-major order.
     rng = np.random.default_rng(seed)
+    n_tiles_y, n_tiles_x = -(-rows // tile_height), -(-cols // tile_width)
+    picks = rng.integers(len(tile_pool), size=(n_tiles_y, n_tiles_x))
 
-    for y in range(0, rows, tile_height):
-        for x in range(0, cols, tile_width):
-            # Pick a random tile from the pool
-            tile = tile_pool[rng.integers(len(tile_pool))]
-
-            # Calculate the space available (may be less than tile size near the edges)
-            space_y = min(tile_height, rows - y)
-            space_x = min(tile_width, cols - x)
-
-            # Crop the tile if necessary to fit into the available space
-            cropped_tile = tile[:space_y, :space_x, :3]
-
-            # Fill the available space with the (possibly cropped) tile
-            filled_img_array[y : y + space_y, x : x + space_x, :3] = cropped_tile
+    # Lay out the picked tiles, and crop the tiles that do not fit at the edges
+    pool = np.stack([tile[:, :, :3] for tile in tile_pool])
+    filled_img_array = pool[picks].swapaxes(1, 2).reshape(n_tiles_y * tile_height, n_tiles_x * tile_width, -1)
+    filled_img_array = np.ascontiguousarray(filled_img_array[:rows, :cols])
 
     return filled_img_array
 
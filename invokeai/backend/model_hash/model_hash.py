@@ -2,6 +2,7 @@
 
 import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Callable, Literal, Optional, Union
 
@@ -9,6 +10,7 @@ from blake3 import blake3
 from tqdm import tqdm
 
 from invokeai.app.util.misc import uuid_string
+from invokeai.backend.model_hash.model_hash_cache import FileSignature, ModelHashCacheBase
 
 HASHING_ALGORITHMS = Literal[
     "blake3_multi",
@@ -39,6 +41,9 @@ class ModelHash:
     Args:
         algorithm: Hashing algorithm to use. Defaults to BLAKE3.
         file_filter: A function that takes a file name and returns True if the file should be included in the hash.
+        cache: Optional cache of file hashes. Files whose size, modification time and inode are unchanged since they
+            were last hashed are not hashed again.
+        max_workers: The number of files of a directory model that are hashed at once.
 
     If the model is a single file, it is hashed directly using the provided algorithm.
 
@@ -61,7 +66,11 @@ class ModelHash:
     """
 
     def __init__(
-        self, algorithm: HASHING_ALGORITHMS = "blake3_single", file_filter: Optional[Callable[[str], bool]] = None
+        self,
+        algorithm: HASHING_ALGORITHMS = "blake3_single",
+        file_filter: Optional[Callable[[str], bool]] = None,
+        cache: Optional[ModelHashCacheBase] = None,
+        max_workers: int = 1,
     ) -> None:
         self.algorithm: HASHING_ALGORITHMS = algorithm
         if algorithm == "blake3_multi":
@@ -76,8 +85,11 @@ class ModelHash:
             raise ValueError(f"Algorithm {algorithm} not available")
 
         self._file_filter = file_filter or self._default_file_filter
+        # Random "hashes" must not be reused
+        self._cache = cache if algorithm != "random" else None
+        self._max_workers = max(1, max_workers)
 
-    def hash(self, model_path: Union[str, Path]) -> str:
+    def hash(self, model_path: Union[str, Path], use_cache: bool = True) -> str:
         """
         Return hexdigest of hash of model located at model_path using the algorithm provided at class instantiation.
 
@@ -86,6 +98,7 @@ class ModelHash:
 
         Args:
             model_path: Path to the model
+            use_cache: Whether to use the cached hashes of unchanged files. Fresh hashes are cached either way.
 
         Returns:
             str: Hexdigest of the hash of the model
@@ -95,35 +108,39 @@ class ModelHash:
         # blake3_single is a single-threaded version of blake3, prefix should still be "blake3:"
         prefix = self._get_prefix(self.algorithm)
         if model_path.is_file():
-            hash_ = None
-            # To give a similar user experience for single files and directories, we use a progress bar even for single files
-            pbar = tqdm([model_path], desc=f"Hashing {model_path.name}", unit="file")
-            for component in pbar:
-                pbar.set_description(f"Hashing {component.name}")
-                hash_ = prefix + self._hash_file(model_path)
-            assert hash_ is not None
-            return hash_
+            return prefix + self._hash_files([model_path], model_path.name, use_cache)[0]
         elif model_path.is_dir():
-            return prefix + self._hash_dir(model_path)
+            return prefix + self._hash_dir(model_path, use_cache)
         else:
             raise OSError(f"Not a valid file or directory: {model_path}")
 
-    def _hash_dir(self, dir: Path) -> str:
+    def verify(self, model_path: Union[str, Path], expected_hash: str) -> bool:
+        """Hash the model again, ignoring any cached hashes, and check it against the expected hash.
+
+        The cache is updated with the fresh hashes, so a stale cache entry is corrected by verifying.
+
+        Args:
+            model_path: Path to the model
+            expected_hash: The expected hash, prefixed by the algorithm
+
+        Returns:
+            True if the model's hash matches the expected hash
+        """
+        return self.hash(model_path, use_cache=False) == expected_hash
+
+    def _hash_dir(self, dir: Path, use_cache: bool = True) -> str:
         """Compute the hash for all files in a directory and return a hexdigest.
 
         Args:
             dir: Path to the directory
+            use_cache: Whether to use the cached hashes of unchanged files
 
         Returns:
             str: Hexdigest of the hash of the directory
         """
         model_component_paths = self._get_file_paths(dir, self._file_filter)
 
-        component_hashes: list[str] = []
-        pbar = tqdm(sorted(model_component_paths), desc=f"Hashing {dir.name}", unit="file")
-        for component in pbar:
-            pbar.set_description(f"Hashing {component.name}")
-            component_hashes.append(self._hash_file(component))
+        component_hashes = self._hash_files(sorted(model_component_paths), dir.name, use_cache)
 
         # BLAKE3 is cryptographically secure. We may as well fall back on a secure algorithm
         # for the composite hash
@@ -133,6 +150,42 @@ class ModelHash:
 
         return composite_hasher.hexdigest()
 
+    def _hash_files(self, paths: list[Path], name: str, use_cache: bool) -> list[str]:
+        """Hash files, in parallel if max_workers allows it, skipping the files whose cached hashes are current.
+
+        Args:
+            paths: Paths to the files
+            name: The name of the model, for progress reporting
+            use_cache: Whether to use the cached hashes of unchanged files
+
+        Returns:
+            The hexdigests of the files, in the order of the paths
+        """
+        signatures = [FileSignature.from_path(path) for path in paths]
+        hashes: list[Optional[str]] = [None] * len(paths)
+        if self._cache is not None and use_cache:
+            for i, (path, signature) in enumerate(zip(paths, signatures, strict=True)):
+                hashes[i] = self._cache.get(path, self.algorithm, signature)
+
+        pending = [i for i, hash_ in enumerate(hashes) if hash_ is None]
+        # The progress bar counts bytes, so it reports the throughput in MB/s
+        with (
+            tqdm(
+                total=sum(signatures[i].size for i in pending), desc=f"Hashing {name}", unit="B", unit_scale=True
+            ) as pbar,
+            ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="model_hash") as executor,
+        ):
+            pbar.set_postfix_str(f"{len(paths) - len(pending)} of {len(paths)} files unchanged")
+            futures = {executor.submit(self._hash_file, paths[i]): i for i in pending}
+            for future in as_completed(futures):
+                i = futures[future]
+                hash_ = future.result()
+                hashes[i] = hash_
+                pbar.update(signatures[i].size)
+                if self._cache is not None:
+                    self._cache.put(paths[i], self.algorithm, signatures[i], hash_)
+        return [hash_ for hash_ in hashes if hash_ is not None]
+
     @staticmethod
     def _get_file_paths(model_path: Path, file_filter: Callable[[str], bool]) -> list[Path]:
         """Return a list of all model files in the directory.
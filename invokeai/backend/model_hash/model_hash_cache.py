@@ -0,0 +1,58 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+class FileSignature(NamedTuple):
+    """The stat signature of a file. A file whose signature is unchanged is assumed to have unchanged contents."""
+
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @classmethod
+    def from_path(cls, path: Path) -> "FileSignature":
+        stat = path.stat()
+        return cls(size=stat.st_size, mtime_ns=stat.st_mtime_ns, inode=stat.st_ino)
+
+
+class ModelHashCacheBase(ABC):
+    """Stores the hashes of model files, so that unchanged files are not hashed again."""
+
+    @abstractmethod
+    def get(self, path: Path, algorithm: str, signature: FileSignature) -> Optional[str]:
+        """Gets the hash of a file, if it was hashed with the given algorithm while it had the given signature.
+
+        Args:
+            path: Path to the file
+            algorithm: The hashing algorithm
+            signature: The current signature of the file
+
+        Returns:
+            The hexdigest of the file, or None if it is not cached
+        """
+        pass
+
+    @abstractmethod
+    def put(self, path: Path, algorithm: str, signature: FileSignature, hash: str) -> None:
+        """Stores the hash of a file, replacing any hash stored for the same path and algorithm.
+
+        Args:
+            path: Path to the file
+            algorithm: The hashing algorithm
+            signature: The signature of the file when it was hashed
+            hash: The hexdigest of the file
+        """
+        pass
+
+    @abstractmethod
+    def invalidate(self, path: Optional[Path] = None) -> int:
+        """Removes the hashes of a file, or of all files in a directory.
+
+        Args:
+            path: Path to the file or directory. If None, all hashes are removed.
+
+        Returns:
+            The number of removed hashes
+        """
+        pass
@@ -1,9 +1,8 @@
 import json
 import re
 from pathlib import Path
-from typing import Any, Callable, Dict, Literal, Optional, Union
+from typing import Any, Callable, Dict, Literal, Mapping, Optional, Union
 
-import safetensors.torch
 import spandrel
 import torch
 from picklescan.scanner import scan_file_path
@@ -16,6 +15,7 @@ from invokeai.backend.flux.controlnet.state_dict_utils import (
 )
 from invokeai.backend.flux.ip_adapter.state_dict_utils import is_state_dict_xlabs_ip_adapter
 from invokeai.backend.model_hash.model_hash import HASHING_ALGORITHMS, ModelHash
+from invokeai.backend.model_hash.model_hash_cache import ModelHashCacheBase
 from invokeai.backend.model_manager.config import (
     AnyModelConfig,
     AnyVariant,
@@ -35,6 +35,7 @@ from invokeai.backend.model_manager.config import (
 )
 from invokeai.backend.model_manager.load.model_loaders.generic_diffusers import ConfigLoader
 from invokeai.backend.model_manager.util.model_util import (
+    LazySafetensorsStateDict,
     get_clip_variant_type,
     lora_token_vector_length,
     read_checkpoint_meta,
@@ -51,7 +52,9 @@ from invokeai.backend.quantization.gguf.loaders import gguf_sd_loader
 from invokeai.backend.spandrel_image_to_image_model import SpandrelImageToImageModel
 from invokeai.backend.util.silence_warnings import SilenceWarnings
 
-CkptType = Dict[str | int, Any]
+CkptType = Mapping[str, Any]
+
+CHECKPOINT_SUFFIXES = (".bin", ".pt", ".ckpt", ".safetensors", ".pth", ".gguf")
 
 LEGACY_CONFIGS: Dict[BaseModelType, Dict[ModelVariantType, Union[str, Dict[SchedulerPredictionType, str]]]] = {
     BaseModelType.StableDiffusion1: {
@@ -148,7 +151,12 @@ class ModelProbe(object):
 
     @classmethod
     def probe(
-        cls, model_path: Path, fields: Optional[Dict[str, Any]] = None, hash_algo: HASHING_ALGORITHMS = "blake3_single"
+        cls,
+        model_path: Path,
+        fields: Optional[Dict[str, Any]] = None,
+        hash_algo: HASHING_ALGORITHMS = "blake3_single",
+        hash_cache: Optional[ModelHashCacheBase] = None,
+        hash_threads: int = 1,
     ) -> AnyModelConfig:
         """
         Probe the model at model_path and return its configuration record.
@@ -156,6 +164,9 @@ class ModelProbe(object):
         :param model_path: Path to the model file (checkpoint) or directory (diffusers).
         :param fields: An optional dictionary that can be used to override probed
         fields. Typically used for fields that don't probe well, such as prediction_type.
+        :param hash_algo: The algorithm used to hash the model.
+        :param hash_cache: An optional cache of file hashes, so unchanged files are not hashed again.
+        :param hash_threads: The number of files of a directory model hashed at once.
 
         Returns: The appropriate model configuration derived from ModelConfigBase.
         """
@@ -166,19 +177,27 @@ class ModelProbe(object):
 
         format_type = ModelFormat.Diffusers if model_path.is_dir() else ModelFormat.Checkpoint
         model_info = None
+        # A checkpoint is loaded once, lazily where possible, and shared by the type detection and the probe
+        checkpoint: Optional[CkptType] = None
         model_type = ModelType(fields["type"]) if "type" in fields and fields["type"] else None
         if not model_type:
             if format_type is ModelFormat.Diffusers:
                 model_type = cls.get_model_type_from_folder(model_path)
             else:
-                model_type = cls.get_model_type_from_checkpoint(model_path)
+                if model_path.suffix in CHECKPOINT_SUFFIXES:
+                    checkpoint = cls._scan_and_load_checkpoint(model_path)
+                model_type = cls.get_model_type_from_checkpoint(model_path, checkpoint)
         format_type = ModelFormat.ONNX if model_type == ModelType.ONNX else format_type
 
         probe_class = cls.PROBES[format_type].get(model_type)
         if not probe_class:
             raise InvalidModelConfigException(f"Unhandled combination of {format_type} and {model_type}")
 
-        probe = probe_class(model_path)
+        probe: ProbeBase
+        if issubclass(probe_class, CheckpointProbeBase):
+            probe = probe_class(model_path, checkpoint)
+        else:
+            probe = probe_class(model_path)
 
         fields["source_type"] = fields.get("source_type") or ModelSourceType.Path
         fields["source"] = fields.get("source") or model_path.as_posix()
@@ -197,7 +216,9 @@ class ModelProbe(object):
             fields.get("description") or f"{fields['base'].value} {model_type.value} model {fields['name']}"
         )
         fields["format"] = ModelFormat(fields.get("format")) if "format" in fields else probe.get_format()
-        fields["hash"] = fields.get("hash") or ModelHash(algorithm=hash_algo).hash(model_path)
+        fields["hash"] = fields.get("hash") or ModelHash(
+            algorithm=hash_algo, cache=hash_cache, max_workers=hash_threads
+        ).hash(model_path)
 
         fields["default_settings"] = fields.get("default_settings")
 
@@ -252,7 +273,7 @@ class ModelProbe(object):
 
     @classmethod
     def get_model_type_from_checkpoint(cls, model_path: Path, checkpoint: Optional[CkptType] = None) -> ModelType:
-        if model_path.suffix not in (".bin", ".pt", ".ckpt", ".safetensors", ".pth", ".gguf"):
+        if model_path.suffix not in CHECKPOINT_SUFFIXES:
             raise InvalidModelConfigException(f"{model_path}: unrecognized suffix")
 
         if model_path.name == "learned_embeds.bin":
@@ -261,7 +282,7 @@ class ModelProbe(object):
         ckpt = checkpoint if checkpoint else read_checkpoint_meta(model_path, scan=True)
         ckpt = ckpt.get("state_dict", ckpt)
 
-        if isinstance(ckpt, dict) and is_state_dict_likely_flux_control(ckpt):
+        if isinstance(ckpt, Mapping) and is_state_dict_likely_flux_control(ckpt):
             return ModelType.ControlLoRa
 
         for key in [str(k) for k in ckpt.keys()]:
@@ -456,16 +477,22 @@ class ModelProbe(object):
 
     @classmethod
     def _scan_and_load_checkpoint(cls, model_path: Path) -> CkptType:
+        """Loads a checkpoint for probing. Tensors are only read from disk when they are accessed, where possible."""
         with SilenceWarnings():
             if model_path.suffix.endswith((".ckpt", ".pt", ".pth", ".bin")):
                 cls._scan_model(model_path.name, model_path)
-                model = torch.load(model_path, map_location="cpu")
+                try:
+                    model = torch.load(model_path, map_location="cpu", mmap=True)
+                except RuntimeError:
+                    # Checkpoints saved in the legacy format cannot be memory-mapped
+                    model = torch.load(model_path, map_location="cpu")
                 assert isinstance(model, dict)
                 return model
             elif model_path.suffix.endswith(".gguf"):
+                # The GGUF reader reads the tensor table, and memory-maps the tensors
                 return gguf_sd_loader(model_path, compute_dtype=torch.float32)
             else:
-                return safetensors.torch.load_file(model_path)
+                return LazySafetensorsStateDict(model_path)
 
     @classmethod
     def _scan_model(cls, model_name: str, checkpoint: Path) -> None:
@@ -526,9 +553,9 @@ def get_default_settings_main(model_base: BaseModelType) -> Optional[MainModelDe
 
 
 class CheckpointProbeBase(ProbeBase):
-    def __init__(self, model_path: Path):
+    def __init__(self, model_path: Path, checkpoint: Optional[CkptType] = None):
         super().__init__(model_path)
-        self.checkpoint = ModelProbe._scan_and_load_checkpoint(model_path)
+        self.checkpoint = checkpoint if checkpoint is not None else ModelProbe._scan_and_load_checkpoint(model_path)
 
     def get_format(self) -> ModelFormat:
         state_dict = self.checkpoint.get("state_dict") or self.checkpoint
@@ -537,7 +564,8 @@ class CheckpointProbeBase(ProbeBase):
             or "model.diffusion_model.double_blocks.0.img_attn.proj.weight.quant_state.bitsandbytes__nf4" in state_dict
         ):
             return ModelFormat.BnbQuantizednf4b
-        elif any(isinstance(v, GGMLTensor) for v in state_dict.values()):
+        # Only GGUF files have GGML tensors. Checking the suffix first avoids reading the tensors of other checkpoints.
+        elif self.model_path.suffix == ".gguf" and any(isinstance(v, GGMLTensor) for v in state_dict.values()):
             return ModelFormat.GGUFQuantized
         return ModelFormat("checkpoint")
 
@@ -666,7 +694,7 @@ class TextualInversionCheckpointProbe(CheckpointProbeBase):
         elif "clip_g" in checkpoint:
             token_dim = checkpoint["clip_g"].shape[-1]
         else:
-            token_dim = list(checkpoint.values())[0].shape[0]
+            token_dim = checkpoint[next(iter(checkpoint))].shape[0]
         if token_dim == 768:
             return BaseModelType.StableDiffusion1
         elif token_dim == 1024:
@@ -2,7 +2,7 @@
 
 import json
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import Any, Dict, Iterator, Mapping, Optional, Union, cast
 
 import safetensors
 import torch
@@ -11,37 +11,100 @@ from picklescan.scanner import scan_file_path
 from invokeai.backend.model_manager.config import ClipVariantType
 from invokeai.backend.quantization.gguf.loaders import gguf_sd_loader
 
+_SAFETENSORS_DTYPES = {
+    "BOOL": torch.bool,
+    "U8": torch.uint8,
+    "I8": torch.int8,
+    "I16": torch.int16,
+    "I32": torch.int32,
+    "I64": torch.int64,
+    "F8_E4M3": torch.float8_e4m3fn,
+    "F8_E5M2": torch.float8_e5m2,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "F32": torch.float32,
+    "F64": torch.float64,
+}
+
+
+def _read_safetensors_definition(path: Union[str, Path]) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        definition_len = int.from_bytes(f.read(8), "little")
+        return cast(Dict[str, Any], json.loads(f.read(definition_len)))
+
+
+def read_safetensors_header(path: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+    """Reads the tensor table from the header of a safetensors file, without reading any tensors.
+
+    Returns a dict mapping each tensor's key to its "dtype", "shape" and "data_offsets".
+    """
+    definition = _read_safetensors_definition(path)
+    definition.pop("__metadata__", None)
+    return definition
+
+
+def _read_safetensors_tensor(path: Union[str, Path], key: str) -> torch.Tensor:
+    """Reads a single tensor from a safetensors file."""
+    # safe_open is untyped
+    safe_open: Any = safetensors.safe_open
+    with safe_open(path, framework="pt", device="cpu") as f:
+        return cast(torch.Tensor, f.get_tensor(key))
+
 
 def _fast_safetensors_reader(path: str) -> Dict[str, torch.Tensor]:
-    checkpoint = {}
+    definition = _read_safetensors_definition(path)
+    if "__metadata__" in definition and definition["__metadata__"].get("format", "pt") not in {
+        "pt",
+        "torch",
+        "pytorch",
+    }:
+        raise Exception("Supported only pytorch safetensors files")
+    definition.pop("__metadata__", None)
+
     device = torch.device("meta")
-    with open(path, "rb") as f:
-        definition_len = int.from_bytes(f.read(8), "little")
-        definition_json = f.read(definition_len)
-        definition = json.loads(definition_json)
-
-        if "__metadata__" in definition and definition["__metadata__"].get("format", "pt") not in {
-            "pt",
-            "torch",
-            "pytorch",
-        }:
-            raise Exception("Supported only pytorch safetensors files")
-        definition.pop("__metadata__", None)
-
-        for key, info in definition.items():
-            dtype = {
-                "I8": torch.int8,
-                "I16": torch.int16,
-                "I32": torch.int32,
-                "I64": torch.int64,
-                "F16": torch.float16,
-                "F32": torch.float32,
-                "F64": torch.float64,
-            }[info["dtype"]]
-
-            checkpoint[key] = torch.empty(info["shape"], dtype=dtype, device=device)
+    return {
+        key: torch.empty(info["shape"], dtype=_SAFETENSORS_DTYPES[info["dtype"]], device=device)
+        for key, info in definition.items()
+    }
 
-    return checkpoint
+
+class LazySafetensorsStateDict(Mapping[str, torch.Tensor]):
+    """A read-only state dict view of a safetensors file, for inspecting a model without loading it.
+
+    The keys come from the file's header. A tensor is only read from the file when it is first accessed, so a probe
+    that checks for a few keys and the shapes of a few tensors reads a few KB of a multi-GB file. Iterating over the
+    values reads every tensor - use `get_shape()` where only the shapes are needed.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self._path = Path(path)
+        self._header = read_safetensors_header(self._path)
+        self._tensors: Dict[str, torch.Tensor] = {}
+
+    def __getitem__(self, key: str) -> torch.Tensor:
+        if key not in self._tensors:
+            if key not in self._header:
+                raise KeyError(key)
+            self._tensors[key] = _read_safetensors_tensor(self._path, key)
+        return self._tensors[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._header
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._header)
+
+    def __len__(self) -> int:
+        return len(self._header)
+
+    def get_shape(self, key: str) -> torch.Size:
+        """Gets the shape of a tensor, without reading it."""
+        return torch.Size(self._header[key]["shape"])
+
+    @property
+    def loaded_keys(self) -> set[str]:
+        """The keys of the tensors which have been read from the file."""
+        return set(self._tensors)
 
 
 def read_checkpoint_meta(path: Union[str, Path], scan: bool = True) -> Dict[str, torch.Tensor]:
@@ -64,14 +127,14 @@ def read_checkpoint_meta(path: Union[str, Path], scan: bool = True) -> Dict[str,
     return checkpoint
 
 
-def lora_token_vector_length(checkpoint: Dict[str, torch.Tensor]) -> Optional[int]:
+def lora_token_vector_length(checkpoint: Mapping[str, torch.Tensor]) -> Optional[int]:
     """
     Given a checkpoint in memory, return the lora token vector length
 
     :param checkpoint: The checkpoint
     """
 
-    def _get_shape_1(key: str, tensor: torch.Tensor, checkpoint: Dict[str, torch.Tensor]) -> Optional[int]:
+    def _get_shape_1(key: str, tensor: torch.Tensor, checkpoint: Mapping[str, torch.Tensor]) -> Optional[int]:
         lora_token_vector_length = None
 
         if "." not in key:
@@ -116,15 +179,16 @@ def lora_token_vector_length(checkpoint: Dict[str, torch.Tensor]) -> Optional[in
     lora_token_vector_length = None
     lora_te1_length = None
     lora_te2_length = None
-    for key, tensor in checkpoint.items():
+    # Only the tensors of the matching keys are accessed, which matters for lazily loaded state dicts
+    for key in checkpoint.keys():
         if key.startswith("lora_unet_") and ("_attn2_to_k." in key or "_attn2_to_v." in key):
-            lora_token_vector_length = _get_shape_1(key, tensor, checkpoint)
+            lora_token_vector_length = _get_shape_1(key, checkpoint[key], checkpoint)
         elif key.startswith("lora_unet_") and (
             "time_emb_proj.lora_down" in key
         ):  # recognizes format at https://civitai.com/models/224641
-            lora_token_vector_length = _get_shape_1(key, tensor, checkpoint)
+            lora_token_vector_length = _get_shape_1(key, checkpoint[key], checkpoint)
         elif key.startswith("lora_te") and "_self_attn_" in key:
-            tmp_length = _get_shape_1(key, tensor, checkpoint)
+            tmp_length = _get_shape_1(key, checkpoint[key], checkpoint)
             if key.startswith("lora_te_"):
                 lora_token_vector_length = tmp_length
             elif key.startswith("lora_te1_"):
@@ -0,0 +1,153 @@
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import torch
+
+from invokeai.app.services.config.config_default import get_config
+from invokeai.backend.patches.layers.base_layer_patch import BaseLayerPatch
+from invokeai.backend.patches.layers.ia3_layer import IA3Layer
+from invokeai.backend.patches.layers.lora_layer_base import LoRALayerBase
+from invokeai.backend.patches.model_patch_raw import ModelPatchRaw
+from invokeai.backend.util.devices import TorchDevice
+
+
+@dataclass
+class LayerPatchPlanCacheStats:
+    """Counters of a LayerPatchPlanCache."""
+
+    plan_hits: int = 0
+    plan_misses: int = 0
+    delta_hits: int = 0
+    delta_misses: int = 0
+    # The total time spent applying patches, and the time spent by the last call to apply_smart_model_patches(...)
+    setup_seconds: float = 0.0
+    last_setup_seconds: float = 0.0
+
+
+@dataclass
+class _CachedDeltas:
+    layer: weakref.ref[BaseLayerPatch]
+    deltas: dict[str, torch.Tensor]
+    size: int
+
+
+class LayerPatchPlanCache:
+    """Caches the work of applying a patch to a model, so that applying the same patches to the same model again is
+    faster.
+
+    Two things are cached:
+    - The module keys that the layer keys of a patch resolve to in a model. Resolving flattened layer keys requires a
+      search of the model's submodules.
+    - Optionally, the parameter deltas that directly patched layers add to the model, in CPU RAM and up to a budget. Only
+      the deltas of layers which do not depend on the values of the original parameters are cached.
+
+    Models and patches are tracked by identity. Their entries are dropped when they are garbage collected.
+
+    Args:
+        max_delta_cache_bytes: The maximum size of the cached deltas. If 0, deltas are not cached.
+    """
+
+    def __init__(self, max_delta_cache_bytes: int = 0):
+        self._lock = threading.Lock()
+        # model -> patch -> prefix -> [(layer_key, module_key)]
+        self._module_keys: weakref.WeakKeyDictionary[
+            torch.nn.Module, weakref.WeakKeyDictionary[ModelPatchRaw, dict[str, list[tuple[str, str]]]]
+        ] = weakref.WeakKeyDictionary()
+        # (id(layer), patch weight, dtype) -> deltas, in least-recently-used order
+        self._deltas: OrderedDict[tuple[int, float, torch.dtype], _CachedDeltas] = OrderedDict()
+        self._max_delta_cache_bytes = max_delta_cache_bytes
+        self._delta_cache_bytes = 0
+        self.stats = LayerPatchPlanCacheStats()
+
+    def get_module_keys(
+        self, model: torch.nn.Module, patch: ModelPatchRaw, prefix: str
+    ) -> Optional[list[tuple[str, str]]]:
+        """Get the (layer key, module key) pairs of the patch's layers with the given prefix, if they are cached."""
+        with self._lock:
+            module_keys: Optional[list[tuple[str, str]]] = None
+            patches = self._module_keys.get(model)
+            if patches is not None:
+                prefixes = patches.get(patch)
+                if prefixes is not None:
+                    module_keys = prefixes.get(prefix)
+            if module_keys is None:
+                self.stats.plan_misses += 1
+            else:
+                self.stats.plan_hits += 1
+            return module_keys
+
+    def put_module_keys(
+        self, model: torch.nn.Module, patch: ModelPatchRaw, prefix: str, module_keys: list[tuple[str, str]]
+    ) -> None:
+        """Cache the (layer key, module key) pairs of the patch's layers with the given prefix."""
+        with self._lock:
+            patches = self._module_keys.setdefault(model, weakref.WeakKeyDictionary())
+            patches.setdefault(patch, {})[prefix] = module_keys
+
+    def can_cache_deltas(self, layer: BaseLayerPatch) -> bool:
+        """Whether the deltas of the layer can be cached. The deltas of IA3 layers scale the original parameters, and
+        those of other layer types (e.g. SetParameterLayer) replace them, so they cannot be reused.
+        """
+        return self._max_delta_cache_bytes > 0 and isinstance(layer, LoRALayerBase) and not isinstance(layer, IA3Layer)
+
+    def get_deltas(
+        self, layer: BaseLayerPatch, patch_weight: float, dtype: torch.dtype
+    ) -> Optional[dict[str, torch.Tensor]]:
+        """Get the cached deltas of the layer, on the CPU, if they are cached."""
+        with self._lock:
+            key = (id(layer), patch_weight, dtype)
+            entry = self._deltas.get(key)
+            # The id of a layer that was garbage collected may have been reused
+            if entry is None or entry.layer() is not layer:
+                self.stats.delta_misses += 1
+                return None
+            self._deltas.move_to_end(key)
+            self.stats.delta_hits += 1
+            return entry.deltas
+
+    def put_deltas(
+        self, layer: BaseLayerPatch, patch_weight: float, dtype: torch.dtype, deltas: dict[str, torch.Tensor]
+    ) -> None:
+        """Cache the deltas of the layer, as computed with the given patch weight for parameters of the given dtype.
+
+        The deltas are copied to the CPU and cast to the dtype. Least recently used deltas are evicted to stay within
+        the budget.
+        """
+        if any(d.is_sparse for d in deltas.values()):
+            return
+        size = sum(d.nelement() for d in deltas.values()) * dtype.itemsize
+        if size > self._max_delta_cache_bytes:
+            return
+
+        cpu_deltas = {name: d.to(device=TorchDevice.CPU_DEVICE, dtype=dtype, copy=True) for name, d in deltas.items()}
+        with self._lock:
+            key = (id(layer), patch_weight, dtype)
+            old_entry = self._deltas.pop(key, None)
+            if old_entry is not None:
+                self._delta_cache_bytes -= old_entry.size
+            self._deltas[key] = _CachedDeltas(layer=weakref.ref(layer), deltas=cpu_deltas, size=size)
+            self._delta_cache_bytes += size
+            while self._delta_cache_bytes > self._max_delta_cache_bytes:
+                _, evicted = self._deltas.popitem(last=False)
+                self._delta_cache_bytes -= evicted.size
+
+    def record_setup_time(self, seconds: float) -> None:
+        with self._lock:
+            self.stats.setup_seconds += seconds
+            self.stats.last_setup_seconds = seconds
+
+
+_layer_patch_plan_cache: Optional[LayerPatchPlanCache] = None
+
+
+def get_layer_patch_plan_cache() -> LayerPatchPlanCache:
+    """Get the shared LayerPatchPlanCache, which is configured by the `lora_delta_cache_ram_mb` setting."""
+    global _layer_patch_plan_cache
+    if _layer_patch_plan_cache is None:
+        _layer_patch_plan_cache = LayerPatchPlanCache(
+            max_delta_cache_bytes=get_config().lora_delta_cache_ram_mb * 2**20
+        )
+    return _layer_patch_plan_cache
@@ -1,8 +1,11 @@
+import time
 from contextlib import contextmanager
 from typing import Dict, Iterable, Optional, Tuple
 
 import torch
 
+import invokeai.backend.util.logging as logger
+from invokeai.backend.patches.layer_patch_plan_cache import LayerPatchPlanCache, get_layer_patch_plan_cache
 from invokeai.backend.patches.layers.base_layer_patch import BaseLayerPatch
 from invokeai.backend.patches.layers.flux_control_lora_layer import FluxControlLoRALayer
 from invokeai.backend.patches.model_patch_raw import ModelPatchRaw
@@ -23,16 +26,23 @@ class LayerPatcher:
         cached_weights: Optional[Dict[str, torch.Tensor]] = None,
         force_direct_patching: bool = False,
         force_sidecar_patching: bool = False,
+        plan_cache: Optional[LayerPatchPlanCache] = None,
     ):
         """Apply 'smart' model patching that chooses whether to use direct patching or a sidecar wrapper for each
         module.
+
+        The resolved module keys, and optionally the deltas, of the patches are cached in `plan_cache` (by default, the
+        shared LayerPatchPlanCache), so that applying the same patches to the same model again is faster.
         """
+        plan_cache = plan_cache or get_layer_patch_plan_cache()
 
         # original_weights are stored for unpatching layers that are directly patched.
         original_weights = OriginalWeightsStorage(cached_weights)
         # original_modules are stored for unpatching layers that are wrapped.
         original_modules: dict[str, torch.nn.Module] = {}
         try:
+            start_time = time.perf_counter()
+            num_patches = 0
             for patch, patch_weight in patches:
                 LayerPatcher.apply_smart_model_patch(
                     model=model,
@@ -44,7 +54,14 @@ class LayerPatcher:
                     dtype=dtype,
                     force_direct_patching=force_direct_patching,
                     force_sidecar_patching=force_sidecar_patching,
+                    plan_cache=plan_cache,
                 )
+                num_patches += 1
+
+            if num_patches > 0:
+                setup_time = time.perf_counter() - start_time
+                plan_cache.record_setup_time(setup_time)
+                logger.debug(f"Applied {num_patches} patch(es) to {model.__class__.__name__} in {setup_time:.3f}s.")
 
             yield
         finally:
@@ -70,6 +87,7 @@ class LayerPatcher:
         dtype: torch.dtype,
         force_direct_patching: bool,
         force_sidecar_patching: bool,
+        plan_cache: Optional[LayerPatchPlanCache] = None,
     ):
         """Apply a single LoRA patch to a model using the 'smart' patching strategy that chooses whether to use direct
         patching or a sidecar wrapper for each module.
@@ -77,21 +95,15 @@ class LayerPatcher:
         if patch_weight == 0:
             return
 
-        # If the layer keys contain a dot, then they are not flattened, and can be directly used to access model
-        # submodules. If the layer keys do not contain a dot, then they are flattened, meaning that all '.' have been
-        # replaced with '_'. Non-flattened keys are preferred, because they allow submodules to be accessed directly
-        # without searching, but some legacy code still uses flattened keys.
-        layer_keys_are_flattened = "." not in next(iter(patch.layers.keys()))
+        plan_cache = plan_cache or get_layer_patch_plan_cache()
+        module_keys = plan_cache.get_module_keys(model, patch, prefix)
+        if module_keys is None:
+            module_keys = LayerPatcher._resolve_module_keys(model, patch, prefix)
+            plan_cache.put_module_keys(model, patch, prefix, module_keys)
 
-        prefix_len = len(prefix)
-
-        for layer_key, layer in patch.layers.items():
-            if not layer_key.startswith(prefix):
-                continue
-
-            module_key, module = LayerPatcher._get_submodule(
-                model, layer_key[prefix_len:], layer_key_is_flattened=layer_keys_are_flattened
-            )
+        for layer_key, module_key in module_keys:
+            layer = patch.layers[layer_key]
+            module = model.get_submodule(module_key)
 
             # Decide whether to use direct patching or a sidecar patch.
             # Direct patching is preferred, because it results in better runtime speed.
@@ -132,8 +144,35 @@ class LayerPatcher:
                     patch=layer,
                     patch_weight=patch_weight,
                     original_weights=original_weights,
+                    plan_cache=plan_cache,
                 )
 
+    @staticmethod
+    def _resolve_module_keys(model: torch.nn.Module, patch: ModelPatchRaw, prefix: str) -> list[tuple[str, str]]:
+        """Resolve the keys of the patch's layers with the given prefix to the keys of the model's submodules.
+
+        Returns:
+            list[tuple[str, str]]: The (layer key, module key) pairs.
+        """
+        # If the layer keys contain a dot, then they are not flattened, and can be directly used to access model
+        # submodules. If the layer keys do not contain a dot, then they are flattened, meaning that all '.' have been
+        # replaced with '_'. Non-flattened keys are preferred, because they allow submodules to be accessed directly
+        # without searching, but some legacy code still uses flattened keys.
+        layer_keys_are_flattened = "." not in next(iter(patch.layers.keys()))
+
+        prefix_len = len(prefix)
+
+        module_keys: list[tuple[str, str]] = []
+        for layer_key in patch.layers.keys():
+            if not layer_key.startswith(prefix):
+                continue
+
+            module_key, _ = LayerPatcher._get_submodule(
+                model, layer_key[prefix_len:], layer_key_is_flattened=layer_keys_are_flattened
+            )
+            module_keys.append((layer_key, module_key))
+        return module_keys
+
     @staticmethod
     def _is_any_part_of_layer_on_cpu(layer: torch.nn.Module) -> bool:
         return any(p.device.type == "cpu" for p in layer.parameters())
@@ -146,6 +185,7 @@ class LayerPatcher:
         patch: BaseLayerPatch,
         patch_weight: float,
         original_weights: OriginalWeightsStorage,
+        plan_cache: Optional[LayerPatchPlanCache] = None,
     ):
         # All of the LoRA weight calculations will be done on the same device as the module weight.
         # (Performance will be best if this is a CUDA device.)
@@ -153,17 +193,24 @@ class LayerPatcher:
         device = first_param.device
         dtype = first_param.dtype
 
-        # We intentionally move to the target device first, then cast. Experimentally, this was found to
-        # be significantly faster for 16-bit CPU tensors being moved to a CUDA device than doing the
-        # same thing in a single call to '.to(...)'.
-        patch.to(device=device)
-        patch.to(dtype=torch.float32)
-
-        # TODO(ryand): Using torch.autocast(...) over explicit casting may offer a speed benefit on CUDA
-        # devices here. Experimentally, it was found to be very slow on CPU. More investigation needed.
-        for param_name, param_weight in patch.get_parameters(
-            dict(module_to_patch.named_parameters(recurse=False)), weight=patch_weight
-        ).items():
+        # The cache of the layer's deltas, if they can be cached.
+        delta_cache = plan_cache if plan_cache is not None and plan_cache.can_cache_deltas(patch) else None
+        params = delta_cache.get_deltas(patch, patch_weight, dtype) if delta_cache is not None else None
+        if params is None:
+            # We intentionally move to the target device first, then cast. Experimentally, this was found to
+            # be significantly faster for 16-bit CPU tensors being moved to a CUDA device than doing the
+            # same thing in a single call to '.to(...)'.
+            patch.to(device=device)
+            patch.to(dtype=torch.float32)
+
+            # TODO(ryand): Using torch.autocast(...) over explicit casting may offer a speed benefit on CUDA
+            # devices here. Experimentally, it was found to be very slow on CPU. More investigation needed.
+            params = patch.get_parameters(dict(module_to_patch.named_parameters(recurse=False)), weight=patch_weight)
+            if delta_cache is not None:
+                delta_cache.put_deltas(patch, patch_weight, dtype, params)
+            patch.to(device=TorchDevice.CPU_DEVICE)
+
+        for param_name, param_weight in params.items():
             param_key = module_to_patch_key + "." + param_name
             module_param = module_to_patch.get_parameter(param_name)
 
@@ -182,9 +229,7 @@ class LayerPatcher:
                 )
                 module_param = expanded_weight
 
-            module_param += param_weight.to(dtype=dtype)
-
-        patch.to(device=TorchDevice.CPU_DEVICE)
+            module_param += param_weight.to(device=device, dtype=dtype)
 
     @staticmethod
     @torch.no_grad()
@@ -1,5 +1,5 @@
 import re
-from typing import Any, Dict, TypeVar
+from typing import Any, Dict, Mapping, TypeVar
 
 import torch
 
@@ -27,7 +27,7 @@ FLUX_KOHYA_TRANSFORMER_KEY_REGEX = (
 FLUX_KOHYA_CLIP_KEY_REGEX = r"lora_te1_text_model_encoder_layers_(\d+)_(mlp|self_attn)_(\w+)\.?.*"
 
 
-def is_state_dict_likely_in_flux_kohya_format(state_dict: Dict[str, Any]) -> bool:
+def is_state_dict_likely_in_flux_kohya_format(state_dict: Mapping[str, Any]) -> bool:
     """Checks if the provided state dict is likely in the Kohya FLUX LoRA format.
 
     This is intended to be a high-precision detector, but it is not guaranteed to have perfect precision. (A
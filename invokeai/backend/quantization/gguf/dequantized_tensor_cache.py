@@ -0,0 +1,112 @@
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import torch
+
+from invokeai.app.services.config.config_default import get_config
+
+
+@dataclass
+class _CacheEntry:
+    tensor: weakref.ref[torch.Tensor]
+    version: int
+    dequantized: torch.Tensor
+    size: int
+
+
+class DequantizedTensorCache:
+    """A least-recently-used cache of the dequantized values of GGMLTensors on the CPU, bounded by size.
+
+    GGMLTensors are dequantized every time they are used in an op. When running on the CPU, this can take longer than
+    the op itself. Caching the dequantized tensors trades memory for speed.
+
+    Tensors are tracked by identity. An entry is dropped when its tensor is garbage collected, and is not used if the
+    tensor's quantized data was modified in-place.
+
+    Args:
+        max_bytes: The maximum size of the cached tensors. If 0, nothing is cached.
+    """
+
+    def __init__(self, max_bytes: int = 0):
+        # A re-entrant lock, because entries are dropped from weakref callbacks, which may run during any allocation
+        self._lock = threading.RLock()
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._cur_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, tensor: torch.Tensor, quantized_data: torch.Tensor, dequantize: Callable[[], torch.Tensor]
+    ) -> torch.Tensor:
+        """Get the dequantized value of a tensor, dequantizing it if it is not cached.
+
+        Args:
+            tensor: The quantized tensor.
+            quantized_data: The quantized data of the tensor, which is checked for in-place modifications.
+            dequantize: Dequantizes the tensor.
+        """
+        if self._max_bytes == 0 or quantized_data.device.type != "cpu":
+            return dequantize()
+
+        key = id(tensor)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.tensor() is tensor and entry.version == quantized_data._version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.dequantized
+            self.misses += 1
+
+        dequantized = dequantize()
+        size = dequantized.nelement() * dequantized.element_size()
+        if size > self._max_bytes:
+            return dequantized
+
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = _CacheEntry(
+                tensor=weakref.ref(tensor, self._make_drop_callback(key)),
+                version=quantized_data._version,
+                dequantized=dequantized,
+                size=size,
+            )
+            self._cur_bytes += size
+            while self._cur_bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._cur_bytes -= evicted.size
+        return dequantized
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._cur_bytes = 0
+
+    def _drop(self, key: int) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._cur_bytes -= entry.size
+
+    def _make_drop_callback(self, key: int) -> Callable[[weakref.ref[torch.Tensor]], None]:
+        def drop(ref: weakref.ref[torch.Tensor]) -> None:
+            with self._lock:
+                entry = self._entries.get(key)
+                # The key may already have been reused by a newer tensor
+                if entry is not None and entry.tensor is ref:
+                    self._drop(key)
+
+        return drop
+
+
+_dequantized_tensor_cache: Optional[DequantizedTensorCache] = None
+
+
+def get_dequantized_tensor_cache() -> DequantizedTensorCache:
+    """Get the shared DequantizedTensorCache, which is configured by the `gguf_dequantize_cache_ram_mb` setting."""
+    global _dequantized_tensor_cache
+    if _dequantized_tensor_cache is None:
+        _dequantized_tensor_cache = DequantizedTensorCache(max_bytes=get_config().gguf_dequantize_cache_ram_mb * 2**20)
+    return _dequantized_tensor_cache
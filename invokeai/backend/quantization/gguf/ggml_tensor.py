@@ -1,8 +1,9 @@
-from typing import overload
+from typing import cast, overload
 
 import gguf
 import torch
 
+from invokeai.backend.quantization.gguf.dequantized_tensor_cache import get_dequantized_tensor_cache
 from invokeai.backend.quantization.gguf.utils import (
     DEQUANTIZE_FUNCTIONS,
     TORCH_COMPATIBLE_QTYPES,
@@ -136,16 +137,19 @@ class GGMLTensor(torch.Tensor):
     def get_dequantized_tensor(self):
         """Return the dequantized tensor.
 
-        Args:
-            dtype: The dtype of the dequantized tensor.
+        The dequantized values of tensors on the CPU are cached, if the DequantizedTensorCache is enabled.
         """
         if self._ggml_quantization_type in TORCH_COMPATIBLE_QTYPES:
             return self.quantized_data.to(self.compute_dtype)
-        elif self._ggml_quantization_type in DEQUANTIZE_FUNCTIONS:
+        return get_dequantized_tensor_cache().get(self, self.quantized_data, self._dequantize)
+
+    def _dequantize(self) -> torch.Tensor:
+        if self._ggml_quantization_type in DEQUANTIZE_FUNCTIONS:
             # TODO(ryand): Look into how the dtype param is intended to be used.
-            return dequantize(
+            dequantized = dequantize(
                 data=self.quantized_data, qtype=self._ggml_quantization_type, oshape=self.tensor_shape, dtype=None
-            ).to(self.compute_dtype)
+            )
+            return cast(torch.Tensor, dequantized).to(self.compute_dtype)
         else:
             # There is no GPU implementation for this quantization type, so fallback to the numpy implementation.
             new = gguf.quants.dequantize(self.quantized_data.cpu().numpy(), self._ggml_quantization_type)
@@ -11,6 +11,10 @@ TORCH_COMPATIBLE_QTYPES = {None, gguf.GGMLQuantizationType.F32, gguf.GGMLQuantiz
 QK_K = 256
 K_SCALE_SIZE = 12
 
+# I-Quants #
+# The non-linear values of the 4-bit I-Quants
+IQ4_NL_KVALUES = (-127, -104, -83, -65, -49, -35, -22, -10, 1, 13, 25, 38, 53, 69, 89, 113)
+
 
 def get_scale_min(scales: torch.Tensor):
     n_blocks = scales.shape[0]
@@ -252,6 +256,54 @@ def dequantize_blocks_Q2_K(
     return qs.reshape((n_blocks, -1))
 
 
+def dequantize_blocks_IQ4_NL(
+    blocks: torch.Tensor, block_size: int, type_size: int, dtype: Optional[torch.dtype] = None
+) -> torch.Tensor:
+    n_blocks = blocks.shape[0]
+
+    d, qs = split_block_dims(blocks, 2)
+    d = d.view(torch.float16).to(dtype)
+
+    qs = qs.reshape((n_blocks, -1, 1, block_size // 2)) >> torch.tensor(
+        [0, 4], device=d.device, dtype=torch.uint8
+    ).reshape((1, 1, 2, 1))
+    qs = (qs & 0x0F).reshape((n_blocks, -1)).to(torch.int64)
+
+    kvalues = torch.tensor(IQ4_NL_KVALUES, device=d.device, dtype=torch.int8)
+    return d * kvalues[qs]
+
+
+def dequantize_blocks_IQ4_XS(
+    blocks: torch.Tensor, block_size: int, type_size: int, dtype: Optional[torch.dtype] = None
+) -> torch.Tensor:
+    n_blocks = blocks.shape[0]
+
+    d, scales_h, scales_l, qs = split_block_dims(blocks, 2, 2, QK_K // 64)
+    d = d.view(torch.float16).to(dtype)
+
+    # The high bits of the scales are packed in a little-endian uint16
+    scales_h = scales_h.to(torch.int32)
+    scales_h = (scales_h[:, 0] | (scales_h[:, 1] << 8)).reshape((n_blocks, 1)) >> torch.arange(
+        0, 16, 2, device=d.device, dtype=torch.int32
+    ).reshape((1, QK_K // 32))
+    scales_l = scales_l.reshape((n_blocks, -1, 1)) >> torch.tensor([0, 4], device=d.device, dtype=torch.uint8).reshape(
+        (1, 1, 2)
+    )
+    scales_l = scales_l.reshape((n_blocks, QK_K // 32)) & 0x0F
+    scales_h = (scales_h & 0x03).to(torch.uint8)
+    scales = (scales_l | (scales_h << 4)).to(torch.int8) - 32
+
+    dl = (d * scales).reshape((n_blocks, -1, 1))
+
+    qs = qs.reshape((n_blocks, -1, 1, 16)) >> torch.tensor([0, 4], device=d.device, dtype=torch.uint8).reshape(
+        (1, 1, 2, 1)
+    )
+    qs = (qs & 0x0F).reshape((n_blocks, -1, 32)).to(torch.int64)
+
+    kvalues = torch.tensor(IQ4_NL_KVALUES, device=d.device, dtype=torch.int8)
+    return (dl * kvalues[qs]).reshape((n_blocks, QK_K))
+
+
 DEQUANTIZE_FUNCTIONS: dict[
     gguf.GGMLQuantizationType, Callable[[torch.Tensor, int, int, Optional[torch.dtype]], torch.Tensor]
 ] = {
@@ -266,6 +318,8 @@ DEQUANTIZE_FUNCTIONS: dict[
     gguf.GGMLQuantizationType.Q4_K: dequantize_blocks_Q4_K,
     gguf.GGMLQuantizationType.Q3_K: dequantize_blocks_Q3_K,
     gguf.GGMLQuantizationType.Q2_K: dequantize_blocks_Q2_K,
+    gguf.GGMLQuantizationType.IQ4_NL: dequantize_blocks_IQ4_NL,
+    gguf.GGMLQuantizationType.IQ4_XS: dequantize_blocks_IQ4_XS,
 }
 
 
@@ -619,6 +619,27 @@ export type paths = {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/images/cursor": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * List Image Dtos By Cursor
+         * @description Gets a page of image DTOs. Unlike offset pagination, the cost of getting a page does not grow with its depth.
+         *     The sort order and filters must be the same for every page.
+         */
+        get: operations["list_image_dtos_by_cursor"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/images/delete": {
         parameters: {
             query?: never;
@@ -687,6 +708,27 @@ export type paths = {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/images/download/stream": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        get?: never;
+        put?: never;
+        /**
+         * Stream Images Download
+         * @description Streams a zip file of images, without preparing it on disk first. Progress is reported with bulk download
+         *     events, which give the number of images written, from which an interrupted download can be resumed.
+         */
+        post: operations["stream_images_download"];
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/images/download/{bulk_download_item_name}": {
         parameters: {
             query?: never;
@@ -998,6 +1040,46 @@ export type paths = {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/app/image_cache/status": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * Get Image Cache Status
+         * @description Gets the status of the decoded image and thumbnail caches
+         */
+        get: operations["get_image_cache_status"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
+    "/api/v1/app/events/stats": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * Get Event Stats
+         * @description Gets the delivery statistics of each event type, including how many progress events were coalesced
+         */
+        get: operations["get_event_stats"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/queue/{queue_id}/enqueue_batch": {
         parameters: {
             query?: never;
@@ -2272,6 +2354,25 @@ export type components = {
              */
             image_names: string[];
         };
+        /** Body_stream_images_download */
+        Body_stream_images_download: {
+            /**
+             * Image Names
+             * @description The list of names of images to download
+             */
+            image_names?: string[] | null;
+            /**
+             * Board Id
+             * @description The board from which image should be downloaded
+             */
+            board_id?: string | null;
+            /**
+             * Start
+             * @description The number of images to skip, to resume a download
+             * @default 0
+             */
+            start?: number;
+        };
         /** Body_unstar_images_in_list */
         Body_unstar_images_in_list: {
             /**
@@ -2600,6 +2701,47 @@ export type components = {
              */
             error: string;
         };
+        /**
+         * BulkDownloadProgressEvent
+         * @description Event model for bulk_download_progress
+         */
+        BulkDownloadProgressEvent: {
+            /**
+             * Timestamp
+             * @description The timestamp of the event
+             */
+            timestamp: number;
+            /**
+             * Bulk Download Id
+             * @description The ID of the bulk image download
+             */
+            bulk_download_id: string;
+            /**
+             * Bulk Download Item Id
+             * @description The ID of the bulk image download item
+             */
+            bulk_download_item_id: string;
+            /**
+             * Bulk Download Item Name
+             * @description The name of the bulk image download item
+             */
+            bulk_download_item_name: string;
+            /**
+             * Images Done
+             * @description The number of images completely written. An interrupted download can be resumed from this image.
+             */
+            images_done: number;
+            /**
+             * Images Total
+             * @description The total number of images in the download
+             */
+            images_total: number;
+            /**
+             * Bytes Sent
+             * @description The number of bytes of the zip file sent so far
+             */
+            bytes_sent: number;
+        };
         /**
          * BulkDownloadStartedEvent
          * @description Event model for bulk_download_started
@@ -6092,6 +6234,43 @@ export type components = {
              */
             priority: number;
         };
+        /**
+         * EventServiceStats
+         * @description Delivery statistics of the event service
+         */
+        EventServiceStats: {
+            /**
+             * Batches
+             * @description The number of batches of events delivered
+             * @default 0
+             */
+            batches?: number;
+            /**
+             * Events
+             * @description The statistics of each event type
+             */
+            events?: {
+                [key: string]: components["schemas"]["EventStats"];
+            };
+        };
+        /**
+         * EventStats
+         * @description Delivery statistics of an event type
+         */
+        EventStats: {
+            /**
+             * Dispatched
+             * @description The number of events dispatched
+             * @default 0
+             */
+            dispatched?: number;
+            /**
+             * Coalesced
+             * @description The number of events dropped because a newer event superseded them before delivery
+             * @default 0
+             */
+            coalesced?: number;
+        };
         /** ExposedField */
         ExposedField: {
             /** Nodeid */
@@ -8884,6 +9063,54 @@ export type components = {
              */
             image_name: string;
         };
+        /** ImageFileCacheStats */
+        ImageFileCacheStats: {
+            /**
+             * Hits
+             * @description The number of cache hits
+             * @default 0
+             */
+            hits?: number;
+            /**
+             * Misses
+             * @description The number of cache misses
+             * @default 0
+             */
+            misses?: number;
+            /**
+             * Evictions
+             * @description The number of images evicted to stay within the cache's budget
+             * @default 0
+             */
+            evictions?: number;
+            /**
+             * Size
+             * @description The number of images in the cache
+             * @default 0
+             */
+            size?: number;
+            /**
+             * Size Bytes
+             * @description The estimated size of the decoded images in the cache, in bytes
+             * @default 0
+             */
+            size_bytes?: number;
+            /**
+             * Max Size Bytes
+             * @description The maximum size of the cache, in bytes
+             * @default 0
+             */
+            max_size_bytes?: number;
+        };
+        /** ImageFileCacheStatus */
+        ImageFileCacheStatus: {
+            /** @description Stats for the full-size image cache */
+            images: components["schemas"]["ImageFileCacheStats"];
+            /** @description Stats for the thumbnail cache */
+            thumbnails: components["schemas"]["ImageFileCacheStats"];
+            /** @description Stats for the intermediate images kept in memory until their files are needed. Their evictions are the images written to stay within the budget. */
+            deferred: components["schemas"]["ImageFileCacheStats"];
+        };
         /**
          * Adjust Image Hue
          * @description Adjusts the Hue of an image.
@@ -10176,6 +10403,64 @@ export type components = {
              * @description The maximum size of the invocation cache
              */
             max_size: number;
+            /**
+             * Size Bytes
+             * @description The estimated memory used by the cached outputs, in bytes
+             * @default 0
+             */
+            size_bytes?: number;
+            /**
+             * Max Size Bytes
+             * @description The maximum memory the cached outputs may use, in bytes
+             * @default 0
+             */
+            max_size_bytes?: number;
+            /**
+             * Evictions
+             * @description The number of outputs evicted from the cache
+             * @default 0
+             */
+            evictions?: number;
+            /**
+             * Stats By Type
+             * @description Hit, miss and eviction counters per invocation type
+             */
+            stats_by_type?: {
+                [key: string]: components["schemas"]["InvocationCacheTypeStats"];
+            };
+            /**
+             * Disk Size Bytes
+             * @description The disk space used by the persistent invocation cache, in bytes
+             * @default 0
+             */
+            disk_size_bytes?: number;
+            /**
+             * Max Disk Size Bytes
+             * @description The maximum disk space the persistent invocation cache may use, in bytes
+             * @default 0
+             */
+            max_disk_size_bytes?: number;
+        };
+        /** InvocationCacheTypeStats */
+        InvocationCacheTypeStats: {
+            /**
+             * Hits
+             * @description The number of cache hits for this invocation type
+             * @default 0
+             */
+            hits?: number;
+            /**
+             * Misses
+             * @description The number of cache misses for this invocation type
+             * @default 0
+             */
+            misses?: number;
+            /**
+             * Evictions
+             * @description The number of outputs of this invocation type evicted from the cache
+             * @default 0
+             */
+            evictions?: number;
         };
         /**
          * InvocationCompleteEvent
@@ -11213,6 +11498,29 @@ export type components = {
             type: "iterate_output";
         };
         JsonValue: unknown;
+        /** KeysetPaginatedResults[ImageDTO] */
+        KeysetPaginatedResults_ImageDTO_: {
+            /**
+             * Limit
+             * @description Limit of items to get
+             */
+            limit: number;
+            /**
+             * Total
+             * @description Total number of items in result
+             */
+            total: number;
+            /**
+             * Next Cursor
+             * @description The cursor to get the next page with, or null if this is the last page
+             */
+            next_cursor: string | null;
+            /**
+             * Items
+             * @description Items
+             */
+            items: components["schemas"]["ImageDTO"][];
+        };
         /**
          * LaMa Infill
          * @description Infills transparent areas of an image using the LaMa model
@@ -16408,6 +16716,11 @@ export type components = {
              * @description Whether a session is being processed
              */
             is_processing: boolean;
+            /**
+             * Workers
+             * @description The status of each worker
+             */
+            workers?: components["schemas"]["SessionWorkerStatus"][];
         };
         /**
          * SessionQueueAndProcessorStatus
@@ -16689,6 +17002,29 @@ export type components = {
              */
             total: number;
         };
+        /** SessionWorkerStatus */
+        SessionWorkerStatus: {
+            /**
+             * Worker Id
+             * @description The index of the worker
+             */
+            worker_id: number;
+            /**
+             * Is Processing
+             * @description Whether the worker is processing a session
+             */
+            is_processing: boolean;
+            /**
+             * Item Id
+             * @description The ID of the queue item being processed, if any
+             */
+            item_id?: number | null;
+            /**
+             * Session Id
+             * @description The ID of the session being processed, if any
+             */
+            session_id?: string | null;
+        };
         /**
          * Show Image
          * @description Displays a provided image using the OS image viewer, and passes it forward in the pipeline.
@@ -20460,6 +20796,54 @@ export interface operations {
             };
         };
     };
+    list_image_dtos_by_cursor: {
+        parameters: {
+            query?: {
+                /** @description The origin of images to list. */
+                image_origin?: components["schemas"]["ResourceOrigin"] | null;
+                /** @description The categories of image to include. */
+                categories?: components["schemas"]["ImageCategory"][] | null;
+                /** @description Whether to list intermediate images. */
+                is_intermediate?: boolean | null;
+                /** @description The board id to filter by. Use 'none' to find images without a board. */
+                board_id?: string | null;
+                /** @description The cursor returned with the previous page. Omit to get the first page. */
+                cursor?: string | null;
+                /** @description The number of images per page */
+                limit?: number;
+                /** @description The order of sort */
+                order_dir?: components["schemas"]["SQLiteDirection"];
+                /** @description Whether to sort by starred images first */
+                starred_first?: boolean;
+                /** @description The term to search for */
+                search_term?: string | null;
+            };
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            /** @description Successful Response */
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["KeysetPaginatedResults_ImageDTO_"];
+                };
+            };
+            /** @description Validation Error */
+            422: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["HTTPValidationError"];
+                };
+            };
+        };
+    };
     delete_images_from_list: {
         parameters: {
             query?: never;
@@ -20592,6 +20976,53 @@ export interface operations {
             };
         };
     };
+    stream_images_download: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: {
+            content: {
+                "application/json": components["schemas"]["Body_stream_images_download"];
+            };
+        };
+        responses: {
+            /** @description A zip file of the images, streamed as it is written */
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/zip": unknown;
+                };
+            };
+            /** @description No images or board id specified */
+            400: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content?: never;
+            };
+            /** @description Image or board not found */
+            404: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content?: never;
+            };
+            /** @description Validation Error */
+            422: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["HTTPValidationError"];
+                };
+            };
+        };
+    };
     get_bulk_download_item: {
         parameters: {
             query?: never;
@@ -21167,6 +21598,46 @@ export interface operations {
             };
         };
     };
+    get_image_cache_status: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            /** @description Successful Response */
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["ImageFileCacheStatus"];
+                };
+            };
+        };
+    };
+    get_event_stats: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            /** @description Successful Response */
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["EventServiceStats"];
+                };
+            };
+        };
+    };
     enqueue_batch: {
         parameters: {
             query?: never;
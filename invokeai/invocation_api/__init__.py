@@ -8,6 +8,7 @@ from invokeai.app.invocations.baseinvocation import (
     BaseInvocation,
     BaseInvocationOutput,
     Classification,
+    Concurrency,
     invocation,
     invocation_output,
 )
@@ -88,6 +89,7 @@ __all__ = [
     "BaseInvocation",
     "BaseInvocationOutput",
     "Classification",
+    "Concurrency",
     "invocation",
     "invocation_output",
     # invokeai.app.services.shared.invocation_context
@@ -0,0 +1,80 @@
+"""Benchmarks dequantizing GGUF weights on the CPU, for each quantization type.
+
+Each type is benchmarked with a weight of random blocks of the given shape. It compares:
+- numpy: the numpy implementation of the gguf library, which GGMLTensor falls back to for types without a torch one
+- torch: the torch implementation used by GGMLTensor, if the type has one
+- cached: a GGMLTensor whose dequantized value is kept in a DequantizedTensorCache, as with
+  `gguf_dequantize_cache_ram_mb` set
+
+Usage:
+    python scripts/benchmark_gguf_dequantize.py --shape 3072 3072 --types Q4_K IQ4_XS --repeats 5
+"""
+
+import argparse
+import time
+from functools import partial
+from typing import Callable
+
+import gguf
+import numpy as np
+import torch
+
+from invokeai.backend.quantization.gguf.dequantized_tensor_cache import DequantizedTensorCache
+from invokeai.backend.quantization.gguf.ggml_tensor import GGMLTensor
+from invokeai.backend.quantization.gguf.utils import DEQUANTIZE_FUNCTIONS, dequantize
+
+
+def best_of(repeats: int, func: Callable[[], object]) -> float:
+    times: list[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shape", type=int, nargs=2, default=[3072, 3072], help="Shape of the dequantized weight.")
+    parser.add_argument(
+        "--types",
+        nargs="+",
+        default=[t.name for t in DEQUANTIZE_FUNCTIONS],
+        help="Quantization types to benchmark.",
+    )
+    parser.add_argument("--threads", type=int, default=None, help="Number of torch threads.")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of times to repeat each measurement.")
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+
+    shape = torch.Size(args.shape)
+    rng = np.random.default_rng(0)
+    print(f"weight of shape {tuple(shape)}, {torch.get_num_threads()} threads, best of {args.repeats}")
+    for name in args.types:
+        qtype = gguf.GGMLQuantizationType[name]
+        block_size, type_size = gguf.GGML_QUANT_SIZES[qtype]
+        blocks = rng.integers(0, 256, size=(shape.numel() // block_size, type_size), dtype=np.uint8)
+        data = torch.from_numpy(blocks)
+
+        results: dict[str, float] = {}
+        with np.errstate(all="ignore"):
+            results["numpy"] = best_of(args.repeats, partial(gguf.quants.dequantize, blocks, qtype))
+        if qtype in DEQUANTIZE_FUNCTIONS:
+            results["torch"] = best_of(args.repeats, partial(dequantize, data, qtype, shape))
+        tensor = GGMLTensor(data, qtype, shape, torch.float32)
+        cache = DequantizedTensorCache(max_bytes=shape.numel() * 4)
+        cache.get(tensor, data, tensor._dequantize)
+        results["cached"] = best_of(args.repeats, partial(cache.get, tensor, data, tensor._dequantize))
+
+        line = f"{name:>8}:"
+        for method, seconds in results.items():
+            line += f"  {method} {seconds * 1000:9.3f} ms"
+        if "torch" in results:
+            line += f"  {results['numpy'] / results['torch']:6.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
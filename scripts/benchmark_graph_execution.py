@@ -0,0 +1,273 @@
+"""Benchmarks scheduling the nodes of large iterate/collect graphs with `GraphExecutionState`.
+
+Builds a synthetic graph that iterates over a collection of integers, runs a chain of math nodes for each item, collects
+the results and runs a final node on the collection. The session is executed to completion with trivial invocations, so
+the time measured is dominated by `next()` and `complete()`. It compares:
+- legacy: the previous scheduler, which searched the whole execution graph for a ready node on every call to `next()`,
+  searched the source graph's ancestors for every node on every preparation, and validated every prepared edge
+  against the whole execution graph
+- incremental: the current scheduler, which keeps in-degree counters, adjacency indexes and a ready queue up to date as
+  nodes are prepared and completed
+
+Usage:
+    python scripts/benchmark_graph_execution.py --items 50 100 200 --chain 4 --repeats 3
+"""
+
+import argparse
+import copy
+import itertools
+import time
+from typing import Optional
+from unittest.mock import Mock
+
+import networkx as nx
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation, BaseInvocationOutput, InvocationContext
+from invokeai.app.invocations.collections import RangeOfSizeInvocation
+from invokeai.app.invocations.math import AddInvocation
+from invokeai.app.services.shared.graph import (
+    CollectInvocation,
+    Edge,
+    EdgeConnection,
+    Graph,
+    GraphExecutionState,
+    IterateInvocation,
+    copydeep,
+)
+from invokeai.app.util.misc import uuid_string
+
+
+class LegacyGraphExecutionState(GraphExecutionState):
+    """The previous scheduler, kept here as a baseline."""
+
+    def complete(self, node_id: str, output: BaseInvocationOutput) -> None:
+        if node_id not in self.execution_graph.nodes:
+            return
+        self.executed.add(node_id)
+        self.results[node_id] = output
+        source_node = self.prepared_source_mapping[node_id]
+        prepared_nodes = self.source_prepared_mapping[source_node]
+        if all(n in self.executed for n in prepared_nodes):
+            self.executed.add(source_node)
+            self.executed_history.append(source_node)
+
+    def is_complete(self) -> bool:
+        node_ids = set(self.graph.nx_graph_flat().nodes)
+        return self.has_error() or all((k in self.executed for k in node_ids))
+
+    def _create_execution_node(self, node_id: str, iteration_node_map: list[tuple[str, str]]) -> list[str]:
+        node = self.graph.get_node(node_id)
+        self_iteration_count = -1
+        if isinstance(node, IterateInvocation):
+            input_collection_edge = next(iter(self.graph._get_input_edges(node_id, "collection")))
+            input_collection_prepared_node_id = next(
+                n[1] for n in iteration_node_map if n[0] == input_collection_edge.source.node_id
+            )
+            input_collection_prepared_node_output = self.results[input_collection_prepared_node_id]
+            input_collection = getattr(input_collection_prepared_node_output, input_collection_edge.source.field)
+            self_iteration_count = len(input_collection)
+
+        new_nodes: list[str] = []
+        if self_iteration_count == 0:
+            return new_nodes
+
+        new_edges: list[Edge] = []
+        for edge in self.graph._get_input_edges(node_id):
+            for input_node_id in (n[1] for n in iteration_node_map if n[0] == edge.source.node_id):
+                new_edges.append(
+                    Edge(
+                        source=EdgeConnection(node_id=input_node_id, field=edge.source.field),
+                        destination=EdgeConnection(node_id="", field=edge.destination.field),
+                    )
+                )
+
+        for i in range(self_iteration_count) if self_iteration_count > 0 else [-1]:
+            new_node = copy.deepcopy(node)
+            new_node.id = uuid_string()
+            if isinstance(new_node, IterateInvocation):
+                new_node.index = i
+            self.execution_graph.add_node(new_node)
+            self.prepared_source_mapping[new_node.id] = node_id
+            if node_id not in self.source_prepared_mapping:
+                self.source_prepared_mapping[node_id] = set()
+            self.source_prepared_mapping[node_id].add(new_node.id)
+            for edge in new_edges:
+                self.execution_graph.add_edge(
+                    Edge(
+                        source=edge.source,
+                        destination=EdgeConnection(node_id=new_node.id, field=edge.destination.field),
+                    )
+                )
+            new_nodes.append(new_node.id)
+
+        return new_nodes
+
+    def _prepare(self) -> Optional[str]:
+        g = self.graph.nx_graph_flat()
+        next_node_id = next(
+            (
+                n
+                for n in nx.topological_sort(g)
+                if n not in self.source_prepared_mapping
+                and not (
+                    isinstance(self.graph.get_node(n), IterateInvocation)
+                    and not all((e[0] in self.executed for e in g.in_edges(n)))
+                )
+                and not any(
+                    (
+                        isinstance(self.graph.get_node(a), IterateInvocation) and a not in self.executed
+                        for a in nx.ancestors(g, n)
+                    )
+                )
+            ),
+            None,
+        )
+        if next_node_id is None:
+            return None
+
+        next_node_parents = [e[0] for e in g.in_edges(next_node_id)]
+        new_node_ids = []
+        if isinstance(self.graph.get_node(next_node_id), CollectInvocation):
+            all_iteration_mappings = list(
+                itertools.chain(*(((s, p) for p in self.source_prepared_mapping[s]) for s in next_node_parents))
+            )
+            new_node_ids.extend(self._create_execution_node(next_node_id, all_iteration_mappings))
+        else:
+            iterator_graph = self._iterator_graph()
+            iterator_nodes = [
+                n
+                for n in nx.ancestors(iterator_graph, next_node_id)
+                if isinstance(self.graph.get_node(n), IterateInvocation)
+            ]
+            iterator_nodes_prepared = [list(self.source_prepared_mapping[n]) for n in iterator_nodes]
+            eg = self.execution_graph.nx_graph_flat()
+            for it in itertools.product(*iterator_nodes_prepared):
+                iteration_mappings = [
+                    (n, self._get_legacy_iteration_node(n, g, eg, list(it))) for n in next_node_parents
+                ]
+                new_node_ids.extend(self._create_execution_node(next_node_id, iteration_mappings))  # type: ignore
+
+        return next(iter(new_node_ids), None)
+
+    def _get_legacy_iteration_node(
+        self, source_node_id: str, graph: nx.DiGraph, execution_graph: nx.DiGraph, prepared_iterator_nodes: list[str]
+    ) -> Optional[str]:
+        prepared_nodes = self.source_prepared_mapping[source_node_id]
+        if len(prepared_nodes) == 1:
+            return next(iter(prepared_nodes))
+        prepared_iterator = next((n for n in prepared_nodes if n in prepared_iterator_nodes), None)
+        if prepared_iterator is not None:
+            return prepared_iterator
+        parent_iterators = [
+            n for n in prepared_iterator_nodes if nx.has_path(graph, self.prepared_source_mapping[n], source_node_id)
+        ]
+        return next(
+            (n for n in prepared_nodes if all(nx.has_path(execution_graph, pit, n) for pit in parent_iterators)),
+            None,
+        )
+
+    def _get_next_node(self) -> Optional[BaseInvocation]:
+        g = self.execution_graph.nx_graph()
+        topo_order = list(nx.dfs_postorder_nodes(g))
+        iterate_nodes = [n for n in topo_order if isinstance(self.execution_graph.nodes[n], IterateInvocation)]
+        iterate_nodes.sort(key=lambda x: self.execution_graph.nodes[x].index)  # type: ignore
+
+        def is_ready(node_id: str) -> bool:
+            return node_id not in self.executed and all((e[0] in self.executed for e in g.in_edges(node_id)))
+
+        for iterate_node in iterate_nodes:
+            if is_ready(iterate_node):
+                return self.execution_graph.nodes[iterate_node]
+            for child_node in nx.dfs_postorder_nodes(g, iterate_node):
+                if is_ready(child_node):
+                    return self.execution_graph.nodes[child_node]
+        for node in topo_order:
+            if is_ready(node):
+                return self.execution_graph.nodes[node]
+        return None
+
+    def _prepare_inputs(self, node: BaseInvocation):
+        input_edges = [e for e in self.execution_graph.edges if e.destination.node_id == node.id]
+        if isinstance(node, CollectInvocation):
+            node.collection = [
+                copydeep(getattr(self.results[edge.source.node_id], edge.source.field))
+                for edge in input_edges
+                if edge.destination.field == "item"
+            ]
+        else:
+            for edge in input_edges:
+                setattr(
+                    node,
+                    edge.destination.field,
+                    copydeep(getattr(self.results[edge.source.node_id], edge.source.field)),
+                )
+
+
+def build_graph(num_items: int, chain_length: int) -> Graph:
+    graph = Graph()
+    graph.add_node(RangeOfSizeInvocation(id="range", start=0, size=num_items, step=1))
+    graph.add_node(IterateInvocation(id="iterate"))
+    graph.add_edge(
+        Edge(
+            source=EdgeConnection(node_id="range", field="collection"),
+            destination=EdgeConnection(node_id="iterate", field="collection"),
+        )
+    )
+    previous = EdgeConnection(node_id="iterate", field="item")
+    for i in range(chain_length):
+        graph.add_node(AddInvocation(id=f"add_{i}", b=1))
+        graph.add_edge(Edge(source=previous, destination=EdgeConnection(node_id=f"add_{i}", field="a")))
+        previous = EdgeConnection(node_id=f"add_{i}", field="value")
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_edge(Edge(source=previous, destination=EdgeConnection(node_id="collect", field="item")))
+    return graph
+
+
+def execute(session: GraphExecutionState) -> int:
+    context = Mock(InvocationContext)
+    executed = 0
+    while (node := session.next()) is not None:
+        session.complete(node.id, node.invoke(context))
+        executed += 1
+    assert session.is_complete()
+    return executed
+
+
+def time_execution(session_class: type[GraphExecutionState], graph: Graph) -> float:
+    session = session_class(graph=graph.model_copy(deep=True))
+    start = time.perf_counter()
+    execute(session)
+    return time.perf_counter() - start
+
+
+def best_of(repeats: int, session_class: type[GraphExecutionState], graph: Graph) -> float:
+    return min(time_execution(session_class, graph) for _ in range(repeats))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[50, 100, 200], help="Collection sizes to iterate.")
+    parser.add_argument("--chain", type=int, default=4, help="Number of nodes executed for each item.")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of times to repeat each measurement.")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only measure the incremental scheduler.")
+    args = parser.parse_args()
+
+    print(f"chain of {args.chain} nodes per item, best of {args.repeats}")
+    for num_items in args.items:
+        graph = build_graph(num_items, args.chain)
+        num_nodes = execute(GraphExecutionState(graph=graph.model_copy(deep=True)))
+        results: dict[str, float] = {}
+        if not args.skip_legacy:
+            results["legacy"] = best_of(args.repeats, LegacyGraphExecutionState, graph)
+        results["incremental"] = best_of(args.repeats, GraphExecutionState, graph)
+
+        line = f"{num_items:>6} items, {num_nodes:>6} nodes:"
+        for name, seconds in results.items():
+            line += f"  {name} {seconds * 1000:9.1f} ms ({seconds / num_nodes * 1e6:8.1f} us/node)"
+        if "legacy" in results:
+            line += f"  {results['legacy'] / results['incremental']:6.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
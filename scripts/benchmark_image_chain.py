@@ -0,0 +1,120 @@
+"""Benchmarks a chain of image invocations through `DiskImageFileStorage`, with and without deferred saves.
+
+Each step reads the previous step's image from the storage, applies a PIL operation like those of the image nodes
+(crop, resize, blur, paste, channel extraction and color adjustment), and saves the result as an intermediate image. The
+last step saves a non-intermediate image and gets its path, as when it is shown in the gallery. With
+`--delete-intermediates`, the intermediate images are then deleted, as when intermediates are cleared.
+
+It compares, for each number of background save workers:
+- written: intermediate images are written when they are saved (`intermediate_image_ram_mb` set to 0)
+- deferred: intermediate images are kept in memory, so only the final image is written
+
+Usage:
+    python scripts/benchmark_image_chain.py --sizes 1024 2048 --steps 8 --save-workers 0 2 --repeats 3
+"""
+
+import argparse
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable
+from unittest.mock import MagicMock
+
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+
+from invokeai.app.services.image_files.image_files_disk import DiskImageFileStorage
+
+
+def crop(image: Image.Image) -> Image.Image:
+    return image.crop((8, 8, image.width - 8, image.height - 8))
+
+
+def resize(image: Image.Image) -> Image.Image:
+    return image.resize((image.width + 16, image.height + 16), Image.Resampling.LANCZOS)
+
+
+def blur(image: Image.Image) -> Image.Image:
+    return image.filter(ImageFilter.GaussianBlur(2))
+
+
+def paste(image: Image.Image) -> Image.Image:
+    pasted = image.copy()
+    pasted.paste(image.resize((image.width // 2, image.height // 2)), (image.width // 4, image.height // 4))
+    return pasted
+
+
+def channel(image: Image.Image) -> Image.Image:
+    red = image.getchannel("R")
+    return Image.merge("RGB", (red, image.getchannel("G"), red))
+
+
+def color(image: Image.Image) -> Image.Image:
+    return ImageEnhance.Color(image).enhance(1.5)
+
+
+OPERATIONS: list[Callable[[Image.Image], Image.Image]] = [crop, resize, blur, paste, channel, color]
+
+
+def run_chain(
+    image_files: DiskImageFileStorage, image: Image.Image, steps: int, delete_intermediates: bool, run: list[int]
+) -> None:
+    run[0] += 1
+    image_files.save(image, f"{run[0]}_0.png", is_intermediate=True)
+    for step in range(1, steps + 1):
+        image = OPERATIONS[(step - 1) % len(OPERATIONS)](image_files.get(f"{run[0]}_{step - 1}.png"))
+        image_files.save(image, f"{run[0]}_{step}.png", is_intermediate=step < steps)
+    image_files.get_path(f"{run[0]}_{steps}.png")
+    if delete_intermediates:
+        for step in range(steps):
+            image_files.delete(f"{run[0]}_{step}.png")
+
+
+def best_of(repeats: int, func: Callable[[], object]) -> float:
+    times: list[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048], help="Image widths and heights.")
+    parser.add_argument("--steps", type=int, default=8, help="Number of image operations in the chain.")
+    parser.add_argument("--save-workers", type=int, nargs="+", default=[0, 2], help="Numbers of save workers.")
+    parser.add_argument("--compress-level", type=int, default=1, help="PNG compression level, as `pil_compress_level`.")
+    parser.add_argument("--delete-intermediates", action="store_true", help="Delete the intermediate images.")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of times to repeat each measurement.")
+    args = parser.parse_args()
+
+    invoker = MagicMock()
+    invoker.services.configuration.pil_compress_level = args.compress_level
+
+    print(f"{args.steps} steps, compress level {args.compress_level}, best of {args.repeats}")
+    for size in args.sizes:
+        np_image = np.random.default_rng(0).integers(0, 256, size=(size, size, 3), dtype=np.uint8)
+        image = Image.fromarray(np_image, "RGB")
+        for save_workers in args.save_workers:
+            results: dict[str, float] = {}
+            for name, max_deferred_bytes in (("written", 0), ("deferred", 2**40)):
+                with tempfile.TemporaryDirectory() as output_folder:
+                    image_files = DiskImageFileStorage(
+                        Path(output_folder), save_workers=save_workers, max_deferred_bytes=max_deferred_bytes
+                    )
+                    image_files.start(invoker)
+                    chain = partial(run_chain, image_files, image, args.steps, args.delete_intermediates, [0])
+                    results[name] = best_of(args.repeats, chain)
+                    image_files.stop(invoker)
+
+            line = f"{size:>5}px, {save_workers} workers:"
+            for name, seconds in results.items():
+                line += f"  {name} {seconds * 1000:9.1f} ms"
+            line += f"  {results['written'] / results['deferred']:6.1f}x"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
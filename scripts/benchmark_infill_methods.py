@@ -0,0 +1,126 @@
+"""Benchmarks the infill methods of `backend/image_util/infill_methods` across image sizes.
+
+Each image is a random RGBA image whose right half is transparent, as when outpainting. It measures:
+- mosaic: `infill_mosaic`, and the previous pixel-by-pixel implementation as `mosaic (legacy)`
+- tile: `infill_tile`, and the previous tile-by-tile implementation as `tile (legacy)`
+- cv2: `cv2_inpaint`
+- patchmatch: `infill_patchmatch`, if PatchMatch is available
+
+LaMa is not included, because it needs a model to be installed.
+
+Usage:
+    python scripts/benchmark_infill_methods.py --sizes 512 1024 2048 --repeats 3 --skip-legacy
+"""
+
+import argparse
+import time
+from functools import partial
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+from invokeai.backend.image_util.infill_methods.cv2_inpaint import cv2_inpaint
+from invokeai.backend.image_util.infill_methods.mosaic import infill_mosaic
+from invokeai.backend.image_util.infill_methods.patchmatch import PatchMatch, infill_patchmatch
+from invokeai.backend.image_util.infill_methods.tile import infill_tile
+
+
+def legacy_infill_mosaic(image: Image.Image, tile_shape: tuple[int, int] = (64, 64)) -> Image.Image:
+    """The previous implementation of `infill_mosaic`, without color clipping, kept here as a baseline."""
+    np_image = np.array(image)
+    non_transparent_pixels = np_image[np_image[:, :, 3] != 0, :3]
+    tile_width, tile_height = tile_shape
+    tiles = []
+    for _ in range(256):
+        color = non_transparent_pixels[np.random.randint(len(non_transparent_pixels))]
+        tile = np.zeros((tile_height, tile_width, 3), dtype=np.uint8)
+        tile[:, :] = color
+        tiles.append(tile)
+    filled_image = np.zeros((image.height, image.width, 3), dtype=np.uint8)
+    for x in range(image.width):
+        for y in range(image.height):
+            tile = tiles[np.random.randint(len(tiles))]
+            try:
+                filled_image[
+                    y - (y % tile_height) : y - (y % tile_height) + tile_height,
+                    x - (x % tile_width) : x - (x % tile_width) + tile_width,
+                ] = tile
+            except ValueError:
+                pass
+    return Image.composite(image, Image.fromarray(filled_image), image.split()[-1])
+
+
+def legacy_infill_tile(image: Image.Image, seed: int, tile_size: int) -> Image.Image:
+    """The previous implementation of `infill_tile`, kept here as a baseline."""
+    img_array = np.array(image, dtype=np.uint8)
+    rows, cols = img_array.shape[:2]
+    tile_pool: list[np.ndarray] = []
+    for y in range(0, rows - tile_size + 1, tile_size):
+        for x in range(0, cols - tile_size + 1, tile_size):
+            tile = img_array[y : y + tile_size, x : x + tile_size]
+            if np.all(tile[:, :, 3] == 255):
+                tile_pool.append(tile)
+    filled_img_array = np.zeros((rows, cols, 3), dtype=img_array.dtype)
+    rng = np.random.default_rng(seed)
+    for y in range(0, rows, tile_size):
+        for x in range(0, cols, tile_size):
+            tile = tile_pool[rng.integers(len(tile_pool))]
+            space_y = min(tile_size, rows - y)
+            space_x = min(tile_size, cols - x)
+            filled_img_array[y : y + space_y, x : x + space_x, :3] = tile[:space_y, :space_x, :3]
+    infilled = Image.fromarray(filled_img_array, "RGB")
+    infilled.paste(image, (0, 0), image.split()[-1])
+    return infilled
+
+
+def build_image(size: int) -> Image.Image:
+    np_image = np.random.default_rng(0).integers(0, 256, size=(size, size, 4), dtype=np.uint8)
+    np_image[:, :, 3] = 255
+    np_image[:, size // 2 :, 3] = 0
+    return Image.fromarray(np_image, "RGBA")
+
+
+def best_of(repeats: int, func: Callable[[], object]) -> float:
+    times: list[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1024, 2048], help="Image widths and heights.")
+    parser.add_argument("--tile-size", type=int, default=32, help="Tile size of the mosaic and tile methods.")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of times to repeat each measurement.")
+    parser.add_argument("--skip-legacy", action="store_true", help="Do not measure the previous implementations.")
+    args = parser.parse_args()
+
+    tile_shape = (args.tile_size, args.tile_size)
+    methods: dict[str, Callable[[Image.Image], object]] = {
+        "mosaic": partial(infill_mosaic, tile_shape=tile_shape),
+        "tile": partial(infill_tile, seed=0, tile_size=args.tile_size),
+        "cv2": cv2_inpaint,
+    }
+    if not args.skip_legacy:
+        methods["mosaic (legacy)"] = partial(legacy_infill_mosaic, tile_shape=tile_shape)
+        methods["tile (legacy)"] = partial(legacy_infill_tile, seed=0, tile_size=args.tile_size)
+    if PatchMatch.patchmatch_available():
+        methods["patchmatch"] = infill_patchmatch
+    else:
+        print("PatchMatch is not available, skipping it")
+
+    print(f"tile size {args.tile_size}, best of {args.repeats}")
+    for size in args.sizes:
+        image = build_image(size)
+        line = f"{size:>5}px:"
+        for name, method in methods.items():
+            seconds = best_of(args.repeats, partial(method, image))
+            line += f"  {name} {seconds * 1000:9.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
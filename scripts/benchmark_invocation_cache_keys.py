@@ -0,0 +1,118 @@
+"""Benchmarks the per-node cost of creating invocation cache keys.
+
+Builds the nodes of a synthetic tiled upscale graph (a handful of nodes per tile, plus a merge node that receives every
+tile) and compares:
+- legacy: the builtin `hash` of the full JSON dump of the node (the previous implementation)
+- dump + blake3: a stable digest of the full JSON dump of the node
+- fingerprint (cold): `BaseInvocation.get_fingerprint()` on fresh nodes
+- fingerprint (cached): `get_fingerprint()` on nodes that have already been fingerprinted
+- fingerprint (copied): `get_fingerprint()` on copies of already-fingerprinted nodes with a new id, as happens when the
+  session prepares a node for each iteration of a collection
+- fingerprint (reassigned): as above, but with one input reassigned, as happens when the session sets a prepared
+  node's inputs from edges
+
+Usage:
+    python scripts/benchmark_invocation_cache_keys.py --tiles 256 --repeats 5
+"""
+
+import argparse
+import copy
+import time
+from typing import Callable
+
+from blake3 import blake3
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation
+from invokeai.app.invocations.fields import ImageField
+from invokeai.app.invocations.image import ImageResizeInvocation
+from invokeai.app.invocations.tiles import (
+    MergeTilesToImageInvocation,
+    PairTileImageInvocation,
+    TileToPropertiesInvocation,
+    TileWithImage,
+)
+from invokeai.app.util.misc import uuid_string
+from invokeai.backend.tiles.utils import TBLR, Tile
+
+
+def build_nodes(num_tiles: int) -> list[BaseInvocation]:
+    nodes: list[BaseInvocation] = []
+    tiles_with_images: list[TileWithImage] = []
+    for i in range(num_tiles):
+        tile = Tile(
+            coords=TBLR(top=i * 512, bottom=i * 512 + 576, left=0, right=576),
+            overlap=TBLR(top=64, bottom=64, left=64, right=64),
+        )
+        image = ImageField(image_name=f"tile_{i}.png")
+        nodes.append(TileToPropertiesInvocation(tile=tile))
+        nodes.append(ImageResizeInvocation(image=image, width=1152, height=1152))
+        nodes.append(PairTileImageInvocation(tile=tile, image=image))
+        tiles_with_images.append(TileWithImage(tile=tile, image=image))
+    nodes.append(MergeTilesToImageInvocation(tiles_with_images=tiles_with_images))
+    return nodes
+
+
+def legacy_key(node: BaseInvocation) -> int:
+    return hash(node.model_dump_json(exclude={"id"}, warnings=False))
+
+
+def dump_blake3_key(node: BaseInvocation) -> str:
+    return blake3(node.model_dump_json(exclude={"id"}, warnings=False).encode()).hexdigest()
+
+
+def fingerprint_key(node: BaseInvocation) -> str:
+    return node.get_fingerprint()
+
+
+def time_keys(nodes: list[BaseInvocation], create_key: Callable[[BaseInvocation], object]) -> float:
+    start = time.perf_counter()
+    for node in nodes:
+        create_key(node)
+    return time.perf_counter() - start
+
+
+def copy_nodes(nodes: list[BaseInvocation], reassign_input: bool) -> list[BaseInvocation]:
+    copies: list[BaseInvocation] = []
+    for node in nodes:
+        node_copy = copy.deepcopy(node)
+        node_copy.id = uuid_string()
+        if reassign_input:
+            # Reassign one input, as `GraphExecutionState._prepare_inputs` does for connected fields
+            node_copy.is_intermediate = not node_copy.is_intermediate
+        copies.append(node_copy)
+    return copies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tiles", type=int, default=256, help="Number of tiles in the synthetic graph.")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of times to repeat each measurement.")
+    args = parser.parse_args()
+
+    num_nodes = len(build_nodes(args.tiles))
+    print(f"{args.tiles} tiles, {num_nodes} nodes, best of {args.repeats}")
+
+    results: dict[str, float] = {}
+    for name, create_key in (("legacy", legacy_key), ("dump + blake3", dump_blake3_key)):
+        results[name] = min(time_keys(build_nodes(args.tiles), create_key) for _ in range(args.repeats))
+
+    results["fingerprint (cold)"] = min(
+        time_keys(build_nodes(args.tiles), fingerprint_key) for _ in range(args.repeats)
+    )
+
+    warm_nodes = build_nodes(args.tiles)
+    time_keys(warm_nodes, fingerprint_key)
+    results["fingerprint (cached)"] = min(time_keys(warm_nodes, fingerprint_key) for _ in range(args.repeats))
+    results["fingerprint (copied)"] = min(
+        time_keys(copy_nodes(warm_nodes, reassign_input=False), fingerprint_key) for _ in range(args.repeats)
+    )
+    results["fingerprint (reassigned)"] = min(
+        time_keys(copy_nodes(warm_nodes, reassign_input=True), fingerprint_key) for _ in range(args.repeats)
+    )
+
+    for name, seconds in results.items():
+        print(f"{name:>26}: {seconds * 1000:8.2f} ms total, {seconds / num_nodes * 1e6:8.2f} us/node")
+
+
+if __name__ == "__main__":
+    main()
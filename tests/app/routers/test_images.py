@@ -1,6 +1,10 @@
+import asyncio
+import io
 import os
 from pathlib import Path
 from typing import Any
+from unittest.mock import MagicMock
+from zipfile import ZipFile
 
 import pytest
 from fastapi import BackgroundTasks
@@ -9,6 +13,7 @@ from fastapi.testclient import TestClient
 from invokeai.app.api.dependencies import ApiDependencies
 from invokeai.app.api_app import app
 from invokeai.app.services.board_records.board_records_common import BoardRecord
+from invokeai.app.services.image_records.image_records_common import ImageCategory
 from invokeai.app.services.invoker import Invoker
 
 
@@ -117,3 +122,144 @@ def test_get_bulk_download_image_image_deleted_after_response(
     client.get("/api/v1/images/download/test.zip")
 
     assert not (tmp_path / "test.zip").exists()
+
+
+@pytest.fixture
+def image_file(tmp_path: Path, monkeypatch: Any, mock_invoker: Invoker) -> Path:
+    image_file = tmp_path / "test.png"
+    image_file.write_bytes(bytes(range(256)) * 4)
+    monkeypatch.setattr(mock_invoker.services.images, "get_path", lambda image_name, thumbnail=False: str(image_file))
+    monkeypatch.setattr("invokeai.app.api.routers.images.ApiDependencies", MockApiDependencies(mock_invoker))
+    return image_file
+
+
+def test_get_image_full(image_file: Path, client: TestClient) -> None:
+    response = client.get("/api/v1/images/i/test.png/full")
+
+    assert response.status_code == 200
+    assert response.content == image_file.read_bytes()
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["content-disposition"] == 'inline; filename="test.png"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"].startswith('"')
+
+
+def test_get_image_full_not_modified(image_file: Path, client: TestClient) -> None:
+    etag = client.get("/api/v1/images/i/test.png/full").headers["etag"]
+
+    response = client.get("/api/v1/images/i/test.png/full", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    # The ETag changes when the file is modified
+    stat = image_file.stat()
+    os.utime(image_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    response = client.get("/api/v1/images/i/test.png/full", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_image_etags_differ_between_image_and_thumbnail(image_file: Path, client: TestClient) -> None:
+    full = client.get("/api/v1/images/i/test.png/full")
+    thumbnail = client.get("/api/v1/images/i/test.png/thumbnail")
+    assert thumbnail.headers["content-type"] == "image/webp"
+    assert full.headers["etag"] != thumbnail.headers["etag"]
+
+
+@pytest.mark.parametrize("url", ["/api/v1/images/i/test.png/full", "/api/v1/images/i/test.png/thumbnail"])
+def test_get_image_gets_path_off_the_event_loop(
+    image_file: Path, monkeypatch: Any, mock_invoker: Invoker, client: TestClient, url: str
+) -> None:
+    # Getting the path may write the image, so it must not block the event loop
+    running_loops: list[bool] = []
+
+    def get_path(image_name: str, thumbnail: bool = False) -> str:
+        try:
+            asyncio.get_running_loop()
+            running_loops.append(True)
+        except RuntimeError:
+            running_loops.append(False)
+        return str(image_file)
+
+    monkeypatch.setattr(mock_invoker.services.images, "get_path", get_path)
+    assert client.get(url).status_code == 200
+    assert running_loops == [False]
+
+
+@pytest.mark.parametrize(
+    "range_header,start,end",
+    [("bytes=0-99", 0, 99), ("bytes=1000-", 1000, 1023), ("bytes=-10", 1014, 1023), ("bytes=1000-5000", 1000, 1023)],
+)
+def test_get_image_full_range(image_file: Path, client: TestClient, range_header: str, start: int, end: int) -> None:
+    response = client.get("/api/v1/images/i/test.png/full", headers={"Range": range_header})
+
+    assert response.status_code == 206
+    assert response.content == image_file.read_bytes()[start : end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/1024"
+    assert response.headers["content-length"] == str(end - start + 1)
+
+
+def test_get_image_full_range_not_satisfiable(image_file: Path, client: TestClient) -> None:
+    response = client.get("/api/v1/images/i/test.png/full", headers={"Range": "bytes=2000-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */1024"
+
+
+@pytest.mark.parametrize("range_header", ["bytes=0-1,5-6", "items=0-1", "bytes=abc"])
+def test_get_image_full_unsupported_range_returns_whole_file(
+    image_file: Path, client: TestClient, range_header: str
+) -> None:
+    response = client.get("/api/v1/images/i/test.png/full", headers={"Range": range_header})
+
+    assert response.status_code == 200
+    assert response.content == image_file.read_bytes()
+
+
+def test_get_image_full_range_with_stale_if_range(image_file: Path, client: TestClient) -> None:
+    response = client.get("/api/v1/images/i/test.png/full", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+
+    assert response.status_code == 200
+    assert len(response.content) == 1024
+
+
+def test_head_image_full(image_file: Path, client: TestClient) -> None:
+    response = client.head("/api/v1/images/i/test.png/full")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == "1024"
+
+
+def test_get_image_full_not_found(tmp_path: Path, monkeypatch: Any, mock_invoker: Invoker, client: TestClient) -> None:
+    monkeypatch.setattr(
+        mock_invoker.services.images, "get_path", lambda image_name, thumbnail=False: str(tmp_path / "missing.png")
+    )
+    monkeypatch.setattr("invokeai.app.api.routers.images.ApiDependencies", MockApiDependencies(mock_invoker))
+
+    response = client.get("/api/v1/images/i/missing.png/full")
+
+    assert response.status_code == 404
+
+
+def test_stream_images_download(image_file: Path, monkeypatch: Any, mock_invoker: Invoker, client: TestClient) -> None:
+    image_dto = MagicMock(image_name="test.png", image_category=ImageCategory.GENERAL)
+    monkeypatch.setattr(mock_invoker.services.images, "get_dto", lambda image_name: image_dto)
+    mock_invoker.services.bulk_download.start(mock_invoker)
+
+    response = client.post("/api/v1/images/download/stream", json={"image_names": ["test.png"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert "content-length" not in response.headers
+    with ZipFile(io.BytesIO(response.content)) as zip_file:
+        assert zip_file.read("general/test.png") == image_file.read_bytes()
+
+
+def test_stream_images_download_without_images(monkeypatch: Any, mock_invoker: Invoker, client: TestClient) -> None:
+    monkeypatch.setattr("invokeai.app.api.routers.images.ApiDependencies", MockApiDependencies(mock_invoker))
+
+    response = client.post("/api/v1/images/download/stream", json={"image_names": []})
+
+    assert response.status_code == 400
@@ -1,8 +1,9 @@
+import io
 import os
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import Any
-from zipfile import ZipFile
+from zipfile import ZIP_STORED, ZipFile
 
 import pytest
 
@@ -12,6 +13,7 @@ from invokeai.app.services.bulk_download.bulk_download_default import BulkDownlo
 from invokeai.app.services.events.events_common import (
     BulkDownloadCompleteEvent,
     BulkDownloadErrorEvent,
+    BulkDownloadProgressEvent,
     BulkDownloadStartedEvent,
 )
 from invokeai.app.services.image_records.image_records_common import (
@@ -386,3 +388,95 @@ def test_stop(tmp_path: Path):
     bulk_download_service.stop()
 
     assert not (tmp_path / "bulk_downloads").exists()
+
+
+def prepare_stream_test(tmp_path: Path, monkeypatch: Any, mock_image_dto: ImageDTO, mock_invoker: Invoker) -> list[str]:
+    """Prepare images with distinct names and contents for the streaming tests."""
+
+    image_names = [f"image_{i}.png" for i in range(20)]
+    for i, image_name in enumerate(image_names):
+        (tmp_path / image_name).write_bytes(bytes([i]) * (1000 + i))
+
+    def mock_get_dto(image_name: str) -> ImageDTO:
+        return mock_image_dto.model_copy(update={"image_name": image_name})
+
+    def mock_get_path(image_name: str, thumbnail: bool = False) -> str:
+        return str(tmp_path / image_name)
+
+    monkeypatch.setattr(mock_invoker.services.images, "get_dto", mock_get_dto)
+    monkeypatch.setattr(mock_invoker.services.images, "get_path", mock_get_path)
+    return image_names
+
+
+def test_stream(tmp_path: Path, monkeypatch: Any, mock_image_dto: ImageDTO, mock_invoker: Invoker):
+    """Test that a streamed zip file holds the stored images, in order, without writing anything to disk."""
+
+    image_names = prepare_stream_test(tmp_path, monkeypatch, mock_image_dto, mock_invoker)
+    bulk_download_service = BulkDownloadService()
+    bulk_download_service.start(mock_invoker)
+
+    zip_bytes = b"".join(bulk_download_service.stream(image_names, None, "test"))
+
+    with ZipFile(io.BytesIO(zip_bytes)) as zip_file:
+        assert zip_file.testzip() is None
+        infos = zip_file.infolist()
+        assert [info.filename for info in infos] == [f"general/{image_name}" for image_name in image_names]
+        assert all(info.compress_type == ZIP_STORED for info in infos)
+        assert zip_file.read("general/image_3.png") == bytes([3]) * 1003
+    assert os.listdir(tmp_path / "bulk_downloads") == []
+
+    # Only progress events are emitted, as the complete event would link to a zip file that does not exist
+    event_bus: TestEventService = mock_invoker.services.events
+    assert all(isinstance(event, BulkDownloadProgressEvent) for event in event_bus.events)
+    assert event_bus.events[0].images_done == 0
+    progress_event = event_bus.events[-1]
+    assert progress_event.images_done == progress_event.images_total == 20
+    assert progress_event.bytes_sent == len(zip_bytes)
+    assert progress_event.bulk_download_item_name == "test.zip"
+
+
+def test_stream_resumes_from_start(tmp_path: Path, monkeypatch: Any, mock_image_dto: ImageDTO, mock_invoker: Invoker):
+    """Test that a streamed zip file skips the images before the start index."""
+
+    image_names = prepare_stream_test(tmp_path, monkeypatch, mock_image_dto, mock_invoker)
+    bulk_download_service = BulkDownloadService()
+    bulk_download_service.start(mock_invoker)
+
+    zip_bytes = b"".join(bulk_download_service.stream(image_names, None, "test", start=15))
+
+    with ZipFile(io.BytesIO(zip_bytes)) as zip_file:
+        assert zip_file.namelist() == [f"general/{image_name}" for image_name in image_names[15:]]
+
+
+def test_stream_reports_interrupted_download(
+    tmp_path: Path, monkeypatch: Any, mock_image_dto: ImageDTO, mock_invoker: Invoker
+):
+    """Test that an interrupted streamed download reports where to resume, without an error event."""
+
+    image_names = prepare_stream_test(tmp_path, monkeypatch, mock_image_dto, mock_invoker)
+    bulk_download_service = BulkDownloadService()
+    bulk_download_service.start(mock_invoker)
+
+    chunks = bulk_download_service.stream(image_names, None, "test")
+    next(chunks)
+    next(chunks)
+    chunks.close()  # pyright: ignore [reportAttributeAccessIssue]
+
+    event_bus: TestEventService = mock_invoker.services.events
+    assert all(isinstance(event, BulkDownloadProgressEvent) for event in event_bus.events)
+    assert event_bus.events[-1].images_done == 1
+
+
+def test_stream_raises_before_streaming_on_image_not_found(monkeypatch: Any, mock_invoker: Invoker):
+    """Test that missing images are reported when the stream is created."""
+
+    def mock_get_dto(*args, **kwargs):
+        raise ImageRecordNotFoundException("Image not found")
+
+    monkeypatch.setattr(mock_invoker.services.images, "get_dto", mock_get_dto)
+    bulk_download_service = BulkDownloadService()
+    bulk_download_service.start(mock_invoker)
+
+    with pytest.raises(ImageRecordNotFoundException):
+        bulk_download_service.stream(["missing.png"], None, "test")
+    assert mock_invoker.services.events.events == []
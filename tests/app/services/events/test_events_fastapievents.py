@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from invokeai.app.services.events import events_fastapievents
+from invokeai.app.services.events.events_common import DownloadCompleteEvent, DownloadProgressEvent, EventBase
+from invokeai.app.services.events.events_fastapievents import FastAPIEventService
+
+
+def progress_event(download_path: str, current_bytes: int) -> DownloadProgressEvent:
+    return DownloadProgressEvent(
+        source="http://www.test.foo", download_path=download_path, current_bytes=current_bytes, total_bytes=100
+    )
+
+
+def complete_event(download_path: str) -> DownloadCompleteEvent:
+    return DownloadCompleteEvent(source="http://www.test.foo", download_path=download_path, total_bytes=100)
+
+
+def run_service(
+    monkeypatch: pytest.MonkeyPatch, events: list[EventBase], batch_window: float = 0.05
+) -> tuple[list[EventBase], FastAPIEventService]:
+    """Dispatches the events from another thread, as services do, and returns the delivered events."""
+    delivered: list[EventBase] = []
+    monkeypatch.setattr(events_fastapievents, "dispatch", lambda event, **kwargs: delivered.append(event))
+
+    async def run() -> FastAPIEventService:
+        service = FastAPIEventService(0, loop=asyncio.get_running_loop(), batch_window=batch_window)
+        await asyncio.to_thread(lambda: [service.dispatch(event) for event in events])
+        await asyncio.sleep(0.1)
+        service.stop()
+        await asyncio.sleep(0)
+        return service
+
+    service = asyncio.run(run())
+    return delivered, service
+
+
+def test_superseded_progress_events_are_coalesced(monkeypatch: pytest.MonkeyPatch):
+    events = [progress_event("a", i) for i in range(10)] + [progress_event("b", i) for i in range(5)]
+    delivered, service = run_service(monkeypatch, events)
+    assert [(e.download_path, e.current_bytes) for e in delivered] == [("a", 9), ("b", 4)]
+
+    stats = service.get_stats()
+    assert stats.batches == 1
+    assert stats.events["download_progress"].dispatched == 15
+    assert stats.events["download_progress"].coalesced == 13
+
+
+def test_progress_events_are_not_moved_past_other_events(monkeypatch: pytest.MonkeyPatch):
+    events = [progress_event("a", 1), complete_event("b"), progress_event("a", 2), complete_event("a")]
+    delivered, service = run_service(monkeypatch, events, batch_window=10)
+    # The other events are delivered without waiting for the batch window
+    assert delivered == events
+    assert service.get_stats().events["download_complete"].coalesced == 0
@@ -1,9 +1,14 @@
 import platform
+import threading
 from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
 
 import pytest
+from PIL import Image
 
 from invokeai.app.services.image_files.image_files_disk import DiskImageFileStorage
+from invokeai.app.services.invoker import Invoker
 
 
 @pytest.fixture
@@ -49,3 +54,219 @@ def test_image_paths_relative_to_storage_dir(tmp_path: Path):
     image_files_disk = DiskImageFileStorage(tmp_path)
     path = image_files_disk.get_path("foo.png")
     assert path.is_relative_to(tmp_path)
+
+
+def save_image(image_files_disk: DiskImageFileStorage, image_name: str, size: int = 8, thumbnail: bool = False) -> None:
+    Image.new("RGB", (size, size)).save(image_files_disk.get_path(image_name, thumbnail))
+
+
+def test_image_cache_is_lru(tmp_path: Path):
+    # Room for two 8x8 RGB images, which are stored with 4 bytes per pixel
+    image_files_disk = DiskImageFileStorage(tmp_path, max_cache_bytes=8 * 8 * 4 * 2)
+    for name in ("1.png", "2.png", "3.png"):
+        save_image(image_files_disk, name)
+    image_1 = image_files_disk.get("1.png")
+    image_files_disk.get("2.png")
+    # Refreshes the recency of the first image, so the second is evicted instead
+    assert image_files_disk.get("1.png") is image_1
+    image_files_disk.get("3.png")
+    assert image_files_disk.get("1.png") is image_1
+    status = image_files_disk.get_cache_status().images
+    assert status.hits == 2
+    assert status.misses == 3
+    assert status.evictions == 1
+    assert status.size == 2
+    assert status.size_bytes == 8 * 8 * 4 * 2
+    image_files_disk.get("2.png")
+    assert image_files_disk.get_cache_status().images.misses == 4
+
+
+def test_image_cache_decodes_images(tmp_path: Path):
+    image_files_disk = DiskImageFileStorage(tmp_path)
+    save_image(image_files_disk, "1.png")
+    image = image_files_disk.get("1.png")
+    # The pixel data is loaded and the file is closed
+    assert image.im is not None
+    assert getattr(image, "fp", None) is None
+
+
+def test_image_cache_skips_images_over_budget(tmp_path: Path):
+    image_files_disk = DiskImageFileStorage(tmp_path, max_cache_bytes=8 * 8 * 4)
+    save_image(image_files_disk, "big.png", size=16)
+    image = image_files_disk.get("big.png")
+    assert image_files_disk.get("big.png") is not image
+    assert image_files_disk.get_cache_status().images.size == 0
+
+
+def test_image_cache_separates_thumbnails(tmp_path: Path):
+    image_files_disk = DiskImageFileStorage(tmp_path, max_cache_bytes=0, max_thumbnail_cache_bytes=2**20)
+    save_image(image_files_disk, "1.png")
+    save_image(image_files_disk, "1.png", thumbnail=True)
+    image_files_disk.get("1.png")
+    thumbnail = image_files_disk.get("1.png", thumbnail=True)
+    assert image_files_disk.get("1.png", thumbnail=True) is thumbnail
+    status = image_files_disk.get_cache_status()
+    assert status.images.size == 0
+    assert status.thumbnails.size == 1
+    assert status.thumbnails.hits == 1
+    image_files_disk.delete("1.png")
+    assert image_files_disk.get_cache_status().thumbnails.size == 0
+
+
+@pytest.fixture
+def invoker() -> Invoker:
+    invoker = MagicMock()
+    invoker.services.configuration.pil_compress_level = 1
+    return invoker
+
+
+def block_writes(image_files_disk: DiskImageFileStorage) -> threading.Event:
+    """Makes the storage's background writes wait until the returned event is set."""
+    unblocked = threading.Event()
+    write = image_files_disk._DiskImageFileStorage__write  # pyright: ignore [reportAttributeAccessIssue]
+
+    def blocked_write(*args: Any) -> None:
+        unblocked.wait()
+        write(*args)
+
+    image_files_disk._DiskImageFileStorage__write = blocked_write  # pyright: ignore [reportAttributeAccessIssue]
+    return unblocked
+
+
+def test_background_save_reads_through(tmp_path: Path, invoker: Invoker):
+    image_files_disk = DiskImageFileStorage(tmp_path, save_workers=1)
+    image_files_disk.start(invoker)
+    unblocked = block_writes(image_files_disk)
+    image = Image.new("RGB", (8, 8))
+    image_files_disk.save(image, "1.png", workflow="workflow", graph="graph")
+    # The image is readable before it is written
+    assert image_files_disk.get("1.png") is image
+    assert image_files_disk.get("1.png", thumbnail=True).size == (8, 8)
+    assert image_files_disk.get_workflow("1.png") == "workflow"
+    assert image_files_disk.get_graph("1.png") == "graph"
+    assert not (tmp_path / "1.png").exists()
+
+    # Getting the path waits for the image to be written
+    paths: list[Path] = []
+    thread = threading.Thread(target=lambda: paths.append(image_files_disk.get_path("1.png")))
+    thread.start()
+    thread.join(timeout=0.1)
+    assert thread.is_alive()
+    unblocked.set()
+    thread.join()
+    assert paths[0].exists()
+    assert image_files_disk.get_path("1.png", thumbnail=True).exists()
+    with Image.open(paths[0]) as saved_image:
+        assert saved_image.info["invokeai_workflow"] == "workflow"
+    image_files_disk.stop(invoker)
+
+
+def test_background_save_applies_backpressure(tmp_path: Path, invoker: Invoker):
+    image_files_disk = DiskImageFileStorage(tmp_path, save_workers=1, max_pending_saves=1)
+    image_files_disk.start(invoker)
+    unblocked = block_writes(image_files_disk)
+    image_files_disk.save(Image.new("RGB", (8, 8)), "1.png")
+    # The second save waits for a free slot
+    thread = threading.Thread(target=lambda: image_files_disk.save(Image.new("RGB", (8, 8)), "2.png"))
+    thread.start()
+    thread.join(timeout=0.1)
+    assert thread.is_alive()
+    unblocked.set()
+    thread.join()
+    image_files_disk.stop(invoker)
+    assert (tmp_path / "1.png").exists()
+    assert (tmp_path / "2.png").exists()
+
+
+def test_background_save_flushes_on_stop(tmp_path: Path, invoker: Invoker):
+    image_files_disk = DiskImageFileStorage(tmp_path, save_workers=2)
+    image_files_disk.start(invoker)
+    for i in range(10):
+        image_files_disk.save(Image.new("RGB", (8, 8)), f"{i}.png")
+    image_files_disk.stop(invoker)
+    for i in range(10):
+        assert (tmp_path / f"{i}.png").exists()
+        assert (tmp_path / "thumbnails" / f"{i}.webp").exists()
+
+
+def test_background_save_delete_waits_for_write(tmp_path: Path, invoker: Invoker):
+    image_files_disk = DiskImageFileStorage(tmp_path, save_workers=1)
+    image_files_disk.start(invoker)
+    image_files_disk.save(Image.new("RGB", (8, 8)), "1.png")
+    image_files_disk.delete("1.png")
+    image_files_disk.stop(invoker)
+    assert not (tmp_path / "1.png").exists()
+    assert not (tmp_path / "thumbnails" / "1.webp").exists()
+
+
+def test_deferred_save_reads_from_memory(tmp_path: Path, invoker: Invoker):
+    image_files_disk = DiskImageFileStorage(tmp_path, max_deferred_bytes=2**20)
+    image_files_disk.start(invoker)
+    image = Image.new("RGB", (8, 8))
+    image_files_disk.save(image, "1.png", workflow="workflow", is_intermediate=True)
+    assert image_files_disk.get("1.png") is image
+    assert image_files_disk.get_workflow("1.png") == "workflow"
+    assert image_files_disk.exists("1.png")
+    assert not (tmp_path / "1.png").exists()
+    status = image_files_disk.get_cache_status().deferred
+    assert status.hits == 2
+    assert status.size == 1
+    assert status.size_bytes == 8 * 8 * 4
+
+    # Non-intermediate images are written as usual
+    image_files_disk.save(Image.new("RGB", (8, 8)), "2.png")
+    assert (tmp_path / "2.png").exists()
+
+
+@pytest.mark.parametrize("save_workers", [0, 1])
+def test_deferred_save_is_written_when_its_file_is_needed(tmp_path: Path, invoker: Invoker, save_workers: int):
+    image_files_disk = DiskImageFileStorage(tmp_path, save_workers=save_workers, max_deferred_bytes=2**20)
+    image_files_disk.start(invoker)
+    image_files_disk.save(Image.new("RGB", (8, 8)), "1.png", workflow="workflow", is_intermediate=True)
+    path = image_files_disk.get_path("1.png")
+    assert path.exists()
+    with Image.open(path) as saved_image:
+        assert saved_image.info["invokeai_workflow"] == "workflow"
+    assert image_files_disk.get_cache_status().deferred.size == 0
+
+    # Getting the thumbnail also writes the image
+    image_files_disk.save(Image.new("RGB", (8, 8)), "2.png", is_intermediate=True)
+    assert image_files_disk.get("2.png", thumbnail=True).size == (8, 8)
+    image_files_disk.stop(invoker)
+    assert (tmp_path / "2.png").exists()
+    assert (tmp_path / "thumbnails" / "2.webp").exists()
+
+
+def test_deferred_save_is_not_written_when_deleted(tmp_path: Path, invoker: Invoker):
+    image_files_disk = DiskImageFileStorage(tmp_path, max_deferred_bytes=2**20)
+    image_files_disk.start(invoker)
+    image_files_disk.save(Image.new("RGB", (8, 8)), "1.png", is_intermediate=True)
+    image_files_disk.delete("1.png")
+    assert not image_files_disk.exists("1.png")
+    assert image_files_disk.get_cache_status().deferred.size_bytes == 0
+    image_files_disk.stop(invoker)
+    assert not (tmp_path / "1.png").exists()
+    assert not (tmp_path / "thumbnails" / "1.webp").exists()
+
+
+def test_deferred_saves_over_budget_are_written(tmp_path: Path, invoker: Invoker):
+    # Room for two 8x8 RGB images
+    image_files_disk = DiskImageFileStorage(tmp_path, max_deferred_bytes=8 * 8 * 4 * 2)
+    image_files_disk.start(invoker)
+    for name in ("1.png", "2.png"):
+        image_files_disk.save(Image.new("RGB", (8, 8)), name, is_intermediate=True)
+    # Refreshes the recency of the first image, so the second is written instead
+    image_files_disk.get("1.png")
+    image_files_disk.save(Image.new("RGB", (8, 8)), "3.png", is_intermediate=True)
+    assert [name for name in ("1.png", "2.png", "3.png") if (tmp_path / name).exists()] == ["2.png"]
+    # Images larger than the budget are written immediately
+    image_files_disk.save(Image.new("RGB", (16, 16)), "big.png", is_intermediate=True)
+    assert (tmp_path / "big.png").exists()
+    status = image_files_disk.get_cache_status().deferred
+    assert status.evictions == 1
+    assert status.size == 2
+
+    image_files_disk.stop(invoker)
+    for name in ("1.png", "3.png"):
+        assert (tmp_path / name).exists()
+        assert (tmp_path / "thumbnails" / name.replace(".png", ".webp")).exists()
@@ -0,0 +1,131 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from invokeai.app.services.config import InvokeAIAppConfig
+from invokeai.app.services.image_records.image_records_common import (
+    ImageCategory,
+    InvalidImageCursorException,
+    ResourceOrigin,
+)
+from invokeai.app.services.image_records.image_records_sqlite import SqliteImageRecordStorage
+from invokeai.app.services.shared.sqlite.sqlite_common import SQLiteDirection
+from invokeai.backend.util.logging import InvokeAILogger
+from tests.fixtures.sqlite_database import create_mock_sqlite_database
+
+
+@pytest.fixture(params=["memory", "file"])
+def store(request: pytest.FixtureRequest, tmp_path: Path) -> SqliteImageRecordStorage:
+    # File databases read from pooled connections, while in-memory databases read from the write connection
+    config = InvokeAIAppConfig(use_memory_db=request.param == "memory")
+    config._root = tmp_path
+    logger = InvokeAILogger.get_logger(config=config)
+    db = create_mock_sqlite_database(config, logger)
+    return SqliteImageRecordStorage(db)
+
+
+def save_image(store: SqliteImageRecordStorage, image_name: str, metadata: Optional[dict] = None, **kwargs) -> None:
+    store.save(
+        image_name=image_name,
+        image_origin=ResourceOrigin.INTERNAL,
+        image_category=ImageCategory.GENERAL,
+        width=8,
+        height=8,
+        has_workflow=False,
+        metadata=json.dumps(metadata) if metadata is not None else None,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def images(store: SqliteImageRecordStorage) -> list[tuple[bool, str, str]]:
+    """Saves images with many ties in `created_at`, returning their (starred, created_at, image_name)."""
+    images: list[tuple[bool, str, str]] = []
+    for i in range(23):
+        starred = i % 5 == 0
+        created_at = f"2024-01-0{1 + i % 3} 00:00:00.000"
+        image_name = f"{i:02}.png"
+        save_image(store, image_name, starred=starred)
+        store._conn.execute("UPDATE images SET created_at = ? WHERE image_name = ?;", (created_at, image_name))
+        images.append((starred, created_at, image_name))
+    store._conn.commit()
+    return images
+
+
+@pytest.mark.parametrize("starred_first", [True, False])
+@pytest.mark.parametrize("order_dir", [SQLiteDirection.Descending, SQLiteDirection.Ascending])
+def test_get_many_by_cursor_pages_in_order(
+    store: SqliteImageRecordStorage,
+    images: list[tuple[bool, str, str]],
+    starred_first: bool,
+    order_dir: SQLiteDirection,
+):
+    reverse = order_dir is SQLiteDirection.Descending
+    expected = sorted(images, key=lambda i: (i[1], i[2]), reverse=reverse)
+    if starred_first:
+        expected = sorted(expected, key=lambda i: i[0], reverse=True)
+
+    image_names: list[str] = []
+    cursor = None
+    while True:
+        page = store.get_many_by_cursor(cursor=cursor, limit=4, starred_first=starred_first, order_dir=order_dir)
+        assert page.total == len(images)
+        assert len(page.items) <= 4
+        image_names.extend(r.image_name for r in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert image_names == [i[2] for i in expected]
+
+
+def test_get_many_by_cursor_exact_last_page(store: SqliteImageRecordStorage, images: list[tuple[bool, str, str]]):
+    page = store.get_many_by_cursor(limit=len(images))
+    assert len(page.items) == len(images)
+    assert page.next_cursor is None
+
+
+def test_get_many_by_cursor_rejects_invalid_cursor(store: SqliteImageRecordStorage):
+    for cursor in ("not a cursor", "WzEsMl0=", ""):
+        with pytest.raises(InvalidImageCursorException):
+            store.get_many_by_cursor(cursor=cursor)
+
+
+def test_get_many_counts_are_refreshed_after_writes(store: SqliteImageRecordStorage):
+    save_image(store, "1.png")
+    assert store.get_many().total == 1
+    assert store.get_many(offset=1).total == 1
+    save_image(store, "2.png")
+    assert store.get_many().total == 2
+    assert store.get_many_by_cursor().total == 2
+    store.delete("1.png")
+    assert store.get_many().total == 1
+
+
+def test_search_uses_full_text_index(store: SqliteImageRecordStorage):
+    assert store._has_fts
+    save_image(store, "fox.png", {"positive_prompt": "a red fox in the snow", "negative_prompt": "blurry"})
+    save_image(store, "cat.png", {"positive_prompt": "a black cat", "model": {"name": "Dreamshaper"}})
+    save_image(store, "none.png")
+
+    def search(term: str) -> list[str]:
+        names = [r.image_name for r in store.get_many(search_term=term).items]
+        assert sorted(names) == sorted(r.image_name for r in store.get_many_by_cursor(search_term=term).items)
+        return sorted(names)
+
+    assert search("fox") == ["fox.png"]
+    # Words are matched by prefix, in any order and any case
+    assert search("sno RED") == ["fox.png"]
+    assert search("blurry") == ["fox.png"]
+    assert search("dreamshaper") == ["cat.png"]
+    assert search("a") == ["cat.png", "fox.png"]
+    assert search("red cat") == []
+    # Punctuation is ignored, and a term without words falls back to a substring search
+    assert search('"fox"') == ["fox.png"]
+    assert search("{") == ["cat.png", "fox.png"]
+
+    store.delete("fox.png")
+    assert search("fox") == []
+    store._cursor.execute("SELECT COUNT(*) FROM images_fts;")
+    assert store._cursor.fetchone()[0] == 2
@@ -0,0 +1,120 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from invokeai.app.services.config import InvokeAIAppConfig
+from invokeai.app.services.model_hash_cache.model_hash_cache_sqlite import SqliteModelHashCache
+from invokeai.backend.model_hash.model_hash import ModelHash
+from invokeai.backend.model_hash.model_hash_cache import FileSignature
+from invokeai.backend.util.logging import InvokeAILogger
+from tests.fixtures.sqlite_database import create_mock_sqlite_database
+
+
+@pytest.fixture
+def hash_cache() -> SqliteModelHashCache:
+    config = InvokeAIAppConfig(use_memory_db=True)
+    logger = InvokeAILogger.get_logger(config=config)
+    db = create_mock_sqlite_database(config, logger)
+    return SqliteModelHashCache(db=db)
+
+
+@pytest.fixture
+def model_dir(tmp_path: Path) -> Path:
+    model_dir = tmp_path / "model"
+    for i in range(4):
+        (model_dir / f"part_{i}").mkdir(parents=True)
+        (model_dir / f"part_{i}" / "model.safetensors").write_bytes(bytes([i]) * 1000)
+    return model_dir
+
+
+def track_hashed_files(model_hash: ModelHash) -> list[Path]:
+    hashed: list[Path] = []
+    hash_file = model_hash._hash_file
+
+    def counting_hash_file(path: Path) -> str:
+        hashed.append(path)
+        return hash_file(path)
+
+    model_hash._hash_file = counting_hash_file
+    return hashed
+
+
+def test_cache_returns_hash_for_unchanged_file(hash_cache: SqliteModelHashCache, tmp_path: Path):
+    file = tmp_path / "model.safetensors"
+    file.write_bytes(b"data")
+    signature = FileSignature.from_path(file)
+    hash_cache.put(file, "blake3_single", signature, "abc")
+
+    assert hash_cache.get(file, "blake3_single", signature) == "abc"
+    assert hash_cache.get(file, "md5", signature) is None
+    assert hash_cache.get(file, "blake3_single", signature._replace(mtime_ns=signature.mtime_ns + 1)) is None
+    assert hash_cache.get(file, "blake3_single", signature._replace(inode=signature.inode + 1)) is None
+
+
+def test_cached_hashes_are_used_for_unchanged_files(hash_cache: SqliteModelHashCache, model_dir: Path):
+    uncached_hash = ModelHash("blake3_single").hash(model_dir)
+
+    model_hash = ModelHash("blake3_single", cache=hash_cache, max_workers=4)
+    hashed = track_hashed_files(model_hash)
+    assert model_hash.hash(model_dir) == uncached_hash
+    assert len(hashed) == 4
+
+    hashed.clear()
+    assert model_hash.hash(model_dir) == uncached_hash
+    assert hashed == []
+
+    # Only the modified file is hashed again
+    changed_file = model_dir / "part_2" / "model.safetensors"
+    changed_file.write_bytes(b"new data")
+    hashed.clear()
+    assert model_hash.hash(model_dir) != uncached_hash
+    assert hashed == [changed_file]
+
+
+def test_cache_detects_same_size_rewrites(hash_cache: SqliteModelHashCache, tmp_path: Path):
+    file = tmp_path / "model.safetensors"
+    file.write_bytes(b"aaaa")
+    model_hash = ModelHash("blake3_single", cache=hash_cache)
+    first_hash = model_hash.hash(file)
+
+    file.write_bytes(b"bbbb")
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert model_hash.hash(file) != first_hash
+
+
+def test_verify_ignores_cache(hash_cache: SqliteModelHashCache, model_dir: Path):
+    model_hash = ModelHash("blake3_single", cache=hash_cache)
+    hash_ = model_hash.hash(model_dir)
+    hashed = track_hashed_files(model_hash)
+
+    assert model_hash.verify(model_dir, hash_)
+    assert len(hashed) == 4
+
+    # A stale cache entry is corrected by verifying
+    file = model_dir / "part_0" / "model.safetensors"
+    hash_cache.put(file, "blake3_single", FileSignature.from_path(file), "stale")
+    assert model_hash.hash(model_dir) != hash_
+    assert model_hash.verify(model_dir, hash_)
+    assert model_hash.hash(model_dir) == hash_
+
+
+def test_invalidate_removes_hashes_under_path(hash_cache: SqliteModelHashCache, model_dir: Path, tmp_path: Path):
+    other_file = tmp_path / "model_other.safetensors"
+    other_file.write_bytes(b"data")
+    model_hash = ModelHash("blake3_single", cache=hash_cache)
+    model_hash.hash(model_dir)
+    model_hash.hash(other_file)
+
+    assert hash_cache.invalidate(model_dir / "part_0") == 1
+    # The other file's name starts with the directory's name, but it is not under the directory
+    assert hash_cache.invalidate(model_dir) == 3
+    assert hash_cache.invalidate(model_dir) == 0
+    assert hash_cache.invalidate() == 1
+
+
+def test_random_hashes_are_not_cached(hash_cache: SqliteModelHashCache, model_dir: Path):
+    model_hash = ModelHash("random", cache=hash_cache)
+    assert model_hash.hash(model_dir) != model_hash.hash(model_dir)
+    assert hash_cache.invalidate() == 0
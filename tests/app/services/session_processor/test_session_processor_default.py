@@ -0,0 +1,113 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from invokeai.app.services.session_processor.session_processor_base import InvocationServices, SessionRunnerBase
+from invokeai.app.services.session_processor.session_processor_default import DefaultSessionProcessor
+from invokeai.app.services.session_queue.session_queue_common import SessionQueueItem
+from invokeai.app.util.profiler import Profiler
+
+
+class BlockingSessionRunner(SessionRunnerBase):
+    """Runs each session until it is canceled or released."""
+
+    def __init__(self, started: threading.Semaphore, release: threading.Event) -> None:
+        self.started = started
+        self.release = release
+
+    def start(
+        self,
+        services: InvocationServices,
+        cancel_event: threading.Event,
+        profiler: Optional[Profiler] = None,
+        gpu_lock: Optional[threading.Lock] = None,
+    ) -> None:
+        self.cancel_event = cancel_event
+        self.gpu_lock = gpu_lock
+        self.canceled: list[int] = []
+
+    def run(self, queue_item: SessionQueueItem) -> None:
+        self.started.release()
+        while not self.release.is_set():
+            if self.cancel_event.wait(0.01):
+                self.canceled.append(queue_item.item_id)
+                return
+
+    def run_node(self, invocation, queue_item) -> None:
+        pass
+
+
+@pytest.fixture
+def release() -> threading.Event:
+    return threading.Event()
+
+
+@pytest.fixture
+def started() -> threading.Semaphore:
+    return threading.Semaphore(0)
+
+
+@pytest.fixture
+def processor(started: threading.Semaphore, release: threading.Event):
+    queue_items = [SimpleNamespace(item_id=i, session_id=f"session_{i}", queue_id="default") for i in range(3)]
+    invoker = MagicMock()
+    invoker.services.configuration.profile_graphs = False
+    invoker.services.session_queue.dequeue.side_effect = lambda: queue_items.pop(0) if queue_items else None
+    processor = DefaultSessionProcessor(
+        session_runner=BlockingSessionRunner(started, release), thread_limit=2, polling_interval=0.01
+    )
+    processor.start(invoker)
+    yield processor
+    processor.stop()
+    release.set()
+    for thread in processor._threads:
+        thread.join(timeout=5)
+
+
+def wait_for_sessions(started: threading.Semaphore, count: int) -> None:
+    for _ in range(count):
+        assert started.acquire(timeout=5)
+
+
+def test_workers_run_sessions_at_once(processor: DefaultSessionProcessor, started: threading.Semaphore):
+    wait_for_sessions(started, 2)
+    status = processor.get_status()
+    assert status.is_processing
+    assert sorted(w.item_id for w in status.workers) == [0, 1]
+    assert {w.session_id for w in status.workers} == {"session_0", "session_1"}
+
+
+def test_workers_have_their_own_runners(processor: DefaultSessionProcessor):
+    runners = [w.session_runner for w in processor._workers]
+    assert runners[0] is processor.session_runner
+    assert runners[1] is not runners[0]
+    assert runners[0].cancel_event is not runners[1].cancel_event
+    assert runners[0].gpu_lock is runners[1].gpu_lock is not None
+
+
+def test_cancel_is_routed_to_the_item_worker(processor: DefaultSessionProcessor, started: threading.Semaphore):
+    wait_for_sessions(started, 2)
+    worker = next(w for w in processor._workers if w.queue_item and w.queue_item.item_id == 1)
+    other_worker = next(w for w in processor._workers if w is not worker)
+
+    event = SimpleNamespace(item_id=1, status="canceled")
+    asyncio.run(processor._on_queue_item_status_changed(("queue_item_status_changed", event)))
+
+    # The worker moves on to the last queue item, while the other worker's session keeps running
+    wait_for_sessions(started, 1)
+    assert worker.session_runner.canceled == [1]
+    assert other_worker.session_runner.canceled == []
+    assert sorted(w.item_id for w in processor.get_status().workers) == [0, 2]
+
+
+def test_enqueue_wakes_idle_workers(processor: DefaultSessionProcessor, started: threading.Semaphore):
+    wait_for_sessions(started, 2)
+    listener = processor._invoker.services.session_queue.add_enqueue_listener.call_args.args[0]
+    idle_worker = processor._workers[0]
+    idle_worker.poll_now_event.clear()
+    listener()
+    assert idle_worker.poll_now_event.is_set()
@@ -0,0 +1,214 @@
+import threading
+import time
+from contextlib import nullcontext
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from invokeai.app.invocations.baseinvocation import BaseInvocation, Concurrency, invocation
+from invokeai.app.invocations.fields import InputField
+from invokeai.app.invocations.math import AddInvocation
+from invokeai.app.invocations.primitives import StringOutput
+from invokeai.app.services.session_processor.session_processor_default import DefaultSessionRunner
+from invokeai.app.services.shared.graph import Edge, EdgeConnection, Graph, GraphExecutionState
+from invokeai.app.services.shared.invocation_context import InvocationContext
+from tests.test_nodes import ErrorInvocation
+
+
+class Tracker:
+    """Records which test invocations are running at once."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.running: set[str] = set()
+        self.finished: list[str] = []
+        self.overlaps: list[tuple[str, str]] = []
+        self.barrier: Optional[threading.Barrier] = None
+
+    def enter(self, invocation: BaseInvocation) -> None:
+        with self.lock:
+            for other in self.running:
+                self.overlaps.append((other, invocation.id))
+            self.running.add(invocation.id)
+
+    def exit(self, invocation: BaseInvocation) -> None:
+        with self.lock:
+            self.running.discard(invocation.id)
+            self.finished.append(invocation.get_type())
+
+
+tracker = Tracker()
+
+
+def run_tracked(invocation: "CpuSafeTestInvocation | GpuExclusiveTestInvocation") -> StringOutput:
+    tracker.enter(invocation)
+    try:
+        if invocation.wait_for_peer:
+            assert tracker.barrier is not None
+            # Times out if the peer is not running at the same time
+            tracker.barrier.wait(timeout=5)
+        time.sleep(invocation.sleep)
+    finally:
+        tracker.exit(invocation)
+    return StringOutput(value=invocation.value + "+")
+
+
+@invocation("test_concurrency_cpu_safe", version="1.0.0", concurrency=Concurrency.CpuSafe)
+class CpuSafeTestInvocation(BaseInvocation):
+    value: str = InputField(default="")
+    sleep: float = InputField(default=0)
+    wait_for_peer: bool = InputField(default=False)
+
+    def invoke(self, context: InvocationContext) -> StringOutput:
+        return run_tracked(self)
+
+
+@invocation("test_concurrency_gpu_exclusive", version="1.0.0")
+class GpuExclusiveTestInvocation(BaseInvocation):
+    value: str = InputField(default="")
+    sleep: float = InputField(default=0)
+    wait_for_peer: bool = InputField(default=False)
+
+    def invoke(self, context: InvocationContext) -> StringOutput:
+        return run_tracked(self)
+
+
+@pytest.fixture(autouse=True)
+def reset_tracker():
+    global tracker
+    tracker = Tracker()
+
+
+def run_session(
+    graph: Graph, max_concurrent_nodes: int, gpu_lock: Optional[threading.Lock] = None
+) -> tuple[GraphExecutionState, MagicMock]:
+    services = MagicMock()
+    services.configuration.node_cache_size = 0
+    services.performance_statistics.collect_stats.return_value = nullcontext()
+    runner = DefaultSessionRunner(max_concurrent_nodes=max_concurrent_nodes)
+    runner.start(services=services, cancel_event=threading.Event(), gpu_lock=gpu_lock)
+    queue_item = MagicMock()
+    queue_item.status = "in_progress"
+    queue_item.session = GraphExecutionState(graph=graph)
+    runner.run(queue_item)
+    return queue_item.session, services
+
+
+def build_branches_graph(sleeps: list[float]) -> Graph:
+    """Independent branches of two nodes each, where the first node of each branch sleeps for the given time."""
+    graph = Graph()
+    for i, sleep in enumerate(sleeps):
+        graph.add_node(CpuSafeTestInvocation(id=f"{i}a", value=f"{i}:", sleep=sleep))
+        graph.add_node(CpuSafeTestInvocation(id=f"{i}b"))
+        graph.add_edge(
+            Edge(
+                source=EdgeConnection(node_id=f"{i}a", field="value"),
+                destination=EdgeConnection(node_id=f"{i}b", field="value"),
+            )
+        )
+    return graph
+
+
+def get_events(session: GraphExecutionState, services: MagicMock) -> list[tuple[str, str]]:
+    """Gets the started and complete events, with their invocations' source node ids."""
+    return [
+        (name, session.prepared_source_mapping[kwargs["invocation"].id])
+        for name, _, kwargs in services.events.method_calls
+        if name in ("emit_invocation_started", "emit_invocation_complete")
+    ]
+
+
+def test_concurrency_tags():
+    assert AddInvocation.get_concurrency() is Concurrency.CpuSafe
+    assert GpuExclusiveTestInvocation.get_concurrency() is Concurrency.GpuExclusive
+
+
+def test_concurrent_run_is_deterministic():
+    # The branches finish in a different order in each run
+    session_1, services_1 = run_session(build_branches_graph([0.15, 0.1, 0.05]), max_concurrent_nodes=4)
+    session_2, services_2 = run_session(build_branches_graph([0.05, 0.1, 0.15]), max_concurrent_nodes=4)
+
+    for session in (session_1, session_2):
+        assert session.is_complete()
+        assert not session.has_error()
+    assert session_1.executed_history == session_2.executed_history == ["0a", "1a", "2a", "0b", "1b", "2b"]
+    assert get_events(session_1, services_1) == get_events(session_2, services_2)
+    # The independent branches ran at the same time
+    assert tracker.overlaps
+
+
+def test_concurrent_run_gives_same_results_as_sequential_run():
+    sequential_session, _ = run_session(build_branches_graph([0, 0, 0]), max_concurrent_nodes=1)
+    concurrent_session, _ = run_session(build_branches_graph([0, 0, 0]), max_concurrent_nodes=4)
+
+    def get_outputs(session: GraphExecutionState) -> dict[str, str]:
+        return {session.prepared_source_mapping[k]: v.value for k, v in session.results.items()}
+
+    assert get_outputs(concurrent_session) == get_outputs(sequential_session)
+    assert get_outputs(concurrent_session)["2b"] == "2:++"
+
+
+def test_cpu_safe_invocations_run_alongside_each_other():
+    tracker.barrier = threading.Barrier(2)
+    graph = Graph()
+    graph.add_node(CpuSafeTestInvocation(id="1", wait_for_peer=True))
+    graph.add_node(CpuSafeTestInvocation(id="2", wait_for_peer=True))
+    session, _ = run_session(graph, max_concurrent_nodes=2)
+    assert not session.has_error()
+    assert session.is_complete()
+
+
+def test_cpu_safe_invocations_run_alongside_gpu_exclusive_invocations():
+    tracker.barrier = threading.Barrier(2)
+    graph = Graph()
+    graph.add_node(GpuExclusiveTestInvocation(id="1", wait_for_peer=True))
+    graph.add_node(CpuSafeTestInvocation(id="2", wait_for_peer=True))
+    session, _ = run_session(graph, max_concurrent_nodes=2)
+    assert not session.has_error()
+    assert session.is_complete()
+
+
+def test_gpu_exclusive_invocations_run_one_at_a_time():
+    graph = Graph()
+    for i in range(3):
+        graph.add_node(GpuExclusiveTestInvocation(id=str(i), sleep=0.05))
+    session, _ = run_session(graph, max_concurrent_nodes=4)
+    assert session.is_complete()
+    assert not session.has_error()
+    assert tracker.overlaps == []
+
+
+def test_concurrent_run_stops_on_node_error():
+    graph = Graph()
+    graph.add_node(CpuSafeTestInvocation(id="1", sleep=0.05))
+    graph.add_node(ErrorInvocation(id="2"))
+    graph.add_node(CpuSafeTestInvocation(id="3"))
+    graph.add_edge(
+        Edge(source=EdgeConnection(node_id="1", field="value"), destination=EdgeConnection(node_id="3", field="value"))
+    )
+    session, services = run_session(graph, max_concurrent_nodes=4)
+    assert session.has_error()
+    assert list(session.errors.keys()) == [session.source_prepared_mapping["2"].pop()]
+    assert "3" not in session.executed
+    services.session_queue.fail_queue_item.assert_called_once()
+
+
+def test_gpu_lock_is_held_by_gpu_exclusive_invocations():
+    gpu_lock = threading.Lock()
+    graph = Graph()
+    graph.add_node(GpuExclusiveTestInvocation(id="1"))
+    graph.add_node(CpuSafeTestInvocation(id="2"))
+
+    # Another session's gpu-exclusive node holds the lock
+    with gpu_lock:
+        thread = threading.Thread(
+            target=run_session, args=(graph,), kwargs={"max_concurrent_nodes": 2, "gpu_lock": gpu_lock}
+        )
+        thread.start()
+        time.sleep(0.1)
+        # The cpu-safe invocation ran without the lock
+        assert tracker.finished == ["test_concurrency_cpu_safe"]
+        assert thread.is_alive()
+    thread.join(timeout=5)
+    assert tracker.finished == ["test_concurrency_cpu_safe", "test_concurrency_gpu_exclusive"]
@@ -0,0 +1,263 @@
+import sqlite3
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from pydantic import ValidationError
+
+from invokeai.app.invocations.math import AddInvocation
+from invokeai.app.services.config import InvokeAIAppConfig
+from invokeai.app.services.session_queue.session_queue_common import Batch, BatchDatum
+from invokeai.app.services.session_queue.session_queue_sqlite import SqliteSessionQueue
+from invokeai.app.services.shared.graph import Graph
+from invokeai.app.services.shared.sqlite_migrator.migrations.migration_17 import Migration17Callback
+from invokeai.backend.util.logging import InvokeAILogger
+from tests.fixtures.sqlite_database import create_mock_sqlite_database
+from tests.test_nodes import PromptTestInvocation
+
+
+@pytest.fixture
+def session_queue() -> SqliteSessionQueue:
+    config = InvokeAIAppConfig(use_memory_db=True, max_queue_size=10)
+    logger = InvokeAILogger.get_logger(config=config)
+    db = create_mock_sqlite_database(config, logger)
+    session_queue = SqliteSessionQueue(db=db)
+    invoker = MagicMock()
+    invoker.services.configuration = config
+    session_queue.start(invoker)
+    return session_queue
+
+
+@pytest.fixture
+def batch() -> Batch:
+    graph = Graph()
+    graph.add_node(PromptTestInvocation(id="1", prompt="Chevy"))
+    graph.add_node(PromptTestInvocation(id="2", prompt="Toyota"))
+    return Batch(
+        graph=graph,
+        data=[
+            [BatchDatum(node_path="1", field_name="prompt", items=["Banana sushi", "Grape sushi"])],
+            [BatchDatum(node_path="2", field_name="prompt", items=["Orange sushi", "Apple sushi"])],
+        ],
+        runs=2,
+    )
+
+
+def count_graphs(session_queue: SqliteSessionQueue) -> int:
+    return session_queue._SqliteSessionQueue__conn.execute("SELECT COUNT(*) FROM session_queue_graphs;").fetchone()[0]
+
+
+def test_enqueue_batch_stores_graph_once(session_queue: SqliteSessionQueue, batch: Batch):
+    result = session_queue.enqueue_batch("default", batch, prepend=False)
+    assert result.requested == 8
+    assert result.enqueued == 8
+    assert count_graphs(session_queue) == 1
+
+
+def test_queue_items_sessions_are_built_from_graph(session_queue: SqliteSessionQueue, batch: Batch):
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    items = session_queue.list_queue_items("default", limit=10, priority=0).items
+    prompts = []
+    for item in items:
+        queue_item = session_queue.get_queue_item(item.item_id)
+        assert queue_item.session.id == queue_item.session_id
+        prompts.append((queue_item.session.graph.get_node("1").prompt, queue_item.session.graph.get_node("2").prompt))
+    permutations = [
+        ("Banana sushi", "Orange sushi"),
+        ("Banana sushi", "Apple sushi"),
+        ("Grape sushi", "Orange sushi"),
+        ("Grape sushi", "Apple sushi"),
+    ]
+    assert prompts == permutations * 2
+
+
+def test_dequeue_builds_session(session_queue: SqliteSessionQueue, batch: Batch):
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    queue_item = session_queue.dequeue()
+    assert queue_item is not None
+    assert queue_item.status == "in_progress"
+    assert queue_item.session.graph.get_node("1").prompt == "Banana sushi"
+
+
+def test_saved_session_takes_precedence(session_queue: SqliteSessionQueue, batch: Batch):
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    queue_item = session_queue.dequeue()
+    assert queue_item is not None
+    queue_item.session.graph.get_node("2").prompt = "Mango sushi"
+    session_queue.set_queue_item_session(queue_item.item_id, queue_item.session)
+    assert session_queue.get_queue_item(queue_item.item_id).session.graph.get_node("2").prompt == "Mango sushi"
+
+
+def test_enqueue_batch_is_capped_by_max_queue_size(session_queue: SqliteSessionQueue, batch: Batch):
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    result = session_queue.enqueue_batch("default", batch, prepend=False)
+    assert result.requested == 8
+    assert result.enqueued == 2
+    result = session_queue.enqueue_batch("default", batch, prepend=False)
+    assert result.enqueued == 0
+    assert session_queue.get_queue_status("default").pending == 10
+    # No graph is stored for the batch that enqueued nothing
+    assert count_graphs(session_queue) == 2
+
+
+def test_deleting_queue_items_deletes_graphs(session_queue: SqliteSessionQueue, batch: Batch):
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    assert count_graphs(session_queue) == 1
+    session_queue.clear("default")
+    assert count_graphs(session_queue) == 0
+
+
+def test_migration_17_keeps_queue_items():
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    cursor.execute(
+        """--sql
+        CREATE TABLE session_queue (
+            item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT NOT NULL,
+            queue_id TEXT NOT NULL,
+            session_id TEXT NOT NULL UNIQUE,
+            field_values TEXT,
+            session TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            priority INTEGER NOT NULL DEFAULT 0,
+            error_traceback TEXT,
+            created_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
+            updated_at DATETIME NOT NULL DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
+            started_at DATETIME,
+            completed_at DATETIME,
+            workflow TEXT, error_type TEXT, error_message TEXT, origin TEXT, destination TEXT
+        );
+        """
+    )
+    for i in range(3):
+        cursor.execute(
+            "INSERT INTO session_queue (batch_id, queue_id, session_id, session) VALUES ('b', 'default', ?, '{}');",
+            (f"s{i}",),
+        )
+    cursor.execute("DELETE FROM session_queue WHERE session_id = 's2';")
+
+    Migration17Callback()(cursor)
+
+    cursor.execute("SELECT item_id, session_id, session, graph_id FROM session_queue ORDER BY item_id;")
+    assert cursor.fetchall() == [(1, "s0", "{}", None), (2, "s1", "{}", None)]
+    # Item ids are not reused
+    cursor.execute("INSERT INTO session_queue (batch_id, queue_id, session_id) VALUES ('b', 'default', 's3');")
+    assert cursor.lastrowid == 4
+    # Triggers are recreated
+    cursor.execute("UPDATE session_queue SET status = 'in_progress' WHERE item_id = 4;")
+    cursor.execute("SELECT started_at FROM session_queue WHERE item_id = 4;")
+    assert cursor.fetchone()[0] is not None
+
+
+def test_dequeue_claims_items_in_priority_order(session_queue: SqliteSessionQueue, batch: Batch):
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    session_queue.enqueue_batch("default", batch, prepend=True)
+    item_ids = []
+    while (queue_item := session_queue.dequeue()) is not None:
+        assert queue_item.status == "in_progress"
+        assert queue_item.started_at is not None
+        item_ids.append(queue_item.item_id)
+    assert item_ids == list(range(9, 11)) + list(range(1, 9))
+    assert session_queue.get_queue_status("default").in_progress == 10
+
+
+def test_dequeue_uses_index(session_queue: SqliteSessionQueue):
+    cursor = session_queue._SqliteSessionQueue__conn.cursor()
+    cursor.execute(
+        """--sql
+        EXPLAIN QUERY PLAN
+        SELECT item_id FROM session_queue WHERE status = 'pending' ORDER BY priority DESC, item_id ASC LIMIT 1;
+        """
+    )
+    plan = " ".join(row["detail"] for row in cursor.fetchall())
+    assert "USING COVERING INDEX idx_session_queue_status_priority_item_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_concurrent_dequeues_claim_different_items(session_queue: SqliteSessionQueue, batch: Batch):
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    item_ids: list[int] = []
+
+    def dequeue_all() -> None:
+        while (queue_item := session_queue.dequeue()) is not None:
+            item_ids.append(queue_item.item_id)
+
+    threads = [threading.Thread(target=dequeue_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(item_ids) == list(range(1, 9))
+
+
+def test_dequeue_uses_prefetched_session(session_queue: SqliteSessionQueue, batch: Batch):
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    session_queue.dequeue()
+    prefetched = session_queue._prefetched
+    assert prefetched is not None
+    item_id, session = prefetched.result()
+    assert item_id == 2
+
+    queue_item = session_queue.dequeue()
+    assert queue_item is not None
+    assert queue_item.item_id == 2
+    assert queue_item.session is session
+    assert queue_item.session.graph.get_node("2").prompt == "Apple sushi"
+
+
+def test_prefetched_session_is_not_used_for_other_items(session_queue: SqliteSessionQueue, batch: Batch):
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    session_queue.dequeue()
+    prefetched = session_queue._prefetched
+    assert prefetched is not None
+    _, session = prefetched.result()
+
+    # A prepended batch is dequeued before the prefetched item
+    session_queue.enqueue_batch("default", batch, prepend=True)
+    queue_item = session_queue.dequeue()
+    assert queue_item is not None
+    assert queue_item.item_id == 9
+    assert queue_item.session is not session
+
+
+def test_enqueue_notifies_listeners(session_queue: SqliteSessionQueue, batch: Batch):
+    listener = MagicMock()
+    session_queue.add_enqueue_listener(listener)
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    assert listener.call_count == 1
+    # Nothing is enqueued into a full queue, so listeners are not called
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    assert listener.call_count == 2
+
+
+def test_enqueue_batch_rejects_invalid_field_values(session_queue: SqliteSessionQueue):
+    graph = Graph()
+    graph.add_node(AddInvocation(id="1"))
+    # The first item is valid, so the items before the invalid one are rolled back
+    batch = Batch(graph=graph, data=[[BatchDatum(node_path="1", field_name="a", items=["1", "abc"])]])
+    with pytest.raises(ValidationError):
+        session_queue.enqueue_batch("default", batch, prepend=False)
+    assert session_queue.get_queue_status("default").pending == 0
+    assert count_graphs(session_queue) == 0
+
+
+def test_dequeue_fails_items_whose_session_cannot_be_built(session_queue: SqliteSessionQueue):
+    graph = Graph()
+    graph.add_node(AddInvocation(id="1"))
+    batch = Batch(graph=graph, data=[[BatchDatum(node_path="1", field_name="a", items=[1])]])
+    session_queue.enqueue_batch("default", batch, prepend=False)
+    # Field values that were stored before they were validated at enqueue
+    session_queue._SqliteSessionQueue__conn.execute(
+        """UPDATE session_queue SET field_values = '[{"node_path": "1", "field_name": "a", "value": "abc"}]';"""
+    )
+    with pytest.raises(ValidationError):
+        session_queue.dequeue()
+    assert session_queue.get_current("default") is None
+    status = session_queue.get_queue_status("default")
+    assert (status.in_progress, status.failed) == (0, 1)
+    queue_item = session_queue.get_queue_item(1)
+    assert queue_item.status == "failed"
+    assert queue_item.error_type == "ValidationError"
+    assert queue_item.session.graph.get_node("1").a == 0
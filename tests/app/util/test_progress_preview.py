@@ -0,0 +1,132 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import torch
+from fastapi import FastAPI
+
+from invokeai.app.api.sockets import SocketIO
+from invokeai.app.services.config.config_default import InvokeAIAppConfig
+from invokeai.app.services.events.events_base import EventServiceBase
+from invokeai.app.services.shared.invocation_context import UtilInterface
+from invokeai.app.util.progress_preview import ProgressPreviewEncoder, ProgressPreviewThrottle, progress_preview_encoder
+from invokeai.app.util.step_callback import get_preview_matrix
+from invokeai.backend.model_manager.config import BaseModelType
+from invokeai.backend.stable_diffusion.diffusers_pipeline import PipelineIntermediateState
+
+
+def test_throttle_limits_rate():
+    throttle = ProgressPreviewThrottle(max_rate=1)
+    assert throttle.should_send()
+    assert not throttle.should_send()
+    assert throttle.should_send(force=True)
+
+
+def test_throttle_without_rate_sends_everything():
+    throttle = ProgressPreviewThrottle(max_rate=0)
+    assert all(throttle.should_send() for _ in range(10))
+
+
+def test_encoder_keeps_latest_preview_of_each_key():
+    encoder = ProgressPreviewEncoder()
+    emitted: list[str] = []
+    busy = threading.Event()
+    release = threading.Event()
+
+    def block() -> None:
+        busy.set()
+        release.wait(timeout=5)
+
+    encoder.submit("blocker", block)
+    assert busy.wait(timeout=5)
+    # These are queued while the worker is busy, so only the last preview of each key is emitted
+    for i in range(3):
+        encoder.submit("a", lambda i=i: emitted.append(f"a{i}"))
+    encoder.submit("b", lambda: emitted.append("b0"))
+    release.set()
+    encoder.emit_now("c", lambda: None)  # Waits for the blocker
+    encoder._executor.shutdown(wait=True)
+    assert sorted(emitted) == ["a2", "b0"]
+
+
+def test_encoder_emit_now_drops_pending_preview():
+    encoder = ProgressPreviewEncoder()
+    emitted: list[str] = []
+    release = threading.Event()
+    encoder.submit("blocker", lambda: release.wait(timeout=5))
+    encoder.submit("a", lambda: emitted.append("stale"))
+    threading.Timer(0.05, release.set).start()
+    encoder.emit_now("a", lambda: emitted.append("final"))
+    encoder._executor.shutdown(wait=True)
+    assert emitted == ["final"]
+
+
+def test_preview_matrix_is_cached():
+    matrix = get_preview_matrix("flux", torch.device("cpu"), torch.float32)
+    assert matrix.shape == (16, 3)
+    assert get_preview_matrix("flux", torch.device("cpu"), torch.float32) is matrix
+    assert get_preview_matrix("flux", torch.device("cpu"), torch.float16).dtype == torch.float16
+
+
+def test_events_assume_subscribers_unless_checked():
+    events = EventServiceBase()
+    assert events.has_queue_subscribers("default")
+    events.set_queue_subscribers_check(lambda queue_id: queue_id == "other")
+    assert not events.has_queue_subscribers("default")
+    assert events.has_queue_subscribers("other")
+
+
+def test_socket_tracks_queue_subscribers():
+    socket_io = SocketIO(FastAPI())
+
+    async def subscribe_and_disconnect() -> None:
+        sid = await socket_io._sio.manager.connect("eio_sid", "/")
+        await socket_io._handle_sub_queue(sid, {"queue_id": "default"})
+        assert socket_io.has_queue_subscribers("default")
+        assert not socket_io.has_queue_subscribers("other")
+        await socket_io._sio.manager.disconnect(sid, "/")
+
+    asyncio.run(subscribe_and_disconnect())
+    assert not socket_io.has_queue_subscribers("default")
+
+
+def build_util(has_subscribers: bool, max_rate: float = 0) -> tuple[UtilInterface, MagicMock]:
+    services = MagicMock()
+    services.configuration = InvokeAIAppConfig(progress_preview_max_rate=max_rate, progress_preview_max_size=16)
+    services.events.has_queue_subscribers.return_value = has_subscribers
+    data = SimpleNamespace(
+        queue_item=SimpleNamespace(item_id=1, queue_id="default"), invocation=SimpleNamespace(id="denoise")
+    )
+    return UtilInterface(services=services, data=data, is_canceled=lambda: False), services  # type: ignore
+
+
+def build_state(step: int, total_steps: int = 10) -> PipelineIntermediateState:
+    return PipelineIntermediateState(
+        step=step, order=1, total_steps=total_steps, timestep=0, latents=torch.zeros(1, 4, 64, 48)
+    )
+
+
+def test_step_callback_is_skipped_without_subscribers():
+    util, services = build_util(has_subscribers=False)
+    util.sd_step_callback(build_state(9), BaseModelType.StableDiffusion1)
+    services.events.emit_invocation_progress.assert_not_called()
+
+
+def test_step_callback_sends_downscaled_preview():
+    util, services = build_util(has_subscribers=True)
+    util.sd_step_callback(build_state(9), BaseModelType.StableDiffusion1)
+    # The last step is emitted on the calling thread
+    progress_image = services.events.emit_invocation_progress.call_args.kwargs["image"]
+    assert (progress_image.width, progress_image.height) == (384, 512)
+
+
+def test_step_callback_is_throttled():
+    util, services = build_util(has_subscribers=True, max_rate=0.001)
+    for step in range(10):
+        util.sd_step_callback(build_state(step), BaseModelType.StableDiffusion1)
+        # Waits for the preview to be emitted, if it was sent
+        progress_preview_encoder._executor.submit(lambda: None).result()
+    # The first and last steps
+    percentages = [c.kwargs["percentage"] for c in services.events.emit_invocation_progress.call_args_list]
+    assert percentages == [0, 0.9]
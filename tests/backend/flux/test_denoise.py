@@ -0,0 +1,140 @@
+import pytest
+import torch
+
+from invokeai.backend.flux.denoise import denoise
+from invokeai.backend.flux.extensions.regional_prompting_extension import RegionalPromptingExtension
+from invokeai.backend.flux.extensions.xlabs_ip_adapter_extension import XLabsIPAdapterExtension
+from invokeai.backend.flux.ip_adapter.xlabs_ip_adapter_flux import XlabsIpAdapterFlux, XlabsIpAdapterParams
+from invokeai.backend.flux.model import Flux, FluxParams
+from invokeai.backend.flux.text_conditioning import FluxTextConditioning
+
+# A tiny FLUX transformer, which runs quickly on the CPU.
+PACKED_H, PACKED_W = 4, 6
+IMG_SEQ_LEN = PACKED_H * PACKED_W
+FLUX_PARAMS = FluxParams(
+    in_channels=8,
+    vec_in_dim=12,
+    context_in_dim=16,
+    hidden_size=32,
+    mlp_ratio=2.0,
+    num_heads=2,
+    depth=2,
+    depth_single_blocks=3,
+    axes_dim=[4, 6, 6],
+    theta=10_000,
+    qkv_bias=True,
+    guidance_embed=True,
+)
+
+
+@pytest.fixture
+def model() -> Flux:
+    torch.manual_seed(0)
+    return Flux(FLUX_PARAMS).eval()
+
+
+def text_conditioning(txt_seq_len: int, mask: torch.Tensor | None = None) -> FluxTextConditioning:
+    return FluxTextConditioning(
+        t5_embeddings=torch.randn(1, txt_seq_len, FLUX_PARAMS.context_in_dim),
+        clip_embeddings=torch.randn(1, FLUX_PARAMS.vec_in_dim),
+        mask=mask,
+    )
+
+
+def region_mask() -> torch.Tensor:
+    mask = torch.zeros(1, 1, IMG_SEQ_LEN)
+    mask[..., : IMG_SEQ_LEN // 2] = 1.0
+    return mask
+
+
+def ip_adapter_extension(seed: int) -> XLabsIPAdapterExtension:
+    torch.manual_seed(seed)
+    ip_adapter = XlabsIpAdapterFlux(
+        XlabsIpAdapterParams(
+            num_double_blocks=FLUX_PARAMS.depth,
+            context_dim=8,
+            hidden_dim=FLUX_PARAMS.hidden_size,
+            clip_embeddings_dim=10,
+            clip_extra_context_tokens=2,
+        )
+    )
+    extension = XLabsIPAdapterExtension(
+        model=ip_adapter,
+        image_prompt_clip_embed=torch.randn(1, 10),
+        weight=0.5,
+        begin_step_percent=0.0,
+        end_step_percent=1.0,
+    )
+    extension.run_image_proj(torch.float32)
+    return extension
+
+
+def run_denoise(
+    model: Flux,
+    pos: list[FluxTextConditioning],
+    neg: list[FluxTextConditioning],
+    batch_cfg: bool,
+    ip_adapters: bool = False,
+) -> torch.Tensor:
+    torch.manual_seed(1)
+    img = torch.randn(1, IMG_SEQ_LEN, FLUX_PARAMS.in_channels)
+    img_ids = torch.zeros(1, IMG_SEQ_LEN, 3)
+    img_ids[..., 1] = torch.arange(PACKED_H).repeat_interleave(PACKED_W)
+    img_ids[..., 2] = torch.arange(PACKED_W).repeat(PACKED_H)
+    timesteps = [1.0, 0.75, 0.5, 0.25, 0.0]
+    with torch.no_grad():
+        return denoise(
+            model=model,
+            img=img,
+            img_ids=img_ids,
+            pos_regional_prompting_extension=RegionalPromptingExtension.from_text_conditioning(pos, IMG_SEQ_LEN),
+            neg_regional_prompting_extension=RegionalPromptingExtension.from_text_conditioning(neg, IMG_SEQ_LEN),
+            timesteps=timesteps,
+            step_callback=lambda _: None,
+            guidance=3.5,
+            # The last step does not use CFG
+            cfg_scale=[4.0, 3.0, 2.0, 1.0],
+            inpaint_extension=None,
+            controlnet_extensions=[],
+            pos_ip_adapter_extensions=[ip_adapter_extension(2)] if ip_adapters else [],
+            neg_ip_adapter_extensions=[ip_adapter_extension(3)] if ip_adapters else [],
+            img_cond=None,
+            batch_cfg=batch_cfg,
+        )
+
+
+@pytest.mark.parametrize(
+    "pos_txt_seq_lens,pos_masked,neg_txt_seq_lens",
+    [
+        ([7], [False], [7]),
+        # The negative conditioning is padded
+        ([7], [False], [3]),
+        # Regional prompting, with the restricted attention mask for the positive conditioning only
+        ([5, 4], [True, False], [6]),
+        ([5, 4], [True, False], [5, 4]),
+    ],
+)
+def test_batched_cfg_matches_sequential_cfg(
+    model: Flux, pos_txt_seq_lens: list[int], pos_masked: list[bool], neg_txt_seq_lens: list[int]
+):
+    torch.manual_seed(4)
+    pos = [
+        text_conditioning(n, region_mask() if masked else None)
+        for n, masked in zip(pos_txt_seq_lens, pos_masked, strict=True)
+    ]
+    neg = [text_conditioning(n) for n in neg_txt_seq_lens]
+
+    sequential = run_denoise(model, pos, neg, batch_cfg=False)
+    batched = run_denoise(model, pos, neg, batch_cfg=True)
+    assert torch.allclose(batched, sequential, atol=1e-5)
+
+
+def test_batched_cfg_applies_ip_adapters_to_their_halves(model: Flux):
+    torch.manual_seed(5)
+    pos = [text_conditioning(7)]
+    neg = [text_conditioning(3)]
+
+    sequential = run_denoise(model, pos, neg, batch_cfg=False, ip_adapters=True)
+    batched = run_denoise(model, pos, neg, batch_cfg=True, ip_adapters=True)
+    assert torch.allclose(batched, sequential, atol=1e-5)
+    assert not torch.allclose(batched, run_denoise(model, pos, neg, batch_cfg=True), atol=1e-5)
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from invokeai.backend.image_util.infill_methods.mosaic import infill_mosaic
+from invokeai.backend.image_util.infill_methods.tile import create_filled_image, create_tile_pool, infill_tile
+
+
+def legacy_mosaic_fill(np_image: np.ndarray, tile_shape: tuple[int, int]) -> np.ndarray:
+    """The previous pixel-by-pixel filling of infill_mosaic, without color clipping."""
+    height, width = np_image.shape[:2]
+    non_transparent_pixels = np_image[np_image[:, :, 3] != 0, :3]
+    tile_width, tile_height = tile_shape
+    tiles = []
+    for _ in range(256):
+        color = non_transparent_pixels[np.random.randint(len(non_transparent_pixels))]
+        tile = np.zeros((tile_height, tile_width, 3), dtype=np.uint8)
+        tile[:, :] = color
+        tiles.append(tile)
+    filled_image = np.zeros((height, width, 3), dtype=np.uint8)
+    for x in range(width):
+        for y in range(height):
+            tile = tiles[np.random.randint(len(tiles))]
+            try:
+                filled_image[
+                    y - (y % tile_height) : y - (y % tile_height) + tile_height,
+                    x - (x % tile_width) : x - (x % tile_width) + tile_width,
+                ] = tile
+            except ValueError:
+                pass
+    return filled_image
+
+
+def legacy_tile_pool(img_array: np.ndarray, tile_size: tuple[int, int]) -> list[np.ndarray]:
+    tiles: list[np.ndarray] = []
+    rows, cols = img_array.shape[:2]
+    tile_width, tile_height = tile_size
+    for y in range(0, rows - tile_height + 1, tile_height):
+        for x in range(0, cols - tile_width + 1, tile_width):
+            tile = img_array[y : y + tile_height, x : x + tile_width]
+            if img_array.shape[2] == 4 and np.all(tile[:, :, 3] == 255):
+                tiles.append(tile)
+            elif img_array.shape[2] == 3:
+                tiles.append(tile)
+    return tiles
+
+
+def legacy_filled_image(
+    img_array: np.ndarray, tile_pool: list[np.ndarray], tile_size: tuple[int, int], seed: int
+) -> np.ndarray:
+    rows, cols, _ = img_array.shape
+    tile_width, tile_height = tile_size
+    filled_img_array = np.zeros((rows, cols, 3), dtype=img_array.dtype)
+    rng = np.random.default_rng(seed)
+    for y in range(0, rows, tile_height):
+        for x in range(0, cols, tile_width):
+            tile = tile_pool[rng.integers(len(tile_pool))]
+            space_y = min(tile_height, rows - y)
+            space_x = min(tile_width, cols - x)
+            filled_img_array[y : y + space_y, x : x + space_x, :3] = tile[:space_y, :space_x, :3]
+    return filled_img_array
+
+
+def random_rgba(width: int, height: int) -> np.ndarray:
+    """A random image, with a transparent right half."""
+    np_image = np.random.default_rng(0).integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    np_image[:, :, 3] = 255
+    np_image[:, width // 2 :, 3] = 0
+    return np_image
+
+
+SIZES = [(64, 64), (100, 70), (37, 90), (10, 10)]
+
+
+@pytest.mark.parametrize(["width", "height"], SIZES)
+@pytest.mark.parametrize("tile_shape", [(8, 8), (16, 12)])
+def test_infill_mosaic_matches_pixel_by_pixel_filling(width: int, height: int, tile_shape: tuple[int, int]):
+    np_image = random_rgba(width, height)
+    image = Image.fromarray(np_image, "RGBA")
+
+    np.random.seed(1)
+    expected = Image.composite(image, Image.fromarray(legacy_mosaic_fill(np_image, tile_shape)), image.split()[-1])
+    np.random.seed(1)
+    # The full color range, so that colors are not clipped
+    actual = infill_mosaic(image, tile_shape, min_color=(0, 0, 0, 0), max_color=(255, 255, 255, 0))
+    assert np.array_equal(np.array(actual), np.array(expected))
+
+
+@pytest.mark.parametrize(["width", "height"], SIZES)
+@pytest.mark.parametrize("tile_size", [(8, 8), (16, 12)])
+@pytest.mark.parametrize("channels", [3, 4])
+def test_tile_infill_matches_tile_by_tile_filling(width: int, height: int, tile_size: tuple[int, int], channels: int):
+    np_image = np.ascontiguousarray(random_rgba(width, height)[:, :, :channels])
+    if channels == 4:
+        # Make some tiles on the left partly transparent
+        np_image[: height // 3, : width // 4, 3] = 0
+
+    expected_pool = legacy_tile_pool(np_image, tile_size)
+    if not expected_pool:
+        with pytest.raises(ValueError):
+            create_tile_pool(np_image, tile_size)
+        return
+
+    pool = create_tile_pool(np_image, tile_size)
+    assert len(pool) == len(expected_pool)
+    assert all(np.array_equal(t, e) for t, e in zip(pool, expected_pool, strict=True))
+
+    expected = legacy_filled_image(np_image, expected_pool, tile_size, seed=123)
+    actual = create_filled_image(np_image, pool, tile_size, seed=123)
+    assert actual.dtype == expected.dtype
+    assert np.array_equal(actual, expected)
+
+
+def test_infill_tile_fills_transparent_area():
+    image = Image.fromarray(random_rgba(64, 48), "RGBA")
+    output = infill_tile(image, seed=5, tile_size=8)
+    assert output.tile_image is not None
+    infilled = np.array(output.infilled)
+    assert np.array_equal(infilled[:, :32], np.array(image)[:, :32, :3])
+    assert np.array_equal(infilled[:, 32:], np.array(output.tile_image)[:, 32:])
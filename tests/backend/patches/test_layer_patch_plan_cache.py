@@ -0,0 +1,128 @@
+import gc
+
+import pytest
+import torch
+
+from invokeai.backend.patches.layer_patch_plan_cache import LayerPatchPlanCache
+from invokeai.backend.patches.layer_patcher import LayerPatcher
+from invokeai.backend.patches.layers.lora_layer import LoRALayer
+from invokeai.backend.patches.layers.set_parameter_layer import SetParameterLayer
+from invokeai.backend.patches.model_patch_raw import ModelPatchRaw
+
+
+class DummyBlock(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.proj_in = torch.nn.Linear(4, 8)
+        self.proj_out = torch.nn.Linear(8, 4)
+
+
+class DummyModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.down_blocks = torch.nn.ModuleList([DummyBlock(), DummyBlock()])
+
+
+def build_lora(in_features: int, out_features: int, rank: int = 2) -> LoRALayer:
+    return LoRALayer(
+        up=torch.randn(out_features, rank), mid=None, down=torch.randn(rank, in_features), alpha=None, bias=None
+    )
+
+
+def build_patch(flattened: bool) -> ModelPatchRaw:
+    torch.manual_seed(0)
+    layers = {}
+    for i in range(2):
+        layers[f"lora_unet_down_blocks_{i}_proj_in" if flattened else f"down_blocks.{i}.proj_in"] = build_lora(4, 8)
+        layers[f"lora_unet_down_blocks_{i}_proj_out" if flattened else f"down_blocks.{i}.proj_out"] = build_lora(8, 4)
+    return ModelPatchRaw(layers)
+
+
+def patched_state_dict(
+    model: torch.nn.Module, patch: ModelPatchRaw, prefix: str, plan_cache: LayerPatchPlanCache
+) -> dict[str, torch.Tensor]:
+    with LayerPatcher.apply_smart_model_patches(
+        model=model,
+        patches=[(patch, 0.5)],
+        prefix=prefix,
+        dtype=torch.float32,
+        force_direct_patching=True,
+        plan_cache=plan_cache,
+    ):
+        return {k: v.clone() for k, v in model.state_dict().items()}
+
+
+@pytest.mark.parametrize("flattened", [True, False])
+def test_module_keys_are_resolved_once(flattened: bool, monkeypatch: pytest.MonkeyPatch):
+    model = DummyModel()
+    patch = build_patch(flattened)
+    prefix = "lora_unet_" if flattened else ""
+    orig_state_dict = {k: v.clone() for k, v in model.state_dict().items()}
+    expected = patched_state_dict(model, patch, prefix, LayerPatchPlanCache())
+
+    plan_cache = LayerPatchPlanCache()
+    patched_state_dict(model, patch, prefix, plan_cache)
+    # Repeat applications do not resolve the layer keys again
+    monkeypatch.setattr(LayerPatcher, "_get_submodule", None)
+    for _ in range(2):
+        patched = patched_state_dict(model, patch, prefix, plan_cache)
+        assert all(torch.equal(patched[k], expected[k]) for k in expected)
+
+    assert (plan_cache.stats.plan_hits, plan_cache.stats.plan_misses) == (2, 1)
+    assert plan_cache.stats.last_setup_seconds > 0
+    # The model is unpatched
+    assert all(torch.equal(v, orig_state_dict[k]) for k, v in model.state_dict().items())
+
+
+def test_deltas_are_cached():
+    model = DummyModel()
+    patch = build_patch(flattened=False)
+    expected = patched_state_dict(model, patch, "", LayerPatchPlanCache())
+
+    plan_cache = LayerPatchPlanCache(max_delta_cache_bytes=2**20)
+    for _ in range(3):
+        patched = patched_state_dict(model, patch, "", plan_cache)
+        assert all(torch.equal(patched[k], expected[k]) for k in expected)
+    assert (plan_cache.stats.delta_hits, plan_cache.stats.delta_misses) == (8, 4)
+
+    # Deltas are cached per patch weight
+    with LayerPatcher.apply_smart_model_patches(
+        model=model,
+        patches=[(patch, 1.0)],
+        prefix="",
+        dtype=torch.float32,
+        force_direct_patching=True,
+        plan_cache=plan_cache,
+    ):
+        pass
+    assert plan_cache.stats.delta_misses == 8
+
+
+def test_deltas_are_evicted_to_stay_within_budget():
+    model = DummyModel()
+    patch = build_patch(flattened=False)
+    # Each layer has a 32 element weight delta and no bias delta
+    plan_cache = LayerPatchPlanCache(max_delta_cache_bytes=3 * 32 * 4)
+    for _ in range(2):
+        patched_state_dict(model, patch, "", plan_cache)
+    assert plan_cache.stats.delta_hits == 0
+    assert plan_cache._delta_cache_bytes == 3 * 32 * 4
+
+
+def test_deltas_of_layers_that_depend_on_the_original_parameters_are_not_cached():
+    plan_cache = LayerPatchPlanCache(max_delta_cache_bytes=2**20)
+    assert plan_cache.can_cache_deltas(build_lora(4, 8))
+    assert not plan_cache.can_cache_deltas(SetParameterLayer("weight", torch.zeros(8, 4)))
+    assert not LayerPatchPlanCache().can_cache_deltas(build_lora(4, 8))
+
+
+def test_entries_are_dropped_with_the_patch():
+    model = DummyModel()
+    patch = build_patch(flattened=False)
+    plan_cache = LayerPatchPlanCache(max_delta_cache_bytes=2**20)
+    patched_state_dict(model, patch, "", plan_cache)
+    assert len(plan_cache._module_keys[model]) == 1
+
+    del patch
+    gc.collect()
+    assert len(plan_cache._module_keys[model]) == 0
@@ -0,0 +1,52 @@
+import gc
+
+import gguf
+import torch
+
+from invokeai.backend.quantization.gguf import ggml_tensor
+from invokeai.backend.quantization.gguf.dequantized_tensor_cache import DequantizedTensorCache
+from tests.backend.quantization.gguf.test_ggml_tensor import quantize_tensor
+
+
+def test_cache_reuses_dequantized_tensors(monkeypatch):
+    cache = DequantizedTensorCache(max_bytes=2**20)
+    monkeypatch.setattr(ggml_tensor, "get_dequantized_tensor_cache", lambda: cache)
+    x = quantize_tensor(torch.randn(32, 64), gguf.GGMLQuantizationType.Q8_0)
+
+    dequantized = x.get_dequantized_tensor()
+    assert x.get_dequantized_tensor() is dequantized
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert torch.equal(dequantized, x._dequantize())
+
+    # In-place modifications of the quantized data invalidate the cached tensor
+    x.quantized_data.zero_()
+    assert not torch.equal(x.get_dequantized_tensor(), dequantized)
+    assert cache.misses == 2
+
+
+def test_cache_evicts_least_recently_used_tensors():
+    cache = DequantizedTensorCache(max_bytes=2 * 32 * 64 * 4)
+    tensors = [quantize_tensor(torch.randn(32, 64), gguf.GGMLQuantizationType.Q8_0) for _ in range(3)]
+    for x in [*tensors, tensors[2], tensors[0]]:
+        cache.get(x, x.quantized_data, x._dequantize)
+    # tensors[0] was evicted by tensors[2], before it was used again
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert cache._cur_bytes == 2 * 32 * 64 * 4
+
+
+def test_cache_drops_garbage_collected_tensors():
+    cache = DequantizedTensorCache(max_bytes=2**20)
+    x = quantize_tensor(torch.randn(32, 64), gguf.GGMLQuantizationType.Q8_0)
+    cache.get(x, x.quantized_data, x._dequantize)
+    assert cache._cur_bytes > 0
+
+    del x
+    gc.collect()
+    assert cache._cur_bytes == 0
+
+
+def test_cache_is_disabled_without_budget():
+    cache = DequantizedTensorCache()
+    x = quantize_tensor(torch.randn(32, 64), gguf.GGMLQuantizationType.Q8_0)
+    assert cache.get(x, x.quantized_data, x._dequantize) is not cache.get(x, x.quantized_data, x._dequantize)
+    assert cache.misses == 0
@@ -0,0 +1,24 @@
+import gguf
+import numpy as np
+import pytest
+import torch
+
+from invokeai.backend.quantization.gguf.utils import DEQUANTIZE_FUNCTIONS, dequantize
+
+
+@pytest.mark.parametrize("qtype", list(DEQUANTIZE_FUNCTIONS.keys()), ids=lambda q: q.name)
+def test_dequantize_matches_gguf(qtype: gguf.GGMLQuantizationType):
+    """Check the torch dequantization of random blocks against the numpy implementation of the gguf library."""
+    block_size, type_size = gguf.GGML_QUANT_SIZES[qtype]
+    n_blocks = 64
+    blocks = np.random.default_rng(123).integers(0, 256, size=(n_blocks, type_size), dtype=np.uint8)
+    shape = torch.Size((4, n_blocks * block_size // 4))
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        expected = gguf.quants.dequantize(blocks, qtype).reshape(shape)
+    actual = dequantize(torch.from_numpy(blocks), qtype, shape, dtype=torch.float32).numpy()
+
+    # Random bytes include non-finite float16 scales
+    finite = np.isfinite(expected) & np.isfinite(actual)
+    assert finite.mean() > 0.8
+    np.testing.assert_allclose(actual[finite], expected[finite], rtol=1e-3, atol=1e-3)
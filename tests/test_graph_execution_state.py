@@ -221,3 +221,68 @@ def test_graph_iterate_execution_order(execution_number: int):
     _ = invoke_next(g)
     assert _[1].item == "Dinosaur Sushi"
     _ = invoke_next(g)
+
+
+def collect_graph(test_prompts: list[str]) -> Graph:
+    graph = Graph()
+    graph.add_node(PromptCollectionTestInvocation(id="prompt_collection", collection=list(test_prompts)))
+    graph.add_node(IterateInvocation(id="iterate"))
+    graph.add_node(PromptTestInvocation(id="prompt_iterated"))
+    graph.add_node(PromptTestInvocation(id="prompt_successor"))
+    graph.add_node(CollectInvocation(id="collect"))
+    graph.add_edge(create_edge("prompt_collection", "collection", "iterate", "collection"))
+    graph.add_edge(create_edge("iterate", "item", "prompt_iterated", "prompt"))
+    graph.add_edge(create_edge("prompt_iterated", "prompt", "prompt_successor", "prompt"))
+    graph.add_edge(create_edge("prompt_successor", "prompt", "collect", "item"))
+    return graph
+
+
+def test_graph_collects_in_iteration_order():
+    test_prompts = ["Banana sushi", "Cat sushi", "Strawberry Sushi", "Dinosaur Sushi"]
+    g = GraphExecutionState(graph=collect_graph(test_prompts))
+    while not g.is_complete():
+        invoke_next(g)
+
+    collect_id = next(iter(g.source_prepared_mapping["collect"]))
+    assert g.results[collect_id].collection == test_prompts
+
+
+def test_graph_next_is_stable_until_completed():
+    g = GraphExecutionState(graph=collect_graph(["Banana sushi", "Cat sushi"]))
+    invoke_next(g)
+    n1 = g.next()
+    n2 = g.next()
+    assert n1 is not None and n2 is not None
+    assert n1.id == n2.id
+
+
+def test_graph_resumes_after_deserialization():
+    test_prompts = ["Banana sushi", "Cat sushi", "Strawberry Sushi"]
+    g = GraphExecutionState(graph=collect_graph(test_prompts))
+    expected = GraphExecutionState(graph=collect_graph(test_prompts))
+    for _ in range(6):
+        invoke_next(g)
+        invoke_next(expected)
+
+    # The scheduler is rebuilt from the deserialized state, and does not affect equality
+    g = GraphExecutionState.model_validate_json(g.model_dump_json())
+    assert g == GraphExecutionState.model_validate_json(g.model_dump_json())
+    while not g.is_complete():
+        n, _ = invoke_next(g)
+        expected_n, _ = invoke_next(expected)
+        assert n is not None and expected_n is not None
+        assert g.prepared_source_mapping[n.id] == expected.prepared_source_mapping[expected_n.id]
+        assert n.model_dump(exclude={"id"}) == expected_n.model_dump(exclude={"id"})
+    assert expected.is_complete()
+
+
+def test_graph_prepares_nodes_added_during_execution(simple_graph: Graph):
+    g = GraphExecutionState(graph=simple_graph)
+    invoke_next(g)
+    g.add_node(PromptTestInvocation(id="3"))
+    g.add_edge(create_edge("1", "prompt", "3", "prompt"))
+    invoke_next(g)
+    invoke_next(g)
+    assert g.next() is None
+    assert g.is_complete()
+    assert g.results[next(iter(g.source_prepared_mapping["3"]))].prompt == "Banana sushi"
@@ -1,8 +1,9 @@
 # pyright: reportPrivateUsage=false
 from contextlib import suppress
+from unittest.mock import MagicMock
 
 from invokeai.app.invocations.fields import ImageField
-from invokeai.app.invocations.primitives import ImageOutput
+from invokeai.app.invocations.primitives import ImageCollectionOutput, ImageOutput
 from invokeai.app.services.invocation_cache.invocation_cache_memory import MemoryInvocationCache
 from tests.test_nodes import PromptTestInvocation
 
@@ -27,6 +28,40 @@ def test_invocation_cache_memory_creates_deterministic_keys():
     assert hash1 != hash3
 
 
+def test_invocation_cache_memory_keys_ignore_id_and_track_inputs():
+    invocation = PromptTestInvocation(prompt="foo")
+    key = MemoryInvocationCache.create_key(invocation)
+    # Copies that only differ by id share the key
+    invocation_copy = invocation.model_copy(deep=True)
+    invocation_copy.id = "some_other_id"
+    assert MemoryInvocationCache.create_key(invocation_copy) == key
+    # Reassigning an input invalidates the cached fingerprint
+    invocation_copy.prompt = "bar"
+    assert MemoryInvocationCache.create_key(invocation_copy) == MemoryInvocationCache.create_key(
+        PromptTestInvocation(prompt="bar")
+    )
+    # The cached fingerprint does not affect equality
+    assert invocation == PromptTestInvocation(id=invocation.id, prompt="foo")
+
+
+def test_invocation_cache_memory_keys_track_updated_copies():
+    invocation = PromptTestInvocation(prompt="foo")
+    key = MemoryInvocationCache.create_key(invocation)
+    bar_key = MemoryInvocationCache.create_key(PromptTestInvocation(prompt="bar"))
+    # Fields updated by model_copy do not go through __setattr__
+    for deep in (False, True):
+        updated_copy = invocation.model_copy(update={"prompt": "bar"}, deep=deep)
+        assert MemoryInvocationCache.create_key(updated_copy) == bar_key
+    assert MemoryInvocationCache.create_key(invocation.model_copy(update={"id": "some_other_id"})) == key
+
+    # Reassigning an input of a shallow copy does not affect the original
+    shallow_copy = invocation.model_copy()
+    assert MemoryInvocationCache.create_key(shallow_copy) == key
+    shallow_copy.prompt = "bar"
+    assert MemoryInvocationCache.create_key(shallow_copy) == bar_key
+    assert MemoryInvocationCache.create_key(invocation) == key
+
+
 def test_invocation_cache_memory_adds_invocation():
     output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
     output_2 = ImageOutput(image=ImageField(image_name="bar"), width=512, height=512)
@@ -181,3 +216,61 @@ def test_invocation_cache_memory_status():
     assert status.hits == 0
     assert status.misses == 0
     assert status.max_size == 0
+
+
+def test_invocation_cache_memory_respects_max_cache_bytes():
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ImageOutput(image=ImageField(image_name="bar"), width=512, height=512)
+    output_3 = ImageOutput(image=ImageField(image_name="baz"), width=512, height=512)
+    item_size = len(output_1.model_dump_json(warnings=False, exclude_defaults=True, exclude_unset=True))
+    cache = MemoryInvocationCache(max_cache_size=5, max_cache_bytes=item_size * 2)
+    cache.save(1, output_1, "foo_type")
+    cache.save(2, output_2, "bar_type")
+    cache.get(1)
+    cache.save(3, output_3, "baz_type")
+    # 2 is the least recently used item, so it is evicted to make room for 3
+    assert list(cache._cache.keys()) == [1, 3]
+    status = cache.get_status()
+    assert status.size_bytes == item_size * 2
+    assert status.max_size_bytes == item_size * 2
+    assert status.evictions == 1
+    assert status.stats_by_type["bar_type"].evictions == 1
+    # An item larger than the whole budget is never cached
+    cache = MemoryInvocationCache(max_cache_size=5, max_cache_bytes=item_size - 1)
+    cache.save(1, output_1)
+    assert len(cache._cache) == 0
+
+
+def test_invocation_cache_memory_indexes_references():
+    cache = MemoryInvocationCache(max_cache_size=5)
+    cache.start(MagicMock())
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    output_2 = ImageCollectionOutput(collection=[ImageField(image_name="foo"), ImageField(image_name="bar")])
+    cache.save(1, output_1)
+    cache.save(2, output_2)
+    assert cache._references == {"foo": {1, 2}, "bar": {2}}
+    # Names are matched exactly, not as substrings
+    cache._delete_by_match("fo")
+    assert len(cache._cache) == 2
+    cache._delete_by_match("bar")
+    assert list(cache._cache.keys()) == [1]
+    assert cache._references == {"foo": {1}}
+    cache._delete_by_match("foo")
+    assert len(cache._cache) == 0
+    assert cache._references == {}
+    assert cache.get_status().size_bytes == 0
+
+
+def test_invocation_cache_memory_tracks_stats_by_type():
+    output_1 = ImageOutput(image=ImageField(image_name="foo"), width=512, height=512)
+    cache = MemoryInvocationCache(max_cache_size=5)
+    cache.save(1, output_1, "img_resize")
+    cache.get(1, "img_resize")  # hit
+    cache.get(1, "img_resize")  # hit
+    cache.get(2, "img_crop")  # miss
+    status = cache.get_status()
+    assert status.stats_by_type["img_resize"].hits == 2
+    assert status.stats_by_type["img_resize"].misses == 0
+    assert status.stats_by_type["img_crop"].misses == 1
+    cache.clear()
+    assert cache.get_status().stats_by_type == {}
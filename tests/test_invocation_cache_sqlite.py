@@ -0,0 +1,111 @@
+# pyright: reportPrivateUsage=false
+from pathlib import Path
+from typing import Optional
+
+import pytest
+import torch
+
+from invokeai.app.invocations.fields import ImageField, LatentsField
+from invokeai.app.invocations.primitives import ImageOutput, IntegerOutput, LatentsOutput
+from invokeai.app.services.image_files.image_files_disk import DiskImageFileStorage
+from invokeai.app.services.invocation_cache.invocation_cache_memory import MemoryInvocationCache
+from invokeai.app.services.invocation_cache.invocation_cache_sqlite import SqliteInvocationCache
+from invokeai.app.services.invocation_cache.invocation_cache_tiered import TieredInvocationCache
+from invokeai.app.services.invocation_services import InvocationServices
+from invokeai.app.services.invoker import Invoker
+from invokeai.app.services.object_serializer.object_serializer_disk import ObjectSerializerDisk
+from invokeai.app.services.object_serializer.object_serializer_forward_cache import ObjectSerializerForwardCache
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.backend.util.logging import InvokeAILogger
+
+
+@pytest.fixture
+def invoker(mock_services: InvocationServices, tmp_path: Path) -> Invoker:
+    mock_services.image_files = DiskImageFileStorage(tmp_path / "images")
+    mock_services.tensors = ObjectSerializerForwardCache(ObjectSerializerDisk[torch.Tensor](tmp_path / "tensors"))
+    mock_services.conditioning = ObjectSerializerForwardCache(ObjectSerializerDisk[torch.Tensor](tmp_path / "cond"))
+    mock_services.logger = InvokeAILogger.get_logger()
+    return Invoker(mock_services)
+
+
+def create_cache(invoker: Invoker, db_path: Optional[Path], max_cache_bytes: int = 2**20) -> SqliteInvocationCache:
+    db = SqliteDatabase(db_path=db_path, logger=InvokeAILogger.get_logger())
+    cache = SqliteInvocationCache(db=db, max_cache_bytes=max_cache_bytes)
+    cache.start(invoker)
+    return cache
+
+
+def test_invocation_cache_sqlite_persists_outputs(invoker: Invoker, tmp_path: Path):
+    db_path = tmp_path / "invocation_cache.db"
+    cache = create_cache(invoker, db_path)
+    output = IntegerOutput(value=42)
+    cache.save("foo", output, "integer")
+    # A new instance backed by the same file should see the output
+    cache = create_cache(invoker, db_path)
+    assert cache.get("foo", "integer") == output
+    assert cache.get("bar", "integer") is None
+    status = cache.get_status()
+    assert status.hits == 1
+    assert status.misses == 1
+    assert status.size == 1
+    assert status.disk_size_bytes == len(output.model_dump_json())
+
+
+def test_invocation_cache_sqlite_supports_memory_db(invoker: Invoker, tmp_path: Path):
+    cache = create_cache(invoker, None)
+    output = IntegerOutput(value=42)
+    cache.save("foo", output, "integer")
+    assert cache.get("foo", "integer") == output
+    assert list(tmp_path.glob("*.db")) == []
+
+
+def test_invocation_cache_sqlite_drops_outputs_with_missing_references(invoker: Invoker, tmp_path: Path):
+    cache = create_cache(invoker, tmp_path / "invocation_cache.db")
+    latents_name = invoker.services.tensors.save(torch.zeros(1))
+    latents_output = LatentsOutput(latents=LatentsField(latents_name=latents_name), width=8, height=8)
+    image_output = ImageOutput(image=ImageField(image_name="missing.png"), width=8, height=8)
+    cache.save("latents", latents_output)
+    cache.save("image", image_output)
+    assert cache.get("latents") == latents_output
+    # The image file does not exist, so the output is stale
+    assert cache.get("image") is None
+    assert cache.get_status().size == 1
+    # Deleting the tensor invalidates the output that references it
+    invoker.services.tensors.delete(latents_name)
+    assert cache.get("latents") is None
+    assert cache.get_status().size == 0
+    assert cache.get_status().disk_size_bytes == 0
+
+
+def test_invocation_cache_sqlite_evicts_lru_under_budget(invoker: Invoker, tmp_path: Path):
+    output_size = len(IntegerOutput(value=1).model_dump_json())
+    cache = create_cache(invoker, tmp_path / "invocation_cache.db", max_cache_bytes=output_size * 2)
+    cache.save(1, IntegerOutput(value=1), "integer")
+    cache.save(2, IntegerOutput(value=2), "integer")
+    cache.get(1)
+    cache.save(3, IntegerOutput(value=3), "integer")
+    assert cache.get(1) is not None
+    assert cache.get(2) is None
+    assert cache.get(3) is not None
+    status = cache.get_status()
+    assert status.evictions == 1
+    assert status.stats_by_type["integer"].evictions == 1
+    assert status.disk_size_bytes == output_size * 2
+
+
+def test_invocation_cache_tiered_promotes_hits(invoker: Invoker, tmp_path: Path):
+    db_path = tmp_path / "invocation_cache.db"
+    output = IntegerOutput(value=42)
+    create_cache(invoker, db_path).save("foo", output)
+
+    memory_cache = MemoryInvocationCache(max_cache_size=5)
+    cache = TieredInvocationCache(memory_cache, create_cache(invoker, db_path))
+    cache.start(invoker)
+    assert cache.get("foo") == output
+    assert "foo" in memory_cache._cache
+    assert cache.get("foo") == output
+    status = cache.get_status()
+    assert status.hits == 2
+    assert status.misses == 0
+    cache.get("bar")
+    assert cache.get_status().misses == 1
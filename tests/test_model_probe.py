@@ -2,17 +2,20 @@ from pathlib import Path
 
 import pytest
 import torch
+from safetensors.torch import save_file
 from torch import tensor
 
-from invokeai.backend.model_manager import BaseModelType, ModelRepoVariant
+from invokeai.backend.model_manager import BaseModelType, ModelRepoVariant, ModelType
 from invokeai.backend.model_manager.config import InvalidModelConfigException, MainDiffusersConfig, ModelVariantType
 from invokeai.backend.model_manager.probe import (
     CkptType,
+    LoRACheckpointProbe,
     ModelProbe,
     VaeFolderProbe,
     get_default_settings_control_adapters,
     get_default_settings_main,
 )
+from invokeai.backend.model_manager.util.model_util import LazySafetensorsStateDict
 
 
 @pytest.mark.parametrize(
@@ -88,3 +91,54 @@ def test_probe_sd1_diffusers_inpainting(datadir: Path):
     assert config.base is BaseModelType.StableDiffusion1
     assert config.variant is ModelVariantType.Inpaint
     assert config.repo_variant is ModelRepoVariant.FP16
+
+
+def test_lazy_safetensors_state_dict_reads_accessed_tensors_only(tmp_path: Path):
+    sd_path = tmp_path / "sd.safetensors"
+    save_file({"a": torch.ones(2, 3), "b": torch.zeros(4, dtype=torch.bfloat16), "c": torch.ones(1)}, sd_path)
+
+    state_dict = LazySafetensorsStateDict(sd_path)
+    assert sorted(state_dict.keys()) == ["a", "b", "c"]
+    assert "b" in state_dict
+    assert "d" not in state_dict
+    assert state_dict.get_shape("a") == torch.Size([2, 3])
+    assert state_dict.loaded_keys == set()
+
+    assert torch.equal(state_dict["b"], torch.zeros(4, dtype=torch.bfloat16))
+    assert state_dict.get("d") is None
+    assert state_dict.loaded_keys == {"b"}
+
+
+def test_probe_lora_reads_few_tensors(tmp_path: Path):
+    state_dict = {
+        f"lora_unet_down_blocks_{i}_attentions_0_transformer_blocks_0_attn1_to_q.lora_down.weight": torch.ones(4, 320)
+        for i in range(50)
+    }
+    state_dict["lora_unet_down_blocks_0_attentions_0_transformer_blocks_0_attn2_to_k.lora_down.weight"] = torch.ones(
+        4, 768
+    )
+    lora_path = tmp_path / "lora.safetensors"
+    save_file(state_dict, lora_path)
+
+    probe = LoRACheckpointProbe(lora_path)
+    assert probe.get_base_type() is BaseModelType.StableDiffusion1
+    assert isinstance(probe.checkpoint, LazySafetensorsStateDict)
+    assert probe.checkpoint.loaded_keys == {
+        "lora_unet_down_blocks_0_attentions_0_transformer_blocks_0_attn2_to_k.lora_down.weight"
+    }
+
+
+def test_probe_lazily_loaded_flux_control_lora(tmp_path: Path):
+    state_dict = {
+        "img_in.lora_A.weight": torch.ones(2, 128),
+        "img_in.lora_B.weight": torch.ones(3072, 2),
+        "img_in.lora_B.bias": torch.ones(3072),
+    }
+    lora_path = tmp_path / "flux_control_lora.safetensors"
+    save_file(state_dict, lora_path)
+
+    model_type = ModelProbe.get_model_type_from_checkpoint(lora_path, LazySafetensorsStateDict(lora_path))
+    assert model_type is ModelType.ControlLoRa
+    config = ModelProbe.probe(lora_path)
+    assert config.type is ModelType.ControlLoRa
+    assert config.base is BaseModelType.Flux
@@ -168,8 +168,36 @@ def test_obj_serializer_fwd_cache_respects_cache_size(fwd_cache: ObjectSerialize
     assert obj_1_name not in fwd_cache._cache
     assert obj_2_name in fwd_cache._cache
     assert obj_3_name in fwd_cache._cache
-    # apparently qsize is "not reliable"?
-    assert fwd_cache._cache_ids.qsize() == 2
+    assert len(fwd_cache._cache) == 2
+
+
+def test_obj_serializer_fwd_cache_evicts_lru(fwd_cache: ObjectSerializerForwardCache[MockDataclass]):
+    obj_1_name = fwd_cache.save(MockDataclass(foo="bar"))
+    obj_2_name = fwd_cache.save(MockDataclass(foo="baz"))
+    # Loading refreshes recency, so the second object is evicted instead of the first
+    fwd_cache.load(obj_1_name)
+    obj_3_name = fwd_cache.save(MockDataclass(foo="qux"))
+    assert obj_1_name in fwd_cache._cache
+    assert obj_2_name not in fwd_cache._cache
+    assert obj_3_name in fwd_cache._cache
+
+
+def test_obj_serializer_fwd_cache_respects_cache_bytes(tmp_path: Path):
+    tensor_size = torch.zeros(256).element_size() * 256
+    fwd_cache = ObjectSerializerForwardCache(
+        ObjectSerializerDisk[torch.Tensor](tmp_path), max_cache_size=10, max_cache_bytes=tensor_size * 2
+    )
+    name_1 = fwd_cache.save(torch.zeros(256))
+    name_2 = fwd_cache.save(torch.zeros(256))
+    name_3 = fwd_cache.save(torch.zeros(256))
+    assert list(fwd_cache._cache.keys()) == [name_2, name_3]
+    assert fwd_cache._cache_bytes == tensor_size * 2
+    # Objects larger than the whole budget are not cached
+    name_4 = fwd_cache.save(torch.zeros(1024))
+    assert name_4 not in fwd_cache._cache
+    assert list(fwd_cache._cache.keys()) == [name_2, name_3]
+    # Evicted objects are still loadable from the underlying storage
+    assert torch.equal(fwd_cache.load(name_1), torch.zeros(256))
 
 
 def test_obj_serializer_fwd_cache_calls_delete_callback(fwd_cache: ObjectSerializerForwardCache[MockDataclass]):
@@ -184,3 +212,67 @@ def test_obj_serializer_fwd_cache_calls_delete_callback(fwd_cache: ObjectSeriali
     obj_1_name = fwd_cache.save(obj_1)
     fwd_cache.delete(obj_1_name)
     assert called_name == obj_1_name
+
+
+def test_obj_serializer_exists(obj_serializer: ObjectSerializerDisk[MockDataclass]):
+    obj_1_name = obj_serializer.save(MockDataclass(foo="bar"))
+    assert obj_serializer.exists(obj_1_name)
+    assert not obj_serializer.exists("nonexistent_object_name")
+    obj_serializer.delete(obj_1_name)
+    assert not obj_serializer.exists(obj_1_name)
+
+
+def test_obj_serializer_write_behind_reads_own_writes(tmp_path: Path):
+    obj_serializer = ObjectSerializerDisk[MockDataclass](tmp_path, write_behind=True)
+    obj_1 = MockDataclass(foo="bar")
+    obj_1_name = obj_serializer.save(obj_1)
+    # The object is readable immediately, whether or not it has been written yet
+    assert obj_serializer.exists(obj_1_name)
+    assert obj_serializer.load(obj_1_name).foo == "bar"
+    obj_serializer.flush()
+    assert obj_serializer._pending == {}
+    assert Path(obj_serializer._output_dir, obj_1_name).exists()
+    assert obj_serializer.load(obj_1_name).foo == "bar"
+    obj_serializer.stop(None)  # pyright: ignore [reportArgumentType]
+
+
+def test_obj_serializer_write_behind_deletes_pending(tmp_path: Path):
+    obj_serializer = ObjectSerializerDisk[MockDataclass](tmp_path, write_behind=True)
+    names = [obj_serializer.save(MockDataclass(foo=str(i))) for i in range(20)]
+    for name in names:
+        obj_serializer.delete(name)
+    obj_serializer.flush()
+    for name in names:
+        assert not obj_serializer.exists(name)
+    assert count_files(tmp_path) == 0
+    with pytest.raises(ObjectNotFoundError):
+        obj_serializer.load(names[0])
+    obj_serializer.stop(None)  # pyright: ignore [reportArgumentType]
+
+
+def test_obj_serializer_write_behind_drops_failed_writes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    obj_serializer = ObjectSerializerDisk[MockDataclass](tmp_path, write_behind=True)
+
+    def failing_write(obj: MockDataclass, file_path: Path) -> None:
+        file_path.write_bytes(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(obj_serializer, "_write", failing_write)
+    name = obj_serializer.save(MockDataclass(foo="bar"))
+    obj_serializer.flush()
+    assert obj_serializer._pending == {}
+    assert not obj_serializer.exists(name)
+    with pytest.raises(ObjectNotFoundError):
+        obj_serializer.load(name)
+    obj_serializer.stop(None)  # pyright: ignore [reportArgumentType]
+
+
+def test_obj_serializer_write_behind_flushes_on_stop(tmp_path: Path):
+    obj_serializer = ObjectSerializerDisk[MockDataclass](tmp_path, write_behind=True)
+    names = [obj_serializer.save(MockDataclass(foo=str(i))) for i in range(20)]
+    obj_serializer.stop(None)  # pyright: ignore [reportArgumentType]
+    assert count_files(tmp_path) == 20
+    assert [obj_serializer.load(name).foo for name in names] == [str(i) for i in range(20)]
+    # Saves after stopping are written synchronously
+    name = obj_serializer.save(MockDataclass(foo="bar"))
+    assert Path(obj_serializer._output_dir, name).exists()
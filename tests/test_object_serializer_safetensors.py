@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+import torch
+
+from invokeai.app.services.object_serializer.object_serializer_common import ObjectNotFoundError
+from invokeai.app.services.object_serializer.object_serializer_safetensors import ObjectSerializerSafetensors
+from invokeai.backend.stable_diffusion.diffusion.conditioning_data import (
+    BasicConditioningInfo,
+    ConditioningFieldData,
+    FLUXConditioningInfo,
+    SD3ConditioningInfo,
+    SDXLConditioningInfo,
+)
+
+
+@dataclass
+class MockDataclass:
+    foo: str
+
+
+@pytest.fixture
+def tensor_serializer(tmp_path: Path):
+    return ObjectSerializerSafetensors[torch.Tensor](tmp_path)
+
+
+@pytest.fixture
+def conditioning_serializer(tmp_path: Path):
+    return ObjectSerializerSafetensors[ConditioningFieldData](tmp_path)
+
+
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float16, torch.bfloat16, torch.bool])
+def test_obj_serializer_safetensors_tensor(tensor_serializer: ObjectSerializerSafetensors[torch.Tensor], dtype):
+    tensor = torch.rand(1, 4, 8, 8) > 0.5 if dtype == torch.bool else torch.rand(1, 4, 8, 8).to(dtype)
+    name = tensor_serializer.save(tensor)
+    assert name.startswith("Tensor_")
+    with open(tensor_serializer._get_path(name), "rb") as file:
+        # A safetensors file, not a zip written by torch.save
+        assert file.read(2) != b"PK"
+    loaded = tensor_serializer.load(name)
+    assert loaded.dtype == dtype
+    assert torch.equal(loaded, tensor)
+
+
+def test_obj_serializer_safetensors_loads_copy_on_write(tensor_serializer: ObjectSerializerSafetensors[torch.Tensor]):
+    name = tensor_serializer.save(torch.zeros(16))
+    loaded_1 = tensor_serializer.load(name)
+    loaded_1 += 1
+    # Writes to a loaded tensor do not affect the file or other readers
+    loaded_2 = tensor_serializer.load(name)
+    assert torch.equal(loaded_2, torch.zeros(16))
+    assert torch.equal(loaded_1, torch.ones(16))
+
+
+def test_obj_serializer_safetensors_edge_case_tensors(tensor_serializer: ObjectSerializerSafetensors[torch.Tensor]):
+    for tensor in (torch.tensor(3.0), torch.zeros(0, 4), torch.arange(16).reshape(4, 4).t()):
+        assert torch.equal(tensor_serializer.load(tensor_serializer.save(tensor)), tensor)
+
+
+@pytest.mark.parametrize(
+    "conditioning",
+    [
+        BasicConditioningInfo(embeds=torch.rand(1, 77, 768)),
+        SDXLConditioningInfo(
+            embeds=torch.rand(1, 77, 2048), pooled_embeds=torch.rand(1, 1280), add_time_ids=torch.rand(1, 6)
+        ),
+        FLUXConditioningInfo(clip_embeds=torch.rand(1, 768), t5_embeds=torch.rand(1, 512, 64).to(torch.bfloat16)),
+        SD3ConditioningInfo(
+            clip_l_pooled_embeds=torch.rand(1, 768),
+            clip_l_embeds=torch.rand(1, 77, 768),
+            clip_g_pooled_embeds=torch.rand(1, 1280),
+            clip_g_embeds=torch.rand(1, 77, 1280),
+            t5_embeds=None,
+        ),
+    ],
+)
+def test_obj_serializer_safetensors_conditioning(
+    conditioning_serializer: ObjectSerializerSafetensors[ConditioningFieldData], conditioning
+):
+    name = conditioning_serializer.save(ConditioningFieldData(conditionings=[conditioning]))
+    loaded = conditioning_serializer.load(name)
+    assert len(loaded.conditionings) == 1
+    loaded_conditioning = loaded.conditionings[0]
+    assert type(loaded_conditioning) is type(conditioning)
+    for field_name, value in vars(conditioning).items():
+        loaded_value = getattr(loaded_conditioning, field_name)
+        if value is None:
+            assert loaded_value is None
+        else:
+            assert torch.equal(loaded_value, value)
+
+
+def test_obj_serializer_safetensors_shared_storage(tensor_serializer: ObjectSerializerSafetensors[torch.Tensor]):
+    embeds = torch.rand(2, 77, 768)
+    serializer = ObjectSerializerSafetensors[ConditioningFieldData](tensor_serializer._output_dir)
+    conditioning = ConditioningFieldData(
+        conditionings=[BasicConditioningInfo(embeds=embeds[0]), BasicConditioningInfo(embeds=embeds[1])]
+    )
+    loaded = serializer.load(serializer.save(conditioning))
+    assert torch.equal(loaded.conditionings[0].embeds, embeds[0])
+    assert torch.equal(loaded.conditionings[1].embeds, embeds[1])
+
+
+def test_obj_serializer_safetensors_falls_back_to_torch(tmp_path: Path):
+    serializer = ObjectSerializerSafetensors[MockDataclass](tmp_path)
+    name = serializer.save(MockDataclass(foo="bar"))
+    assert serializer.load(name).foo == "bar"
+
+
+def test_obj_serializer_safetensors_write_behind(tmp_path: Path):
+    serializer = ObjectSerializerSafetensors[torch.Tensor](tmp_path, write_behind=True)
+    tensor = torch.rand(4, 4)
+    name = serializer.save(tensor)
+    assert serializer.load(name) is tensor
+    serializer.flush()
+    assert torch.equal(serializer.load(name), tensor)
+    serializer.delete(name)
+    with pytest.raises(ObjectNotFoundError):
+        serializer.load(name)
+    serializer.stop(None)  # pyright: ignore [reportArgumentType]
@@ -8,9 +8,11 @@ from invokeai.app.services.session_queue.session_queue_common import (
     NodeFieldValue,
     calc_session_count,
     create_session_nfv_tuples,
+    get_field_values,
+    get_session,
     prepare_values_to_insert,
 )
-from invokeai.app.services.shared.graph import Graph, GraphExecutionState
+from invokeai.app.services.shared.graph import Graph
 from tests.test_nodes import PromptTestInvocation
 
 
@@ -120,14 +122,39 @@ def test_calc_session_count(batch_data_collection, batch_graph):
     assert calc_session_count(batch=b) == 8
 
 
+def test_calc_session_count_does_not_expand_batch(batch_graph):
+    b = Batch(
+        graph=batch_graph,
+        data=[
+            [BatchDatum(node_path="1", field_name="prompt", items=[str(i) for i in range(1000)])],
+            [BatchDatum(node_path="2", field_name="prompt", items=[str(i) for i in range(1000)])],
+            [BatchDatum(node_path="3", field_name="prompt", items=[str(i) for i in range(1000)])],
+        ],
+        runs=3,
+    )
+    # Far too many sessions to create, but they are counted instantly
+    assert calc_session_count(batch=b) == 3 * 1000**3
+
+
+def test_calc_session_count_without_data(batch_graph):
+    assert calc_session_count(batch=Batch(graph=batch_graph, runs=3)) == 3
+
+
 def test_prepare_values_to_insert(batch_data_collection, batch_graph):
     b = Batch(graph=batch_graph, data=batch_data_collection, runs=2)
-    values = prepare_values_to_insert(queue_id="default", batch=b, priority=0, max_new_queue_items=1000)
+    values = list(
+        prepare_values_to_insert(queue_id="default", batch=b, priority=0, max_new_queue_items=1000, graph_id=1)
+    )
     assert len(values) == 8
 
-    GraphExecutionStateValidator = TypeAdapter(GraphExecutionState)
-    # graph should be serialized
-    ges = GraphExecutionStateValidator.validate_json(values[0].session)
+    # session should be built from the shared graph and the field values
+    queue_item_dict = {
+        "session": None,
+        "session_id": values[0].session_id,
+        "graph": batch_graph.model_dump_json(),
+        "field_values": get_field_values(values[0]._asdict()),
+    }
+    ges = get_session(queue_item_dict)
 
     # graph values should be populated
     assert ges.graph.get_node("1").prompt == "Banana sushi"
@@ -135,8 +162,14 @@ def test_prepare_values_to_insert(batch_data_collection, batch_graph):
     assert ges.graph.get_node("3").prompt == "Orange sushi"
     assert ges.graph.get_node("4").prompt == "Nissan"
 
-    # session ids should match deserialized graph
-    assert [v.session_id for v in values] == [GraphExecutionStateValidator.validate_json(v.session).id for v in values]
+    # session id should match the queue item's
+    assert ges.id == values[0].session_id
+
+    # the shared graph should not be modified
+    assert batch_graph.get_node("1").prompt == "Chevy"
+
+    # should all share the graph
+    assert all(v.graph_id == 1 for v in values)
 
     # should unique session ids
     sids = [v.session_id for v in values]
@@ -154,13 +187,13 @@ def test_prepare_values_to_insert(batch_data_collection, batch_graph):
 
 def test_prepare_values_to_insert_with_priority(batch_data_collection, batch_graph):
     b = Batch(graph=batch_graph, data=batch_data_collection, runs=2)
-    values = prepare_values_to_insert(queue_id="default", batch=b, priority=1, max_new_queue_items=1000)
+    values = prepare_values_to_insert(queue_id="default", batch=b, priority=1, max_new_queue_items=1000, graph_id=1)
     assert all(v.priority == 1 for v in values)
 
 
 def test_prepare_values_to_insert_with_max(batch_data_collection, batch_graph):
     b = Batch(graph=batch_graph, data=batch_data_collection, runs=2)
-    values = prepare_values_to_insert(queue_id="default", batch=b, priority=1, max_new_queue_items=5)
+    values = list(prepare_values_to_insert(queue_id="default", batch=b, priority=1, max_new_queue_items=5, graph_id=1))
     assert len(values) == 5
 
 
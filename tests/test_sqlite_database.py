@@ -0,0 +1,172 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from invokeai.app.services.shared.sqlite.sqlite_database import SqliteDatabase
+from invokeai.backend.util.logging import InvokeAILogger
+
+
+@pytest.fixture
+def file_db(tmp_path: Path) -> SqliteDatabase:
+    db = SqliteDatabase(db_path=tmp_path / "test.db", logger=InvokeAILogger.get_logger(), read_pool_size=2)
+    db.conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, value TEXT);")
+    db.conn.commit()
+    return db
+
+
+@pytest.fixture
+def memory_db() -> SqliteDatabase:
+    db = SqliteDatabase(db_path=None, logger=InvokeAILogger.get_logger())
+    db.conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, value TEXT);")
+    db.conn.commit()
+    return db
+
+
+def test_file_db_uses_wal(file_db: SqliteDatabase):
+    assert file_db.conn.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+
+
+def test_read_connection_is_read_only(file_db: SqliteDatabase):
+    with file_db.read_connection() as conn:
+        assert conn is not file_db.conn
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO test (value) VALUES ('a');")
+
+
+def test_read_connection_sees_committed_writes(file_db: SqliteDatabase):
+    file_db.conn.execute("INSERT INTO test (value) VALUES ('a');")
+    file_db.conn.commit()
+    with file_db.read_connection() as conn:
+        assert conn.execute("SELECT value FROM test;").fetchall()[0]["value"] == "a"
+
+
+def test_read_connection_does_not_wait_for_writes(file_db: SqliteDatabase):
+    read_values: list[str] = []
+
+    def read() -> None:
+        with file_db.read_connection() as conn:
+            read_values.extend(row["value"] for row in conn.execute("SELECT value FROM test;"))
+
+    with file_db.lock:
+        file_db.conn.execute("INSERT INTO test (value) VALUES ('a');")
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        file_db.conn.commit()
+
+    # The uncommitted write was not visible to the reader
+    assert read_values == []
+
+
+def test_read_connection_is_a_snapshot(file_db: SqliteDatabase):
+    with file_db.read_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM test;").fetchone()[0] == 0
+        with file_db.lock:
+            file_db.conn.execute("INSERT INTO test (value) VALUES ('a');")
+            file_db.conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM test;").fetchone()[0] == 0
+
+    with file_db.read_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM test;").fetchone()[0] == 1
+
+
+def test_read_connection_while_holding_the_lock_sees_own_writes(file_db: SqliteDatabase):
+    with file_db.lock:
+        file_db.conn.execute("INSERT INTO test (value) VALUES ('a');")
+        with file_db.read_connection() as conn:
+            assert conn is file_db.conn
+            assert conn.execute("SELECT COUNT(*) FROM test;").fetchone()[0] == 1
+        file_db.conn.rollback()
+
+
+def test_read_connections_are_pooled(file_db: SqliteDatabase):
+    with file_db.read_connection() as conn_1, file_db.read_connection() as conn_2:
+        assert conn_1 is not conn_2
+    with file_db.read_connection() as conn_3:
+        assert conn_3 in (conn_1, conn_2)
+
+
+def test_memory_db_reads_use_the_write_connection(memory_db: SqliteDatabase):
+    memory_db.conn.execute("INSERT INTO test (value) VALUES ('a');")
+    memory_db.conn.commit()
+    with memory_db.read_connection() as conn:
+        assert conn is memory_db.conn
+        assert conn.execute("SELECT COUNT(*) FROM test;").fetchone()[0] == 1
+
+
+def test_lock_is_reentrant(memory_db: SqliteDatabase):
+    with memory_db.lock:
+        with memory_db.lock:
+            pass
+        # Still held by this thread, so another thread cannot take it
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: memory_db.lock.acquire() and acquired.set())
+        thread.start()
+        assert not acquired.wait(timeout=0.1)
+    assert acquired.wait(timeout=5)
+    thread.join()
+
+
+def test_lock_release_by_non_owner_raises(memory_db: SqliteDatabase):
+    with pytest.raises(RuntimeError):
+        memory_db.lock.release()
+
+
+def test_lock_is_granted_in_order(memory_db: SqliteDatabase):
+    order: list[int] = []
+
+    def take(i: int) -> None:
+        with memory_db.lock:
+            order.append(i)
+
+    threads = [threading.Thread(target=take, args=(i,)) for i in range(5)]
+    with memory_db.lock:
+        for thread in threads:
+            thread.start()
+            # Wait for each thread to queue up before starting the next
+            while len(memory_db._write_lock._waiters) < threads.index(thread) + 1:
+                time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_lock_stats_are_recorded_per_name(file_db: SqliteDatabase):
+    images_lock = file_db.get_lock("images")
+    queue_lock = file_db.get_lock("queue")
+
+    with images_lock:
+        time.sleep(0.05)
+    with queue_lock:
+        pass
+    with queue_lock:
+        pass
+    with file_db.read_connection("images"):
+        pass
+
+    stats = file_db.get_lock_stats()
+    assert stats["images"].acquisitions == 1
+    assert stats["images"].hold_time >= 0.05
+    assert stats["images"].reads == 1
+    assert stats["queue"].acquisitions == 2
+    assert stats["queue"].reads == 0
+
+
+def test_lock_stats_record_waits(memory_db: SqliteDatabase):
+    waiter = memory_db.get_lock("waiter")
+    thread = threading.Thread(target=lambda: waiter.acquire() and waiter.release())
+    with memory_db.get_lock("holder"):
+        thread.start()
+        while not memory_db._write_lock._waiters:
+            time.sleep(0.001)
+        time.sleep(0.05)
+    thread.join()
+
+    stats = memory_db.get_lock_stats()
+    assert stats["waiter"].wait_time >= 0.05
+    assert stats["waiter"].max_wait_time == stats["waiter"].wait_time
+    assert stats["holder"].wait_time < 0.05